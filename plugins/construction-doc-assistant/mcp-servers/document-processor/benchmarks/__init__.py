@@ -0,0 +1,18 @@
+"""
+基准测试模块
+
+生成合成建筑施工语料,通过服务器工具调用路径测量吞吐量、延迟和峰值内存
+运行方式: python -m benchmarks (见 README "性能基准测试")
+"""
+
+from .corpus import CorpusGenerator, generate_corpus, SCALE_PRESETS
+from .runner import BenchmarkRunner, compare_results, SCENARIOS
+
+__all__ = [
+    'CorpusGenerator',
+    'generate_corpus',
+    'SCALE_PRESETS',
+    'BenchmarkRunner',
+    'compare_results',
+    'SCENARIOS',
+]
@@ -0,0 +1,117 @@
+"""
+基准测试命令行入口
+
+在 document-processor 目录下运行:
+
+    python -m benchmarks --scale small --output results.json
+    python -m benchmarks --scale medium --pages 50 --compare baseline.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import SCALE_PRESETS, generate_corpus
+from benchmarks.runner import SCENARIOS, BenchmarkRunner, compare_results
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="建筑施工文档处理 MCP 服务器基准测试"
+    )
+    parser.add_argument("--scale", choices=list(SCALE_PRESETS), default="small", help="语料规模预设 (默认 small)")
+    parser.add_argument("--docs", type=int, help="每种类型的文档数")
+    parser.add_argument("--pages", type=int, help="Word/PDF/Markdown 页数")
+    parser.add_argument("--rows", type=int, help="Excel 每个工作表的行数")
+    parser.add_argument("--sheets", type=int, help="Excel 工作表数")
+    parser.add_argument("--tables", type=int, help="每个 Word 文档的表格数")
+    parser.add_argument("--slides", type=int, help="PowerPoint 幻灯片数")
+    parser.add_argument("--seed", type=int, default=20240315, help="语料随机种子")
+    parser.add_argument("--corpus-dir", help="语料目录 (已有 corpus.json 时直接复用,默认使用临时目录)")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="只运行指定场景 (可重复)")
+    parser.add_argument("--iterations", type=int, default=3, help="每个场景的轮数 (默认 3)")
+    parser.add_argument("--parse-mode", choices=["summary", "full"], default="full", help="parse_* 场景的解析模式")
+    parser.add_argument("--cache", action="store_true", help="启用解析缓存 (默认关闭)")
+    parser.add_argument("--no-isolate", action="store_true", help="所有场景在同一进程中运行")
+    parser.add_argument("--output", help="结果 JSON 输出文件 (默认输出到 stdout)")
+    parser.add_argument("--compare", help="对比的基线结果 JSON")
+    parser.add_argument("--threshold", type=float, default=0.1, help="判定退化的相对变化阈值 (默认 0.1)")
+    parser.add_argument("--worker", choices=list(SCENARIOS), help=argparse.SUPPRESS)
+    return parser
+
+
+def _load_corpus(args) -> dict:
+    """复用已有语料或按参数生成语料"""
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix="construction-bench-")
+    manifest_path = os.path.join(corpus_dir, "corpus.json")
+
+    scale = dict(SCALE_PRESETS[args.scale])
+    for key in scale:
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if args.worker or (manifest["scale"] == scale and manifest["seed"] == args.seed):
+            return manifest
+
+    return generate_corpus(corpus_dir, scale, args.seed)
+
+
+def _print_summary(result: dict, comparison: list):
+    """在 stderr 输出结果摘要"""
+    print(f"{'场景':<28}{'调用':>6}{'首次ms':>10}{'p50ms':>10}{'p95ms':>10}{'文档/s':>10}{'RSS MB':>9}", file=sys.stderr)
+    for name, item in result["results"].items():
+        print(
+            f"{name:<28}{item['calls']:>6}{item['cold_ms']:>10}{item['p50_ms']:>10}"
+            f"{item['p95_ms']:>10}{item['docs_per_second']:>10}{str(item['peak_rss_mb']):>9}",
+            file=sys.stderr
+        )
+
+    regressions = [item for item in comparison if item["regression"]]
+    if comparison:
+        print(f"\n与基线对比: {len(regressions)} 项退化", file=sys.stderr)
+        for item in regressions:
+            print(
+                f"  ⚠️ {item['scenario']} {item['metric']}: "
+                f"{item['baseline']} -> {item['current']} ({item['change']:+.1%})",
+                file=sys.stderr
+            )
+
+
+def main(argv=None) -> int:
+    args = _build_parser().parse_args(argv)
+    manifest = _load_corpus(args)
+    runner = BenchmarkRunner(manifest, args.iterations, args.parse_mode, args.cache)
+
+    # 子进程: 运行单个场景,结果输出到 stdout
+    if args.worker:
+        print(json.dumps(runner.run_scenario(args.worker)))
+        return 0
+
+    result = runner.run(args.scenario, isolate=not args.no_isolate)
+
+    comparison = []
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            comparison = compare_results(json.load(f), result, args.threshold)
+        result["comparison"] = comparison
+
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    _print_summary(result, comparison)
+    return 1 if any(item["regression"] for item in comparison) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+合成语料生成模块
+
+按可配置规模生成建筑施工领域的合成文档 (内容由固定随机种子生成,可重复):
+- Word (.docx): 多级编号标题、正文段落和表格
+- Excel (.xlsx): 多个工作表的进度/材料台账
+- PowerPoint (.pptx): 标题 + 要点的汇报幻灯片
+- PDF (.pdf): 多页文本 (仅含文本层,字形不可用于显示)
+- Markdown (.md): generate_word_report 的报告源文件
+"""
+from typing import Dict, List, Optional
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+# 规模预设: 每种类型的文档数、Word/PDF 页数、每个工作表行数、每个 Word 文档表格数、幻灯片数
+SCALE_PRESETS = {
+    "small": {"docs": 3, "pages": 5, "rows": 200, "sheets": 2, "tables": 2, "slides": 10},
+    "medium": {"docs": 5, "pages": 30, "rows": 2000, "sheets": 3, "tables": 5, "slides": 40},
+    "large": {"docs": 10, "pages": 100, "rows": 20000, "sheets": 4, "tables": 10, "slides": 100},
+}
+
+_CHAPTERS = ['工程概况', '施工部署', '施工进度计划', '主要分部分项工程施工方法', '质量管理措施',
+             '安全文明施工措施', '环境保护措施', '验收情况', '存在问题及整改', '下一步工作安排']
+_SECTIONS = ['基础工程', '主体结构', '钢筋工程', '模板工程', '混凝土工程', '砌体工程',
+             '防水工程', '装饰装修', '给排水安装', '电气安装', '幕墙工程', '室外工程']
+_SUBJECTS = ['本工程', '施工单位', '监理单位', '建设单位', '项目部', '质检员', '安全员', '总包单位']
+_ACTIONS = ['完成了', '组织了', '检查了', '整改了', '浇筑了', '验收了', '复核了', '提交了']
+_OBJECTS = ['地下室底板混凝土', '三层框架柱钢筋', '屋面防水卷材', '外墙保温层', '脚手架搭设',
+            '塔吊基础', '隐蔽工程', '砌体墙面', '给水管道试压', '配电箱安装']
+_DETAILS = ['混凝土强度等级为C30', '钢筋保护层厚度符合设计要求', '检验批验收合格',
+            '发现安全隐患2处并已整改', '进度滞后3天', '完成率达到85%', '投资金额1200万元',
+            '坍落度控制在180mm±20mm', '经监理工程师旁站确认', '资料已归档']
+_MATERIALS = ['C30商品混凝土', 'HRB400钢筋', '烧结多孔砖', 'SBS防水卷材', '镀锌钢管',
+              'PVC线管', '岩棉保温板', '水泥砂浆', '铝合金型材', '中空玻璃']
+_UNITS = ['m³', 't', '千块', 'm²', 'm', 'm', 'm²', 'm³', 't', 'm²']
+
+
+class CorpusGenerator:
+    """合成语料生成器"""
+
+    def __init__(self, output_dir: str, scale: Optional[Dict] = None, seed: int = 20240315):
+        """
+        初始化语料生成器
+
+        Args:
+            output_dir: 语料输出目录
+            scale: 规模参数 (docs/pages/rows/sheets/tables/slides,缺省项取 small 预设)
+            seed: 随机种子
+        """
+        self.output_dir = os.path.abspath(output_dir)
+        self.scale = {**SCALE_PRESETS["small"], **(scale or {})}
+        self.seed = seed
+        self.logger = get_logger(__name__)
+
+    def generate(self) -> Dict:
+        """
+        生成全部语料并写入清单 (corpus.json)
+
+        Returns:
+            语料清单 {"scale": ..., "files": {类型: [路径]}, "total_bytes": ...}
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        generators = {
+            "word": ("docx", self._write_docx),
+            "excel": ("xlsx", self._write_xlsx),
+            "powerpoint": ("pptx", self._write_pptx),
+            "pdf": ("pdf", self._write_pdf),
+            "markdown": ("md", self._write_markdown),
+        }
+
+        files: Dict[str, List[str]] = {}
+        for file_type, (extension, write) in generators.items():
+            files[file_type] = []
+            for i in range(1, self.scale["docs"] + 1):
+                # 每个文档使用独立的随机序列,规模参数不变时内容不变
+                rng = random.Random(f"{self.seed}-{file_type}-{i}")
+                path = os.path.join(self.output_dir, f"{file_type}_{i:03d}.{extension}")
+                write(path, rng, i)
+                files[file_type].append(path)
+
+        manifest = {
+            "scale": self.scale,
+            "seed": self.seed,
+            "files": files,
+            "total_bytes": sum(os.path.getsize(p) for paths in files.values() for p in paths),
+        }
+        with open(os.path.join(self.output_dir, "corpus.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        self.logger.info(
+            "合成语料生成完成: %s 个文件, %.1f MB - %s",
+            sum(len(p) for p in files.values()), manifest['total_bytes'] / 1024 / 1024, self.output_dir
+        )
+        return manifest
+
+    # ========== 文本 ==========
+
+    @staticmethod
+    def _sentence(rng: random.Random) -> str:
+        """生成一句施工记录"""
+        return (f"{rng.choice(_SUBJECTS)}{rng.choice(_ACTIONS)}{rng.choice(_OBJECTS)}，"
+                f"{rng.choice(_DETAILS)}。")
+
+    def _paragraph(self, rng: random.Random) -> str:
+        """生成一个正文段落 (3-6 句)"""
+        return ''.join(self._sentence(rng) for _ in range(rng.randint(3, 6)))
+
+    @staticmethod
+    def _chapter_title(page: int) -> str:
+        """第 page 章的标题 (中文编号)"""
+        numerals = '一二三四五六七八九十'
+        if page <= 10:
+            numeral = numerals[page - 1]
+        elif page < 20:
+            numeral = '十' + numerals[page - 11]
+        else:
+            numeral = str(page)
+        return f"{numeral}、{_CHAPTERS[(page - 1) % len(_CHAPTERS)]}"
+
+    def _table_rows(self, rng: random.Random, count: int) -> List[List[str]]:
+        """生成材料台账表格行 (含表头)"""
+        rows = [['序号', '材料名称', '规格', '单位', '数量', '进场日期']]
+        for i in range(1, count + 1):
+            material = rng.randrange(len(_MATERIALS))
+            rows.append([
+                str(i), _MATERIALS[material], f"规格{rng.randint(1, 20)}", _UNITS[material],
+                str(rng.randint(10, 5000)), f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            ])
+        return rows
+
+    # ========== 各类型文档 ==========
+
+    def _write_docx(self, path: str, rng: random.Random, index: int):
+        """Word: 每页一个一级标题、两个二级标题和约 8 个段落;表格均匀分布在各页之后"""
+        from docx import Document
+
+        doc = Document()
+        doc.add_heading(f"某住宅项目施工报告 {index}", 0)
+
+        pages = self.scale["pages"]
+        table_pages = {round((t + 1) * pages / (self.scale["tables"] + 1)) for t in range(self.scale["tables"])}
+        for page in range(1, pages + 1):
+            doc.add_heading(self._chapter_title(page), 1)
+            for section in range(1, 3):
+                doc.add_heading(f"{page}.{section} {rng.choice(_SECTIONS)}", 2)
+                for _ in range(4):
+                    doc.add_paragraph(self._paragraph(rng))
+
+            if page in table_pages:
+                rows = self._table_rows(rng, 10)
+                table = doc.add_table(rows=len(rows), cols=len(rows[0]))
+                for row, values in zip(table.rows, rows):
+                    for cell, value in zip(row.cells, values):
+                        cell.text = value
+
+        doc.save(path)
+
+    def _write_xlsx(self, path: str, rng: random.Random, index: int):
+        """Excel: 每个工作表为一份材料台账 (write-only 模式,支持大行数)"""
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        for sheet in range(1, self.scale["sheets"] + 1):
+            worksheet = workbook.create_sheet(f"{_SECTIONS[(sheet - 1) % len(_SECTIONS)]}台账")
+            for row in self._table_rows(rng, self.scale["rows"]):
+                worksheet.append(row)
+        workbook.save(path)
+
+    def _write_pptx(self, path: str, rng: random.Random, index: int):
+        """PowerPoint: 每张幻灯片一个标题和 4 条要点"""
+        from pptx import Presentation
+
+        presentation = Presentation()
+        layout = presentation.slide_layouts[1]
+        for slide_number in range(1, self.scale["slides"] + 1):
+            slide = presentation.slides.add_slide(layout)
+            slide.shapes.title.text = f"{slide_number}. {rng.choice(_SECTIONS)}进展汇报"
+            body = slide.placeholders[1].text_frame
+            body.text = self._sentence(rng)
+            for _ in range(3):
+                body.add_paragraph().text = self._sentence(rng)
+        presentation.save(path)
+
+    def _write_pdf(self, path: str, rng: random.Random, index: int):
+        """
+        PDF: 每页约 30 行文本
+
+        直接写出 PDF 结构: Identity-H 编码的 CID 字体加恒等 ToUnicode 映射,
+        文本层可被 PyPDF2 正确提取 (无需额外的 PDF 生成库)
+        """
+        pages = [
+            [self._chapter_title(page)] + [self._sentence(rng) for _ in range(30)]
+            for page in range(1, self.scale["pages"] + 1)
+        ]
+
+        # ToUnicode 只映射用到的字符 (整段 0000-FFFF 映射会使 PyPDF2 提取明显变慢)
+        chars = sorted({ord(char) for lines in pages for line in lines for char in line})
+        mappings = []
+        for start in range(0, len(chars), 100):
+            block = chars[start:start + 100]
+            mappings.append(b"%d beginbfchar\n" % len(block))
+            mappings.extend(b"<%04X> <%04X>\n" % (code, code) for code in block)
+            mappings.append(b"endbfchar\n")
+        to_unicode = (
+            b"/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+            b"/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+            b"1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+            + b"".join(mappings) +
+            b"endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend"
+        )
+        objects = {
+            1: b"<< /Type /Catalog /Pages 2 0 R >>",
+            3: b"<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /Identity-H "
+               b"/DescendantFonts [4 0 R] /ToUnicode 5 0 R >>",
+            4: b"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light "
+               b"/CIDSystemInfo << /Registry (Adobe) /Ordering (GB1) /Supplement 2 >> >>",
+            5: self._pdf_stream(to_unicode),
+        }
+
+        page_ids = []
+        for page, lines in enumerate(pages, 1):
+            operators = [b"BT /F1 10 Tf 14 TL 40 800 Td"]
+            operators.extend(b"<" + line.encode('utf-16-be').hex().encode() + b"> Tj T*" for line in lines)
+            operators.append(b"ET")
+
+            page_id = 4 + 2 * page
+            page_ids.append(page_id)
+            objects[page_id] = (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+            ).encode()
+            objects[page_id + 1] = self._pdf_stream(b"\n".join(operators))
+
+        kids = ' '.join(f"{page_id} 0 R" for page_id in page_ids)
+        objects[2] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+        output = bytearray(b"%PDF-1.4\n")
+        offsets = {}
+        for number in sorted(objects):
+            offsets[number] = len(output)
+            output += b"%d 0 obj\n" % number + objects[number] + b"\nendobj\n"
+
+        xref_offset = len(output)
+        size = max(objects) + 1
+        output += b"xref\n0 %d\n0000000000 65535 f \n" % size
+        for number in range(1, size):
+            output += b"%010d 00000 n \n" % offsets[number]
+        output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_offset)
+
+        with open(path, 'wb') as f:
+            f.write(output)
+
+    @staticmethod
+    def _pdf_stream(data: bytes) -> bytes:
+        """PDF 流对象"""
+        return b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+
+    def _write_markdown(self, path: str, rng: random.Random, index: int):
+        """Markdown 报告: 章节、段落、列表和表格 (规模与 Word 文档相同)"""
+        lines = [f"# 某住宅项目总结报告 {index}", ""]
+        for page in range(1, self.scale["pages"] + 1):
+            lines += [f"## {self._chapter_title(page)}", ""]
+            lines += [f"### {page}.1 {rng.choice(_SECTIONS)}", "", self._paragraph(rng), ""]
+            lines += [f"- **{rng.choice(_OBJECTS)}**: {rng.choice(_DETAILS)}" for _ in range(3)]
+            lines += ["", self._paragraph(rng), ""]
+
+            rows = self._table_rows(rng, 5)
+            lines.append("| " + " | ".join(rows[0]) + " |")
+            lines.append("|" + "---|" * len(rows[0]))
+            lines += ["| " + " | ".join(row) + " |" for row in rows[1:]]
+            lines.append("")
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines))
+
+
+# 便捷函数
+def generate_corpus(output_dir: str, scale: Optional[Dict] = None, seed: int = 20240315) -> Dict:
+    """生成合成语料的便捷函数"""
+    return CorpusGenerator(output_dir, scale, seed).generate()
@@ -0,0 +1,312 @@
+"""
+基准测试运行模块
+
+通过 server.call_tool 调用各工具 (与 MCP 客户端调用走同一路径,包含结果格式化),
+每个场景记录:
+- 吞吐量: 文档数/秒、输入 MB/秒
+- 延迟: 首次调用 (含按需导入) 与其余调用的 p50/p95/最大值
+- 峰值 RSS: 场景在独立子进程中运行时即为该场景的内存峰值
+
+结果写入 JSON,可与其他提交的结果对比 (compare_results)
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# 一次工具调用: (工具名, 参数, 输入字节数, 文档数)
+Call = Tuple[str, Dict, int, int]
+
+
+def _parse_calls(tool_name: str, file_type: str) -> Callable[[Dict, Dict], List[Call]]:
+    """单文档解析场景: 每个文档一次调用"""
+    def build(manifest: Dict, options: Dict) -> List[Call]:
+        return [
+            (tool_name, {"file_path": path, "parse_mode": options["parse_mode"]}, os.path.getsize(path), 1)
+            for path in manifest["files"][file_type]
+        ]
+    return build
+
+
+def _summary_calls(manifest: Dict, options: Dict) -> List[Call]:
+    """摘要场景: 全部类型的文档各一次调用"""
+    return [
+        ("extract_document_summary", {"file_path": path}, os.path.getsize(path), 1)
+        for file_type in ("word", "excel", "powerpoint", "pdf")
+        for path in manifest["files"][file_type]
+    ]
+
+
+def _batch_calls(manifest: Dict, options: Dict) -> List[Call]:
+    """批量解析场景: 全部文档按批量上限分批"""
+    from utils import config
+
+    paths = [p for t in ("word", "excel", "powerpoint", "pdf") for p in manifest["files"][t]]
+    batch_size = config.MAX_BATCH_SIZE
+    return [
+        (
+            "batch_parse_documents",
+            {"file_paths": batch, "extract_mode": "summary"},
+            sum(os.path.getsize(p) for p in batch),
+            len(batch),
+        )
+        for batch in (paths[i:i + batch_size] for i in range(0, len(paths), batch_size))
+    ]
+
+
+def _report_calls(manifest: Dict, options: Dict) -> List[Call]:
+    """报告生成场景: 每个 Markdown 源文件生成一份 Word 报告"""
+    output_dir = os.path.join(os.path.dirname(manifest["files"]["markdown"][0]), "reports")
+    os.makedirs(output_dir, exist_ok=True)
+    return [
+        (
+            "generate_word_report",
+            {
+                "markdown_file": path,
+                "output_file": os.path.join(output_dir, os.path.basename(path)[:-3] + ".docx"),
+                "project_info": {"project_name": "基准测试项目", "generate_date": "2024-03-15"},
+            },
+            os.path.getsize(path),
+            1,
+        )
+        for path in manifest["files"]["markdown"]
+    ]
+
+
+def _structure_calls(manifest: Dict, options: Dict) -> List[Call]:
+    """结构提取场景: 每个 Word 文档一次调用"""
+    return [
+        ("extract_document_structure", {"file_path": path, "max_depth": 3}, os.path.getsize(path), 1)
+        for path in manifest["files"]["word"]
+    ]
+
+
+# 场景名 -> 调用列表构建函数
+SCENARIOS: Dict[str, Callable[[Dict, Dict], List[Call]]] = {
+    "parse_word_document": _parse_calls("parse_word_document", "word"),
+    "parse_excel_document": _parse_calls("parse_excel_document", "excel"),
+    "parse_powerpoint_document": _parse_calls("parse_powerpoint_document", "powerpoint"),
+    "parse_pdf_document": _parse_calls("parse_pdf_document", "pdf"),
+    "extract_document_summary": _summary_calls,
+    "batch_parse_documents": _batch_calls,
+    "generate_word_report": _report_calls,
+    "extract_document_structure": _structure_calls,
+}
+
+
+def _percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    """最近秩法百分位数"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """当前进程的峰值 RSS (MB,不支持的平台返回 None)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 为 KB,macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class BenchmarkRunner:
+    """基准测试运行器"""
+
+    def __init__(self, manifest: Dict, iterations: int = 3, parse_mode: str = "full", use_cache: bool = False):
+        """
+        初始化运行器
+
+        Args:
+            manifest: 语料清单 (CorpusGenerator.generate 的返回值)
+            iterations: 每个场景重复执行调用列表的轮数
+            parse_mode: parse_* 场景使用的解析模式
+            use_cache: 是否启用解析缓存 (默认关闭,每次调用都实际解析文档)
+        """
+        self.manifest = manifest
+        self.iterations = iterations
+        self.options = {"parse_mode": parse_mode}
+        self.use_cache = use_cache
+        self.logger = get_logger(__name__)
+
+    def run_scenario(self, name: str) -> Dict:
+        """
+        在当前进程中运行一个场景
+
+        Args:
+            name: 场景名 (见 SCENARIOS)
+
+        Returns:
+            场景结果字典
+        """
+        import server
+        from utils import config, parse_cache
+
+        config.ENABLE_CACHE = self.use_cache
+        parse_cache.clear()
+
+        calls = SCENARIOS[name](self.manifest, self.options)
+        latencies = []
+        errors = 0
+        total_bytes = 0
+        total_docs = 0
+
+        for _ in range(self.iterations):
+            for tool_name, arguments, size, docs in calls:
+                start = time.perf_counter()
+                response = asyncio.run(server.call_tool(tool_name, dict(arguments)))
+                latencies.append(time.perf_counter() - start)
+
+                if response[0].text.startswith("❌"):
+                    errors += 1
+                total_bytes += size
+                total_docs += docs
+
+        # 首次调用包含按需导入和解析后端初始化,单独记录
+        cold = latencies[0] if latencies else None
+        warm = sorted(latencies[1:] or latencies)
+        elapsed = sum(latencies)
+
+        result = {
+            "calls": len(latencies),
+            "documents": total_docs,
+            "errors": errors,
+            "total_seconds": round(elapsed, 4),
+            "docs_per_second": round(total_docs / elapsed, 2) if elapsed else None,
+            "mb_per_second": round(total_bytes / 1024 / 1024 / elapsed, 2) if elapsed else None,
+            "cold_ms": round(cold * 1000, 2) if cold is not None else None,
+            "p50_ms": round(_percentile(warm, 50) * 1000, 2) if warm else None,
+            "p95_ms": round(_percentile(warm, 95) * 1000, 2) if warm else None,
+            "max_ms": round(warm[-1] * 1000, 2) if warm else None,
+            "peak_rss_mb": _peak_rss_mb(),
+        }
+
+        self.logger.info(
+            "基准场景完成: %s - %s 次调用, p50 %s ms, p95 %s ms",
+            name, result['calls'], result['p50_ms'], result['p95_ms']
+        )
+        return result
+
+    def run(self, scenarios: Optional[List[str]] = None, isolate: bool = True) -> Dict:
+        """
+        运行多个场景
+
+        Args:
+            scenarios: 场景名列表 (默认全部)
+            isolate: 是否每个场景在独立子进程中运行 (冷启动和峰值 RSS 互不影响)
+
+        Returns:
+            完整的基准测试结果 (含环境信息)
+        """
+        results = {}
+        for name in scenarios or list(SCENARIOS):
+            if name not in SCENARIOS:
+                raise ValueError(f"未知的基准场景: {name},可选: {', '.join(SCENARIOS)}")
+            results[name] = self._run_isolated(name) if isolate else self.run_scenario(name)
+
+        return {
+            "meta": self._environment(isolate),
+            "corpus": {
+                "scale": self.manifest["scale"],
+                "seed": self.manifest["seed"],
+                "total_bytes": self.manifest["total_bytes"],
+            },
+            "iterations": self.iterations,
+            "parse_mode": self.options["parse_mode"],
+            "results": results,
+        }
+
+    def _run_isolated(self, name: str) -> Dict:
+        """在子进程中运行场景 (python -m benchmarks --worker)"""
+        corpus_dir = os.path.dirname(self.manifest["files"]["word"][0])
+        command = [
+            sys.executable, "-m", "benchmarks", "--worker", name,
+            "--corpus-dir", corpus_dir,
+            "--iterations", str(self.iterations),
+            "--parse-mode", self.options["parse_mode"],
+        ]
+        if self.use_cache:
+            command.append("--cache")
+        completed = subprocess.run(
+            command,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        if completed.returncode != 0:
+            stderr_tail = completed.stderr.decode('utf-8', errors='replace').strip().splitlines()[-5:]
+            raise RuntimeError(f"基准场景 {name} 运行失败:\n" + "\n".join(stderr_tail))
+        return json.loads(completed.stdout)
+
+    def _environment(self, isolate: bool) -> Dict:
+        """运行环境信息 (用于跨提交对比时核对)"""
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            ).stdout.strip() or None
+        except OSError:
+            commit = None
+
+        return {
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "isolated": isolate,
+            "cache_enabled": self.use_cache,
+        }
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.1) -> List[Dict]:
+    """
+    对比两次基准测试结果
+
+    Args:
+        baseline: 基线结果
+        current: 当前结果
+        threshold: 判定为退化的相对变化阈值 (默认 10%)
+
+    Returns:
+        各场景各指标的对比列表 (regression 标记退化)
+    """
+    # 指标 -> 数值越大越好
+    metrics = {"p50_ms": False, "p95_ms": False, "docs_per_second": True, "peak_rss_mb": False}
+
+    comparison = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        for metric, higher_is_better in metrics.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            comparison.append({
+                "scenario": name,
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": round(change, 4),
+                "regression": (-change if higher_is_better else change) > threshold,
+            })
+    return comparison
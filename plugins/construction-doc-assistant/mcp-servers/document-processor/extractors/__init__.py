@@ -1,7 +1,7 @@
 """
 信息提取器模块
 
-导出摘要提取器和相关功能
+导出摘要提取器、针对性提取器、事实提取器、模板匹配器、上下文构建器和相关功能
 """
 
 from .summary_extractor import (
@@ -9,9 +9,35 @@ from .summary_extractor import (
     extract_summary,
     extract_construction_summary
 )
+from .targeted_extractor import (
+    TargetedExtractor,
+    extract_targeted
+)
+from .fact_extractor import (
+    FactExtractor,
+    extract_facts
+)
+from .template_matcher import (
+    TemplateMatcher,
+    get_template_matcher,
+    match_report_template
+)
+from .context_builder import (
+    ContextBuilder,
+    build_context
+)
 
 __all__ = [
     'SummaryExtractor',
     'extract_summary',
     'extract_construction_summary',
+    'TargetedExtractor',
+    'extract_targeted',
+    'FactExtractor',
+    'extract_facts',
+    'TemplateMatcher',
+    'get_template_matcher',
+    'match_report_template',
+    'ContextBuilder',
+    'build_context',
 ]
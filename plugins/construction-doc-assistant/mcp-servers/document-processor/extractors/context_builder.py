@@ -0,0 +1,280 @@
+"""
+上下文构建器模块
+
+在服务器端完成多文档上下文构建:
+1. 并行读取文档内容单元 (段落/表格行/页/行/幻灯片) 作为候选段落
+2. 以 BM25 计算段落与问题的相关度
+3. 去除跨文档的近似重复段落
+4. 按相关度将段落装入 token 预算,并附带来源引用
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config, estimate_tokens, truncate_to_tokens
+from parsers import BaseParser, iter_document_units
+from indexers.tokenizer import get_tokenizer
+
+logger = get_logger(__name__)
+
+
+class ContextBuilder:
+    """多文档上下文构建器"""
+
+    # BM25 参数
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+
+    # 判定为近似重复段落的字二元组 Jaccard 相似度
+    DUPLICATE_SIMILARITY = 0.8
+
+    # 每条引用的格式开销 (来源标注等) 估算
+    CITATION_TOKENS = 20
+
+    # 短于该 token 数的段落截断后不再保留
+    MIN_PASSAGE_TOKENS = 30
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        初始化上下文构建器
+
+        Args:
+            workers: 并行读取文档的线程数 (默认: config.CONTEXT_WORKERS)
+        """
+        self.workers = workers or config.CONTEXT_WORKERS
+        self.tokenizer = get_tokenizer()
+        self.logger = get_logger(__name__)
+
+    def build(self, file_paths: List[str], query: str, max_tokens: Optional[int] = None) -> Dict:
+        """
+        构建与问题相关的多文档上下文
+
+        Args:
+            file_paths: 文档路径列表
+            query: 用户问题或关键词
+            max_tokens: 上下文 token 预算 (默认: config.CONTEXT_MAX_TOKENS)
+
+        Returns:
+            上下文结果字典
+        """
+        query_tokens = self.tokenizer.query_tokens(query)
+        if not query_tokens:
+            raise ValueError(f"问题中没有可用于检索的内容: {query}")
+
+        max_tokens = max_tokens or config.CONTEXT_MAX_TOKENS
+        start_time = time.perf_counter()
+
+        # 1. 并行读取候选段落
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            loaded = list(executor.map(self._load_passages, file_paths))
+
+        passages = []
+        failed = []
+        for file_path, (doc_passages, error) in zip(file_paths, loaded):
+            if error:
+                failed.append({"path": file_path, "error": error})
+            passages.extend(doc_passages)
+
+        # 2. BM25 打分
+        scored = self._score(passages, query_tokens)
+
+        # 3. 去重并装入预算
+        selected, duplicates_removed, dropped = self._pack(scored, max_tokens)
+
+        # 按文档及原文顺序输出
+        path_order: Dict[str, int] = {}
+        for position, file_path in enumerate(file_paths):
+            path_order.setdefault(file_path, position)
+
+        documents = []
+        by_path: Dict[str, Dict] = {}
+        for passage in sorted(selected, key=lambda p: (path_order[p["path"]], p["order"])):
+            doc = by_path.get(passage["path"])
+            if doc is None:
+                doc = {
+                    "path": passage["path"],
+                    "name": os.path.basename(passage["path"]),
+                    "file_type": config.get_file_type_by_extension(passage["path"]),
+                    "score": 0.0,
+                    "passages": [],
+                }
+                by_path[passage["path"]] = doc
+                documents.append(doc)
+            doc["score"] += passage["score"]
+            doc["passages"].append({
+                "location_text": passage["location_text"],
+                "text": passage["text"],
+                "score": round(passage["score"], 3),
+            })
+
+        top_score = max((doc["score"] for doc in documents), default=0)
+        for doc in documents:
+            doc["relevance"] = round(doc["score"] / top_score, 2) if top_score else 0
+            doc["score"] = round(doc["score"], 3)
+
+        elapsed = time.perf_counter() - start_time
+        tokens_used = sum(p["tokens"] + self.CITATION_TOKENS for p in selected)
+
+        self.logger.info(
+            "上下文构建完成: %s 个文档, 候选段落 %s 个, 选用 %s 个, 约 %s tokens, 耗时 %.3fs",
+            len(file_paths), len(passages), len(selected), tokens_used, elapsed
+        )
+
+        return {
+            "status": "success",
+            "query": query,
+            "max_tokens": max_tokens,
+            "tokens_used": tokens_used,
+            "candidate_passages": len(passages),
+            "matched_passages": len(scored),
+            "selected_passages": len(selected),
+            "duplicates_removed": duplicates_removed,
+            "dropped_for_budget": dropped,
+            "documents": documents,
+            "failed": failed,
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+    def _load_passages(self, file_path: str):
+        """
+        读取单个文档的候选段落 (标题并入后续段落的位置描述,不单独作为段落)
+
+        Returns:
+            (段落列表, 错误信息)
+        """
+        passages = []
+        try:
+            for order, unit in enumerate(iter_document_units(file_path)):
+                if unit['type'] == 'heading':
+                    continue
+                passages.append({
+                    "path": file_path,
+                    "order": order,
+                    "location_text": BaseParser.describe_location(unit['location']),
+                    "text": unit['text'],
+                })
+            return passages, None
+        except Exception as e:
+            self.logger.warning("读取文档失败: %s - %s", file_path, e)
+            return passages, str(e)
+
+    def _score(self, passages: List[Dict], query_tokens: List[str]) -> List[Dict]:
+        """
+        以 BM25 计算段落相关度
+
+        Args:
+            passages: 候选段落
+            query_tokens: 查询词
+
+        Returns:
+            得分大于 0 的段落 (按得分降序)
+        """
+        if not passages:
+            return []
+
+        query_set = set(query_tokens)
+        term_freqs = []
+        doc_freq = {token: 0 for token in query_set}
+        total_length = 0
+
+        for passage in passages:
+            tokens = self.tokenizer.tokenize(passage["text"]) + self.tokenizer.extract_terms(passage["text"])
+            passage["length"] = len(tokens)
+            total_length += len(tokens)
+
+            counts = {}
+            for token in tokens:
+                if token in query_set:
+                    counts[token] = counts.get(token, 0) + 1
+            for token in counts:
+                doc_freq[token] += 1
+            term_freqs.append(counts)
+
+        n = len(passages)
+        avg_length = total_length / n or 1
+        idf = {
+            token: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for token, df in doc_freq.items()
+        }
+
+        scored = []
+        for passage, counts in zip(passages, term_freqs):
+            if not counts:
+                continue
+            norm = self.BM25_K1 * (1 - self.BM25_B + self.BM25_B * passage["length"] / avg_length)
+            passage["score"] = sum(
+                idf[token] * tf * (self.BM25_K1 + 1) / (tf + norm)
+                for token, tf in counts.items()
+            )
+            scored.append(passage)
+
+        scored.sort(key=lambda p: p["score"], reverse=True)
+        return scored
+
+    def _pack(self, scored: List[Dict], max_tokens: int):
+        """
+        按相关度去重并装入 token 预算
+
+        Args:
+            scored: 已打分的段落 (降序)
+            max_tokens: token 预算
+
+        Returns:
+            (选用段落, 去重数量, 因预算舍弃数量)
+        """
+        selected = []
+        selected_shingles: List[Set[str]] = []
+        seen_texts = set()
+        budget = max_tokens
+        duplicates_removed = 0
+        dropped = 0
+
+        for position, passage in enumerate(scored):
+            # 剩余预算放不下最短段落时停止,其余段落都计为因预算舍弃 (不再分词和比较相似度)
+            if budget - self.CITATION_TOKENS < self.MIN_PASSAGE_TOKENS:
+                dropped += len(scored) - position
+                break
+
+            normalized = ''.join(passage["text"].split())
+            if normalized in seen_texts:
+                duplicates_removed += 1
+                continue
+
+            shingles = set(self.tokenizer.tokenize(passage["text"]))
+            if any(self._jaccard(shingles, other) >= self.DUPLICATE_SIMILARITY for other in selected_shingles):
+                duplicates_removed += 1
+                continue
+
+            tokens = estimate_tokens(passage["text"])
+            available = budget - self.CITATION_TOKENS
+            if tokens > available:
+                # 长段落截断保留开头部分 (剩余预算至少为 MIN_PASSAGE_TOKENS)
+                passage["text"] = truncate_to_tokens(passage["text"], available) + "..."
+                tokens = available
+
+            passage["tokens"] = tokens
+            budget -= tokens + self.CITATION_TOKENS
+            selected.append(passage)
+            selected_shingles.append(shingles)
+            seen_texts.add(normalized)
+
+        return selected, duplicates_removed, dropped
+
+    @staticmethod
+    def _jaccard(a: Set[str], b: Set[str]) -> float:
+        """集合 Jaccard 相似度"""
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
+
+
+# 便捷函数
+def build_context(file_paths: List[str], query: str, max_tokens: Optional[int] = None) -> Dict:
+    """构建多文档上下文的便捷函数"""
+    builder = ContextBuilder()
+    return builder.build(file_paths, query, max_tokens)
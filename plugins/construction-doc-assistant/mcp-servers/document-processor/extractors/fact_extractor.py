@@ -0,0 +1,178 @@
+"""
+关键事实提取器模块
+
+基于规则和正则表达式,从文档内容单元中提取可追溯的关键事实:
+- date: 日期
+- amount: 金额 (统一换算为元)
+- percentage: 百分比
+- organization: 单位/组织
+- milestone: 施工节点 (节点事件 + 日期)
+- project_info: 项目基本信息 (工程名称、建设单位、项目经理等)
+- risk_event: 风险事件 (事故、隐患、延期等)
+- decision_record: 决策记录 (决定、采用、变更等)
+"""
+from typing import Dict, Iterator, List, Optional
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config
+from parsers import BaseParser, iter_document_units
+
+logger = get_logger(__name__)
+
+
+class FactExtractor:
+    """关键事实提取器"""
+
+    FACT_TYPES = config.FACT_TYPES
+
+    # 事实上下文的最大长度 (字符)
+    CONTEXT_LENGTH = 120
+
+    _DATE_PATTERN = re.compile(
+        r'(?<!\d)(\d{4})\s*[年\-/.]\s*(\d{1,2})\s*(?:[月\-/.]\s*(\d{1,2})\s*日?|月)'
+    )
+    _AMOUNT_PATTERN = re.compile(
+        r'(?<![\d.])(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?\s*(亿元|万元|元)'
+    )
+    _PERCENTAGE_PATTERN = re.compile(r'(?<![\d.])(\d+(?:\.\d+)?)\s*[%％]')
+    _ORGANIZATION_PATTERN = re.compile(
+        r'[\u4e00-\u9fff（）()]{2,25}?'
+        r'(?:股份有限公司|有限责任公司|有限公司|集团|公司|设计院|研究院|勘察院|监理部|项目部|'
+        r'建设局|住建局|管理局|管理站|质监站|安监站|委员会)'
+    )
+    _PROJECT_INFO_PATTERN = re.compile(
+        r'(工程名称|项目名称|建设单位|施工单位|监理单位|设计单位|勘察单位|项目经理|总监理工程师|'
+        r'技术负责人|建设地点|工程地点|合同工期|合同金额|合同价款|建筑面积|结构形式|开工日期|竣工日期)'
+        r'\s*[:：]\s*([^\n\t;；，,。]{1,60})'
+    )
+    _MILESTONE_PATTERN = re.compile(
+        r'(开工|竣工|封顶|出正负零|正负零|±0|基础验收|主体验收|竣工验收|分部验收|'
+        r'浇筑完成|完成验收|验收合格|交付|移交|节点)'
+    )
+    _RISK_PATTERN = re.compile(
+        r'(事故|隐患|风险|延期|滞后|超预算|停工|返工|不合格|整改|缺陷|索赔|纠纷)'
+    )
+    _DECISION_PATTERN = re.compile(
+        r'(决定|决议|同意|批准|采用|选用|变更为|改为|确定为|要求)'
+    )
+    # 句子切分 (风险、决策、节点按句提取)
+    _SENTENCE_PATTERN = re.compile(r'[^。；;！!？?\n]+[。；;！!？?]?')
+
+    _AMOUNT_UNITS = {'元': 1, '万元': 10_000, '亿元': 100_000_000}
+
+    def __init__(self):
+        self.logger = get_logger(__name__)
+
+    def extract_file(self, file_path: str) -> Iterator[Dict]:
+        """
+        逐单元提取文档中的事实
+
+        Args:
+            file_path: 文件路径
+
+        Yields:
+            事实字典 {type, value, date, text, context, location, location_text}
+        """
+        for unit in iter_document_units(file_path):
+            location = unit['location']
+            location_text = BaseParser.describe_location(location)
+            for fact in self.extract_text(unit['text']):
+                fact["location"] = location
+                fact["location_text"] = location_text
+                yield fact
+
+    def extract_text(self, text: str) -> List[Dict]:
+        """
+        从一段文本中提取事实
+
+        Args:
+            text: 内容单元文本
+
+        Returns:
+            事实列表 (不含位置信息)
+        """
+        facts = []
+
+        for match in self._DATE_PATTERN.finditer(text):
+            normalized = self._normalize_date(match)
+            if normalized:
+                facts.append(self._make_fact('date', normalized, match, text, date=normalized))
+
+        for match in self._AMOUNT_PATTERN.finditer(text):
+            number = float(match.group(1).replace(',', '') + (match.group(2) or ''))
+            value = number * self._AMOUNT_UNITS[match.group(3)]
+            facts.append(self._make_fact('amount', f"{value:.2f}", match, text))
+
+        for match in self._PERCENTAGE_PATTERN.finditer(text):
+            facts.append(self._make_fact('percentage', match.group(1), match, text))
+
+        for match in self._ORGANIZATION_PATTERN.finditer(text):
+            facts.append(self._make_fact('organization', match.group(0), match, text))
+
+        for match in self._PROJECT_INFO_PATTERN.finditer(text):
+            value = f"{match.group(1)}: {match.group(2).strip()}"
+            facts.append(self._make_fact('project_info', value, match, text))
+
+        # 按句提取的事实: 节点需同时包含日期
+        for sentence_match in self._SENTENCE_PATTERN.finditer(text):
+            sentence = sentence_match.group(0).strip()
+            if not sentence:
+                continue
+
+            milestone = self._MILESTONE_PATTERN.search(sentence)
+            if milestone:
+                date = self._DATE_PATTERN.search(sentence)
+                normalized = self._normalize_date(date) if date else None
+                if normalized:
+                    facts.append(self._make_fact(
+                        'milestone', f"{milestone.group(1)} {normalized}", sentence_match, text, date=normalized
+                    ))
+
+            risk = self._RISK_PATTERN.search(sentence)
+            if risk:
+                facts.append(self._make_fact('risk_event', risk.group(1), sentence_match, text))
+
+            decision = self._DECISION_PATTERN.search(sentence)
+            if decision:
+                facts.append(self._make_fact('decision_record', decision.group(1), sentence_match, text))
+
+        return facts
+
+    def _make_fact(self, fact_type: str, value: str, match, text: str, date: Optional[str] = None) -> Dict:
+        """组装事实字典 (附带命中位置附近的上下文,日期类事实附带规范化日期)"""
+        start, end = match.span()
+        half = max(0, (self.CONTEXT_LENGTH - (end - start)) // 2)
+        context_start = max(0, start - half)
+        context_end = min(len(text), end + half)
+        context = ' '.join(text[context_start:context_end].split())
+
+        return {
+            "type": fact_type,
+            "value": value,
+            "date": date,
+            "text": match.group(0).strip(),
+            "context": ("..." if context_start > 0 else "") + context + ("..." if context_end < len(text) else ""),
+        }
+
+    @staticmethod
+    def _normalize_date(match) -> Optional[str]:
+        """将日期匹配规范化为 YYYY-MM-DD 或 YYYY-MM (无效日期返回 None)"""
+        year, month, day = int(match.group(1)), int(match.group(2)), match.group(3)
+        if not (1900 <= year <= 2100 and 1 <= month <= 12):
+            return None
+        if day is None:
+            return f"{year:04d}-{month:02d}"
+        day = int(day)
+        if not 1 <= day <= 31:
+            return None
+        return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+# 便捷函数
+def extract_facts(file_path: str) -> List[Dict]:
+    """提取文档关键事实的便捷函数"""
+    return list(FactExtractor().extract_file(file_path))
@@ -251,12 +251,14 @@ class SummaryExtractor:
             matching_cells = []
 
             for sheet in sheets:
-                for row_idx, row in enumerate(sheet['data']):
+                # 工作表中的实际行号 (跳过的空行不影响编号)
+                row_numbers = sheet.get('row_numbers') or range(1, len(sheet['data']) + 1)
+                for row_number, row in zip(row_numbers, sheet['data']):
                     for col_idx, cell in enumerate(row):
                         if keyword.lower() in str(cell).lower():
                             matching_cells.append({
                                 "sheet": sheet['name'],
-                                "row": row_idx + 1,
+                                "row": row_number,
                                 "col": col_idx + 1,
                                 "value": str(cell)
                             })
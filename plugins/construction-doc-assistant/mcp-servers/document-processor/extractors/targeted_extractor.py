@@ -0,0 +1,198 @@
+"""
+针对性提取器模块
+
+逐单元流式读取文档 (Word 段落/表格行、PDF 页、Excel 行、幻灯片),
+只返回命中关键词的单元及其前后上下文,达到 token 预算即停止,
+不构建完整解析结果
+"""
+from collections import deque
+from typing import Dict, List, Optional
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config, estimate_tokens, truncate_to_tokens, ParseError
+from parsers import BaseParser, iter_document_units
+
+logger = get_logger(__name__)
+
+
+class TargetedExtractor:
+    """针对性提取器"""
+
+    def __init__(self):
+        self.logger = get_logger(__name__)
+
+    def extract(
+        self,
+        file_path: str,
+        keywords: List[str],
+        context: int = 1,
+        max_tokens: Optional[int] = None,
+        match_all: bool = False
+    ) -> Dict:
+        """
+        提取文档中命中关键词的内容单元及上下文
+
+        相邻或上下文重叠的命中合并为一个片段,避免重复输出
+
+        Args:
+            file_path: 文件路径
+            keywords: 关键词列表
+            context: 命中单元前后各保留的上下文单元数
+            max_tokens: token 预算 (默认: config.SMART_PARSE_MAX_TOKENS)
+            match_all: 单元是否须命中全部关键词 (默认任一命中)
+
+        Returns:
+            提取结果字典
+        """
+        keywords = [k.strip() for k in keywords if k and k.strip()]
+        if not keywords:
+            raise ValueError("针对性提取需要至少一个关键词")
+
+        if not os.path.isfile(file_path):
+            raise ParseError(f"文件不存在: {file_path}")
+
+        max_tokens = max_tokens or config.SMART_PARSE_MAX_TOKENS
+        context = max(0, context)
+        lowered_keywords = [k.lower() for k in keywords]
+
+        start_time = time.perf_counter()
+        self.logger.info("针对性提取: %s - 关键词 %s", file_path, keywords)
+
+        passages = []
+        keyword_counts = {k: 0 for k in keywords}
+        before = deque(maxlen=context)  # 最近的未输出单元 (作为下一个命中的前文)
+        current = None                  # 正在构建的片段
+        after_remaining = 0             # 当前片段还需补充的后文单元数
+        tokens_used = 0
+        units_scanned = 0
+        truncated = False
+
+        for unit in iter_document_units(file_path):
+            units_scanned += 1
+            text = unit['text']
+            lowered = text.lower()
+            matched = [k for k, lk in zip(keywords, lowered_keywords) if lk in lowered]
+            is_match = len(matched) == len(keywords) if match_all else bool(matched)
+
+            if not is_match and after_remaining == 0:
+                before.append(unit)
+                continue
+
+            # 组装待加入的单元: 新片段需先补上前文
+            new_units = []
+            if current is None or after_remaining == 0:
+                if current is not None:
+                    passages.append(current)
+                current = {
+                    "location": unit['location'],
+                    "location_text": BaseParser.describe_location(unit['location']),
+                    "matched_keywords": [],
+                    "units": [],
+                }
+                new_units.extend(self._make_unit(u, False, lowered_keywords) for u in before)
+                before.clear()
+            new_units.append(self._make_unit(unit, is_match, lowered_keywords))
+
+            # token 预算检查: 超出时截断命中单元并停止读取
+            for item in new_units:
+                item_tokens = estimate_tokens(item["text"])
+                if tokens_used + item_tokens > max_tokens:
+                    remaining = max_tokens - tokens_used
+                    if item["is_match"] and remaining > 0:
+                        item["text"] = truncate_to_tokens(item["text"], remaining) + "..."
+                        current["units"].append(item)
+                        tokens_used = max_tokens
+                    truncated = True
+                    break
+                current["units"].append(item)
+                tokens_used += item_tokens
+
+            # 仅统计实际输出的命中单元
+            if is_match and current["units"] and current["units"][-1] is new_units[-1]:
+                for k in matched:
+                    keyword_counts[k] += 1
+                    if k not in current["matched_keywords"]:
+                        current["matched_keywords"].append(k)
+
+            if truncated:
+                break
+
+            if is_match:
+                after_remaining = context
+            else:
+                after_remaining -= 1
+
+        if current is not None and current["units"]:
+            passages.append(current)
+
+        elapsed = time.perf_counter() - start_time
+        self.logger.info(
+            "针对性提取完成: 扫描 %s 个单元, 片段 %s 个, 约 %s tokens, 耗时 %.3fs",
+            units_scanned, len(passages), tokens_used, elapsed
+        )
+
+        return {
+            "status": "success",
+            "mode": "targeted",
+            "file_info": {
+                "path": file_path,
+                "name": os.path.basename(file_path),
+                "type": config.get_file_type_by_extension(file_path),
+            },
+            "keywords": keywords,
+            "keyword_counts": keyword_counts,
+            "passages": passages,
+            "units_scanned": units_scanned,
+            "tokens_used": tokens_used,
+            "max_tokens": max_tokens,
+            "truncated": truncated,
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+    @staticmethod
+    def _make_unit(unit: Dict, is_match: bool, lowered_keywords: List[str]) -> Dict:
+        """
+        转换为输出单元 (表格行命中时标注命中的单元格)
+
+        Args:
+            unit: 解析器产出的内容单元
+            is_match: 是否为命中单元
+            lowered_keywords: 小写关键词
+
+        Returns:
+            输出单元字典
+        """
+        item = {
+            "location_text": BaseParser.describe_location(unit['location']),
+            "text": unit['text'],
+            "is_match": is_match,
+        }
+
+        if is_match and unit.get('cells'):
+            cells = []
+            for col, value in enumerate(unit['cells'], 1):
+                if any(k in value.lower() for k in lowered_keywords):
+                    cell = {"col": col, "value": value}
+                    if 'sheet' in unit['location']:
+                        cell["cell"] = f"{BaseParser.column_letter(col)}{unit['location']['row']}"
+                    cells.append(cell)
+            item["cells"] = cells
+
+        return item
+
+
+# 便捷函数
+def extract_targeted(
+    file_path: str,
+    keywords: List[str],
+    context: int = 1,
+    max_tokens: Optional[int] = None,
+    match_all: bool = False
+) -> Dict:
+    """针对性提取的便捷函数"""
+    extractor = TargetedExtractor()
+    return extractor.extract(file_path, keywords, context, max_tokens, match_all)
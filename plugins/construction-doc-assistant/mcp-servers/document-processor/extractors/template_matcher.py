@@ -0,0 +1,310 @@
+"""
+报告模板匹配器模块
+
+按 templates/report_templates.json 中的分级关键词 (高/中/低权重,默认 10/5/2 分)
+为文档匹配报告模板:
+- 全部模板的关键词编译为一个 Aho-Corasick 自动机,一次扫描统计所有模板的命中
+- 可重叠匹配 (如 "技术方案" 与 "技术" 同时计数)
+- 文档逐单元流式读取,文件名同样参与匹配
+- 结果为 template_matcher.md 中的关键词匹配度 (权重 40%),
+  文档类型和目录结构的得分由调用方结合
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config
+from parsers import iter_document_units
+
+logger = get_logger(__name__)
+
+
+class KeywordAutomaton:
+    """多模式匹配自动机 (Aho-Corasick)"""
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        构建自动机
+
+        Args:
+            patterns: 模式串 (匹配不区分大小写)
+        """
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for pattern in patterns:
+            self._add(pattern.lower())
+        self._build_failure_links()
+
+    def _add(self, pattern: str):
+        """向字典树加入一个模式串"""
+        if not pattern or pattern in self.patterns:
+            return
+
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+
+        self._output[state].append(len(self.patterns))
+        self.patterns.append(pattern)
+
+    def _build_failure_links(self):
+        """按广度优先构建失败指针,并合并后缀模式的输出"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def count(self, text: str, counts: Optional[List[int]] = None) -> List[int]:
+        """
+        统计各模式串在文本中的出现次数 (可重叠)
+
+        Args:
+            text: 文本
+            counts: 累加计数的列表 (默认新建)
+
+        Returns:
+            按模式串序号排列的出现次数
+        """
+        if counts is None:
+            counts = [0] * len(self.patterns)
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                counts[pattern_id] += 1
+
+        return counts
+
+
+class TemplateMatcher:
+    """报告模板匹配器"""
+
+    # 未配置 keyword_points 时的分级分值
+    DEFAULT_KEYWORD_POINTS = {"high": 10, "medium": 5, "low": 2}
+
+    # 最高得分低于 min_confidence 时推荐的默认模板
+    DEFAULT_TEMPLATE = "summary"
+
+    def __init__(self, templates_file: Optional[str] = None):
+        """
+        加载模板配置并编译关键词自动机
+
+        Args:
+            templates_file: 模板配置文件 (默认: config.REPORT_TEMPLATES_FILE)
+        """
+        self.templates_file = templates_file or config.REPORT_TEMPLATES_FILE
+        self.logger = get_logger(__name__)
+
+        with open(self.templates_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.mtime_ns = os.stat(self.templates_file).st_mtime_ns
+
+        rules = data.get('matching_rules', {})
+        self.keyword_weight = rules.get('keyword_weight', 0.4)
+        self.min_confidence = rules.get('min_confidence', 0.6)
+        self.keyword_points = {**self.DEFAULT_KEYWORD_POINTS, **rules.get('keyword_points', {})}
+
+        # 模板 -> [(关键词, 分级)];未分级的 keywords 按高权重计
+        self.templates: Dict[str, Dict] = {}
+        for template_id, template in data.get('templates', {}).items():
+            keywords = self._tiered_keywords(template)
+            if keywords:
+                self.templates[template_id] = {
+                    "name": template.get('name', template_id),
+                    "priority": template.get('priority', 0),
+                    "keywords": keywords,
+                }
+
+        self.automaton = KeywordAutomaton(
+            keyword for template in self.templates.values() for keyword, _ in template["keywords"]
+        )
+        self._pattern_ids = {pattern: i for i, pattern in enumerate(self.automaton.patterns)}
+
+        self.logger.info(
+            "模板关键词自动机已编译: %s 个模板, %s 个关键词",
+            len(self.templates), len(self.automaton.patterns)
+        )
+
+    @staticmethod
+    def _tiered_keywords(template: Dict) -> List[Tuple[str, str]]:
+        """读取模板的分级关键词 (同一关键词只保留最高分级)"""
+        keywords = []
+        seen = set()
+        tiers = template.get('keyword_tiers', {})
+        for tier in ('high', 'medium', 'low'):
+            for keyword in tiers.get(tier, []):
+                if keyword.lower() not in seen:
+                    seen.add(keyword.lower())
+                    keywords.append((keyword, tier))
+        for keyword in template.get('keywords', []):
+            if keyword.lower() not in seen:
+                seen.add(keyword.lower())
+                keywords.append((keyword, 'high'))
+        return keywords
+
+    def match(
+        self,
+        file_paths: Optional[List[str]] = None,
+        text: Optional[str] = None,
+        top_n: int = 3
+    ) -> Dict:
+        """
+        为文档 (或一批文档) 匹配报告模板
+
+        Args:
+            file_paths: 文档路径列表 (文件名和内容都参与匹配)
+            text: 已解析的文档文本
+            top_n: 每个文档列出的候选模板数
+
+        Returns:
+            匹配结果字典
+        """
+        if not file_paths and not text:
+            raise ValueError("模板匹配需要提供 file_paths 或 text")
+
+        start_time = time.perf_counter()
+        total_counts = [0] * len(self.automaton.patterns)
+        documents = []
+        failed = []
+
+        for file_path in file_paths or []:
+            counts = self.automaton.count(os.path.basename(file_path))
+            try:
+                for unit in iter_document_units(file_path):
+                    self.automaton.count(unit['text'], counts)
+            except Exception as e:
+                self.logger.warning("读取文档失败: %s - %s", file_path, e)
+                failed.append({"path": file_path, "error": str(e)})
+
+            ranked = self._rank(counts)
+            documents.append({
+                "path": file_path,
+                "name": os.path.basename(file_path),
+                "templates": [
+                    {k: item[k] for k in ("template", "name", "points", "keyword_score")}
+                    for item in ranked[:top_n]
+                ],
+            })
+            total_counts = [a + b for a, b in zip(total_counts, counts)]
+
+        if text:
+            self.automaton.count(text, total_counts)
+
+        ranked = self._rank(total_counts)
+        best = ranked[0] if ranked else None
+        confident = best is not None and best["keyword_score"] >= self.min_confidence
+        recommended = best["template"] if confident else self.DEFAULT_TEMPLATE
+
+        elapsed = time.perf_counter() - start_time
+        self.logger.info(
+            "模板匹配完成: %s 个文档, 推荐 %s, 耗时 %.3fs",
+            len(file_paths or []), recommended, elapsed
+        )
+
+        return {
+            "status": "success",
+            "recommended": recommended,
+            "confident": confident,
+            "min_confidence": self.min_confidence,
+            "keyword_weight": self.keyword_weight,
+            "templates": ranked,
+            "documents": documents,
+            "failed": failed,
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+    def _rank(self, counts: List[int]) -> List[Dict]:
+        """
+        按关键词计数为模板打分并排序
+
+        关键词匹配度 = 命中关键词分值覆盖率 × 得分相对最高得分的比例,
+        同时反映关键词覆盖面和出现频率
+
+        Args:
+            counts: 按模式串序号排列的出现次数
+
+        Returns:
+            模板得分列表 (按匹配度、得分、优先级降序)
+        """
+        scored = []
+        for template_id, template in self.templates.items():
+            points = 0
+            covered = 0
+            possible = 0
+            tiers = {tier: {} for tier in self.keyword_points}
+            for keyword, tier in template["keywords"]:
+                tier_points = self.keyword_points[tier]
+                count = counts[self._pattern_ids[keyword.lower()]]
+                possible += tier_points
+                if count:
+                    points += tier_points * count
+                    covered += tier_points
+                    tiers[tier][keyword] = count
+
+            scored.append({
+                "template": template_id,
+                "name": template["name"],
+                "priority": template["priority"],
+                "points": points,
+                "coverage": covered / possible if possible else 0.0,
+                "tiers": tiers,
+            })
+
+        max_points = max((item["points"] for item in scored), default=0)
+        for item in scored:
+            relative = item["points"] / max_points if max_points else 0.0
+            item["keyword_score"] = round(item["coverage"] * relative, 3)
+            item["weighted_score"] = round(item["keyword_score"] * self.keyword_weight, 3)
+            item["coverage"] = round(item["coverage"], 3)
+
+        scored.sort(key=lambda item: (item["keyword_score"], item["points"], item["priority"]), reverse=True)
+        return scored
+
+
+_default_matcher: Optional[TemplateMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_template_matcher() -> TemplateMatcher:
+    """获取默认模板匹配器 (进程内共享,模板配置文件变化后重新编译)"""
+    global _default_matcher
+    with _matcher_lock:
+        if _default_matcher is None or _default_matcher.mtime_ns != os.stat(config.REPORT_TEMPLATES_FILE).st_mtime_ns:
+            _default_matcher = TemplateMatcher()
+        return _default_matcher
+
+
+# 便捷函数
+def match_report_template(
+    file_paths: Optional[List[str]] = None,
+    text: Optional[str] = None,
+    top_n: int = 3
+) -> Dict:
+    """匹配报告模板的便捷函数"""
+    return get_template_matcher().match(file_paths, text, top_n)
@@ -8,10 +8,13 @@ from .base_generator import BaseGenerator
 from .markdown_parser import MarkdownParser
 from .word_generator import WordGenerator
 from .construction_styles import ConstructionStyles
+from .batch_generator import BatchReportGenerator, batch_generate_word_reports
 
 __all__ = [
     'BaseGenerator',
     'MarkdownParser',
     'WordGenerator',
     'ConstructionStyles',
+    'BatchReportGenerator',
+    'batch_generate_word_reports',
 ]
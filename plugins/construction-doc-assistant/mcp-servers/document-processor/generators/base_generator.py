@@ -74,7 +74,7 @@ class BaseGenerator:
         if output_dir and not os.path.exists(output_dir):
             try:
                 os.makedirs(output_dir, exist_ok=True)
-                self.logger.info(f"创建输出目录: {output_dir}")
+                self.logger.info("创建输出目录: %s", output_dir)
             except Exception as e:
                 raise ValueError(f"无法创建输出目录 {output_dir}: {e}")
 
@@ -0,0 +1,211 @@
+"""
+Word 报告批量生成
+
+多个 Markdown 报告在进程池中并行生成 Word 文档:
+- 每个工作进程按模板缓存 WordGenerator,模板样式只编译一次,之后的任务直接复用
+- 返回每个任务的生成结果和耗时
+"""
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from .construction_styles import ConstructionStyles
+from .word_generator import WordGenerator
+from utils import get_logger, config
+
+logger = get_logger(__name__)
+
+# 当前进程中的生成器 (按模板缓存,跨任务复用)
+_generators: Dict[str, WordGenerator] = {}
+
+
+def _get_generator(template_type: str) -> WordGenerator:
+    """获取当前进程中指定模板的生成器 (首次使用时创建并编译模板)"""
+    generator = _generators.get(template_type)
+    if generator is None:
+        generator = _generators[template_type] = WordGenerator(template_type=template_type)
+    return generator
+
+
+def _init_worker(template_types: List[str]):
+    """
+    工作进程初始化: 预先创建本批次用到的模板的生成器
+
+    Args:
+        template_types: 模板类型列表 (已校验)
+    """
+    from multiprocessing import util
+    from utils import shutdown_logging
+
+    # 工作进程退出时不执行 atexit 回调,在 multiprocessing 的退出流程中写出队列中剩余的日志
+    util.Finalize(None, shutdown_logging, exitpriority=0)
+    for template_type in template_types:
+        _get_generator(template_type)
+
+
+def _run_job(job: Dict) -> Dict:
+    """
+    生成单个报告 (在工作进程中执行)
+
+    Args:
+        job: 已规范化的任务 (见 BatchReportGenerator._normalize_job)
+
+    Returns:
+        WordGenerator.generate() 的结果,附加耗时和工作进程 ID
+    """
+    start_time = time.perf_counter()
+    result = _get_generator(job["template_type"]).generate(
+        markdown_file=job["markdown_file"],
+        output_file=job["output_file"],
+        options={
+            "project_info": job.get("project_info"),
+            "style_mode": job["style_mode"],
+        }
+    )
+    result["markdown_file"] = job["markdown_file"]
+    result["elapsed_seconds"] = round(time.perf_counter() - start_time, 3)
+    result["worker_pid"] = os.getpid()
+    return result
+
+
+class BatchReportGenerator:
+    """Word 报告批量生成器"""
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        初始化批量生成器
+
+        Args:
+            workers: 工作进程数 (默认: config.REPORT_WORKERS)
+        """
+        self.workers = max(1, workers or config.REPORT_WORKERS)
+        self.logger = logger
+
+    def generate(self, jobs: List[Dict], defaults: Optional[Dict] = None) -> Dict:
+        """
+        批量生成 Word 报告
+
+        Args:
+            jobs: 任务列表,每个任务包含
+                - markdown_file: Markdown源文件路径 (必需)
+                - output_file: Word输出文件路径 (必需)
+                - project_info: 项目信息 (可选,用于页眉页脚)
+                - template_type / style_mode: 可选,覆盖 defaults 中的设置
+            defaults: 所有任务共用的设置 (template_type、style_mode、project_info)
+
+        Returns:
+            批量结果字典: 汇总统计和按任务顺序排列的每个任务结果 (含 elapsed_seconds)
+        """
+        start_time = time.perf_counter()
+        defaults = defaults or {}
+        results: List[Optional[Dict]] = [None] * len(jobs)
+
+        pending = []
+        output_files = set()
+        for index, job in enumerate(jobs):
+            normalized, error = self._normalize_job(job, defaults)
+            if not error:
+                # 并行写同一个输出文件会互相覆盖,同一输出路径只生成第一个任务
+                output_file = os.path.abspath(normalized["output_file"])
+                if output_file in output_files:
+                    error = f"输出文件与前面的任务重复: {normalized['output_file']}"
+                output_files.add(output_file)
+            if error:
+                results[index] = self._job_error(job, error)
+            else:
+                pending.append((index, normalized))
+
+        workers = min(self.workers, len(pending))
+        self.logger.info("批量生成Word报告: %s 个任务, %s 个工作进程", len(jobs), workers)
+
+        if workers <= 1:
+            # 单个任务或单进程时在当前进程中生成,省去启动工作进程的开销
+            for index, job in pending:
+                results[index] = _run_job(job)
+        else:
+            template_types = sorted({job["template_type"] for _, job in pending})
+            # 使用 spawn 启动工作进程: 服务器进程中有日志、预热、目录监控等后台线程,fork 不安全
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(template_types,),
+            ) as executor:
+                futures = [(index, job, executor.submit(_run_job, job)) for index, job in pending]
+                for index, job, future in futures:
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        self.logger.error("报告生成任务失败: %s: %s", job["markdown_file"], e, exc_info=True)
+                        results[index] = self._job_error(job, f"工作进程异常: {e}")
+
+        for index, result in enumerate(results):
+            result["index"] = index
+
+        succeeded = sum(1 for r in results if r.get("status") == "success")
+        elapsed = time.perf_counter() - start_time
+        self.logger.info(
+            "批量生成完成: 成功 %s 个, 失败 %s 个, 耗时 %.3fs",
+            succeeded, len(results) - succeeded, elapsed
+        )
+
+        return {
+            "status": "success",
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "workers": workers,
+            "elapsed_seconds": round(elapsed, 3),
+            "jobs_seconds": round(sum(r["elapsed_seconds"] for r in results), 3),
+            "results": results,
+        }
+
+    def _normalize_job(self, job, defaults: Dict):
+        """
+        校验并补全任务设置
+
+        Returns:
+            (规范化的任务, 错误信息) 二者之一为 None
+        """
+        if not isinstance(job, dict):
+            return None, "任务格式错误: 应为包含 markdown_file 和 output_file 的对象"
+        for key in ("markdown_file", "output_file"):
+            if not job.get(key):
+                return None, f"任务缺少 {key}"
+
+        template_type = job.get("template_type") or defaults.get("template_type") or "project_summary"
+        if template_type not in ConstructionStyles.TEMPLATES:
+            available = ", ".join(ConstructionStyles.TEMPLATES.keys())
+            return None, f"未知模板: {template_type}。可用模板: {available}"
+
+        return {
+            "markdown_file": job["markdown_file"],
+            "output_file": job["output_file"],
+            "project_info": job.get("project_info") or defaults.get("project_info"),
+            "template_type": template_type,
+            "style_mode": job.get("style_mode") or defaults.get("style_mode") or "direct",
+        }, None
+
+    def _job_error(self, job, error: str) -> Dict:
+        """未能完成的任务的错误结果"""
+        job = job if isinstance(job, dict) else {}
+        return {
+            "status": "error",
+            "error": error,
+            "markdown_file": job.get("markdown_file"),
+            "output_file": job.get("output_file"),
+            "elapsed_seconds": 0.0,
+        }
+
+
+# 便捷函数
+def batch_generate_word_reports(jobs: List[Dict],
+                                defaults: Optional[Dict] = None,
+                                workers: Optional[int] = None) -> Dict:
+    """批量生成 Word 报告的便捷函数"""
+    return BatchReportGenerator(workers=workers).generate(jobs, defaults)
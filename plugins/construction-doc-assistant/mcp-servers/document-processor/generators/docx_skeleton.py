@@ -0,0 +1,117 @@
+"""
+Word 报告骨架缓存
+
+每个模板预先生成一份骨架 .docx (页边距、命名样式、页眉页脚已设置好),
+缓存在内存中并写入磁盘缓存目录。生成报告时从骨架字节加载文档,不再重复这些设置
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import zipfile
+from typing import Callable, Dict
+
+import docx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config
+
+logger = get_logger(__name__)
+
+# 骨架格式版本: 修改骨架的生成方式 (页边距、页眉页脚等) 时递增,使磁盘上的旧骨架失效
+SKELETON_VERSION = 1
+
+# 已生成的骨架 (按骨架名缓存,进程内共享)
+_skeletons: Dict[str, bytes] = {}
+_skeleton_lock = threading.Lock()
+
+
+def skeleton_name(template_type: str, template: Dict, style_mode: str, with_header_footer: bool) -> str:
+    """
+    骨架名 (同时作为磁盘缓存文件名)
+
+    名称中包含模板配置、python-docx 版本和骨架格式版本的摘要,任何一项变化都会生成新的骨架
+
+    Args:
+        template_type: 模板类型
+        template: 模板配置
+        style_mode: 样式模式
+        with_header_footer: 是否包含页眉页脚
+
+    Returns:
+        骨架名
+    """
+    fingerprint = json.dumps(
+        [SKELETON_VERSION, getattr(docx, "__version__", ""), template, style_mode, with_header_footer],
+        sort_keys=True, default=str, ensure_ascii=False
+    )
+    digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
+    layout = "header" if with_header_footer else "plain"
+    return f"{template_type}-{style_mode}-{layout}-{digest}.docx"
+
+
+def _load_from_disk(path: str):
+    """读取磁盘缓存的骨架 (文件不存在或已损坏时返回 None)"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if not zipfile.is_zipfile(io.BytesIO(data)):
+        logger.warning("骨架缓存文件已损坏,重新生成: %s", path)
+        return None
+    return data
+
+
+def _save_to_disk(path: str, data: bytes):
+    """写入磁盘缓存 (先写临时文件再替换,并发写入时不会产生不完整的文件)"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning("写入骨架缓存失败: %s: %s", path, e)
+
+
+def get_skeleton(name: str, build: Callable[[], bytes]) -> bytes:
+    """
+    获取骨架 .docx 字节 (依次查找内存缓存、磁盘缓存,都没有时生成)
+
+    Args:
+        name: 骨架名 (见 skeleton_name)
+        build: 生成骨架的函数,返回 .docx 字节
+
+    Returns:
+        骨架 .docx 字节
+    """
+    data = _skeletons.get(name)
+    if data is not None:
+        return data
+
+    with _skeleton_lock:
+        data = _skeletons.get(name)
+        if data is not None:
+            return data
+
+        path = os.path.join(config.WORD_SKELETON_DIR, name) if config.WORD_SKELETON_DIR else None
+        if path:
+            data = _load_from_disk(path)
+        if data is None:
+            logger.info("生成报告骨架: %s", name)
+            data = build()
+            if path:
+                _save_to_disk(path, data)
+
+        _skeletons[name] = data
+        return data
+
+
+def clear_skeleton_cache():
+    """清空内存中的骨架缓存 (磁盘缓存保留)"""
+    with _skeleton_lock:
+        _skeletons.clear()
@@ -0,0 +1,122 @@
+"""
+Word 文档正文流式写出
+
+python-docx 在内存中保留整个文档的 XML 树,超大报告的内存占用随内容增长。
+StreamingBodyWriter 定期把已生成的正文元素序列化到临时文件并从树中移除,
+保存时再把这些正文拼回 word/document.xml,内存占用与报告大小无关
+"""
+import io
+import re
+import shutil
+import tempfile
+import zipfile
+
+from lxml import etree
+
+# 正文中的占位注释: 已写出的正文元素在保存时插入到这里
+_MARKER_TEXT = "streamed-body"
+_MARKER = f"<!--{_MARKER_TEXT}-->".encode()
+
+_DOCUMENT_PART = "word/document.xml"
+
+# 序列化的元素开始标签上的命名空间声明
+_NAMESPACE_DECLARATION = re.compile(rb'\sxmlns:([\w.-]+)="([^"]*)"')
+
+
+class StreamingBodyWriter:
+    """正文流式写出器"""
+
+    def __init__(self, document, flush_every: int = 200):
+        """
+        初始化写出器 (在添加正文内容之前创建)
+
+        Args:
+            document: python-docx 文档对象
+            flush_every: 每添加多少个正文元素写出一次
+        """
+        self.document = document
+        self.flush_every = max(1, flush_every)
+        self.body = document.element.body
+        self.sect_pr = self.body.sectPr
+        self.flushed_elements = 0
+
+        # 占位注释放在已有正文之后,之后添加的正文都在它和 sectPr 之间
+        self.marker = etree.Comment(_MARKER_TEXT)
+        if self.sect_pr is not None:
+            self.sect_pr.addprevious(self.marker)
+        else:
+            self.body.append(self.marker)
+        # 不需要写出的子元素数 (占位注释及其之前的元素、sectPr)
+        self._fixed_children = self.body.index(self.marker) + 1 + (self.sect_pr is not None)
+
+        # 根元素已声明的命名空间,写出的元素不再重复声明
+        self._root_namespaces = {
+            prefix.encode(): uri.encode()
+            for prefix, uri in document.element.nsmap.items() if prefix
+        }
+        self._spool = tempfile.TemporaryFile()
+
+    def _pending(self) -> list:
+        """占位注释之后尚未写出的正文元素"""
+        return [element for element in self.marker.itersiblings() if element is not self.sect_pr]
+
+    def maybe_flush(self):
+        """未写出的正文元素达到 flush_every 时写出"""
+        if len(self.body) - self._fixed_children >= self.flush_every:
+            self._write(self._pending())
+
+    def flush(self):
+        """写出全部未写出的正文元素"""
+        self._write(self._pending())
+
+    def _write(self, elements: list):
+        """序列化正文元素到临时文件,并从文档树中移除"""
+        for element in elements:
+            self._spool.write(self._serialize(element))
+            self.body.remove(element)
+        self.flushed_elements += len(elements)
+
+    def _serialize(self, element) -> bytes:
+        """序列化单个正文元素 (去掉与根元素重复的命名空间声明)"""
+        data = etree.tostring(element, encoding='UTF-8')
+        tag_end = data.index(b'>')
+
+        def strip_declaration(match):
+            if self._root_namespaces.get(match.group(1)) == match.group(2):
+                return b''
+            return match.group(0)
+
+        return _NAMESPACE_DECLARATION.sub(strip_declaration, data[:tag_end]) + data[tag_end:]
+
+    def save(self, output_file: str):
+        """
+        保存文档: 其余部件按 python-docx 原样写出,正文由已写出的内容和树中剩余的内容拼接
+
+        Args:
+            output_file: 输出文件路径
+        """
+        package = io.BytesIO()
+        self.document.save(package)
+        package.seek(0)
+
+        with zipfile.ZipFile(package) as source, \
+                zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                if info.filename != _DOCUMENT_PART:
+                    target.writestr(info, source.read(info.filename), compress_type=zipfile.ZIP_DEFLATED)
+                    continue
+
+                head, tail = source.read(info.filename).split(_MARKER, 1)
+                part_info = zipfile.ZipInfo(info.filename, info.date_time)
+                part_info.compress_type = zipfile.ZIP_DEFLATED
+                # 正文大小在写入前已知,只有超过 2GB 时才需要 ZIP64
+                part_size = len(head) + self._spool.seek(0, io.SEEK_END) + len(tail)
+                with target.open(part_info, 'w', force_zip64=part_size > zipfile.ZIP64_LIMIT) as part:
+                    part.write(head)
+                    self._spool.seek(0)
+                    shutil.copyfileobj(self._spool, part)
+                    part.write(tail)
+
+    def close(self):
+        """释放临时文件"""
+        self._spool.close()
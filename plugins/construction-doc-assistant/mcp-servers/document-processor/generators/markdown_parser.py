@@ -6,7 +6,7 @@ Markdown解析器
 import re
 import os
 import sys
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -15,13 +15,47 @@ from utils import get_logger
 logger = get_logger(__name__)
 
 
+class _LineBuffer:
+    """
+    按需读取的行缓冲区
+
+    按行号访问,只在需要时从底层迭代器读取;release() 丢弃已处理的行,
+    内存中只保留当前块和向前查看的几行
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self._iter = iter(lines)
+        self._lines: List[str] = []
+        self._offset = 0  # _lines[0] 的行号
+
+    def has(self, index: int) -> bool:
+        """第 index 行是否存在 (必要时继续读取)"""
+        while index - self._offset >= len(self._lines):
+            try:
+                line = next(self._iter)
+            except StopIteration:
+                return False
+            # 逐行读取的文件行带有换行符
+            self._lines.append(line[:-1] if line.endswith('\n') else line)
+        return True
+
+    def __getitem__(self, index: int) -> str:
+        return self._lines[index - self._offset]
+
+    def release(self, index: int):
+        """丢弃第 index 行之前的行"""
+        if index > self._offset:
+            del self._lines[:index - self._offset]
+            self._offset = index
+
+
 class MarkdownParser:
     """Markdown解析器 - 使用正则表达式解析"""
 
     # 正则表达式模式
     HEADING_PATTERN = r'^(#{1,6})\s+(.+)$'  # 标题
     TABLE_ROW_PATTERN = r'^\|(.+)\|$'  # 表格行
-    TABLE_SEPARATOR_PATTERN = r'^\|[\s\-:]+\|$'  # 表格分隔符
+    TABLE_SEPARATOR_PATTERN = r'^\|[\s\-:|]+\|$'  # 表格分隔符(如 |---|:---:|)
     LIST_PATTERN = r'^(\s*)([-*+]|\d+\.)\s+(.+)$'  # 列表项
     QUOTE_PATTERN = r'^>\s+(.+)$'  # 引用
     CODE_BLOCK_START = r'^```(\w*)$'  # 代码块开始
@@ -60,6 +94,31 @@ class MarkdownParser:
         r'^##\s*数据来源\s*$',
     ]
 
+    # 预编译的模式 (解析时每行只做一次首字符分派,再匹配对应的模式)
+    _HEADING_RE = re.compile(HEADING_PATTERN)
+    _SECTION_START_RE = re.compile(r'^##\s+')
+    _TABLE_ROW_RE = re.compile(TABLE_ROW_PATTERN)
+    _TABLE_SEPARATOR_RE = re.compile(TABLE_SEPARATOR_PATTERN)
+    _LIST_RE = re.compile(LIST_PATTERN)
+    _QUOTE_RE = re.compile(QUOTE_PATTERN)
+    _CODE_BLOCK_START_RE = re.compile(CODE_BLOCK_START)
+    _CODE_BLOCK_END_RE = re.compile(CODE_BLOCK_END)
+    _IMAGE_RE = re.compile(IMAGE_PATTERN)
+    _HORIZONTAL_RULE_RE = re.compile(HORIZONTAL_RULE)
+    _BOLD_RE = re.compile(BOLD_PATTERN)
+    _ITALIC_RE = re.compile(ITALIC_PATTERN)
+    _CODE_INLINE_RE = re.compile(CODE_INLINE_PATTERN)
+
+    # 普通段落遇到这些行时结束 (标题、列表、引用、代码块、表格行)
+    _PARAGRAPH_BREAK_RE = re.compile('|'.join(
+        f'(?:{pattern})'
+        for pattern in (HEADING_PATTERN, LIST_PATTERN, QUOTE_PATTERN, CODE_BLOCK_START, TABLE_ROW_PATTERN)
+    ))
+
+    # 技术性元数据和技术章节标题各合并为一个模式 (任一分支从行首匹配即命中)
+    _TECHNICAL_METADATA_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in TECHNICAL_METADATA_PATTERNS))
+    _TECHNICAL_SECTION_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in TECHNICAL_SECTIONS_TO_REMOVE))
+
     def __init__(self):
         self.logger = logger
 
@@ -73,11 +132,7 @@ class MarkdownParser:
         Returns:
             True表示是技术性元数据,应该被过滤
         """
-        line_stripped = line.strip()
-        for pattern in self.TECHNICAL_METADATA_PATTERNS:
-            if re.match(pattern, line_stripped):
-                return True
-        return False
+        return self._TECHNICAL_METADATA_RE.match(line.strip()) is not None
 
     def is_technical_section_start(self, line: str) -> bool:
         """
@@ -89,11 +144,7 @@ class MarkdownParser:
         Returns:
             True表示是技术章节标题,该章节应被完整删除
         """
-        line_stripped = line.strip()
-        for pattern in self.TECHNICAL_SECTIONS_TO_REMOVE:
-            if re.match(pattern, line_stripped):
-                return True
-        return False
+        return self._TECHNICAL_SECTION_RE.match(line.strip()) is not None
 
     def parse(self, markdown_text: str, filter_technical_metadata: bool = True) -> List[Dict[str, Any]]:
         """
@@ -115,24 +166,41 @@ class MarkdownParser:
                 {"type": "horizontal_rule"},
             ]
         """
-        sections = []
-        lines = markdown_text.split('\n')
+        return list(self.iter_sections(markdown_text.split('\n'), filter_technical_metadata))
+
+    def iter_sections(self, lines: Iterable[str], filter_technical_metadata: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        流式解析Markdown: 逐个生成段落字典 (格式同 parse)
+
+        行按需读取,已处理的行随即丢弃,可直接传入打开的文件对象,
+        内存占用与文件大小无关
+
+        Args:
+            lines: 文本行的可迭代对象 (如按换行符拆分的文本或打开的文本文件)
+            filter_technical_metadata: 是否过滤技术性元数据
+
+        Yields:
+            段落字典
+        """
+        lines = _LineBuffer(lines)
         i = 0
         skip_until_next_section = False  # 用于跳过整个技术章节
 
-        while i < len(lines):
+        while lines.has(i):
+            lines.release(i)
             line = lines[i]
+            stripped = line.strip()
 
             # 跳过空行
-            if not line.strip():
+            if not stripped:
                 i += 1
                 continue
 
             # 检查是否遇到新的章节标题（##开头）
-            if re.match(r'^##\s+', line):
+            if line.startswith('##') and self._SECTION_START_RE.match(line):
                 # 检查是否为需要删除的技术章节
-                if filter_technical_metadata and self.is_technical_section_start(line):
-                    self.logger.info(f"跳过技术章节: {line[:50]}...")
+                if filter_technical_metadata and self._TECHNICAL_SECTION_RE.match(stripped):
+                    self.logger.info("跳过技术章节: %s...", line[:50])
                     skip_until_next_section = True
                     i += 1
                     continue
@@ -146,121 +214,109 @@ class MarkdownParser:
                 continue
 
             # 过滤技术性元数据行
-            if filter_technical_metadata and self.is_technical_metadata(line):
-                self.logger.debug(f"过滤技术性元数据: {line[:50]}...")
+            if filter_technical_metadata and self._TECHNICAL_METADATA_RE.match(stripped):
+                self.logger.debug("过滤技术性元数据: %s...", line[:50])
                 i += 1
                 continue
 
+            kind, match = self._classify_line(line, stripped)
+
             # 1. 标题
-            heading_match = re.match(self.HEADING_PATTERN, line)
-            if heading_match:
-                level = len(heading_match.group(1))
-                text = heading_match.group(2).strip()
-                # 清理行内格式标记
-                text = self.strip_inline_styles(text)
-                sections.append({
+            if kind == "heading":
+                yield {
                     "type": "heading",
-                    "level": level,
-                    "text": text
-                })
+                    "level": len(match.group(1)),
+                    # 清理行内格式标记
+                    "text": self.strip_inline_styles(match.group(2).strip())
+                }
                 i += 1
                 continue
 
             # 2. 水平线
-            if re.match(self.HORIZONTAL_RULE, line.strip()):
-                sections.append({"type": "horizontal_rule"})
+            if kind == "horizontal_rule":
+                yield {"type": "horizontal_rule"}
                 i += 1
                 continue
 
             # 3. 代码块
-            code_match = re.match(self.CODE_BLOCK_START, line.strip())
-            if code_match:
-                language = code_match.group(1) or ""
+            if kind == "code":
+                language = match.group(1) or ""
                 code_lines = []
                 i += 1
 
-                while i < len(lines):
-                    if re.match(self.CODE_BLOCK_END, lines[i].strip()):
+                code_block_end = self._CODE_BLOCK_END_RE
+                while lines.has(i):
+                    if code_block_end.match(lines[i].strip()):
                         i += 1
                         break
                     code_lines.append(lines[i])
                     i += 1
 
-                sections.append({
+                yield {
                     "type": "code",
                     "language": language,
                     "text": '\n'.join(code_lines)
-                })
+                }
                 continue
 
-            # 4. 表格
-            if re.match(self.TABLE_ROW_PATTERN, line):
+            # 4. 表格 (不是标准表格时继续按列表、引用等识别)
+            if kind == "table":
                 table_data = self._parse_table(lines, i)
                 if table_data:
-                    sections.append(table_data["section"])
+                    yield table_data["section"]
                     i = table_data["next_index"]
                     continue
+                kind, match = self._classify_line(line, stripped, after_table=True)
 
             # 5. 列表
-            list_match = re.match(self.LIST_PATTERN, line)
-            if list_match:
+            if kind == "list":
                 list_data = self._parse_list(lines, i)
-                sections.append(list_data["section"])
+                yield list_data["section"]
                 i = list_data["next_index"]
                 continue
 
             # 6. 引用
-            quote_match = re.match(self.QUOTE_PATTERN, line)
-            if quote_match:
+            if kind == "quote":
+                quote_re = self._QUOTE_RE
                 quote_lines = []
-                while i < len(lines) and re.match(self.QUOTE_PATTERN, lines[i]):
-                    match = re.match(self.QUOTE_PATTERN, lines[i])
-                    quote_lines.append(match.group(1))
+                while lines.has(i):
+                    quote_match = quote_re.match(lines[i])
+                    if not quote_match:
+                        break
+                    quote_lines.append(quote_match.group(1))
                     i += 1
 
-                sections.append({
+                yield {
                     "type": "quote",
                     "text": ' '.join(quote_lines)
-                })
+                }
                 continue
 
             # 7. 图片(独立行)
-            image_match = re.match(self.IMAGE_PATTERN, line.strip())
-            if image_match:
-                alt_text = image_match.group(1) or ""
-                image_url = image_match.group(2) or ""
-                title = image_match.group(3) or alt_text
+            if kind == "image":
+                alt_text = match.group(1) or ""
+                image_url = match.group(2) or ""
+                title = match.group(3) or alt_text
 
-                sections.append({
+                yield {
                     "type": "image",
                     "alt": alt_text,
                     "url": image_url,
                     "title": title,
                     "IMPLEMENTED": False  # 标记为未实现(Phase 1)
-                })
+                }
                 i += 1
                 continue
 
             # 8. 普通段落
             # 收集连续的非空行作为一个段落
+            # 遇到空行、标题、列表、引用、代码块、表格行时停止
+            paragraph_break = self._PARAGRAPH_BREAK_RE
             para_lines = []
-            while i < len(lines):
+            while lines.has(i):
                 current_line = lines[i]
-
-                # 遇到空行、标题、列表、引用、代码块等,停止
-                if not current_line.strip():
-                    break
-                if re.match(self.HEADING_PATTERN, current_line):
-                    break
-                if re.match(self.LIST_PATTERN, current_line):
-                    break
-                if re.match(self.QUOTE_PATTERN, current_line):
-                    break
-                if re.match(self.CODE_BLOCK_START, current_line):
+                if not current_line.strip() or paragraph_break.match(current_line):
                     break
-                if re.match(self.TABLE_ROW_PATTERN, current_line):
-                    break
-
                 para_lines.append(current_line)
                 i += 1
 
@@ -268,17 +324,62 @@ class MarkdownParser:
                 para_text = ' '.join(para_lines)
                 # 清理行内格式标记
                 para_text = self.strip_inline_styles(para_text)
-                sections.append({
+                yield {
                     "type": "paragraph",
                     "text": para_text
-                })
+                }
             else:
                 # 如果没有收集到段落内容,必须递增i避免无限循环
                 i += 1
 
-        return sections
+    def _classify_line(self, line: str, stripped: str, after_table: bool = False):
+        """
+        按首字符分派识别块类型 (判断顺序与匹配规则同逐个模式尝试一致)
 
-    def _parse_table(self, lines: List[str], start_index: int) -> Optional[Dict]:
+        Args:
+            line: 原始行
+            stripped: 去除首尾空白后的行 (非空)
+            after_table: 已确认不是标准表格,从列表开始继续识别
+
+        Returns:
+            (类型, 匹配结果): 类型为 heading / horizontal_rule / code / table / list / quote / image / paragraph
+        """
+        first = line[0]
+        first_stripped = stripped[0]
+
+        if not after_table:
+            if first == '#':
+                match = self._HEADING_RE.match(line)
+                if match:
+                    return "heading", match
+            if first_stripped in '*-_':
+                match = self._HORIZONTAL_RULE_RE.match(stripped)
+                if match:
+                    return "horizontal_rule", match
+            if first_stripped == '`':
+                match = self._CODE_BLOCK_START_RE.match(stripped)
+                if match:
+                    return "code", match
+            if first == '|':
+                match = self._TABLE_ROW_RE.match(line)
+                if match:
+                    return "table", match
+
+        if first_stripped in '-*+' or first_stripped.isdigit():
+            match = self._LIST_RE.match(line)
+            if match:
+                return "list", match
+        if first == '>':
+            match = self._QUOTE_RE.match(line)
+            if match:
+                return "quote", match
+        if first_stripped == '!':
+            match = self._IMAGE_RE.match(stripped)
+            if match:
+                return "image", match
+        return "paragraph", None
+
+    def _parse_table(self, lines: _LineBuffer, start_index: int) -> Optional[Dict]:
         """
         解析表格
 
@@ -293,14 +394,14 @@ class MarkdownParser:
 
         # 第一行应该是表头
         header_line = lines[i].strip()
-        if not re.match(self.TABLE_ROW_PATTERN, header_line):
+        if not self._TABLE_ROW_RE.match(header_line):
             return None
 
         headers = [self.strip_inline_styles(cell.strip()) for cell in header_line.split('|')[1:-1]]
         i += 1
 
         # 第二行应该是分隔符
-        if i >= len(lines) or not re.match(self.TABLE_SEPARATOR_PATTERN, lines[i].strip()):
+        if not lines.has(i) or not self._TABLE_SEPARATOR_RE.match(lines[i].strip()):
             # 不是标准表格,跳过
             return None
 
@@ -308,9 +409,9 @@ class MarkdownParser:
 
         # 后续行是数据行
         rows = []
-        while i < len(lines):
+        while lines.has(i):
             row_line = lines[i].strip()
-            if not re.match(self.TABLE_ROW_PATTERN, row_line):
+            if not self._TABLE_ROW_RE.match(row_line):
                 break
 
             cells = [self.strip_inline_styles(cell.strip()) for cell in row_line.split('|')[1:-1]]
@@ -326,7 +427,7 @@ class MarkdownParser:
             "next_index": i
         }
 
-    def _parse_list(self, lines: List[str], start_index: int) -> Dict:
+    def _parse_list(self, lines: _LineBuffer, start_index: int) -> Dict:
         """
         解析列表
 
@@ -342,14 +443,14 @@ class MarkdownParser:
         ordered = False
 
         # 检查第一个列表项,判断是有序还是无序
-        first_match = re.match(self.LIST_PATTERN, lines[i])
+        first_match = self._LIST_RE.match(lines[i])
         if first_match:
             marker = first_match.group(2)
             ordered = marker[0].isdigit()
 
         # 收集所有列表项
-        while i < len(lines):
-            list_match = re.match(self.LIST_PATTERN, lines[i])
+        while lines.has(i):
+            list_match = self._LIST_RE.match(lines[i])
             if not list_match:
                 break
 
@@ -378,12 +479,16 @@ class MarkdownParser:
         Returns:
             纯文本
         """
+        # 大多数文本不含样式标记
+        if '*' not in text and '`' not in text:
+            return text
+
         # 移除粗体
-        text = re.sub(self.BOLD_PATTERN, r'\1', text)
+        text = self._BOLD_RE.sub(r'\1', text)
         # 移除斜体
-        text = re.sub(self.ITALIC_PATTERN, r'\1', text)
+        text = self._ITALIC_RE.sub(r'\1', text)
         # 移除行内代码
-        text = re.sub(self.CODE_INLINE_PATTERN, r'\1', text)
+        text = self._CODE_INLINE_RE.sub(r'\1', text)
 
         return text
 
@@ -400,7 +505,7 @@ class MarkdownParser:
         styles = []
 
         # 提取粗体
-        for match in re.finditer(self.BOLD_PATTERN, text):
+        for match in self._BOLD_RE.finditer(text):
             styles.append({
                 "type": "bold",
                 "start": match.start(),
@@ -409,7 +514,7 @@ class MarkdownParser:
             })
 
         # 提取斜体
-        for match in re.finditer(self.ITALIC_PATTERN, text):
+        for match in self._ITALIC_RE.finditer(text):
             # 排除粗体中的星号
             if not any(s["start"] <= match.start() < s["end"] for s in styles if s["type"] == "bold"):
                 styles.append({
@@ -420,7 +525,7 @@ class MarkdownParser:
                 })
 
         # 提取行内代码
-        for match in re.finditer(self.CODE_INLINE_PATTERN, text):
+        for match in self._CODE_INLINE_RE.finditer(text):
             styles.append({
                 "type": "code",
                 "start": match.start(),
@@ -0,0 +1,273 @@
+"""
+模板样式编译
+
+将 ConstructionStyles 模板中的样式配置预先编译为 w:rPr / w:pPr / w:tcPr XML 片段:
+- 每个模板只编译一次 (按模板名缓存),编译时解析颜色、构建 Pt/Inches 等对象
+- 直接格式模式: 应用样式时只需克隆预编译的 XML 片段,不再逐个检查样式键和重建对象
+- 命名样式模式: 编译结果注册为文档 styles.xml 中的段落样式,内容只引用样式
+"""
+import copy
+import threading
+from typing import Dict
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt, Inches
+from docx.text.paragraph import Paragraph
+
+from .construction_styles import ConstructionStyles
+
+
+# 各类内容应用的样式键: 名称 -> (模板中的样式组, 键前缀, 字符样式键, 段落样式键)
+STYLE_KINDS = {
+    **{
+        f"h{level}": (f"h{level}", "", ("font_name", "font_size", "bold", "color"),
+                      ("alignment", "space_before", "space_after"))
+        for level in range(1, 7)
+    },
+    "body": ("body", "", ("font_name", "font_size", "color"),
+             ("line_spacing", "alignment", "first_line_indent", "space_after")),
+    "list": ("list", "", ("font_name", "font_size"), ("line_spacing",)),
+    "quote": ("quote", "", ("font_name", "font_size", "italic", "color"), ("left_indent", "space_after")),
+    "code": ("code", "", ("font_name", "font_size"), ("line_spacing", "left_indent")),
+    "table_header": ("table", "header_", ("font_name", "font_size", "bold"), ("alignment",)),
+    "table_cell": ("table", "cell_", ("font_name", "font_size"), ("alignment",)),
+}
+
+# 命名样式模式下各类内容使用的段落样式 (标题使用内置标题样式,保留大纲级别)
+NAMED_STYLES = {
+    **{f"h{level}": f"Heading {level}" for level in range(1, 7)},
+    "body": "Report Body",
+    "list": "Report List",
+    "quote": "Report Quote",
+    "code": "Report Code",
+    "table_header": "Report Table Header",
+    "table_cell": "Report Table Cell",
+}
+
+
+class CompiledStyle:
+    """预编译的样式 (字符属性、段落属性和单元格属性的 XML 片段)"""
+
+    def __init__(self, rpr=None, ppr=None, tcpr=None):
+        """
+        Args:
+            rpr: w:rPr 元素 (无字符属性时为 None)
+            ppr: w:pPr 元素 (无段落属性时为 None)
+            tcpr: w:tcPr 元素 (无单元格属性时为 None)
+        """
+        self.rpr = rpr
+        self.ppr = ppr
+        self.tcpr = tcpr
+
+    def apply(self, paragraph):
+        """
+        将样式应用到段落及其全部文本块
+
+        Args:
+            paragraph: python-docx 段落对象
+        """
+        p = paragraph._p
+        if self.rpr is not None:
+            for r in p.r_lst:
+                _merge_properties(r, self.rpr)
+        if self.ppr is not None:
+            _merge_properties(p, self.ppr)
+
+    def apply_to_cell(self, cell):
+        """
+        将样式应用到表格单元格 (单元格属性及其中全部段落)
+
+        Args:
+            cell: python-docx 单元格对象
+        """
+        self.apply_cell_properties(cell)
+        for paragraph in cell.paragraphs:
+            self.apply(paragraph)
+
+    def apply_cell_properties(self, cell):
+        """只应用单元格属性 (如背景色)"""
+        if self.tcpr is not None:
+            _merge_properties(cell._tc, self.tcpr)
+
+
+def _merge_properties(parent, properties):
+    """
+    将预编译的属性元素 (rPr/pPr/tcPr) 合并到父元素
+
+    父元素还没有该属性元素时直接插入克隆 (最常见的情况);
+    已有时逐个替换同名子元素,新子元素按架构顺序插入
+    """
+    existing = parent.find(properties.tag)
+    if existing is None:
+        # rPr/pPr/tcPr 都是父元素的第一个子元素
+        parent.insert(0, copy.deepcopy(properties))
+        return
+    _merge_children(existing, properties)
+
+
+def _merge_children(existing, properties):
+    """将属性元素的子元素逐个合并到已有的同类属性元素 (替换同名子元素)"""
+    for child in properties:
+        for old in existing.findall(child.tag):
+            existing.remove(old)
+        local_name = child.tag.rsplit('}', 1)[-1]
+        insert = getattr(existing, f"_insert_{local_name}", None)
+        if insert is not None:
+            insert(copy.deepcopy(child))
+        else:
+            existing.append(copy.deepcopy(child))
+
+
+def _compile_style(config: Dict, prefix: str, run_keys: tuple, paragraph_keys: tuple) -> CompiledStyle:
+    """在游离的段落上设置一次样式,取出生成的属性元素"""
+    paragraph = Paragraph(OxmlElement('w:p'), None)
+    run = paragraph.add_run()
+    values = {key: config[prefix + key] for key in run_keys + paragraph_keys if prefix + key in config}
+
+    font = run.font
+    if "font_name" in values:
+        font.name = values["font_name"]
+    if "font_size" in values:
+        font.size = Pt(values["font_size"])
+    if "bold" in values:
+        font.bold = values["bold"]
+    if "italic" in values:
+        font.italic = values["italic"]
+    if "color" in values:
+        font.color.rgb = ConstructionStyles.get_color(values["color"])
+
+    paragraph_format = paragraph.paragraph_format
+    if values.get("alignment") in ConstructionStyles.ALIGNMENT_MAP:
+        paragraph_format.alignment = ConstructionStyles.ALIGNMENT_MAP[values["alignment"]]
+    if "line_spacing" in values:
+        paragraph_format.line_spacing = values["line_spacing"]
+    first_line_indent = values.get("first_line_indent")
+    if isinstance(first_line_indent, (int, float)) and first_line_indent > 0:
+        paragraph_format.first_line_indent = Inches(first_line_indent)
+    if "left_indent" in values:
+        paragraph_format.left_indent = values["left_indent"]
+    if "space_before" in values:
+        paragraph_format.space_before = Pt(values["space_before"])
+    if "space_after" in values:
+        paragraph_format.space_after = Pt(values["space_after"])
+
+    return CompiledStyle(rpr=run._r.rPr, ppr=paragraph._p.pPr)
+
+
+def _compile_cell_background(color: str):
+    """编译单元格背景色 (颜色名或十六进制颜色)"""
+    fill = ConstructionStyles.COLORS.get(color, color)
+    if not isinstance(fill, str):
+        fill = str(fill)
+    tcpr = OxmlElement('w:tcPr')
+    shade = OxmlElement('w:shd')
+    shade.set(qn('w:val'), 'clear')
+    shade.set(qn('w:color'), 'auto')
+    shade.set(qn('w:fill'), fill.lstrip('#'))
+    tcpr.append(shade)
+    return tcpr
+
+
+def compile_template(template: Dict) -> Dict[str, CompiledStyle]:
+    """
+    编译模板中的全部样式
+
+    Args:
+        template: ConstructionStyles 模板配置
+
+    Returns:
+        {样式名: CompiledStyle} (样式名见 STYLE_KINDS,模板中没有的样式组不编译)
+    """
+    compiled = {}
+    for name, (group, prefix, run_keys, paragraph_keys) in STYLE_KINDS.items():
+        if group in template:
+            compiled[name] = _compile_style(template[group], prefix, run_keys, paragraph_keys)
+
+    header_bg = template.get("table", {}).get("header_bg")
+    if header_bg and "table_header" in compiled:
+        compiled["table_header"].tcpr = _compile_cell_background(header_bg)
+    return compiled
+
+
+def register_named_styles(document, compiled: Dict[str, CompiledStyle]) -> Dict[str, str]:
+    """
+    将编译好的样式注册为文档的段落样式 (写入 styles.xml,每个文档一次)
+
+    内置标题样式直接改写为模板格式,其余样式以 Normal 为基础新建
+
+    Args:
+        document: python-docx 文档对象
+        compiled: get_compiled_template() 的返回值
+
+    Returns:
+        {样式名: 样式 ID} (用于段落的 w:pStyle 引用)
+    """
+    styles = document.styles
+    style_ids = {}
+    for kind, style_name in NAMED_STYLES.items():
+        compiled_style = compiled.get(kind)
+        if compiled_style is None:
+            continue
+
+        try:
+            style = styles[style_name]
+        except KeyError:
+            style = styles.add_style(style_name, WD_STYLE_TYPE.PARAGRAPH)
+            style.base_style = styles['Normal']
+            style.quick_style = True
+
+        element = style.element
+        if compiled_style.ppr is not None:
+            _merge_children(element.get_or_add_pPr(), compiled_style.ppr)
+        if compiled_style.rpr is not None:
+            _merge_children(element.get_or_add_rPr(), compiled_style.rpr)
+        style_ids[kind] = style.style_id
+    return style_ids
+
+
+def get_named_style_ids(document, compiled: Dict[str, CompiledStyle]) -> Dict[str, str]:
+    """
+    读取文档中已注册的命名样式的样式 ID (用于从已注册样式的骨架加载的文档)
+
+    Args:
+        document: python-docx 文档对象
+        compiled: get_compiled_template() 的返回值
+
+    Returns:
+        {样式名: 样式 ID}
+    """
+    styles = document.styles
+    return {
+        kind: styles[style_name].style_id
+        for kind, style_name in NAMED_STYLES.items() if kind in compiled
+    }
+
+
+# 已编译的模板 (按模板名缓存,进程内共享,编译结果只读)
+_compiled_templates: Dict[str, Dict[str, CompiledStyle]] = {}
+_compile_lock = threading.Lock()
+
+
+def get_compiled_template(template_type: str) -> Dict[str, CompiledStyle]:
+    """
+    获取已编译的模板 (首次使用时编译)
+
+    Args:
+        template_type: 模板类型
+
+    Returns:
+        {样式名: CompiledStyle}
+
+    Raises:
+        ValueError: 模板不存在
+    """
+    compiled = _compiled_templates.get(template_type)
+    if compiled is None:
+        template = ConstructionStyles.get_template(template_type)
+        with _compile_lock:
+            compiled = _compiled_templates.get(template_type)
+            if compiled is None:
+                compiled = _compiled_templates[template_type] = compile_template(template)
+    return compiled
@@ -3,6 +3,8 @@ Word文档生成器
 
 将Markdown文本转换为格式化的Word文档
 """
+import copy
+import io
 import os
 import sys
 from typing import Dict, Any, Optional, List
@@ -14,15 +16,20 @@ try:
     from docx import Document
     from docx.shared import Pt, RGBColor, Inches
     from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.enum.style import WD_STYLE_TYPE
     from docx.oxml.ns import qn
     from docx.oxml import OxmlElement
+    from docx.table import _Cell
 except ImportError:
     raise ImportError("请安装 python-docx: pip install python-docx")
 
 from .base_generator import BaseGenerator
 from .markdown_parser import MarkdownParser
 from .construction_styles import ConstructionStyles
-from utils import get_logger
+from .style_compiler import get_compiled_template, register_named_styles, get_named_style_ids
+from .docx_stream import StreamingBodyWriter
+from .docx_skeleton import get_skeleton, skeleton_name
+from utils import get_logger, config
 
 logger = get_logger(__name__)
 
@@ -44,6 +51,12 @@ class WordGenerator(BaseGenerator):
         super().__init__()
         self.template_type = template_type
         self.styles = ConstructionStyles.get_template(template_type)
+        # 预编译的样式 (按模板缓存),应用样式时只克隆 XML 片段
+        self.compiled_styles = get_compiled_template(template_type)
+        # 命名样式模式下的 {样式名: 样式 ID} (直接格式模式下为空)
+        self.style_ids = {}
+        # 当前文档中表格样式的样式 ID (元组包装,区分"未查找"和"默认样式")
+        self._table_style_id = None
         self.doc = None
         self.markdown_parser = MarkdownParser()
         self.warnings = []
@@ -63,64 +76,103 @@ class WordGenerator(BaseGenerator):
                     - project_name: 项目名称
                     - report_type: 报告类型
                     - generate_date: 生成日期
+                - style_mode: 样式模式
+                    - direct: 直接格式(默认),每个段落和文本块写入格式属性
+                    - named: 命名样式,样式注册到 styles.xml 一次,内容只引用样式名,文件更小
 
         Returns:
             生成结果字典
         """
         try:
+            options = options or {}
+            style_mode = options.get('style_mode') or 'direct'
+            if style_mode not in ('direct', 'named'):
+                raise ValueError(f"未知样式模式: {style_mode}。可用模式: direct, named")
+
             # 1. 验证输入文件
             self.validate_input(markdown_file)
             self.validate_output(output_file)
 
-            # 2. 读取Markdown文件
-            self.logger.info(f"读取Markdown文件: {markdown_file}")
-            with open(markdown_file, 'r', encoding='utf-8') as f:
-                markdown_text = f.read()
-
-            # 3. 解析Markdown(启用技术性元数据过滤)
-            self.logger.info("解析Markdown内容(过滤技术性元数据)...")
-            sections = self.markdown_parser.parse(markdown_text, filter_technical_metadata=True)
-            self.logger.info(f"解析完成,共 {len(sections)} 个段落")
-
-            # 4. 创建Word文档
+            # 2. 从模板骨架创建Word文档 (页边距、命名样式、页眉页脚已设置好)
             self.logger.info("创建Word文档...")
-            self.doc = Document()
-            self._setup_document_margins()
-
-            # 5. 添加页眉页脚
-            options = options or {}
             project_info = options.get('project_info')
+            self.doc = Document(io.BytesIO(self._get_skeleton(style_mode, bool(project_info))))
+            self._table_style_id = None
+            self.warnings = []
+            self.style_ids = get_named_style_ids(self.doc, self.compiled_styles) if style_mode == 'named' else {}
+
+            # 3. 填写页眉文字
             if project_info:
-                self._add_header_footer(project_info)
-
-            # 6. 逐节构建内容
-            self.logger.info("构建Word内容...")
-            for i, section in enumerate(sections):
-                try:
-                    self._add_section(section)
-                except Exception as e:
-                    self.logger.error(f"处理段落失败 (索引{i}): {e}", exc_info=True)
-                    self.warnings.append(f"段落 {i+1} 处理失败: {section.get('type', 'unknown')} - {str(e)}")
-
-            # 7. 保存文档
-            self.logger.info(f"保存Word文档: {output_file}")
-            self.doc.save(output_file)
-
-            # 8. 返回结果
+                self._set_header_text(project_info)
+
+            # 4. 流式解析Markdown(启用技术性元数据过滤)并逐节构建内容
+            #    按行读取文件,已生成的正文定期写出到临时文件,内存占用与报告大小无关
+            self.logger.info("读取并解析Markdown文件(过滤技术性元数据): %s", markdown_file)
+            writer = StreamingBodyWriter(self.doc, flush_every=config.WORD_STREAM_FLUSH_EVERY)
+            try:
+                sections_processed = 0
+                with open(markdown_file, 'r', encoding='utf-8') as f:
+                    for section in self.markdown_parser.iter_sections(f, filter_technical_metadata=True):
+                        sections_processed += 1
+                        try:
+                            self._add_section(section)
+                        except Exception as e:
+                            self.logger.error("处理段落失败 (索引%s): %s", sections_processed - 1, e, exc_info=True)
+                            self.warnings.append(f"段落 {sections_processed} 处理失败: {section.get('type', 'unknown')} - {str(e)}")
+                        writer.maybe_flush()
+                self.logger.info("解析完成,共 %s 个段落", sections_processed)
+
+                # 5. 保存文档
+                self.logger.info("保存Word文档: %s", output_file)
+                writer.save(output_file)
+            finally:
+                writer.close()
+
+            # 6. 返回结果
             result = self.create_success_response(
                 output_file,
-                sections_processed=len(sections),
+                sections_processed=sections_processed,
                 warnings=self.warnings,
                 template_type=self.template_type,
+                style_mode=style_mode,
             )
 
-            self.logger.info(f"✅ Word文档生成成功: {output_file}")
+            self.logger.info("✅ Word文档生成成功: %s", output_file)
             return result
 
         except Exception as e:
-            self.logger.error(f"Word文档生成失败: {e}", exc_info=True)
+            self.logger.error("Word文档生成失败: %s", e, exc_info=True)
             return self.create_error_response(str(e))
 
+    def _get_skeleton(self, style_mode: str, with_header_footer: bool) -> bytes:
+        """
+        获取当前模板的骨架 .docx 字节 (内存和磁盘缓存,首次使用时生成)
+
+        Args:
+            style_mode: 样式模式
+            with_header_footer: 是否包含页眉页脚
+        """
+        name = skeleton_name(self.template_type, self.styles, style_mode, with_header_footer)
+        return get_skeleton(name, lambda: self._build_skeleton(style_mode, with_header_footer))
+
+    def _build_skeleton(self, style_mode: str, with_header_footer: bool) -> bytes:
+        """
+        生成骨架文档: 页边距、命名样式 (named 模式) 和页眉页脚 (页眉文字留空,生成报告时填写)
+
+        Returns:
+            骨架 .docx 字节
+        """
+        self.doc = Document()
+        self._setup_document_margins()
+        if style_mode == 'named':
+            register_named_styles(self.doc, self.compiled_styles)
+        if with_header_footer:
+            self._add_header_footer({})
+
+        output = io.BytesIO()
+        self.doc.save(output)
+        return output.getvalue()
+
     def _setup_document_margins(self):
         """设置文档边距"""
         sections = self.doc.sections
@@ -146,8 +198,7 @@ class WordGenerator(BaseGenerator):
         # 页眉:项目名称 | 报告类型
         header = section.header
         header_para = header.paragraphs[0]
-        header_text = f"{project_info.get('project_name', '')} - {project_info.get('report_type', '')}"
-        header_para.text = header_text
+        header_para.text = self._header_text(project_info)
         header_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
         # 设置页眉样式
@@ -164,6 +215,21 @@ class WordGenerator(BaseGenerator):
         # 添加页码域
         self._add_page_number(footer_para)
 
+    def _set_header_text(self, project_info: Dict):
+        """
+        填写骨架页眉中的文字 (页眉文字块的格式已在骨架中设置)
+
+        Args:
+            project_info: 项目信息
+        """
+        header_para = self.doc.sections[0].header.paragraphs[0]
+        header_para.runs[0].text = self._header_text(project_info)
+
+    @staticmethod
+    def _header_text(project_info: Dict) -> str:
+        """页眉文字: 项目名称 - 报告类型"""
+        return f"{project_info.get('project_name', '')} - {project_info.get('report_type', '')}"
+
     def _add_page_number(self, paragraph):
         """添加页码"""
         run = paragraph.add_run()
@@ -216,20 +282,21 @@ class WordGenerator(BaseGenerator):
         elif section_type == "horizontal_rule":
             self._add_horizontal_rule()
         else:
-            self.logger.warning(f"未知段落类型: {section_type}")
+            self.logger.warning("未知段落类型: %s", section_type)
 
     def _add_heading(self, section: Dict):
         """添加标题"""
         level = section.get("level", 1)
         text = section.get("text", "")
 
-        # 添加标题
-        heading = self.doc.add_heading(text, level=min(level, 3))
+        # 添加标题 (命名样式模式下直接引用对应级别的标题样式)
+        if f"h{level}" in self.style_ids:
+            heading = self.doc.add_paragraph(text)
+        else:
+            heading = self.doc.add_heading(text, level=min(level, 3))
 
         # 应用样式
-        style_key = f"h{level}"
-        if style_key in self.styles:
-            self._apply_heading_style(heading, self.styles[style_key])
+        self._apply_style(heading, f"h{level}")
 
     def _add_paragraph(self, section: Dict):
         """添加段落"""
@@ -239,8 +306,7 @@ class WordGenerator(BaseGenerator):
         para = self.doc.add_paragraph(text)
 
         # 应用样式
-        if "body" in self.styles:
-            self._apply_paragraph_style(para, self.styles["body"])
+        self._apply_style(para, "body")
 
     def _add_table(self, section: Dict):
         """添加表格"""
@@ -251,12 +317,12 @@ class WordGenerator(BaseGenerator):
             self.logger.warning("表格缺少表头,跳过")
             return
 
-        # 创建表格
-        table = self.doc.add_table(rows=len(rows) + 1, cols=len(headers))
+        # 创建表格 (只创建表头行,数据行由 _append_table_rows 批量写入)
+        table = self.doc.add_table(rows=1, cols=len(headers))
+        blank_row = copy.deepcopy(table._tbl.tr_lst[0])
 
-        # 应用表格样式
-        table_style = self.styles.get("table", {}).get("style", "Light Grid Accent 1")
-        table.style = table_style
+        # 应用表格样式 (样式 ID 每个文档只查找一次)
+        table._tbl.tblStyle_val = self._get_table_style_id()
 
         # 填充表头
         header_cells = table.rows[0].cells
@@ -264,25 +330,63 @@ class WordGenerator(BaseGenerator):
             if i < len(header_cells):
                 cell = header_cells[i]
                 cell.text = str(header_text)
-                self._apply_table_header_style(cell)
+                self._apply_cell_style(cell, "table_header")
 
         # 填充数据行
-        for row_idx, row_data in enumerate(rows):
-            if row_idx + 1 < len(table.rows):
-                row_cells = table.rows[row_idx + 1].cells
-                for col_idx, cell_text in enumerate(row_data):
-                    if col_idx < len(row_cells):
-                        cell = row_cells[col_idx]
-                        cell.text = str(cell_text)
-                        self._apply_table_cell_style(cell)
+        self._append_table_rows(table, blank_row, rows)
+
+    def _get_table_style_id(self) -> Optional[str]:
+        """获取模板表格样式在当前文档中的样式 ID (按文档缓存)"""
+        if self._table_style_id is None:
+            table_style = self.styles.get("table", {}).get("style", "Light Grid Accent 1")
+            self._table_style_id = (self.doc.part.get_style_id(table_style, WD_STYLE_TYPE.TABLE),)
+        return self._table_style_id[0]
+
+    def _append_table_rows(self, table, blank_row, rows: List[List]):
+        """
+        批量写入表格数据行
+
+        预先构建一个已应用单元格样式的行模板 (每个单元格含一个带格式的文本块),
+        每个数据行克隆一次模板并填入文本,直接追加到 w:tbl,
+        避免逐行访问 table.rows[i].cells 重建表格网格
+
+        Args:
+            table: 表格对象
+            blank_row: 未填充的空白行 (w:tr)
+            rows: 数据行
+        """
+        if not rows:
+            return
+
+        row_template = copy.deepcopy(blank_row)
+        for tc in row_template.tc_lst:
+            tc.p_lst[0].add_r()
+            self._apply_cell_style(_Cell(tc, table), "table_cell")
+        num_cols = len(row_template.tc_lst)
+
+        tbl = table._tbl
+        for row_data in rows:
+            tr = copy.deepcopy(row_template)
+            tcs = tr.tc_lst
+            for col_idx, cell_text in enumerate(row_data[:num_cols]):
+                text = str(cell_text)
+                if not text:
+                    continue
+                r = tcs[col_idx].p_lst[0].r_lst[0]
+                if '\t' in text or '\n' in text or '\r' in text:
+                    r.text = text  # 制表符和换行转换为 w:tab / w:br
+                else:
+                    r.add_t(text)
+            # 缺少的单元格保持为空白单元格
+            for col_idx in range(len(row_data), num_cols):
+                tr.replace(tcs[col_idx], copy.deepcopy(blank_row.tc_lst[col_idx]))
+            tbl.append(tr)
 
     def _add_list(self, section: Dict):
         """添加列表"""
         ordered = section.get("ordered", False)
         items = section.get("items", [])
 
-        list_style = self.styles.get("list", {})
-
         for i, item_text in enumerate(items):
             # 添加列表项
             if ordered:
@@ -291,7 +395,7 @@ class WordGenerator(BaseGenerator):
                 para = self.doc.add_paragraph(f"• {item_text}")
 
             # 应用样式
-            self._apply_list_style(para, list_style)
+            self._apply_style(para, "list")
 
     def _add_quote(self, section: Dict):
         """添加引用块"""
@@ -301,8 +405,7 @@ class WordGenerator(BaseGenerator):
         para = self.doc.add_paragraph(text)
 
         # 应用引用样式
-        if "quote" in self.styles:
-            self._apply_quote_style(para, self.styles["quote"])
+        self._apply_style(para, "quote")
 
     def _add_code(self, section: Dict):
         """添加代码块"""
@@ -321,8 +424,7 @@ class WordGenerator(BaseGenerator):
         para = self.doc.add_paragraph(code_text)
 
         # 应用代码样式
-        if "code" in self.styles:
-            self._apply_code_style(para, self.styles["code"])
+        self._apply_style(para, "code")
 
     def _add_image_placeholder(self, section: Dict):
         """
@@ -351,7 +453,7 @@ class WordGenerator(BaseGenerator):
 
         # 记录警告
         self.warnings.append(f"图片暂未支持,已添加占位符: {alt_text}")
-        self.logger.info(f"📷 图片占位符已添加: {alt_text} (Phase 2将实现)")
+        self.logger.info("📷 图片占位符已添加: %s (Phase 2将实现)", alt_text)
 
         # TODO Phase 2: 实现图片插入
         """
@@ -389,161 +491,40 @@ class WordGenerator(BaseGenerator):
 
     # ========== 样式应用方法 ==========
 
-    def _apply_heading_style(self, paragraph, style_config: Dict):
-        """应用标题样式"""
-        # 字体和大小
-        for run in paragraph.runs:
-            if "font_name" in style_config:
-                run.font.name = style_config["font_name"]
-            if "font_size" in style_config:
-                run.font.size = Pt(style_config["font_size"])
-            if "bold" in style_config:
-                run.font.bold = style_config["bold"]
-            if "color" in style_config:
-                color_name = style_config["color"]
-                run.font.color.rgb = ConstructionStyles.get_color(color_name)
-
-        # 对齐方式
-        if "alignment" in style_config:
-            alignment = style_config["alignment"]
-            if alignment in ConstructionStyles.ALIGNMENT_MAP:
-                paragraph.alignment = ConstructionStyles.ALIGNMENT_MAP[alignment]
-
-        # 段前段后间距
-        if "space_before" in style_config:
-            paragraph.paragraph_format.space_before = Pt(style_config["space_before"])
-        if "space_after" in style_config:
-            paragraph.paragraph_format.space_after = Pt(style_config["space_after"])
-
-    def _apply_paragraph_style(self, paragraph, style_config: Dict):
-        """应用段落样式"""
-        # 字体和大小
-        for run in paragraph.runs:
-            if "font_name" in style_config:
-                run.font.name = style_config["font_name"]
-            if "font_size" in style_config:
-                run.font.size = Pt(style_config["font_size"])
-            if "color" in style_config:
-                color_name = style_config["color"]
-                run.font.color.rgb = ConstructionStyles.get_color(color_name)
-
-        # 行距
-        if "line_spacing" in style_config:
-            paragraph.paragraph_format.line_spacing = style_config["line_spacing"]
-
-        # 对齐方式
-        if "alignment" in style_config:
-            alignment = style_config["alignment"]
-            if alignment in ConstructionStyles.ALIGNMENT_MAP:
-                paragraph.alignment = ConstructionStyles.ALIGNMENT_MAP[alignment]
-
-        # 首行缩进
-        if "first_line_indent" in style_config:
-            indent_value = style_config["first_line_indent"]
-            if isinstance(indent_value, (int, float)) and indent_value > 0:
-                paragraph.paragraph_format.first_line_indent = Inches(indent_value)
-
-        # 段后间距
-        if "space_after" in style_config:
-            paragraph.paragraph_format.space_after = Pt(style_config["space_after"])
-
-    def _apply_table_header_style(self, cell):
-        """应用表头样式"""
-        table_config = self.styles.get("table", {})
-
-        # 设置背景色
-        if "header_bg" in table_config:
-            bg_color = table_config["header_bg"]
-            self._set_cell_background(cell, bg_color)
-
-        # 设置字体
-        for para in cell.paragraphs:
-            for run in para.runs:
-                if "header_font_name" in table_config:
-                    run.font.name = table_config["header_font_name"]
-                if "header_font_size" in table_config:
-                    run.font.size = Pt(table_config["header_font_size"])
-                if "header_bold" in table_config:
-                    run.font.bold = table_config["header_bold"]
-
-            # 对齐方式
-            if "header_alignment" in table_config:
-                alignment = table_config["header_alignment"]
-                if alignment in ConstructionStyles.ALIGNMENT_MAP:
-                    para.alignment = ConstructionStyles.ALIGNMENT_MAP[alignment]
-
-    def _apply_table_cell_style(self, cell):
-        """应用表格单元格样式"""
-        table_config = self.styles.get("table", {})
-
-        # 设置字体
-        for para in cell.paragraphs:
-            for run in para.runs:
-                if "cell_font_name" in table_config:
-                    run.font.name = table_config["cell_font_name"]
-                if "cell_font_size" in table_config:
-                    run.font.size = Pt(table_config["cell_font_size"])
-
-            # 对齐方式
-            if "cell_alignment" in table_config:
-                alignment = table_config["cell_alignment"]
-                if alignment in ConstructionStyles.ALIGNMENT_MAP:
-                    para.alignment = ConstructionStyles.ALIGNMENT_MAP[alignment]
-
-    def _apply_list_style(self, paragraph, style_config: Dict):
-        """应用列表样式"""
-        for run in paragraph.runs:
-            if "font_name" in style_config:
-                run.font.name = style_config["font_name"]
-            if "font_size" in style_config:
-                run.font.size = Pt(style_config["font_size"])
-
-        if "line_spacing" in style_config:
-            paragraph.paragraph_format.line_spacing = style_config["line_spacing"]
-
-    def _apply_quote_style(self, paragraph, style_config: Dict):
-        """应用引用样式"""
-        for run in paragraph.runs:
-            if "font_name" in style_config:
-                run.font.name = style_config["font_name"]
-            if "font_size" in style_config:
-                run.font.size = Pt(style_config["font_size"])
-            if "italic" in style_config:
-                run.italic = style_config["italic"]
-            if "color" in style_config:
-                color_name = style_config["color"]
-                run.font.color.rgb = ConstructionStyles.get_color(color_name)
-
-        if "left_indent" in style_config:
-            paragraph.paragraph_format.left_indent = style_config["left_indent"]
-
-        if "space_after" in style_config:
-            paragraph.paragraph_format.space_after = Pt(style_config["space_after"])
-
-    def _apply_code_style(self, paragraph, style_config: Dict):
-        """应用代码样式"""
-        for run in paragraph.runs:
-            if "font_name" in style_config:
-                run.font.name = style_config["font_name"]
-            if "font_size" in style_config:
-                run.font.size = Pt(style_config["font_size"])
-
-        if "line_spacing" in style_config:
-            paragraph.paragraph_format.line_spacing = style_config["line_spacing"]
-
-        if "left_indent" in style_config:
-            paragraph.paragraph_format.left_indent = style_config["left_indent"]
-
-    def _set_cell_background(self, cell, color_hex: str):
+    def _apply_style(self, paragraph, style_name: str):
         """
-        设置单元格背景色
+        应用样式: 命名样式模式下引用样式,否则克隆预编译的格式属性
+
+        Args:
+            paragraph: 段落对象
+            style_name: 样式名 (h1-h6, body, list, quote, code),模板中没有时不处理
+        """
+        style_id = self.style_ids.get(style_name)
+        if style_id is not None:
+            paragraph._p.style = style_id
+            return
+
+        compiled = self.compiled_styles.get(style_name)
+        if compiled is not None:
+            compiled.apply(paragraph)
+
+    def _apply_cell_style(self, cell, style_name: str):
+        """
+        应用表格单元格样式 (单元格背景色始终直接写入)
 
         Args:
             cell: 单元格对象
-            color_hex: 十六进制颜色(如"D9E2F3")
+            style_name: 样式名 (table_header, table_cell)
         """
-        cell_xml = cell._element
-        cell_properties = cell_xml.get_or_add_tcPr()
-        shade_obj = OxmlElement('w:shd')
-        shade_obj.set(qn('w:fill'), color_hex)
-        cell_properties.append(shade_obj)
+        compiled = self.compiled_styles.get(style_name)
+        if compiled is None:
+            return
+
+        style_id = self.style_ids.get(style_name)
+        if style_id is None:
+            compiled.apply_to_cell(cell)
+            return
+
+        compiled.apply_cell_properties(cell)
+        for paragraph in cell.paragraphs:
+            paragraph._p.style = style_id
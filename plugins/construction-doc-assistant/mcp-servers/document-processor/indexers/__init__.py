@@ -0,0 +1,59 @@
+"""
+索引模块
+
+导出文档清单索引器、全文索引、事实库、重复检测、目录监控、启动预热和相关功能
+"""
+
+from .document_indexer import (
+    DocumentIndexer,
+    index_directory
+)
+from .search_index import (
+    SearchIndex,
+    build_search_index,
+    search_documents
+)
+from .fact_store import (
+    FactStore,
+    query_facts
+)
+from .duplicate_detector import (
+    DuplicateDetector,
+    find_duplicates,
+    skip_duplicate_files
+)
+from .prewarm import (
+    Prewarmer,
+    prewarm,
+    get_recent_projects,
+    record_recent_project
+)
+from .watcher import (
+    DocumentWatcher,
+    start_watching,
+    stop_watching,
+    get_watch_status,
+    stop_all_watchers
+)
+
+__all__ = [
+    'DocumentIndexer',
+    'index_directory',
+    'SearchIndex',
+    'build_search_index',
+    'search_documents',
+    'FactStore',
+    'query_facts',
+    'DuplicateDetector',
+    'find_duplicates',
+    'skip_duplicate_files',
+    'Prewarmer',
+    'prewarm',
+    'get_recent_projects',
+    'record_recent_project',
+    'DocumentWatcher',
+    'start_watching',
+    'stop_watching',
+    'get_watch_status',
+    'stop_all_watchers',
+]
@@ -0,0 +1,326 @@
+"""
+文档清单索引器模块
+
+扫描项目目录并维护持久化的文档清单(manifest)
+再次扫描时仅重新 stat 文件,只对大小或修改时间变化的文件重新探测
+"""
+from typing import Dict, Optional, Tuple
+from datetime import datetime
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config
+
+logger = get_logger(__name__)
+
+# 每个索引数据库一把更新锁 (后台监控与工具调用可能同时更新同一全文索引或事实库)
+_refresh_locks: Dict[str, threading.Lock] = {}
+_refresh_locks_guard = threading.Lock()
+
+
+def get_refresh_lock(db_path: str) -> threading.Lock:
+    """
+    获取索引数据库对应的更新锁 (同一数据库路径在进程内共用一把锁)
+
+    Args:
+        db_path: 索引数据库路径
+
+    Returns:
+        更新锁
+    """
+    with _refresh_locks_guard:
+        return _refresh_locks.setdefault(db_path, threading.Lock())
+
+
+class DocumentIndexer:
+    """文档清单索引器"""
+
+    # 清单格式版本 (格式变化时递增,旧清单将被整体重建)
+    MANIFEST_VERSION = 1
+
+    # 指纹计算的读取块大小
+    FINGERPRINT_CHUNK_SIZE = 1024 * 1024
+
+    # Office 文档内部结构探测
+    _DOCX_PAGES_PATTERN = re.compile(rb'<(?:\w+:)?Pages>(\d+)</(?:\w+:)?Pages>')
+    _XLSX_SHEET_PATTERN = re.compile(rb'<(?:\w+:)?sheet\s')
+    _PPTX_SLIDE_PATTERN = re.compile(r'^ppt/slides/slide\d+\.xml$')
+
+    def __init__(self, root_dir: str, index_dir: Optional[str] = None):
+        """
+        初始化索引器
+
+        Args:
+            root_dir: 项目文档根目录
+            index_dir: 索引存放目录 (默认: 根目录下的 config.INDEX_DIR_NAME)
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.index_dir = index_dir or os.path.join(self.root_dir, config.INDEX_DIR_NAME)
+        self.manifest_path = os.path.join(self.index_dir, config.INDEX_MANIFEST_FILE)
+        self.logger = get_logger(__name__)
+
+    def index(self, recursive: bool = True, force: bool = False) -> Dict:
+        """
+        扫描目录并增量更新文档清单
+
+        Args:
+            recursive: 是否递归扫描子目录
+            force: 是否忽略已有清单,强制重新探测所有文件
+
+        Returns:
+            索引结果字典
+        """
+        if not os.path.isdir(self.root_dir):
+            raise FileNotFoundError(f"目录不存在: {self.root_dir}")
+
+        start_time = time.perf_counter()
+
+        manifest = {} if force else self.load_manifest()
+        old_files = manifest.get('files', {})
+        new_files = {}
+
+        added, modified, unchanged = [], [], []
+
+        # 1. stat 扫描: 仅对 (size, mtime) 变化的文件重新探测
+        for rel_path, stat in self._scan(recursive):
+            entry = old_files.get(rel_path)
+            if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+                new_files[rel_path] = entry
+                unchanged.append(rel_path)
+                continue
+
+            new_files[rel_path] = self._probe(rel_path, stat)
+            (modified if entry else added).append(rel_path)
+
+        removed = [path for path in old_files if path not in new_files]
+
+        # 2. 有变化时才写回清单
+        changed = bool(added or modified or removed) or not os.path.exists(self.manifest_path)
+        if changed:
+            self._save_manifest(new_files)
+
+        elapsed = time.perf_counter() - start_time
+
+        by_type = {}
+        total_size = 0
+        for entry in new_files.values():
+            by_type[entry['type']] = by_type.get(entry['type'], 0) + 1
+            total_size += entry['size']
+
+        self.logger.info(
+            "索引完成: %s - 共 %s 个文件, 新增 %s, 修改 %s, 删除 %s, 耗时 %.3fs",
+            self.root_dir, len(new_files), len(added), len(modified), len(removed), elapsed
+        )
+
+        return {
+            "status": "success",
+            "root": self.root_dir,
+            "manifest_path": self.manifest_path,
+            "total_files": len(new_files),
+            "total_size": total_size,
+            "by_type": by_type,
+            "changes": {
+                "added": sorted(added),
+                "modified": sorted(modified),
+                "removed": sorted(removed),
+            },
+            "unchanged": len(unchanged),
+            "manifest_updated": changed,
+            "elapsed_seconds": round(elapsed, 3),
+            "files": new_files,
+        }
+
+    def load_manifest(self) -> Dict:
+        """
+        读取已有清单
+
+        Returns:
+            清单字典 (不存在、损坏或版本不符时返回空字典)
+        """
+        if not os.path.exists(self.manifest_path):
+            return {}
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning("清单读取失败,将重新建立: %s", e)
+            return {}
+
+        if manifest.get('version') != self.MANIFEST_VERSION or manifest.get('root') != self.root_dir:
+            self.logger.info("清单版本或根目录不匹配,将重新建立")
+            return {}
+
+        return manifest
+
+    def _save_manifest(self, files: Dict):
+        """原子写入清单文件"""
+        os.makedirs(self.index_dir, exist_ok=True)
+
+        manifest = {
+            "version": self.MANIFEST_VERSION,
+            "root": self.root_dir,
+            "updated_at": datetime.now().isoformat(timespec='seconds'),
+            "files": files
+        }
+
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.manifest_path)
+
+    def _scan(self, recursive: bool):
+        """
+        遍历目录中受支持的文档
+
+        Yields:
+            (相对路径, stat 结果)
+        """
+        index_dir = os.path.abspath(self.index_dir)
+        stack = [self.root_dir]
+
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.name.startswith(config.INDEX_IGNORE_PREFIXES):
+                            continue
+
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive and entry.path != index_dir:
+                                    stack.append(entry.path)
+                                continue
+
+                            if not entry.is_file() or not config.is_supported_file(entry.name):
+                                continue
+
+                            stat = entry.stat()
+                        except OSError as e:
+                            self.logger.warning("无法访问: %s - %s", entry.path, e)
+                            continue
+
+                        rel_path = os.path.relpath(entry.path, self.root_dir)
+                        yield rel_path.replace(os.sep, '/'), stat
+
+            except OSError as e:
+                self.logger.warning("无法读取目录: %s - %s", current, e)
+
+    def _probe(self, rel_path: str, stat) -> Dict:
+        """
+        探测单个文件的清单信息 (指纹和页/表/幻灯片数)
+
+        Args:
+            rel_path: 相对路径
+            stat: stat 结果
+
+        Returns:
+            清单条目
+        """
+        abs_path = os.path.join(self.root_dir, rel_path)
+
+        entry = {
+            "path": rel_path,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "mtime": datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds'),
+            "type": config.get_file_type_by_extension(rel_path),
+            "extension": os.path.splitext(rel_path)[1].lower(),
+        }
+
+        try:
+            entry["fingerprint"] = self.compute_fingerprint(abs_path)
+            entry.update(self._probe_counts(abs_path, entry["extension"]))
+        except Exception as e:
+            self.logger.warning("文件探测失败: %s - %s", rel_path, e)
+            entry["error"] = str(e)
+
+        return entry
+
+    @classmethod
+    def compute_fingerprint(cls, file_path: str) -> str:
+        """
+        计算文件内容指纹
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            十六进制指纹字符串
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(cls.FINGERPRINT_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _probe_counts(self, file_path: str, extension: str) -> Dict:
+        """
+        轻量探测页数/工作表数/幻灯片数 (不做完整解析)
+
+        Args:
+            file_path: 文件路径
+            extension: 文件扩展名
+
+        Returns:
+            计数字典,如 {"pages": 12}
+        """
+        if extension == '.docx':
+            with zipfile.ZipFile(file_path) as zf:
+                pages, _ = self._read_zip_count(zf, 'docProps/app.xml', self._DOCX_PAGES_PATTERN)
+            return {"pages": pages} if pages is not None else {}
+
+        if extension == '.xlsx':
+            with zipfile.ZipFile(file_path) as zf:
+                _, sheets = self._read_zip_count(zf, 'xl/workbook.xml', self._XLSX_SHEET_PATTERN)
+            return {"sheets": sheets} if sheets is not None else {}
+
+        if extension == '.pptx':
+            with zipfile.ZipFile(file_path) as zf:
+                slides = sum(1 for name in zf.namelist() if self._PPTX_SLIDE_PATTERN.match(name))
+            return {"slides": slides}
+
+        if extension == '.pdf':
+            try:
+                import PyPDF2
+            except ImportError:
+                return {}
+            with open(file_path, 'rb') as f:
+                return {"pages": len(PyPDF2.PdfReader(f, strict=False).pages)}
+
+        return {}
+
+    @staticmethod
+    def _read_zip_count(zf: zipfile.ZipFile, member: str, pattern) -> Tuple[Optional[int], Optional[int]]:
+        """
+        读取压缩包成员并匹配模式
+
+        Returns:
+            (首个匹配的数值, 匹配次数); 成员不存在时为 (None, None)
+        """
+        try:
+            data = zf.read(member)
+        except KeyError:
+            return None, None
+
+        matches = pattern.findall(data)
+        first = None
+        if matches and isinstance(matches[0], bytes) and matches[0].isdigit():
+            first = int(matches[0])
+        return first, len(matches)
+
+
+# 便捷函数
+def index_directory(directory: str, recursive: bool = True, force: bool = False) -> Dict:
+    """索引目录的便捷函数"""
+    indexer = DocumentIndexer(directory)
+    return indexer.index(recursive=recursive, force=force)
@@ -0,0 +1,447 @@
+"""
+近似重复文档检测模块
+
+为每个文档计算一次 MinHash 签名 (基于分词后的三元词组),
+通过 LSH 分桶快速找出候选文档对,再按签名估计相似度聚类
+无文本内容的文档 (如扫描件) 仅按文件内容指纹识别完全相同的副本
+"""
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖,缺失时用纯 Python 计算签名 (结果相同,速度较慢)
+    np = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config
+from parsers import ParserFactory, iter_document_units
+from .document_indexer import DocumentIndexer
+from .tokenizer import get_tokenizer
+
+logger = get_logger(__name__)
+
+# MinHash 使用的梅森素数 (2^61 - 1) 与 32 位哈希掩码
+# 排列参数 a、b 取 32 位,a * h + b 不超过 2^64,可在 uint64 数组中精确计算
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class DuplicateDetector:
+    """近似重复文档检测器 (MinHash + LSH)"""
+
+    # 签名文件格式版本 (签名算法或参数变化时递增)
+    SIGNATURE_VERSION = 2
+
+    # 每个 shingle 包含的连续分词数
+    SHINGLE_SIZE = 3
+
+    # numpy 计算签名时每批处理的 shingle 数 (限制 num_perm x 批大小 中间矩阵的内存)
+    SIGNATURE_CHUNK_SIZE = 4096
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        num_perm: Optional[int] = None,
+        bands: Optional[int] = None
+    ):
+        """
+        初始化检测器
+
+        Args:
+            threshold: 判定为重复的相似度阈值 (默认: config.DUPLICATE_THRESHOLD)
+            num_perm: MinHash 排列数 (默认: config.DUPLICATE_NUM_PERM)
+            bands: LSH 分段数,须整除 num_perm (默认: config.DUPLICATE_LSH_BANDS)
+        """
+        self.threshold = threshold if threshold is not None else config.DUPLICATE_THRESHOLD
+        self.num_perm = num_perm or config.DUPLICATE_NUM_PERM
+        self.bands = bands or config.DUPLICATE_LSH_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError(f"LSH 分段数 {self.bands} 必须整除排列数 {self.num_perm}")
+        self.rows = self.num_perm // self.bands
+
+        # 固定种子,保证签名可持久化复用
+        rng = random.Random(20240601)
+        self._permutations = [
+            (rng.randint(1, _MAX_HASH), rng.randint(0, _MAX_HASH))
+            for _ in range(self.num_perm)
+        ]
+        if np is not None:
+            self._perm_a = np.array([a for a, _ in self._permutations], dtype=np.uint64)[:, None]
+            self._perm_b = np.array([b for _, b in self._permutations], dtype=np.uint64)[:, None]
+        self.tokenizer = get_tokenizer()
+        self.logger = get_logger(__name__)
+
+    # ========== 签名 ==========
+
+    def compute_signature(self, text: str) -> Optional[List[int]]:
+        """
+        计算文本的 MinHash 签名
+
+        Args:
+            text: 文档文本
+
+        Returns:
+            签名 (num_perm 个整数),文本过短时为 None
+        """
+        tokens = self.tokenizer.tokenize(text)
+        if len(tokens) < self.SHINGLE_SIZE:
+            return None
+
+        hashes = {
+            int.from_bytes(
+                hashlib.blake2b(
+                    '\x1f'.join(tokens[i:i + self.SHINGLE_SIZE]).encode('utf-8'),
+                    digest_size=4
+                ).digest(),
+                'little'
+            )
+            for i in range(len(tokens) - self.SHINGLE_SIZE + 1)
+        }
+
+        if np is None:
+            return [
+                min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+                for a, b in self._permutations
+            ]
+
+        # 分批计算 num_perm x 批大小 的哈希矩阵,按行取最小值
+        values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        signature = np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        for start in range(0, len(values), self.SIGNATURE_CHUNK_SIZE):
+            chunk = values[start:start + self.SIGNATURE_CHUNK_SIZE]
+            np.minimum(
+                signature,
+                ((self._perm_a * chunk + self._perm_b) % _MERSENNE_PRIME).min(axis=1),
+                out=signature
+            )
+        return (signature & _MAX_HASH).tolist()
+
+    def signature_for_file(self, file_path: str) -> Dict:
+        """
+        读取文档文本并计算签名条目
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            签名条目 {size, mtime_ns, fingerprint, text_length, signature, error}
+        """
+        stat = os.stat(file_path)
+        entry = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "fingerprint": DocumentIndexer.compute_fingerprint(file_path),
+            "text_length": 0,
+            "signature": None,
+        }
+
+        file_type = config.get_file_type_by_extension(file_path)
+        if file_type not in ParserFactory.get_available_parsers():
+            return entry
+
+        try:
+            text = '\n'.join(unit['text'] for unit in iter_document_units(file_path))
+            entry["text_length"] = len(text)
+            entry["signature"] = self.compute_signature(text)
+        except Exception as e:
+            self.logger.warning("计算文档签名失败: %s - %s", file_path, e)
+            entry["error"] = str(e)
+
+        return entry
+
+    def estimate_similarity(self, sig_a: List[int], sig_b: List[int]) -> float:
+        """按签名估计两个文档的 Jaccard 相似度"""
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / self.num_perm
+
+    # ========== 聚类 ==========
+
+    def find_clusters(self, entries: Dict[str, Dict]) -> List[Dict]:
+        """
+        对签名条目聚类
+
+        Args:
+            entries: {路径: 签名条目}
+
+        Returns:
+            重复簇列表,每簇包含代表文档和重复文档
+            [{"representative": path, "duplicates": [{"path", "similarity", "exact"}]}]
+        """
+        parent = {path: path for path in entries}
+
+        def find(path):
+            while parent[path] != path:
+                parent[path] = parent[parent[path]]
+                path = parent[path]
+            return path
+
+        def union(a, b):
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[root_b] = root_a
+
+        # 1. 文件内容完全相同
+        by_fingerprint: Dict[str, str] = {}
+        for path, entry in entries.items():
+            first = by_fingerprint.setdefault(entry["fingerprint"], path)
+            if first != path:
+                union(first, path)
+
+        # 2. LSH 分桶: 任一分段完全相同的文档成为候选对,再用完整签名验证
+        buckets: Dict[Tuple, List[str]] = {}
+        for path, entry in entries.items():
+            signature = entry.get("signature")
+            if not signature:
+                continue
+            for band in range(self.bands):
+                key = (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+                buckets.setdefault(key, []).append(path)
+
+        checked = set()
+        for paths in buckets.values():
+            for i, path_a in enumerate(paths):
+                for path_b in paths[i + 1:]:
+                    pair = (path_a, path_b)
+                    if pair in checked:
+                        continue
+                    checked.add(pair)
+                    similarity = self.estimate_similarity(
+                        entries[path_a]["signature"], entries[path_b]["signature"]
+                    )
+                    if similarity >= self.threshold:
+                        union(path_a, path_b)
+
+        groups: Dict[str, List[str]] = {}
+        for path in entries:
+            groups.setdefault(find(path), []).append(path)
+
+        clusters = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+
+            # 代表文档: 文本最多者优先 (原生文档优于扫描件),其次修改时间最新
+            representative = max(
+                members,
+                key=lambda p: (entries[p]["text_length"], entries[p]["mtime_ns"], p)
+            )
+            rep_entry = entries[representative]
+
+            duplicates = []
+            for path in sorted(members):
+                if path == representative:
+                    continue
+                entry = entries[path]
+                exact = entry["fingerprint"] == rep_entry["fingerprint"]
+                if exact:
+                    similarity = 1.0
+                elif entry.get("signature") and rep_entry.get("signature"):
+                    similarity = self.estimate_similarity(entry["signature"], rep_entry["signature"])
+                else:
+                    similarity = None
+                duplicates.append({
+                    "path": path,
+                    "similarity": round(similarity, 3) if similarity is not None else None,
+                    "exact": exact,
+                })
+
+            clusters.append({"representative": representative, "duplicates": duplicates})
+
+        clusters.sort(key=lambda c: (-len(c["duplicates"]), c["representative"]))
+        return clusters
+
+    # ========== 目录与文件列表 ==========
+
+    def find_directory_duplicates(self, root_dir: str, index_dir: Optional[str] = None) -> Dict:
+        """
+        检测项目目录中的重复文档 (签名持久化在索引目录,未变化的文档不重新计算)
+
+        Args:
+            root_dir: 项目文档根目录
+            index_dir: 索引存放目录 (默认: 根目录下的 config.INDEX_DIR_NAME)
+
+        Returns:
+            检测结果字典
+        """
+        start_time = time.perf_counter()
+        root_dir = os.path.abspath(root_dir)
+        index_dir = index_dir or os.path.join(root_dir, config.INDEX_DIR_NAME)
+        store_path = os.path.join(index_dir, config.SIGNATURE_INDEX_FILE)
+
+        manifest = DocumentIndexer(root_dir, index_dir).index()
+        stored = self._load_signatures(store_path)
+
+        entries = {}
+        computed = 0
+        for rel_path, file_entry in manifest['files'].items():
+            entry = stored.get(rel_path)
+            if not entry or (entry["size"], entry["mtime_ns"]) != (file_entry["size"], file_entry["mtime_ns"]):
+                entry = self.signature_for_file(os.path.join(root_dir, rel_path))
+                computed += 1
+            entries[rel_path] = entry
+
+        if computed or len(entries) != len(stored):
+            self._save_signatures(store_path, entries)
+
+        clusters = self.find_clusters(entries)
+        elapsed = time.perf_counter() - start_time
+
+        self.logger.info(
+            "重复检测完成: %s - %s 个文档, 新计算签名 %s 个, 重复簇 %s 个, 耗时 %.3fs",
+            root_dir, len(entries), computed, len(clusters), elapsed
+        )
+
+        return self._build_result(root_dir, entries, clusters, computed, elapsed)
+
+    def find_file_duplicates(self, file_paths: List[str]) -> Dict:
+        """
+        检测文件列表中的重复文档
+
+        签名与 find_directory_duplicates 共用同一签名文件: 文件归属最近的已建索引的上级目录
+        (没有时为其所在目录),按 (size, mtime) 判断是否变化,未变化的文件不重新解析
+
+        Args:
+            file_paths: 文件路径列表
+
+        Returns:
+            检测结果字典
+        """
+        start_time = time.perf_counter()
+
+        # 按签名根目录分组: {根目录: [(相对路径, 文件路径)]}
+        groups: Dict[str, List[Tuple[str, str]]] = {}
+        roots: Dict[str, str] = {}
+        for file_path in file_paths:
+            directory = os.path.dirname(os.path.abspath(file_path))
+            if directory not in roots:
+                roots[directory] = self._find_signature_root(directory)
+            root_dir = roots[directory]
+            rel_path = os.path.relpath(os.path.abspath(file_path), root_dir).replace(os.sep, '/')
+            groups.setdefault(root_dir, []).append((rel_path, file_path))
+
+        entries = {}
+        computed = 0
+        for root_dir, members in groups.items():
+            store_path = os.path.join(root_dir, config.INDEX_DIR_NAME, config.SIGNATURE_INDEX_FILE)
+            stored = self._load_signatures(store_path)
+            updated = False
+
+            for rel_path, file_path in members:
+                try:
+                    stat = os.stat(file_path)
+                    entry = stored.get(rel_path)
+                    if not entry or (entry["size"], entry["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+                        entry = self.signature_for_file(file_path)
+                        stored[rel_path] = entry
+                        computed += 1
+                        updated = True
+                except OSError as e:
+                    self.logger.warning("无法读取文件: %s - %s", file_path, e)
+                    continue
+                entries[file_path] = entry
+
+            if updated:
+                try:
+                    self._save_signatures(store_path, stored)
+                except OSError as e:
+                    self.logger.warning("签名文件写入失败: %s - %s", store_path, e)
+
+        clusters = self.find_clusters(entries)
+        elapsed = time.perf_counter() - start_time
+
+        return self._build_result(None, entries, clusters, computed, elapsed)
+
+    @staticmethod
+    def _find_signature_root(directory: str) -> str:
+        """查找目录最近的已建索引的上级目录 (含自身),都没有时返回目录本身"""
+        current = directory
+        while True:
+            if os.path.isdir(os.path.join(current, config.INDEX_DIR_NAME)):
+                return current
+            parent = os.path.dirname(current)
+            if parent == current:
+                return directory
+            current = parent
+
+    def _build_result(
+        self,
+        root_dir: Optional[str],
+        entries: Dict[str, Dict],
+        clusters: List[Dict],
+        computed: int,
+        elapsed: float
+    ) -> Dict:
+        """组装检测结果"""
+        return {
+            "status": "success",
+            "root": root_dir,
+            "threshold": self.threshold,
+            "total_documents": len(entries),
+            "signed_documents": sum(1 for e in entries.values() if e.get("signature")),
+            "signatures_computed": computed,
+            "clusters": clusters,
+            "duplicate_count": sum(len(c["duplicates"]) for c in clusters),
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+    def _load_signatures(self, store_path: str) -> Dict[str, Dict]:
+        """读取持久化签名 (参数不一致时视为无效)"""
+        if not os.path.exists(store_path):
+            return {}
+
+        try:
+            with open(store_path, 'r', encoding='utf-8') as f:
+                store = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning("签名文件损坏,将重新计算: %s - %s", store_path, e)
+            return {}
+
+        if store.get("version") != self.SIGNATURE_VERSION or store.get("num_perm") != self.num_perm:
+            return {}
+        return store.get("documents", {})
+
+    def _save_signatures(self, store_path: str, entries: Dict[str, Dict]):
+        """原子写入持久化签名"""
+        os.makedirs(os.path.dirname(store_path), exist_ok=True)
+        store = {
+            "version": self.SIGNATURE_VERSION,
+            "num_perm": self.num_perm,
+            "documents": entries,
+        }
+
+        tmp_path = store_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(store, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, store_path)
+
+
+def skip_duplicate_files(file_paths: List[str], threshold: Optional[float] = None) -> Tuple[List[str], List[Dict]]:
+    """
+    从文件列表中剔除重复文档 (每个重复簇只保留代表文档)
+
+    Args:
+        file_paths: 文件路径列表
+        threshold: 相似度阈值
+
+    Returns:
+        (保留的文件列表, 重复簇列表)
+    """
+    result = DuplicateDetector(threshold=threshold).find_file_duplicates(file_paths)
+    skipped = {
+        duplicate["path"]
+        for cluster in result["clusters"]
+        for duplicate in cluster["duplicates"]
+    }
+    return [path for path in file_paths if path not in skipped], result["clusters"]
+
+
+# 便捷函数
+def find_duplicates(directory: str, threshold: Optional[float] = None) -> Dict:
+    """检测项目目录中重复文档的便捷函数"""
+    return DuplicateDetector(threshold=threshold).find_directory_duplicates(directory)
@@ -0,0 +1,357 @@
+"""
+关键事实库模块
+
+基于 SQLite 的持久化事实库,保存 FactExtractor 从项目文档中提取的事实
+每个文档版本 (size, mtime) 只提取一次,事实按来源文档和单元位置存储,
+报告生成时直接查询事实库,无需重复解析文档
+"""
+from typing import Dict, List, Optional
+from datetime import datetime
+import json
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config
+from parsers import ParserFactory
+from extractors.fact_extractor import FactExtractor
+from .document_indexer import DocumentIndexer, get_refresh_lock
+
+logger = get_logger(__name__)
+
+
+class FactStore:
+    """关键事实库"""
+
+    # 事实库结构版本 (结构或提取规则变化时递增,旧事实库将被整体重建)
+    SCHEMA_VERSION = 1
+
+    def __init__(self, root_dir: str, index_dir: Optional[str] = None):
+        """
+        初始化事实库
+
+        Args:
+            root_dir: 项目文档根目录
+            index_dir: 索引存放目录 (默认: 根目录下的 config.INDEX_DIR_NAME)
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.index_dir = index_dir or os.path.join(self.root_dir, config.INDEX_DIR_NAME)
+        self.db_path = os.path.join(self.index_dir, config.FACT_STORE_FILE)
+        self.extractor = FactExtractor()
+        self.logger = get_logger(__name__)
+        self._conn = None
+
+    # ========== 连接与结构 ==========
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接并确保结构为最新版本"""
+        if self._conn is not None:
+            return self._conn
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or int(row[0]) != self.SCHEMA_VERSION:
+            if row is not None:
+                self.logger.info("事实库结构版本变化 (%s -> %s),重建事实库", row[0], self.SCHEMA_VERSION)
+            self._create_schema(conn)
+
+        self._conn = conn
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        """(重新)创建事实库结构"""
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS facts")
+            conn.execute("DROP TABLE IF EXISTS documents")
+
+            conn.execute("""
+                CREATE TABLE documents (
+                    doc_id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    mtime TEXT,
+                    file_type TEXT,
+                    fact_count INTEGER DEFAULT 0,
+                    extracted_at TEXT,
+                    error TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE facts (
+                    fact_id INTEGER PRIMARY KEY,
+                    doc_id INTEGER NOT NULL,
+                    type TEXT NOT NULL,
+                    value TEXT,
+                    date TEXT,
+                    text TEXT,
+                    context TEXT,
+                    location TEXT,
+                    location_text TEXT
+                )
+            """)
+            # 同一位置的同一事实只保存一次
+            conn.execute("CREATE UNIQUE INDEX idx_facts_unique ON facts(doc_id, location, type, value)")
+            conn.execute("CREATE INDEX idx_facts_type ON facts(type, date)")
+
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                (str(self.SCHEMA_VERSION),)
+            )
+
+    def close(self):
+        """关闭数据库连接"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ========== 更新 ==========
+
+    def refresh(self, force: bool = False) -> Dict:
+        """
+        增量更新事实库: 仅对新增或 (size, mtime) 变化的文档提取事实
+
+        Args:
+            force: 是否清空后全量重建
+
+        Returns:
+            更新统计字典
+        """
+        with get_refresh_lock(self.db_path):
+            return self._refresh(force)
+
+    def _refresh(self, force: bool) -> Dict:
+        """增量更新事实库 (调用方持有更新锁)"""
+        start_time = time.perf_counter()
+        conn = self._connect()
+
+        if force:
+            self._create_schema(conn)
+
+        manifest = DocumentIndexer(self.root_dir, self.index_dir).index()
+        parsable_types = set(ParserFactory.get_available_parsers())
+        files = {
+            path: entry for path, entry in manifest['files'].items()
+            if entry['type'] in parsable_types
+        }
+
+        stored = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in conn.execute("SELECT path, size, mtime_ns FROM documents")
+        }
+        to_extract = [
+            path for path, entry in files.items()
+            if stored.get(path) != (entry['size'], entry['mtime_ns'])
+        ]
+        to_remove = [path for path in stored if path not in files]
+
+        for path in to_remove:
+            with conn:
+                self._remove_document(conn, path)
+
+        failed = []
+        for i, path in enumerate(to_extract, 1):
+            self.logger.info("事实提取进度: %s/%s - %s", i, len(to_extract), path)
+            with conn:
+                error = self._extract_document(conn, path, files[path])
+            if error:
+                failed.append({"path": path, "error": error})
+
+        total_documents, total_facts = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(fact_count), 0) FROM documents"
+        ).fetchone()
+
+        elapsed = time.perf_counter() - start_time
+        self.logger.info(
+            "事实库更新完成: 提取 %s 个, 移除 %s 个, 失败 %s 个, 耗时 %.3fs",
+            len(to_extract), len(to_remove), len(failed), elapsed
+        )
+
+        return {
+            "status": "success",
+            "root": self.root_dir,
+            "store_path": self.db_path,
+            "extracted": len(to_extract),
+            "removed": len(to_remove),
+            "failed": failed,
+            "total_documents": total_documents,
+            "total_facts": total_facts,
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+    def _remove_document(self, conn: sqlite3.Connection, rel_path: str):
+        """移除文档及其全部事实"""
+        row = conn.execute("SELECT doc_id FROM documents WHERE path = ?", (rel_path,)).fetchone()
+        if row is None:
+            return
+        conn.execute("DELETE FROM facts WHERE doc_id = ?", (row[0],))
+        conn.execute("DELETE FROM documents WHERE doc_id = ?", (row[0],))
+
+    def _extract_document(self, conn: sqlite3.Connection, rel_path: str, entry: Dict) -> Optional[str]:
+        """
+        提取单个文档的事实并写入事实库
+
+        Args:
+            conn: 数据库连接
+            rel_path: 相对路径
+            entry: 文档清单条目
+
+        Returns:
+            错误信息 (成功时为 None)
+        """
+        self._remove_document(conn, rel_path)
+
+        cursor = conn.execute(
+            "INSERT INTO documents (path, size, mtime_ns, mtime, file_type, extracted_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (rel_path, entry['size'], entry['mtime_ns'], entry.get('mtime'), entry['type'],
+             datetime.now().isoformat(timespec='seconds'))
+        )
+        doc_id = cursor.lastrowid
+
+        error = None
+        try:
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO facts (doc_id, type, value, date, text, context, location, location_text)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    (doc_id, fact['type'], fact['value'], fact['date'], fact['text'], fact['context'],
+                     json.dumps(fact['location'], ensure_ascii=False, sort_keys=True), fact['location_text'])
+                    for fact in self.extractor.extract_file(os.path.join(self.root_dir, rel_path))
+                )
+            )
+        except Exception as e:
+            # 保留已提取的部分事实,记录错误避免未变化的文件被反复重试
+            self.logger.warning("事实提取失败: %s - %s", rel_path, e)
+            error = str(e)
+
+        fact_count = conn.execute("SELECT COUNT(*) FROM facts WHERE doc_id = ?", (doc_id,)).fetchone()[0]
+        conn.execute(
+            "UPDATE documents SET fact_count = ?, error = ? WHERE doc_id = ?",
+            (fact_count, error, doc_id)
+        )
+        return error
+
+    # ========== 查询 ==========
+
+    def query(
+        self,
+        fact_types: Optional[List[str]] = None,
+        keyword: Optional[str] = None,
+        path: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        limit: int = 100
+    ) -> Dict:
+        """
+        查询事实库
+
+        Args:
+            fact_types: 限定事实类型 (见 FactExtractor.FACT_TYPES)
+            keyword: 事实值或上下文中包含的关键词
+            path: 来源文档路径中包含的文本
+            date_from: 起始日期 (YYYY-MM-DD,仅对带日期的事实生效)
+            date_to: 截止日期 (YYYY-MM-DD,仅对带日期的事实生效)
+            limit: 最大返回条数
+
+        Returns:
+            查询结果字典
+        """
+        conn = self._connect()
+
+        conditions = []
+        params = []
+        if fact_types:
+            conditions.append(f"f.type IN ({', '.join('?' * len(fact_types))})")
+            params.extend(fact_types)
+        if keyword:
+            conditions.append("(f.value LIKE ? OR f.context LIKE ?)")
+            params.extend([f"%{keyword}%"] * 2)
+        if path:
+            conditions.append("d.path LIKE ?")
+            params.append(f"%{path}%")
+        if date_from:
+            conditions.append("f.date >= ?")
+            params.append(date_from)
+        if date_to:
+            # 日期按字符串比较,补 "-99" 使截止日期当天 (或当月) 的事实包含在内
+            conditions.append("f.date <= ?")
+            params.append(date_to + '-99')
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        counts = dict(conn.execute(
+            f"SELECT f.type, COUNT(*) FROM facts f JOIN documents d ON d.doc_id = f.doc_id {where} GROUP BY f.type",
+            params
+        ))
+
+        rows = conn.execute(
+            f"""
+            SELECT f.fact_id, f.type, f.value, f.date, f.text, f.context, f.location, f.location_text,
+                   d.path, d.mtime
+            FROM facts f JOIN documents d ON d.doc_id = f.doc_id
+            {where}
+            ORDER BY d.path, f.fact_id
+            LIMIT ?
+            """,
+            params + [limit]
+        )
+
+        facts = [
+            {
+                "fact_id": fact_id,
+                "type": fact_type,
+                "value": value,
+                "date": date,
+                "text": text,
+                "context": context,
+                "source": {
+                    "path": path,
+                    "name": os.path.basename(path),
+                    "location": json.loads(location),
+                    "location_text": location_text,
+                    "timestamp": mtime,
+                },
+            }
+            for fact_id, fact_type, value, date, text, context, location, location_text, path, mtime in rows
+        ]
+
+        return {
+            "status": "success",
+            "root": self.root_dir,
+            "total_matched": sum(counts.values()),
+            "by_type": counts,
+            "facts": facts,
+        }
+
+
+# 便捷函数
+def query_facts(
+    directory: str,
+    fact_types: Optional[List[str]] = None,
+    keyword: Optional[str] = None,
+    path: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: int = 100,
+    refresh: bool = True
+) -> Dict:
+    """查询项目关键事实的便捷函数 (默认先增量更新事实库)"""
+    store = FactStore(directory)
+    try:
+        refresh_result = store.refresh() if refresh else None
+        result = store.query(fact_types, keyword, path, date_from, date_to, limit)
+        if refresh_result:
+            result["refresh"] = refresh_result
+        return result
+    finally:
+        store.close()
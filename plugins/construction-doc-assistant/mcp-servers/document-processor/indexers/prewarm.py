@@ -0,0 +1,210 @@
+"""
+启动预热模块
+
+由服务器在 MCP 握手完成后放到后台线程中执行,不阻塞握手和工具调用:
+- 导入服务器按需加载的文档处理模块
+- 加载选定的解析器并导入其后端库 (python-docx、openpyxl 等)
+- 按最近修改时间解析项目目录中的文档,预先填充解析缓存
+
+预加载的项目目录来自 PREWARM_DIRECTORIES 和最近使用的项目记录 (PREWARM_RECENT_PROJECTS)
+"""
+from typing import Dict, List, Optional
+from datetime import datetime
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config
+from parsers import ParserFactory
+from .document_indexer import DocumentIndexer
+
+logger = get_logger(__name__)
+
+# 服务器按需导入的模块
+_SERVER_MODULES = ('validators', 'parsers', 'extractors', 'indexers')
+
+_recent_lock = threading.Lock()
+
+
+class Prewarmer:
+    """启动预热器"""
+
+    def __init__(
+        self,
+        backends: Optional[List[str]] = None,
+        directories: Optional[List[str]] = None,
+        max_files: Optional[int] = None
+    ):
+        """
+        初始化预热器
+
+        Args:
+            backends: 预热的解析器类型,含 "all" 时预热全部 (默认: config.PREWARM_BACKENDS)
+            directories: 预加载解析缓存的项目目录 (默认: PREWARM_DIRECTORIES 加最近使用的项目)
+            max_files: 每个目录预加载的文档数 (默认: config.PREWARM_MAX_FILES)
+        """
+        backends = config.PREWARM_BACKENDS if backends is None else backends
+        self.backends = None if 'all' in backends else backends
+        self.warm_backends = bool(backends)
+
+        if directories is None:
+            directories = config.PREWARM_DIRECTORIES + get_recent_projects(config.PREWARM_RECENT_PROJECTS)
+        self.directories = list(dict.fromkeys(os.path.abspath(d) for d in directories))
+        self.max_files = max_files or config.PREWARM_MAX_FILES
+        self.logger = get_logger(__name__)
+
+        self.state = "idle"
+        self.result: Dict = {}
+
+    def run(self) -> Dict:
+        """
+        执行预热
+
+        Returns:
+            预热统计字典
+        """
+        start_time = time.perf_counter()
+        self.state = "running"
+
+        try:
+            for module_name in _SERVER_MODULES:
+                importlib.import_module(module_name)
+
+            backends = ParserFactory.prewarm(self.backends) if self.warm_backends else {}
+
+            # 预加载的文档数不超过缓存容量,避免预热结果相互挤出
+            directories = []
+            if config.ENABLE_CACHE:
+                budget = config.CACHE_MAX_ENTRIES
+                for directory in self.directories:
+                    if budget <= 0:
+                        break
+                    stats = self._preload_directory(directory, min(self.max_files, budget))
+                    budget -= stats["parsed"]
+                    directories.append(stats)
+        except Exception:
+            self.state = "failed"
+            raise
+
+        elapsed = time.perf_counter() - start_time
+        self.result = {
+            "backends": backends,
+            "directories": directories,
+            "elapsed_seconds": round(elapsed, 3),
+            "finished_at": datetime.now().isoformat(timespec='seconds'),
+        }
+        self.state = "done"
+
+        self.logger.info(
+            "启动预热完成: 后端 %s, 预加载 %s 个文档, 耗时 %.3fs",
+            list(backends), sum(d['parsed'] for d in directories), elapsed
+        )
+        return self.result
+
+    def _preload_directory(self, directory: str, limit: int) -> Dict:
+        """
+        解析目录中最近修改的文档,填充解析缓存 (使用解析工具摘要模式的默认选项)
+
+        Args:
+            directory: 项目目录
+            limit: 最多解析的文档数
+
+        Returns:
+            目录预加载统计
+        """
+        stats = {"directory": directory, "parsed": 0, "failed": 0}
+        if not os.path.isdir(directory):
+            self.logger.warning("预热目录不存在: %s", directory)
+            return stats
+
+        manifest = DocumentIndexer(directory).index()
+        parsable_types = set(ParserFactory.get_available_parsers())
+        recent = sorted(
+            (
+                (entry['mtime_ns'], path) for path, entry in manifest['files'].items()
+                if entry['type'] in parsable_types
+            ),
+            reverse=True
+        )[:limit]
+
+        for _, rel_path in recent:
+            file_path = os.path.join(directory, rel_path)
+            file_type = config.get_file_type_by_extension(file_path)
+            options = dict(ParserFactory.SUMMARY_MODE_LIMITS.get(file_type, {}))
+            result = ParserFactory.parse(file_path, options)
+            if result.get('status') == 'success':
+                stats["parsed"] += 1
+            else:
+                stats["failed"] += 1
+
+        return stats
+
+    def status(self) -> Dict:
+        """获取预热状态"""
+        return {
+            "state": self.state,
+            "backends": self.backends or ("all" if self.warm_backends else []),
+            "directories": self.directories,
+            **self.result,
+        }
+
+
+def get_recent_projects(limit: Optional[int] = None) -> List[str]:
+    """
+    读取最近使用的项目目录 (最近使用的在前)
+
+    Args:
+        limit: 最多返回的目录数 (默认全部)
+
+    Returns:
+        项目目录列表
+    """
+    if limit is not None and limit <= 0:
+        return []
+
+    try:
+        with open(config.RECENT_PROJECTS_FILE, 'r', encoding='utf-8') as f:
+            projects = [item['path'] for item in json.load(f).get('projects', [])]
+    except (OSError, ValueError, KeyError, TypeError):
+        return []
+
+    return projects[:limit] if limit else projects
+
+
+def record_recent_project(directory: str):
+    """
+    记录最近使用的项目目录
+
+    Args:
+        directory: 项目目录
+    """
+    path = os.path.abspath(directory)
+    with _recent_lock:
+        projects = [p for p in get_recent_projects() if p != path]
+        projects = [path] + projects[:config.RECENT_PROJECTS_MAX - 1]
+
+        try:
+            os.makedirs(os.path.dirname(config.RECENT_PROJECTS_FILE), exist_ok=True)
+            temp_path = config.RECENT_PROJECTS_FILE + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "projects": [{"path": p} for p in projects],
+                    "updated_at": datetime.now().isoformat(timespec='seconds'),
+                }, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, config.RECENT_PROJECTS_FILE)
+        except OSError as e:
+            logger.warning("无法记录最近使用的项目目录: %s", e)
+
+
+# 便捷函数
+def prewarm(
+    backends: Optional[List[str]] = None,
+    directories: Optional[List[str]] = None
+) -> Dict:
+    """执行启动预热的便捷函数 (同步执行,服务器在后台线程中调用)"""
+    return Prewarmer(backends, directories).run()
@@ -0,0 +1,450 @@
+"""
+全文检索索引模块
+
+基于 SQLite FTS5 的持久化倒排索引
+索引粒度为解析器产出的内容单元 (Word 段落/表格行、PDF 页、Excel 行、幻灯片)
+查询使用 BM25 排序,并返回片段和单元位置
+"""
+from typing import Dict, List, Optional
+from datetime import datetime
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config
+from parsers import BaseParser, ParserFactory, iter_document_units
+from .document_indexer import DocumentIndexer, get_refresh_lock
+from .tokenizer import ConstructionTokenizer, get_tokenizer
+
+logger = get_logger(__name__)
+
+
+class SearchIndex:
+    """全文检索索引"""
+
+    # 索引结构版本 (结构或分词方式变化时递增,旧索引将被整体重建)
+    SCHEMA_VERSION = 2
+
+    def __init__(
+        self,
+        root_dir: str,
+        index_dir: Optional[str] = None,
+        tokenizer: Optional[ConstructionTokenizer] = None
+    ):
+        """
+        初始化全文索引
+
+        Args:
+            root_dir: 项目文档根目录
+            index_dir: 索引存放目录 (默认: 根目录下的 config.INDEX_DIR_NAME)
+            tokenizer: 分词器 (默认: 按配置创建的共享分词器)
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.index_dir = index_dir or os.path.join(self.root_dir, config.INDEX_DIR_NAME)
+        self.db_path = os.path.join(self.index_dir, config.SEARCH_INDEX_FILE)
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.logger = get_logger(__name__)
+        self._conn = None
+
+    # ========== 连接与结构 ==========
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接并确保索引结构为最新版本"""
+        if self._conn is not None:
+            return self._conn
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        if meta.get('schema_version') != str(self.SCHEMA_VERSION):
+            if meta:
+                self.logger.info(
+                    "全文索引结构版本变化 (%s -> %s),重建索引",
+                    meta.get('schema_version'), self.SCHEMA_VERSION
+                )
+            self._create_schema(conn)
+        elif meta.get('dictionary') != self.tokenizer.signature:
+            self.logger.info("分词词典已变化,重建全文索引")
+            self._create_schema(conn)
+
+        self._conn = conn
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        """(重新)创建索引结构"""
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS unit_fts")
+            conn.execute("DROP TABLE IF EXISTS units")
+            conn.execute("DROP TABLE IF EXISTS documents")
+
+            conn.execute("""
+                CREATE TABLE documents (
+                    doc_id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    file_type TEXT,
+                    unit_count INTEGER DEFAULT 0,
+                    indexed_at TEXT,
+                    error TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE units (
+                    unit_id INTEGER PRIMARY KEY,
+                    doc_id INTEGER NOT NULL,
+                    unit_type TEXT,
+                    location TEXT,
+                    text TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX idx_units_doc ON units(doc_id)")
+            # bigrams: 字二元切分词; terms: 词典整词
+            # FTS5 倒排表中的 rowid 与词位置均以差值 + 变长整数编码存储
+            conn.execute("CREATE VIRTUAL TABLE unit_fts USING fts5(bigrams, terms)")
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [('schema_version', str(self.SCHEMA_VERSION)),
+                 ('dictionary', self.tokenizer.signature)]
+            )
+
+    def close(self):
+        """关闭数据库连接"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ========== 查询表达式 ==========
+
+    def _build_match_query(self, query: str, match_all: bool) -> str:
+        """
+        将用户查询转换为 FTS5 MATCH 表达式
+
+        以空白分隔的每个查询词由分词器转换为一个子表达式
+        (词典词匹配整词,其他词匹配相邻二元词组成的短语)
+
+        Args:
+            query: 用户查询
+            match_all: True 表示所有查询词都须命中,False 表示任一命中
+
+        Returns:
+            MATCH 表达式 (无有效查询词时为空字符串)
+        """
+        expressions = []
+        for term in query.split():
+            expression = self.tokenizer.build_query(term)
+            if expression:
+                expressions.append(f'({expression})')
+
+        return (' AND ' if match_all else ' OR ').join(expressions)
+
+    # ========== 索引更新 ==========
+
+    def refresh(self, force: bool = False) -> Dict:
+        """
+        增量更新索引: 仅重新索引新增或 (size, mtime) 变化的文档
+
+        Args:
+            force: 是否清空后全量重建
+
+        Returns:
+            更新统计字典
+        """
+        with get_refresh_lock(self.db_path):
+            return self._refresh(force)
+
+    def _refresh(self, force: bool) -> Dict:
+        """增量更新索引 (调用方持有更新锁)"""
+        start_time = time.perf_counter()
+        conn = self._connect()
+
+        if force:
+            self._create_schema(conn)
+
+        manifest = DocumentIndexer(self.root_dir, self.index_dir).index()
+        parsable_types = set(ParserFactory.get_available_parsers())
+        files = {
+            path: entry for path, entry in manifest['files'].items()
+            if entry['type'] in parsable_types
+        }
+
+        indexed = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in conn.execute("SELECT path, size, mtime_ns FROM documents")
+        }
+
+        to_index = [
+            path for path, entry in files.items()
+            if indexed.get(path) != (entry['size'], entry['mtime_ns'])
+        ]
+        to_remove = [path for path in indexed if path not in files]
+
+        for path in to_remove:
+            with conn:
+                self._remove_document(conn, path)
+
+        failed = []
+        for i, path in enumerate(to_index, 1):
+            self.logger.info("全文索引进度: %s/%s - %s", i, len(to_index), path)
+            with conn:
+                error = self._index_document(conn, path, files[path])
+            if error:
+                failed.append({"path": path, "error": error})
+
+        total_documents, total_units = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(unit_count), 0) FROM documents"
+        ).fetchone()
+
+        elapsed = time.perf_counter() - start_time
+        self.logger.info(
+            "全文索引更新完成: 索引 %s 个, 移除 %s 个, 失败 %s 个, 耗时 %.3fs",
+            len(to_index), len(to_remove), len(failed), elapsed
+        )
+
+        return {
+            "status": "success",
+            "root": self.root_dir,
+            "index_path": self.db_path,
+            "indexed": len(to_index),
+            "removed": len(to_remove),
+            "failed": failed,
+            "total_documents": total_documents,
+            "total_units": total_units,
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+    def _remove_document(self, conn: sqlite3.Connection, rel_path: str):
+        """从索引中移除文档及其全部内容单元"""
+        row = conn.execute("SELECT doc_id FROM documents WHERE path = ?", (rel_path,)).fetchone()
+        if row is None:
+            return
+
+        doc_id = row[0]
+        conn.execute(
+            "DELETE FROM unit_fts WHERE rowid IN (SELECT unit_id FROM units WHERE doc_id = ?)",
+            (doc_id,)
+        )
+        conn.execute("DELETE FROM units WHERE doc_id = ?", (doc_id,))
+        conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+
+    def _index_document(self, conn: sqlite3.Connection, rel_path: str, entry: Dict) -> Optional[str]:
+        """
+        (重新)索引单个文档
+
+        Args:
+            conn: 数据库连接
+            rel_path: 相对路径
+            entry: 文档清单条目
+
+        Returns:
+            错误信息 (成功时为 None)
+        """
+        self._remove_document(conn, rel_path)
+
+        cursor = conn.execute(
+            "INSERT INTO documents (path, size, mtime_ns, file_type, indexed_at) VALUES (?, ?, ?, ?, ?)",
+            (rel_path, entry['size'], entry['mtime_ns'], entry['type'],
+             datetime.now().isoformat(timespec='seconds'))
+        )
+        doc_id = cursor.lastrowid
+
+        unit_count = 0
+        error = None
+        try:
+            for unit in iter_document_units(os.path.join(self.root_dir, rel_path)):
+                tokens = self.tokenizer.tokenize(unit['text'])
+                if not tokens:
+                    continue
+
+                cursor = conn.execute(
+                    "INSERT INTO units (doc_id, unit_type, location, text) VALUES (?, ?, ?, ?)",
+                    (doc_id, unit['type'], json.dumps(unit['location'], ensure_ascii=False), unit['text'])
+                )
+                conn.execute(
+                    "INSERT INTO unit_fts (rowid, bigrams, terms) VALUES (?, ?, ?)",
+                    (cursor.lastrowid, ' '.join(tokens), ' '.join(self.tokenizer.extract_terms(unit['text'])))
+                )
+                unit_count += 1
+
+        except Exception as e:
+            # 保留已索引的部分内容,记录错误避免未变化的文件被反复重试
+            self.logger.warning("文档索引失败: %s - %s", rel_path, e)
+            error = str(e)
+
+        conn.execute(
+            "UPDATE documents SET unit_count = ?, error = ? WHERE doc_id = ?",
+            (unit_count, error, doc_id)
+        )
+        return error
+
+    # ========== 查询 ==========
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        file_types: Optional[List[str]] = None,
+        match_all: bool = True,
+        snippet_length: int = 120
+    ) -> Dict:
+        """
+        检索索引
+
+        Args:
+            query: 查询文本 (空白分隔多个查询词)
+            limit: 最大返回条数
+            file_types: 限定文档类型 (如 ['word', 'pdf'])
+            match_all: 是否要求所有查询词都命中
+            snippet_length: 片段长度 (字符数)
+
+        Returns:
+            检索结果字典
+        """
+        start_time = time.perf_counter()
+        conn = self._connect()
+
+        match_query = self._build_match_query(query, match_all)
+        if not match_query:
+            raise ValueError(f"查询内容无有效检索词: {query}")
+
+        sql = """
+            SELECT u.unit_type, u.location, u.text, d.path, d.file_type, bm25(unit_fts) AS score
+            FROM unit_fts
+            JOIN units u ON u.unit_id = unit_fts.rowid
+            JOIN documents d ON d.doc_id = u.doc_id
+            WHERE unit_fts MATCH ?
+        """
+        params = [match_query]
+        if file_types:
+            sql += f" AND d.file_type IN ({', '.join('?' * len(file_types))})"
+            params.extend(file_types)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        terms = [term.lower() for term in query.split()]
+        results = []
+
+        for unit_type, location_json, text, path, file_type, score in conn.execute(sql, params):
+            location = json.loads(location_json)
+            result = {
+                "path": path,
+                "file_type": file_type,
+                "unit_type": unit_type,
+                "location": location,
+                "location_text": BaseParser.describe_location(location),
+                "score": round(-score, 3),
+                "snippet": self._make_snippet(text, terms, snippet_length),
+            }
+
+            if unit_type in ('row', 'table_row'):
+                result["cells"] = self._match_cells(text, terms, location)
+
+            results.append(result)
+
+        elapsed = time.perf_counter() - start_time
+
+        return {
+            "status": "success",
+            "root": self.root_dir,
+            "query": query,
+            "total_results": len(results),
+            "results": results,
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+    @staticmethod
+    def _make_snippet(text: str, terms: List[str], length: int) -> str:
+        """
+        截取命中词附近的片段并标记命中词
+
+        Args:
+            text: 单元原文
+            terms: 查询词 (小写)
+            length: 片段长度
+
+        Returns:
+            片段文本
+        """
+        text = ' '.join(text.split())
+        lowered = text.lower()
+
+        positions = [(lowered.find(term), term) for term in terms]
+        positions = [(pos, term) for pos, term in positions if pos >= 0]
+
+        if positions:
+            first_pos = min(pos for pos, _ in positions)
+            start = max(0, first_pos - length // 3)
+        else:
+            start = 0
+
+        end = min(len(text), start + length)
+        snippet = text[start:end]
+
+        for term in sorted({term for _, term in positions}, key=len, reverse=True):
+            snippet = re.sub(re.escape(term), lambda m: f"【{m.group(0)}】", snippet, flags=re.IGNORECASE)
+
+        prefix = "..." if start > 0 else ""
+        suffix = "..." if end < len(text) else ""
+        return f"{prefix}{snippet}{suffix}"
+
+    @staticmethod
+    def _match_cells(text: str, terms: List[str], location: Dict) -> List[Dict]:
+        """
+        定位表格行中命中查询词的单元格
+
+        Args:
+            text: 以制表符分隔的行文本
+            terms: 查询词 (小写)
+            location: 行位置
+
+        Returns:
+            命中单元格列表 [{"col": 2, "cell": "B5", "value": "..."}]
+        """
+        cells = []
+        for col, value in enumerate(text.split('\t'), 1):
+            if any(term in value.lower() for term in terms):
+                cell = {"col": col, "value": value}
+                if 'sheet' in location:
+                    cell["cell"] = f"{BaseParser.column_letter(col)}{location['row']}"
+                cells.append(cell)
+        return cells
+
+
+# 便捷函数
+def build_search_index(directory: str, force: bool = False) -> Dict:
+    """更新全文索引的便捷函数"""
+    index = SearchIndex(directory)
+    try:
+        return index.refresh(force=force)
+    finally:
+        index.close()
+
+
+def search_documents(
+    directory: str,
+    query: str,
+    limit: int = 20,
+    file_types: Optional[List[str]] = None,
+    match_all: bool = True,
+    refresh: bool = True
+) -> Dict:
+    """检索项目文档的便捷函数 (默认先增量更新索引)"""
+    index = SearchIndex(directory)
+    try:
+        refresh_result = index.refresh() if refresh else None
+        result = index.search(query, limit=limit, file_types=file_types, match_all=match_all)
+        if refresh_result:
+            result["refresh"] = refresh_result
+        return result
+    finally:
+        index.close()
@@ -0,0 +1,209 @@
+"""
+分词器模块
+
+为全文索引提供中文友好的分词:
+- 拉丁字母/数字连续串作为一个词
+- 中日韩文字按字二元切分 (bigram),连续串末字额外产出单字,用于单字查询
+- 可选行业词典 (CONSTRUCTION_KEYWORDS、CONSTRUCTION_TERMS 及用户词典),
+  词典词作为整词单独索引,查询词典词时只需读取一个倒排表
+"""
+from typing import Dict, Iterable, List, Optional, Set
+import hashlib
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config
+
+logger = get_logger(__name__)
+
+# 中日韩统一表意文字 (基本区、扩展 A 区、兼容区)
+_CJK_RANGES = r'\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+
+
+class ConstructionTokenizer:
+    """建筑文档分词器 (字二元切分 + 行业词典)"""
+
+    # 拉丁字母/数字连续串,或中日韩文字连续串
+    _RUN_PATTERN = re.compile(rf'[a-z0-9]+|[{_CJK_RANGES}]+')
+    _CJK_PATTERN = re.compile(rf'[{_CJK_RANGES}]')
+
+    def __init__(self, use_dictionary: bool = True, extra_terms: Optional[Iterable[str]] = None):
+        """
+        初始化分词器
+
+        Args:
+            use_dictionary: 是否启用行业词典
+            extra_terms: 额外词典词 (如用户词典)
+        """
+        self.logger = get_logger(__name__)
+        self.dictionary: Set[str] = set()
+
+        if use_dictionary:
+            for category, keywords in config.CONSTRUCTION_KEYWORDS.items():
+                self._add_terms([category] + keywords)
+            self._add_terms(config.CONSTRUCTION_TERMS)
+            if extra_terms:
+                self._add_terms(extra_terms)
+
+        # 首字 -> 以该字开头的词典词长度 (降序),逐字扫描时只检查这些长度
+        self._lengths_by_first: Dict[str, List[int]] = {}
+        for term in self.dictionary:
+            self._lengths_by_first.setdefault(term[0], []).append(len(term))
+        for lengths in self._lengths_by_first.values():
+            lengths[:] = sorted(set(lengths), reverse=True)
+
+    def _add_terms(self, terms: Iterable[str]):
+        """加入词典词 (统一小写,去除空白,仅保留多字词)"""
+        for term in terms:
+            term = ''.join(term.split()).lower()
+            if len(term) >= 2:
+                self.dictionary.add(term)
+
+    @property
+    def signature(self) -> str:
+        """词典签名 (词典变化时索引须重建)"""
+        digest = hashlib.blake2b(
+            '\n'.join(sorted(self.dictionary)).encode('utf-8'),
+            digest_size=8
+        )
+        return digest.hexdigest()
+
+    # ========== 索引端 ==========
+
+    def tokenize(self, text: str) -> List[str]:
+        """
+        将文本切分为索引词 (字二元切分)
+
+        例: "C30混凝土浇筑" -> ['c30', '混凝', '凝土', '土浇', '浇筑', '筑']
+
+        Args:
+            text: 原始文本
+
+        Returns:
+            词列表 (保持原文顺序,短语查询依赖相邻位置)
+        """
+        tokens = []
+        for run in self._RUN_PATTERN.findall(text.lower()):
+            if self._CJK_PATTERN.match(run):
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+                tokens.append(run[-1])
+            else:
+                tokens.append(run)
+        return tokens
+
+    def extract_terms(self, text: str) -> List[str]:
+        """
+        提取文本中出现的词典词 (允许重叠,如 "技术人员" 同时命中 "人员")
+
+        Args:
+            text: 原始文本
+
+        Returns:
+            词典词列表 (按出现顺序,可重复)
+        """
+        if not self.dictionary:
+            return []
+
+        text = text.lower()
+        terms = []
+        for i, char in enumerate(text):
+            for length in self._lengths_by_first.get(char, ()):
+                candidate = text[i:i + length]
+                if candidate in self.dictionary:
+                    terms.append(candidate)
+        return terms
+
+    # ========== 查询端 ==========
+
+    def query_tokens(self, text: str) -> List[str]:
+        """
+        将查询文本转换为用于相关度计算的词 (不重复)
+
+        多字中文串只取二元词 (不含串末单字),单字串保留单字,并加入命中的词典词
+
+        Args:
+            text: 查询文本
+
+        Returns:
+            查询词列表
+        """
+        tokens = []
+        for run in self._RUN_PATTERN.findall(text.lower()):
+            if self._CJK_PATTERN.match(run) and len(run) >= 2:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            else:
+                tokens.append(run)
+        tokens.extend(self.extract_terms(text))
+        return list(dict.fromkeys(tokens))
+
+    def build_query(self, term: str) -> Optional[str]:
+        """
+        将单个查询词转换为 FTS5 查询表达式
+
+        - 词典词: 直接匹配 terms 列中的整词
+        - 其他: 在 bigrams 列中匹配相邻二元词组成的短语;
+          单个汉字使用前缀查询 (命中以该字开头的二元词或串末单字)
+
+        Args:
+            term: 查询词 (不含空白)
+
+        Returns:
+            FTS5 表达式 (无有效内容时为 None)
+        """
+        normalized = term.lower()
+        if normalized in self.dictionary:
+            return f'terms : "{normalized}"'
+
+        phrase = []
+        prefixes = []
+        for run in self._RUN_PATTERN.findall(normalized):
+            if not self._CJK_PATTERN.match(run):
+                phrase.append(run)
+            elif len(run) >= 2:
+                phrase.extend(run[i:i + 2] for i in range(len(run) - 1))
+            else:
+                prefixes.append(f'"{run}" *')
+
+        parts = []
+        if phrase:
+            parts.append('"' + ' '.join(phrase) + '"')
+        parts.extend(prefixes)
+
+        if not parts:
+            return None
+        if len(parts) == 1:
+            return f'bigrams : {parts[0]}'
+        return 'bigrams : (' + ' AND '.join(parts) + ')'
+
+
+def _load_user_dictionary(path: str) -> List[str]:
+    """读取用户词典文件 (每行一个词,# 开头为注释)"""
+    if not path:
+        return []
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [
+                line.strip() for line in f
+                if line.strip() and not line.startswith('#')
+            ]
+    except OSError as e:
+        logger.warning("读取用户词典失败: %s - %s", path, e)
+        return []
+
+
+_default_tokenizer: Optional[ConstructionTokenizer] = None
+
+
+def get_tokenizer() -> ConstructionTokenizer:
+    """获取按配置创建的默认分词器 (进程内共享)"""
+    global _default_tokenizer
+    if _default_tokenizer is None:
+        _default_tokenizer = ConstructionTokenizer(
+            use_dictionary=config.INDEX_USE_DICTIONARY,
+            extra_terms=_load_user_dictionary(config.INDEX_USER_DICT_FILE)
+        )
+    return _default_tokenizer
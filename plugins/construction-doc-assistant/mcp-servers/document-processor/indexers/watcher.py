@@ -0,0 +1,363 @@
+"""
+目录监控模块
+
+后台监控项目目录中的文档变化,保持解析缓存和全文索引为最新状态:
+- Linux 下优先使用 inotify (inotify_simple),不可用时退化为定时轮询
+- 文件变化在静默 WATCH_DEBOUNCE_SECONDS 秒后才处理 (Office 保存会产生多次写入)
+- 仅重新解析变化的文档,由线程池并发执行
+- 若目录已建立全文索引或事实库,处理完一批变化后增量更新
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_logger, config, parse_cache
+from parsers import ParserFactory
+from .document_indexer import DocumentIndexer
+from .search_index import SearchIndex
+from .fact_store import FactStore
+
+logger = get_logger(__name__)
+
+
+class DocumentWatcher:
+    """项目目录监控器"""
+
+    def __init__(
+        self,
+        root_dir: str,
+        debounce: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        workers: Optional[int] = None,
+        use_inotify: bool = True
+    ):
+        """
+        初始化监控器
+
+        Args:
+            root_dir: 项目文档根目录
+            debounce: 变化静默时间(秒) (默认: config.WATCH_DEBOUNCE_SECONDS)
+            poll_interval: 轮询间隔(秒) (默认: config.WATCH_POLL_INTERVAL)
+            workers: 重新解析的工作线程数 (默认: config.WATCH_WORKERS)
+            use_inotify: 是否尝试使用 inotify
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.index_dir = os.path.join(self.root_dir, config.INDEX_DIR_NAME)
+        self.debounce = debounce if debounce is not None else config.WATCH_DEBOUNCE_SECONDS
+        self.poll_interval = poll_interval if poll_interval is not None else config.WATCH_POLL_INTERVAL
+        self.workers = workers or config.WATCH_WORKERS
+        self.use_inotify = use_inotify
+        self.logger = get_logger(__name__)
+
+        self.backend = None
+        self._pending: Dict[str, float] = {}  # 相对路径 -> 最后一次变化时间
+        self._pending_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._baseline_ready = threading.Event()  # 监控基线 (初始快照或 inotify 监控) 已建立
+        self._threads: List[threading.Thread] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.started_at = None
+        self.last_refresh_at = None
+        self.processed = 0
+        self.errors = 0
+
+    # ========== 启停 ==========
+
+    def start(self):
+        """启动监控 (后台线程)"""
+        if self.is_running:
+            return
+
+        if not os.path.isdir(self.root_dir):
+            raise NotADirectoryError(f"不是有效的目录: {self.root_dir}")
+
+        self._stop_event.clear()
+        self._baseline_ready.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="doc-watch-worker")
+
+        inotify = self._create_inotify() if self.use_inotify else None
+        if inotify is not None:
+            self.backend = "inotify"
+            watch_target = self._inotify_loop
+            watch_args = (inotify,)
+        else:
+            self.backend = "polling"
+            watch_target = self._poll_loop
+            watch_args = ()
+
+        self._threads = [
+            threading.Thread(target=watch_target, args=watch_args, name="doc-watch-events", daemon=True),
+            threading.Thread(target=self._flush_loop, name="doc-watch-flush", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        # 等待基线建立后再返回,启动后立即发生的变化不会被计入基线而漏掉
+        self._baseline_ready.wait()
+
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.logger.info("开始监控目录 (%s): %s", self.backend, self.root_dir)
+
+    def stop(self, timeout: float = 5.0):
+        """停止监控并等待后台线程退出"""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        self.logger.info("停止监控目录: %s", self.root_dir)
+
+    @property
+    def is_running(self) -> bool:
+        """监控是否运行中"""
+        return any(thread.is_alive() for thread in self._threads)
+
+    def status(self) -> Dict:
+        """获取监控状态"""
+        with self._pending_lock:
+            pending = len(self._pending)
+
+        return {
+            "root": self.root_dir,
+            "running": self.is_running,
+            "backend": self.backend,
+            "debounce_seconds": self.debounce,
+            "started_at": self.started_at,
+            "last_refresh_at": self.last_refresh_at,
+            "pending": pending,
+            "processed": self.processed,
+            "errors": self.errors,
+            "cache": parse_cache.stats(),
+        }
+
+    # ========== 变化来源 ==========
+
+    def _is_watched_file(self, rel_path: str) -> bool:
+        """是否为需要处理的文档 (跳过隐藏文件、临时文件和索引目录)"""
+        parts = rel_path.split('/')
+        if parts[0] == config.INDEX_DIR_NAME:
+            return False
+        if any(part.startswith(config.INDEX_IGNORE_PREFIXES) for part in parts):
+            return False
+        return config.is_supported_file(rel_path)
+
+    def _mark_changed(self, rel_path: str):
+        """记录文件变化 (重复变化会推迟处理时间)"""
+        if self._is_watched_file(rel_path):
+            with self._pending_lock:
+                self._pending[rel_path] = time.monotonic()
+
+    def _create_inotify(self):
+        """创建 inotify 实例 (不可用时返回 None)"""
+        try:
+            from inotify_simple import INotify
+            return INotify()
+        except (ImportError, OSError) as e:
+            self.logger.info("inotify 不可用,使用轮询模式: %s", e)
+            return None
+
+    def _inotify_loop(self, inotify):
+        """inotify 事件循环"""
+        from inotify_simple import flags
+
+        file_mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.MOVED_FROM | flags.DELETE
+        dir_mask = file_mask | flags.CREATE | flags.DELETE_SELF
+        watches: Dict[int, str] = {}
+
+        def add_tree(directory: str):
+            for current, dirnames, _ in os.walk(directory):
+                dirnames[:] = [
+                    d for d in dirnames
+                    if not d.startswith(config.INDEX_IGNORE_PREFIXES)
+                    and os.path.join(current, d) != self.index_dir
+                ]
+                try:
+                    watches[inotify.add_watch(current, dir_mask)] = current
+                except OSError as e:
+                    self.logger.warning("无法监控目录: %s - %s", current, e)
+
+        try:
+            add_tree(self.root_dir)
+            self._baseline_ready.set()
+
+            while not self._stop_event.is_set():
+                for event in inotify.read(timeout=500):
+                    directory = watches.get(event.wd)
+                    if directory is None or not event.name:
+                        continue
+
+                    full_path = os.path.join(directory, event.name)
+                    if event.mask & flags.ISDIR:
+                        # 新建/移入的子目录需要补充监控,其中已有的文件视为变化
+                        if event.mask & (flags.CREATE | flags.MOVED_TO) and not event.name.startswith(config.INDEX_IGNORE_PREFIXES):
+                            add_tree(full_path)
+                            for rel_path, _ in DocumentIndexer(full_path, self.index_dir)._scan(recursive=True):
+                                self._mark_changed(self._relative(os.path.join(full_path, rel_path)))
+                        continue
+
+                    self._mark_changed(self._relative(full_path))
+
+        except Exception as e:
+            self.logger.error("inotify 监控异常,切换为轮询模式: %s", e, exc_info=True)
+            self.backend = "polling"
+            self._poll_loop()
+        finally:
+            inotify.close()
+
+    def _poll_loop(self):
+        """轮询循环: 定期对比文件 (size, mtime)"""
+        scanner = DocumentIndexer(self.root_dir, self.index_dir)
+        try:
+            snapshot = self._snapshot(scanner)
+        finally:
+            self._baseline_ready.set()
+
+        while not self._stop_event.wait(self.poll_interval):
+            current = self._snapshot(scanner)
+            for rel_path in current.keys() | snapshot.keys():
+                if current.get(rel_path) != snapshot.get(rel_path):
+                    self._mark_changed(rel_path)
+            snapshot = current
+
+    @staticmethod
+    def _snapshot(scanner: DocumentIndexer) -> Dict[str, Tuple[int, int]]:
+        """扫描目录,返回 {相对路径: (size, mtime_ns)}"""
+        return {
+            rel_path: (stat.st_size, stat.st_mtime_ns)
+            for rel_path, stat in scanner._scan(recursive=True)
+        }
+
+    def _relative(self, full_path: str) -> str:
+        """绝对路径转换为相对根目录的路径 (统一使用 /)"""
+        return os.path.relpath(full_path, self.root_dir).replace(os.sep, '/')
+
+    # ========== 变化处理 ==========
+
+    def _flush_loop(self):
+        """处理循环: 取出静默期已过的变化,重新解析并更新索引"""
+        while not self._stop_event.wait(min(0.5, self.debounce / 2 or 0.1)):
+            now = time.monotonic()
+            with self._pending_lock:
+                ready = [
+                    path for path, changed_at in self._pending.items()
+                    if now - changed_at >= self.debounce
+                ]
+                for path in ready:
+                    del self._pending[path]
+
+            if ready:
+                self._process(ready)
+
+    def _process(self, rel_paths: List[str]):
+        """
+        处理一批变化的文档
+
+        Args:
+            rel_paths: 相对路径列表
+        """
+        self.logger.info("检测到 %s 个文档变化,开始更新", len(rel_paths))
+
+        futures = [self._executor.submit(self._reparse, rel_path) for rel_path in rel_paths]
+        for future in futures:
+            if not future.result():
+                self.errors += 1
+            self.processed += 1
+
+        # 仅更新已建立的全文索引和事实库,避免未使用相应功能的目录产生索引文件
+        for store_class, file_name in ((SearchIndex, config.SEARCH_INDEX_FILE), (FactStore, config.FACT_STORE_FILE)):
+            if not os.path.exists(os.path.join(self.index_dir, file_name)):
+                continue
+            store = store_class(self.root_dir, self.index_dir)
+            try:
+                store.refresh()
+            except Exception as e:
+                self.errors += 1
+                self.logger.error("%s 更新失败: %s", file_name, e, exc_info=True)
+            finally:
+                store.close()
+
+        self.last_refresh_at = datetime.now().isoformat(timespec='seconds')
+
+    def _reparse(self, rel_path: str) -> bool:
+        """
+        重新解析单个文档,按缓存中已有的选项预热解析缓存
+        (没有缓存条目的新文档按解析工具摘要模式的默认选项预热,与启动预热一致)
+
+        Args:
+            rel_path: 相对路径
+
+        Returns:
+            是否成功 (文件已删除视为成功)
+        """
+        full_path = os.path.join(self.root_dir, rel_path)
+
+        # 先取出已缓存的选项,再清除旧条目
+        options_list = parse_cache.cached_options(full_path) or [
+            dict(ParserFactory.SUMMARY_MODE_LIMITS.get(config.get_file_type_by_extension(full_path), {}))
+        ]
+        parse_cache.invalidate(full_path)
+
+        if not os.path.exists(full_path):
+            return True
+
+        success = True
+        for options in options_list:
+            result = ParserFactory.parse(full_path, options)
+            if result.get('status') != 'success':
+                self.logger.warning("重新解析失败: %s - %s", rel_path, result.get('error_message'))
+                success = False
+        return success
+
+
+# 监控器注册表 (按根目录)
+_watchers: Dict[str, DocumentWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def start_watching(directory: str, use_inotify: bool = True) -> Dict:
+    """开始监控目录的便捷函数 (已在监控时直接返回状态)"""
+    root = os.path.abspath(directory)
+    with _watchers_lock:
+        watcher = _watchers.get(root)
+        if watcher is None or not watcher.is_running:
+            watcher = DocumentWatcher(root, use_inotify=use_inotify)
+            watcher.start()
+            _watchers[root] = watcher
+    return watcher.status()
+
+
+def stop_watching(directory: str) -> Dict:
+    """停止监控目录的便捷函数"""
+    root = os.path.abspath(directory)
+    with _watchers_lock:
+        watcher = _watchers.pop(root, None)
+    if watcher is None:
+        return {"root": root, "running": False}
+    watcher.stop()
+    return watcher.status()
+
+
+def get_watch_status() -> List[Dict]:
+    """获取全部监控器状态的便捷函数"""
+    with _watchers_lock:
+        watchers = list(_watchers.values())
+    return [watcher.status() for watcher in watchers]
+
+
+def stop_all_watchers():
+    """停止全部监控器 (服务器退出时调用)"""
+    with _watchers_lock:
+        watchers = list(_watchers.values())
+        _watchers.clear()
+    for watcher in watchers:
+        watcher.stop()
@@ -1,21 +1,34 @@
 """
 文档解析器模块
 
-导出所有解析器和工厂类
+导出所有解析器和工厂类 (具体解析器按需导入)
 """
 
+import importlib
+
 from .base_parser import BaseParser
-from .word_parser import WordParser
-from .excel_parser import ExcelParser
-from .ppt_parser import PowerPointParser
-from .pdf_parser import PDFParser
 from .factory import (
     ParserFactory,
     parse_document,
     batch_parse_documents,
-    get_parser_for_file
+    get_parser_for_file,
+    iter_document_units
 )
 
+# 具体解析器在首次访问时导入 (与 ParserFactory 按类型延迟加载一致)
+_LAZY_PARSERS = {
+    class_name: module_name
+    for module_name, class_name in ParserFactory._builtin_parsers.values()
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_PARSERS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
+
+
 __all__ = [
     # 基类
     'BaseParser',
@@ -31,4 +44,5 @@ __all__ = [
     'parse_document',
     'batch_parse_documents',
     'get_parser_for_file',
+    'iter_document_units',
 ]
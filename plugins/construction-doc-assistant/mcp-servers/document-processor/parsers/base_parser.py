@@ -4,7 +4,7 @@
 定义所有文档解析器的统一接口和通用功能
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 from pathlib import Path
 import os
 import sys
@@ -26,7 +26,7 @@ class BaseParser(ABC):
 
     def __init__(self):
         """初始化解析器"""
-        self.logger = get_logger(self.__class__.__name__)
+        self.logger = get_logger(self.__class__.__module__)
 
     @abstractmethod
     def parse(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Dict:
@@ -68,6 +68,73 @@ class BaseParser(ABC):
         """
         pass
 
+    def iter_units(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Iterator[Dict]:
+        """
+        逐个产出文档的内容单元,不构建完整解析结果 (由子类实现)
+
+        用于全文索引、定向提取等只需顺序读取内容的场景
+
+        Args:
+            file_path: 文件路径
+            options: 解析选项
+
+        Yields:
+            内容单元字典:
+            {
+                "type": "heading" | "paragraph" | "table_row" | "page" | "row" | "slide",
+                "location": {...},   # 单元在文档中的位置,如 {"page": 3}
+                "text": str,
+                "cells": [...]       # 仅表格行/工作表行
+            }
+
+        Raises:
+            ParseError: 解析失败时抛出
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} 不支持逐单元读取")
+
+    def warm_up(self):
+        """
+        预先导入解析后端库 (由子类实现,用于启动后的后台预热)
+
+        Raises:
+            ParseError: 后端库未安装时抛出
+        """
+        pass
+
+    @staticmethod
+    def describe_location(location: Dict) -> str:
+        """
+        将内容单元的位置转换为可读描述 (用于引用来源)
+
+        Args:
+            location: 单元位置字典
+
+        Returns:
+            位置描述,如 "第 3 页"、"工作表「进度」第 5 行"
+        """
+        if 'page' in location:
+            return f"第 {location['page']} 页"
+        if 'slide' in location:
+            return f"第 {location['slide']} 张幻灯片"
+        if 'sheet' in location:
+            return f"工作表「{location['sheet']}」第 {location['row']} 行"
+        if 'table' in location:
+            return f"表格 {location['table']} 第 {location['row']} 行"
+        if 'paragraph' in location:
+            return f"「{location['section']}」第 {location['paragraph']} 段"
+        if 'section' in location:
+            return f"标题「{location['section']}」"
+        return ""
+
+    @staticmethod
+    def column_letter(col: int) -> str:
+        """将列号转换为 Excel 列字母 (1 -> A, 27 -> AA)"""
+        letters = ""
+        while col > 0:
+            col, remainder = divmod(col - 1, 26)
+            letters = chr(65 + remainder) + letters
+        return letters
+
     def safe_parse(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Dict:
         """
         安全的解析方法 (带错误处理)
@@ -88,18 +155,18 @@ class BaseParser(ABC):
                 )
 
             # 调用子类实现的解析方法
-            self.logger.info(f"开始解析文档: {file_path}")
+            self.logger.info("开始解析文档: %s", file_path)
             result = self.parse(file_path, options or {})
 
-            self.logger.info(f"文档解析成功: {file_path}")
+            self.logger.info("文档解析成功: %s", file_path)
             return result
 
         except ParseError as e:
-            self.logger.error(f"解析错误: {e}", exc_info=True)
+            self.logger.error("解析错误: %s", e, exc_info=True)
             return handle_file_error(e, file_path, "解析")
 
         except Exception as e:
-            self.logger.error(f"未预期的错误: {e}", exc_info=True)
+            self.logger.error("未预期的错误: %s", e, exc_info=True)
             return handle_file_error(e, file_path, "解析")
 
     def _validate_file_path(self, file_path: str) -> bool:
@@ -109,11 +176,11 @@ class BaseParser(ABC):
 
         path = Path(file_path)
         if not path.exists():
-            self.logger.error(f"文件不存在: {file_path}")
+            self.logger.error("文件不存在: %s", file_path)
             return False
 
         if not path.is_file():
-            self.logger.error(f"路径不是文件: {file_path}")
+            self.logger.error("路径不是文件: %s", file_path)
             return False
 
         return True
@@ -4,14 +4,14 @@ Excel 文档解析器模块
 解析 .xlsx 和 .xls 格式的 Excel 文档
 提取工作表、单元格数据、公式等信息
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from .base_parser import BaseParser
-from utils import get_logger, ParseError
+from utils import get_logger, ParseError, TokenBudget
 
 logger = get_logger(__name__)
 
@@ -26,6 +26,15 @@ class ExcelParser(BaseParser):
         """获取支持的文件扩展名"""
         return ['.xlsx', '.xls']
 
+    def warm_up(self):
+        """预先导入 openpyxl"""
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise ParseError(
+                "缺少 openpyxl 库，请运行: pip install openpyxl"
+            )
+
     def parse(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Dict:
         """
         解析 Excel 文档
@@ -36,6 +45,8 @@ class ExcelParser(BaseParser):
                 - sheet_name: 指定工作表名称
                 - max_rows: 每个工作表最大行数
                 - max_sheets: 最大工作表数
+                - max_tokens: 数据行的 token 预算 (每行整体计入,用完后停止读取;
+                  设置后 max_rows 不再默认为 100)
 
         Returns:
             解析结果字典
@@ -49,12 +60,13 @@ class ExcelParser(BaseParser):
 
         options = options or {}
         sheet_name = options.get('sheet_name')
-        max_rows = options.get('max_rows', 100)
+        budget = TokenBudget(options.get('max_tokens'))
+        max_rows = options.get('max_rows', None if budget.limited else 100)
         max_sheets = options.get('max_sheets', 10)
 
         try:
             # 加载工作簿 (只读模式提高性能)
-            self.logger.info(f"加载 Excel 文档: {file_path}")
+            self.logger.info("加载 Excel 文档: %s", file_path)
             wb = load_workbook(file_path, read_only=True, data_only=True)
 
             # 提取内容
@@ -69,14 +81,19 @@ class ExcelParser(BaseParser):
             sheets_data = []
 
             for name in sheets_to_read:
+                if budget.should_stop():
+                    self.logger.info("已达到 token 预算: %s", budget.max_tokens)
+                    break
                 ws = wb[name]
-                sheet_data = self._extract_sheet_data(ws, name, max_rows)
+                sheet_data = self._extract_sheet_data(ws, name, max_rows, budget)
                 sheets_data.append(sheet_data)
 
             content['sheets'] = sheets_data
 
             # 3. 生成摘要
             summary = self._generate_summary(content)
+            if budget.limited:
+                summary['token_budget'] = budget.to_dict()
 
             # 4. 元数据
             metadata = self._extract_metadata(wb)
@@ -89,33 +106,85 @@ class ExcelParser(BaseParser):
             )
 
         except Exception as e:
-            self.logger.error(f"Excel 文档解析失败: {e}", exc_info=True)
+            self.logger.error("Excel 文档解析失败: %s", e, exc_info=True)
             raise ParseError(f"Excel 文档解析失败: {str(e)}")
 
-    def _extract_sheet_data(self, ws, sheet_name: str, max_rows: int) -> Dict:
+    def iter_units(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Iterator[Dict]:
+        """
+        逐行产出 Excel 工作表数据
+
+        Args:
+            file_path: Excel 文档路径
+            options: 解析选项
+                - sheet_name: 指定工作表名称
+
+        Yields:
+            内容单元字典 (每个非空行一个单元)
+        """
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ParseError(
+                "缺少 openpyxl 库，请运行: pip install openpyxl"
+            )
+
+        options = options or {}
+        sheet_name = options.get('sheet_name')
+
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheet_names = [sheet_name] if sheet_name else wb.sheetnames
+
+            for name in sheet_names:
+                ws = wb[name]
+                for row_index, row in enumerate(ws.iter_rows(values_only=True), 1):
+                    cells = [str(cell).strip() if cell is not None else '' for cell in row]
+                    if not any(cells):
+                        continue
+
+                    yield {
+                        "type": "row",
+                        "location": {"sheet": name, "row": row_index},
+                        "text": '\t'.join(cells),
+                        "cells": cells
+                    }
+        finally:
+            wb.close()
+
+    def _extract_sheet_data(
+        self,
+        ws,
+        sheet_name: str,
+        max_rows: Optional[int],
+        budget: Optional[TokenBudget] = None
+    ) -> Dict:
         """
         提取工作表数据
 
         Args:
             ws: Worksheet 对象
             sheet_name: 工作表名称
-            max_rows: 最大行数
+            max_rows: 最大行数 (None 表示不限制)
+            budget: token 预算 (每行整体计入,超出时舍弃该行并停止)
 
         Returns:
-            工作表数据字典
+            工作表数据字典 (data 中的每行在工作表中的行号记录在 row_numbers,空行不计入 data)
         """
         sheet_data = {
             "name": sheet_name,
             "max_row": ws.max_row,
             "max_column": ws.max_column,
             "data": [],
+            "row_numbers": [],
             "headers": []
         }
 
+        budget = budget or TokenBudget()
+
         # 提取数据
         row_count = 0
-        for row in ws.iter_rows(values_only=True):
-            if row_count >= max_rows:
+        for row_index, row in enumerate(ws.iter_rows(values_only=True), 1):
+            if max_rows is not None and row_count >= max_rows:
                 break
 
             # 过滤完全空的行
@@ -124,7 +193,10 @@ class ExcelParser(BaseParser):
 
             # 转换为字符串列表
             row_data = [str(cell) if cell is not None else '' for cell in row]
+            if not budget.fits('\t'.join(row_data)):
+                break
             sheet_data["data"].append(row_data)
+            sheet_data["row_numbers"].append(row_index)
             row_count += 1
 
         # 识别表头 (第一行)
@@ -132,8 +204,8 @@ class ExcelParser(BaseParser):
             sheet_data["headers"] = sheet_data["data"][0]
 
         self.logger.info(
-            f"提取工作表 '{sheet_name}': "
-            f"{len(sheet_data['data'])} 行 x {ws.max_column} 列"
+            "提取工作表 '%s': %s 行 x %s 列",
+            sheet_name, len(sheet_data['data']), ws.max_column
         )
 
         return sheet_data
@@ -158,7 +230,7 @@ class ExcelParser(BaseParser):
                 metadata['modified'] = str(props.modified)
 
         except Exception as e:
-            self.logger.warning(f"提取元数据失败: {e}")
+            self.logger.warning("提取元数据失败: %s", e)
 
         return metadata
 
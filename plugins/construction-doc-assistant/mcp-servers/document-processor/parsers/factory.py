@@ -3,16 +3,21 @@
 
 根据文件类型自动选择合适的解析器
 """
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 from pathlib import Path
+import importlib
 import os
 import sys
+import threading
+import time
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils import (
     get_logger,
     config,
+    parse_cache,
+    metrics,
     UnsupportedFormatError
 )
 
@@ -22,37 +27,55 @@ logger = get_logger(__name__)
 class ParserFactory:
     """解析器工厂类"""
 
-    # 解析器注册表 (延迟加载)
+    # 内置解析器: 文件类型 -> (模块, 类名),首次处理该类型文件时才导入和实例化
+    _builtin_parsers: Dict[str, Tuple[str, str]] = {
+        'word': ('.word_parser', 'WordParser'),
+        'excel': ('.excel_parser', 'ExcelParser'),
+        'powerpoint': ('.ppt_parser', 'PowerPointParser'),
+        'pdf': ('.pdf_parser', 'PDFParser'),
+    }
+
+    # 摘要模式 (parse_mode=summary) 下各类型文档的默认数量限制,解析工具和启动预热共用,
+    # 保证预热填充的缓存与工具调用的缓存键一致
+    SUMMARY_MODE_LIMITS: Dict[str, Dict] = {
+        'word': {'max_paragraphs': 100},
+        'excel': {'max_rows': 100},
+        'powerpoint': {'max_slides': 50},
+        'pdf': {'max_pages': 50},
+    }
+
+    # 已实例化的解析器 (含自定义注册的解析器)
     _parsers: Dict = {}
-    _initialized = False
+    _lock = threading.Lock()
 
     @classmethod
-    def _initialize_parsers(cls):
-        """初始化解析器 (延迟加载以避免循环导入)"""
-        if cls._initialized:
-            return
-
-        try:
-            # 导入所有解析器
-            from .word_parser import WordParser
-            from .excel_parser import ExcelParser
-            from .ppt_parser import PowerPointParser
-            from .pdf_parser import PDFParser
-
-            # 注册解析器
-            cls._parsers = {
-                'word': WordParser(),
-                'excel': ExcelParser(),
-                'powerpoint': PowerPointParser(),
-                'pdf': PDFParser()
-            }
+    def _load_parser(cls, file_type: str):
+        """
+        按文件类型加载解析器 (延迟导入,各类型互不影响)
 
-            cls._initialized = True
-            logger.info(f"解析器工厂初始化完成，共注册 {len(cls._parsers)} 个解析器")
+        Args:
+            file_type: 文件类型
 
-        except ImportError as e:
-            logger.error(f"解析器初始化失败: {e}")
-            cls._parsers = {}
+        Returns:
+            解析器实例 (无对应解析器或导入失败时为 None)
+        """
+        parser = cls._parsers.get(file_type)
+        if parser is not None or file_type not in cls._builtin_parsers:
+            return parser
+
+        with cls._lock:
+            parser = cls._parsers.get(file_type)
+            if parser is None:
+                module_name, class_name = cls._builtin_parsers[file_type]
+                try:
+                    module = importlib.import_module(module_name, __package__)
+                    parser = getattr(module, class_name)()
+                except ImportError as e:
+                    logger.error("解析器加载失败 (%s): %s", file_type, e)
+                    return None
+                cls._parsers[file_type] = parser
+                logger.debug("加载解析器: %s -> %s", file_type, class_name)
+        return parser
 
     @classmethod
     def get_parser(cls, file_path: str):
@@ -68,9 +91,6 @@ class ParserFactory:
         Raises:
             UnsupportedFormatError: 不支持的文件格式
         """
-        # 确保解析器已初始化
-        cls._initialize_parsers()
-
         # 根据文件扩展名确定文件类型
         file_type = config.get_file_type_by_extension(file_path)
 
@@ -81,15 +101,15 @@ class ParserFactory:
                 f"支持的格式: {', '.join(config.get_all_supported_extensions())}"
             )
 
-        # 获取对应的解析器
-        parser = cls._parsers.get(file_type)
+        # 获取对应的解析器 (首次使用时加载)
+        parser = cls._load_parser(file_type)
 
         if parser is None:
             raise UnsupportedFormatError(
                 f"文件类型 '{file_type}' 的解析器未注册"
             )
 
-        logger.debug(f"为文件 {file_path} 选择解析器: {parser.__class__.__name__}")
+        logger.debug("为文件 %s 选择解析器: %s", file_path, parser.__class__.__name__)
         return parser
 
     @classmethod
@@ -108,13 +128,35 @@ class ParserFactory:
             # 获取解析器
             parser = cls.get_parser(file_path)
 
+            # 命中缓存时直接返回 (文件 size/mtime 变化会使缓存失效)
+            if config.ENABLE_CACHE:
+                cached = parse_cache.get(file_path, options)
+                if cached is not None:
+                    logger.debug("解析缓存命中: %s", file_path)
+                    return cached
+
             # 使用安全解析方法
+            start_time = time.perf_counter()
             result = parser.safe_parse(file_path, options)
 
+            if result.get('status') == 'success':
+                metrics.record_parse(
+                    config.get_file_type_by_extension(file_path),
+                    os.path.getsize(file_path),
+                    result.get('summary') or {},
+                    time.perf_counter() - start_time
+                )
+            else:
+                metrics.record_error(result.get('user_message', '解析失败'))
+
+            if config.ENABLE_CACHE:
+                parse_cache.put(file_path, options, result)
+
             return result
 
         except UnsupportedFormatError as e:
-            logger.error(f"不支持的文件格式: {e}")
+            logger.error("不支持的文件格式: %s", e)
+            metrics.record_error('不支持的文件格式')
             return {
                 "status": "error",
                 "file_info": {
@@ -130,7 +172,8 @@ class ParserFactory:
             }
 
         except Exception as e:
-            logger.error(f"解析失败: {e}", exc_info=True)
+            logger.error("解析失败: %s", e, exc_info=True)
+            metrics.record_error('解析失败')
             return {
                 "status": "error",
                 "file_info": {
@@ -145,6 +188,32 @@ class ParserFactory:
                 ]
             }
 
+    @classmethod
+    def prewarm(cls, file_types: Optional[list] = None) -> Dict[str, float]:
+        """
+        加载解析器并预先导入其后端库
+
+        Args:
+            file_types: 文件类型列表 (默认: 全部内置解析器)
+
+        Returns:
+            {文件类型: 耗时(秒)} (未知类型或预热失败的类型不包含在内)
+        """
+        timings = {}
+        for file_type in file_types or list(cls._builtin_parsers):
+            start = time.perf_counter()
+            parser = cls._load_parser(file_type)
+            if parser is None:
+                logger.warning("未知的解析器类型,跳过预热: %s", file_type)
+                continue
+            try:
+                parser.warm_up()
+            except Exception as e:
+                logger.warning("解析后端预热失败 (%s): %s", file_type, e)
+                continue
+            timings[file_type] = round(time.perf_counter() - start, 3)
+        return timings
+
     @classmethod
     def get_available_parsers(cls) -> list:
         """
@@ -153,8 +222,7 @@ class ParserFactory:
         Returns:
             解析器名称列表
         """
-        cls._initialize_parsers()
-        return list(cls._parsers.keys())
+        return list(dict.fromkeys([*cls._builtin_parsers, *cls._parsers]))
 
     @classmethod
     def register_parser(cls, file_type: str, parser):
@@ -165,9 +233,9 @@ class ParserFactory:
             file_type: 文件类型 (如 'word', 'excel')
             parser: 解析器实例
         """
-        cls._initialize_parsers()
-        cls._parsers[file_type] = parser
-        logger.info(f"注册自定义解析器: {file_type} -> {parser.__class__.__name__}")
+        with cls._lock:
+            cls._parsers[file_type] = parser
+        logger.info("注册自定义解析器: %s -> %s", file_type, parser.__class__.__name__)
 
     @classmethod
     def batch_parse(cls, file_paths: list, options: Optional[Dict] = None) -> list:
@@ -183,10 +251,10 @@ class ParserFactory:
         """
         results = []
 
-        logger.info(f"开始批量解析 {len(file_paths)} 个文档")
+        logger.info("开始批量解析 %s 个文档", len(file_paths))
 
         for i, file_path in enumerate(file_paths, 1):
-            logger.info(f"解析进度: {i}/{len(file_paths)} - {os.path.basename(file_path)}")
+            logger.info("解析进度: %s/%s - %s", i, len(file_paths), os.path.basename(file_path))
 
             result = cls.parse(file_path, options)
             results.append(result)
@@ -194,9 +262,8 @@ class ParserFactory:
         # 统计
         success_count = sum(1 for r in results if r.get('status') == 'success')
         logger.info(
-            f"批量解析完成: 总计 {len(file_paths)}, "
-            f"成功 {success_count}, "
-            f"失败 {len(file_paths) - success_count}"
+            "批量解析完成: 总计 %s, 成功 %s, 失败 %s",
+            len(file_paths), success_count, len(file_paths) - success_count
         )
 
         return results
@@ -216,3 +283,13 @@ def batch_parse_documents(file_paths: list, options: Optional[Dict] = None) -> l
 def get_parser_for_file(file_path: str):
     """获取文件解析器的便捷函数"""
     return ParserFactory.get_parser(file_path)
+
+
+def iter_document_units(file_path: str, options: Optional[Dict] = None):
+    """逐单元读取文档内容的便捷函数"""
+    parser = ParserFactory.get_parser(file_path)
+    try:
+        metrics.record_read(os.path.getsize(file_path))
+    except OSError:
+        pass  # 文件不存在等错误由解析器报告
+    return parser.iter_units(file_path, options)
@@ -4,14 +4,14 @@ PDF 文档解析器模块
 解析 .pdf 格式的 PDF 文档
 提取文本、元数据等信息
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from .base_parser import BaseParser
-from utils import get_logger, ParseError
+from utils import get_logger, ParseError, TokenBudget
 
 logger = get_logger(__name__)
 
@@ -26,6 +26,15 @@ class PDFParser(BaseParser):
         """获取支持的文件扩展名"""
         return ['.pdf']
 
+    def warm_up(self):
+        """预先导入 PyPDF2"""
+        try:
+            import PyPDF2  # noqa: F401
+        except ImportError:
+            raise ParseError(
+                "缺少 PyPDF2 库，请运行: pip install PyPDF2"
+            )
+
     def parse(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Dict:
         """
         解析 PDF 文档
@@ -35,6 +44,8 @@ class PDFParser(BaseParser):
             options: 解析选项
                 - max_pages: 最大页数
                 - extract_tables: 是否提取表格 (需要 pdfplumber)
+                - max_tokens: 页面文本的 token 预算 (逐页计入,超出的页截断,用完后停止读取;
+                  设置后 max_pages 不再默认为 50)
 
         Returns:
             解析结果字典
@@ -47,12 +58,13 @@ class PDFParser(BaseParser):
             )
 
         options = options or {}
-        max_pages = options.get('max_pages', 50)
         extract_tables = options.get('extract_tables', False)
+        budget = TokenBudget(options.get('max_tokens'))
+        max_pages = options.get('max_pages', None if budget.limited else 50)
 
         try:
             # 打开 PDF 文件
-            self.logger.info(f"加载 PDF 文档: {file_path}")
+            self.logger.info("加载 PDF 文档: %s", file_path)
 
             with open(file_path, 'rb') as f:
                 reader = PyPDF2.PdfReader(f)
@@ -66,11 +78,18 @@ class PDFParser(BaseParser):
 
                 # 2. 提取页面文本
                 pages_data = []
-                pages_to_read = min(page_count, max_pages)
+                pages_to_read = page_count if max_pages is None else min(page_count, max_pages)
 
                 for i in range(pages_to_read):
+                    if budget.should_stop():
+                        self.logger.info("已达到 token 预算: %s", budget.max_tokens)
+                        break
                     page = reader.pages[i]
-                    page_text = page.extract_text()
+                    page_text = budget.take(page.extract_text() or '')
+                    if page_text is None:
+                        # 剩余预算放不下这一页的截断文本
+                        self.logger.info("已达到 token 预算: %s", budget.max_tokens)
+                        break
 
                     page_data = {
                         "page_number": i + 1,
@@ -88,7 +107,7 @@ class PDFParser(BaseParser):
                     try:
                         tables = self._extract_tables_with_pdfplumber(
                             file_path,
-                            pages_to_read
+                            len(pages_data)
                         )
                         content['tables'] = tables
                     except ImportError:
@@ -97,6 +116,8 @@ class PDFParser(BaseParser):
 
                 # 4. 生成摘要
                 summary = self._generate_summary(content)
+                if budget.limited:
+                    summary['token_budget'] = budget.to_dict()
 
                 # 5. 提取元数据
                 metadata = self._extract_metadata(reader)
@@ -109,9 +130,41 @@ class PDFParser(BaseParser):
                 )
 
         except Exception as e:
-            self.logger.error(f"PDF 文档解析失败: {e}", exc_info=True)
+            self.logger.error("PDF 文档解析失败: %s", e, exc_info=True)
             raise ParseError(f"PDF 文档解析失败: {str(e)}")
 
+    def iter_units(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Iterator[Dict]:
+        """
+        逐页产出 PDF 文本
+
+        Args:
+            file_path: PDF 文档路径
+            options: 解析选项 (未使用)
+
+        Yields:
+            内容单元字典 (每页一个单元)
+        """
+        try:
+            import PyPDF2
+        except ImportError:
+            raise ParseError(
+                "缺少 PyPDF2 库，请运行: pip install PyPDF2"
+            )
+
+        with open(file_path, 'rb') as f:
+            reader = PyPDF2.PdfReader(f)
+
+            for i, page in enumerate(reader.pages, 1):
+                page_text = (page.extract_text() or '').strip()
+                if not page_text:
+                    continue
+
+                yield {
+                    "type": "page",
+                    "location": {"page": i},
+                    "text": page_text
+                }
+
     def _extract_tables_with_pdfplumber(
         self,
         file_path: str,
@@ -151,7 +204,7 @@ class PDFParser(BaseParser):
                             "data": table
                         })
 
-        self.logger.info(f"从 PDF 提取表格: {len(tables)} 个")
+        self.logger.info("从 PDF 提取表格: %s 个", len(tables))
         return tables
 
     def _extract_metadata(self, reader) -> Dict:
@@ -184,7 +237,7 @@ class PDFParser(BaseParser):
                     metadata['modification_date'] = str(info['/ModDate'])
 
         except Exception as e:
-            self.logger.warning(f"提取元数据失败: {e}")
+            self.logger.warning("提取元数据失败: %s", e)
 
         return metadata
 
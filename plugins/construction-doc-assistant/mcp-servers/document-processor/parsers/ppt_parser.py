@@ -4,14 +4,14 @@ PowerPoint 文档解析器模块
 解析 .pptx 格式的 PowerPoint 文档
 提取幻灯片内容、标题、备注等信息
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from .base_parser import BaseParser
-from utils import get_logger, ParseError
+from utils import get_logger, ParseError, TokenBudget
 
 logger = get_logger(__name__)
 
@@ -26,6 +26,15 @@ class PowerPointParser(BaseParser):
         """获取支持的文件扩展名"""
         return ['.pptx', '.ppt']
 
+    def warm_up(self):
+        """预先导入 python-pptx"""
+        try:
+            import pptx  # noqa: F401
+        except ImportError:
+            raise ParseError(
+                "缺少 python-pptx 库，请运行: pip install python-pptx"
+            )
+
     def parse(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Dict:
         """
         解析 PowerPoint 文档
@@ -35,6 +44,8 @@ class PowerPointParser(BaseParser):
             options: 解析选项
                 - max_slides: 最大幻灯片数
                 - extract_notes: 是否提取备注
+                - max_tokens: 幻灯片文本的 token 预算 (标题、文本、备注依次计入,用完后停止读取;
+                  设置后 max_slides 不再默认为 50)
 
         Returns:
             解析结果字典
@@ -47,23 +58,26 @@ class PowerPointParser(BaseParser):
             )
 
         options = options or {}
-        max_slides = options.get('max_slides', 50)
         extract_notes = options.get('extract_notes', True)
+        budget = TokenBudget(options.get('max_tokens'))
+        max_slides = options.get('max_slides', None if budget.limited else 50)
 
         try:
             # 加载演示文稿
-            self.logger.info(f"加载 PowerPoint 文档: {file_path}")
+            self.logger.info("加载 PowerPoint 文档: %s", file_path)
             prs = Presentation(file_path)
 
             # 提取内容
             content = {}
 
             # 1. 提取幻灯片
-            slides_data = self._extract_slides(prs, max_slides, extract_notes)
+            slides_data = self._extract_slides(prs, max_slides, extract_notes, budget)
             content['slides'] = slides_data
 
             # 2. 生成摘要
             summary = self._generate_summary(slides_data)
+            if budget.limited:
+                summary['token_budget'] = budget.to_dict()
 
             # 3. 元数据
             metadata = self._extract_metadata(prs)
@@ -76,70 +90,160 @@ class PowerPointParser(BaseParser):
             )
 
         except Exception as e:
-            self.logger.error(f"PowerPoint 文档解析失败: {e}", exc_info=True)
+            self.logger.error("PowerPoint 文档解析失败: %s", e, exc_info=True)
             raise ParseError(f"PowerPoint 文档解析失败: {str(e)}")
 
+    def iter_units(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Iterator[Dict]:
+        """
+        逐张产出幻灯片文本 (标题、正文和备注)
+
+        Args:
+            file_path: PPT 文档路径
+            options: 解析选项
+                - extract_notes: 是否包含备注 (默认 True)
+
+        Yields:
+            内容单元字典 (每张幻灯片一个单元)
+        """
+        try:
+            from pptx import Presentation
+        except ImportError:
+            raise ParseError(
+                "缺少 python-pptx 库，请运行: pip install python-pptx"
+            )
+
+        options = options or {}
+        extract_notes = options.get('extract_notes', True)
+
+        prs = Presentation(file_path)
+
+        for i, slide in enumerate(prs.slides, 1):
+            slide_data = self._extract_slide(slide, i, extract_notes)
+            texts = [slide_data["title"]] + slide_data["content"] + [slide_data["notes"]]
+            text = '\n'.join(t for t in texts if t)
+            if not text:
+                continue
+
+            yield {
+                "type": "slide",
+                "location": {"slide": i, "title": slide_data["title"]},
+                "text": text
+            }
+
     def _extract_slides(
         self,
         prs,
-        max_slides: int,
-        extract_notes: bool
+        max_slides: Optional[int],
+        extract_notes: bool,
+        budget: Optional[TokenBudget] = None
     ) -> List[Dict]:
         """
         提取幻灯片内容
 
         Args:
             prs: Presentation 对象
-            max_slides: 最大幻灯片数
+            max_slides: 最大幻灯片数 (None 表示不限制)
             extract_notes: 是否提取备注
+            budget: token 预算 (用完后停止)
 
         Returns:
             幻灯片列表
         """
+        budget = budget or TokenBudget()
         slides = []
 
         for i, slide in enumerate(prs.slides):
-            if i >= max_slides:
+            if max_slides is not None and i >= max_slides:
+                break
+            if budget.should_stop():
+                self.logger.info("已达到 token 预算: %s", budget.max_tokens)
                 break
 
-            slide_data = {
-                "index": i + 1,
-                "title": "",
-                "content": [],
-                "notes": "",
-                "shape_count": len(slide.shapes)
-            }
-
-            # 提取形状中的文本
-            for shape in slide.shapes:
-                if hasattr(shape, "text") and shape.text.strip():
-                    text = shape.text.strip()
-
-                    # 识别标题 (通常是第一个大文本或特定位置的文本)
-                    if not slide_data["title"] and (
-                        hasattr(shape, 'is_placeholder') and
-                        shape.is_placeholder and
-                        shape.placeholder_format.type == 1  # 标题占位符
-                    ):
-                        slide_data["title"] = text
-                    else:
-                        slide_data["content"].append(text)
-
-            # 提取备注
-            if extract_notes and slide.has_notes_slide:
-                try:
-                    notes_slide = slide.notes_slide
-                    notes_text_frame = notes_slide.notes_text_frame
-                    if notes_text_frame:
-                        slide_data["notes"] = notes_text_frame.text.strip()
-                except Exception as e:
-                    self.logger.warning(f"提取幻灯片 {i+1} 备注失败: {e}")
-
+            slide_data = self._extract_slide(slide, i + 1, extract_notes)
+            if budget.limited:
+                slide_data = self._apply_budget(slide_data, budget)
+                if slide_data is None:
+                    break
             slides.append(slide_data)
 
-        self.logger.info(f"提取幻灯片: {len(slides)} 张")
+        self.logger.info("提取幻灯片: %s 张", len(slides))
         return slides
 
+    def _extract_slide(self, slide, index: int, extract_notes: bool) -> Dict:
+        """
+        提取单张幻灯片内容
+
+        Args:
+            slide: Slide 对象
+            index: 幻灯片序号 (从 1 开始)
+            extract_notes: 是否提取备注
+
+        Returns:
+            幻灯片数据字典
+        """
+        slide_data = {
+            "index": index,
+            "title": "",
+            "content": [],
+            "notes": "",
+            "shape_count": len(slide.shapes)
+        }
+
+        # 提取形状中的文本
+        for shape in slide.shapes:
+            if hasattr(shape, "text") and shape.text.strip():
+                text = shape.text.strip()
+
+                # 识别标题 (通常是第一个大文本或特定位置的文本)
+                if not slide_data["title"] and (
+                    hasattr(shape, 'is_placeholder') and
+                    shape.is_placeholder and
+                    shape.placeholder_format.type == 1  # 标题占位符
+                ):
+                    slide_data["title"] = text
+                else:
+                    slide_data["content"].append(text)
+
+        # 提取备注
+        if extract_notes and slide.has_notes_slide:
+            try:
+                notes_slide = slide.notes_slide
+                notes_text_frame = notes_slide.notes_text_frame
+                if notes_text_frame:
+                    slide_data["notes"] = notes_text_frame.text.strip()
+            except Exception as e:
+                self.logger.warning("提取幻灯片 %s 备注失败: %s", index, e)
+
+        return slide_data
+
+    @staticmethod
+    def _apply_budget(slide_data: Dict, budget: TokenBudget) -> Optional[Dict]:
+        """
+        按 token 预算裁剪幻灯片文本 (标题、文本、备注依次计入,超出部分截断或舍弃)
+
+        Args:
+            slide_data: 幻灯片数据字典
+            budget: token 预算
+
+        Returns:
+            裁剪后的幻灯片数据,预算已用完时返回 None
+        """
+        title = budget.take(slide_data["title"])
+        if title is None:
+            return None
+        slide_data["title"] = title
+
+        content = []
+        for text in slide_data["content"]:
+            text = budget.take(text)
+            if text is None:
+                break
+            content.append(text)
+        slide_data["content"] = content
+
+        slide_data["notes"] = budget.take(slide_data["notes"]) or ""
+        return slide_data
+
     def _extract_metadata(self, prs) -> Dict:
         """提取元数据"""
         metadata = {}
@@ -160,7 +264,7 @@ class PowerPointParser(BaseParser):
                 metadata['modified'] = str(core_props.modified)
 
         except Exception as e:
-            self.logger.warning(f"提取元数据失败: {e}")
+            self.logger.warning("提取元数据失败: %s", e)
 
         return metadata
 
@@ -4,14 +4,14 @@ Word 文档解析器模块
 解析 .docx 格式的 Word 文档
 提取文本、表格、标题结构等信息
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from .base_parser import BaseParser
-from utils import get_logger, ParseError, config
+from utils import get_logger, ParseError, TokenBudget, config
 
 logger = get_logger(__name__)
 
@@ -26,6 +26,15 @@ class WordParser(BaseParser):
         """获取支持的文件扩展名"""
         return ['.docx', '.doc']
 
+    def warm_up(self):
+        """预先导入 python-docx"""
+        try:
+            import docx  # noqa: F401
+        except ImportError:
+            raise ParseError(
+                "缺少 python-docx 库，请运行: pip install python-docx"
+            )
+
     def parse(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Dict:
         """
         解析 Word 文档
@@ -36,6 +45,8 @@ class WordParser(BaseParser):
                 - extract_tables: 是否提取表格 (默认 True)
                 - max_paragraphs: 最大段落数限制
                 - keywords: 关注的关键词列表
+                - max_tokens: 内容的 token 预算 (章节标题和段落、表格行依次计入,用完后停止读取;
+                  设置后大纲只包含已读取的标题)
 
         Returns:
             解析结果字典
@@ -51,32 +62,38 @@ class WordParser(BaseParser):
         extract_tables = options.get('extract_tables', True)
         max_paragraphs = options.get('max_paragraphs', None)
         keywords = options.get('keywords', [])
+        budget = TokenBudget(options.get('max_tokens'))
 
         try:
             # 加载文档
-            self.logger.info(f"加载 Word 文档: {file_path}")
+            self.logger.info("加载 Word 文档: %s", file_path)
             doc = Document(file_path)
 
             # 提取内容
             content = {}
 
-            # 1. 提取章节和段落
-            sections = self._extract_sections(doc, max_paragraphs, keywords)
+            # 1. 提取章节和段落 (有 token 预算时同时记录已读取的标题作为大纲)
+            budget_outline = [] if budget.limited else None
+            sections = self._extract_sections(doc, max_paragraphs, keywords, budget, budget_outline)
             content['sections'] = sections
 
             # 2. 提取表格
             if extract_tables:
-                tables = self._extract_tables(doc)
+                tables = self._extract_tables(doc, budget)
                 content['tables'] = tables
             else:
                 content['tables'] = []
 
             # 3. 提取文档大纲
-            outline = self._extract_outline(doc)
-            content['outline'] = outline
+            if budget_outline is not None:
+                content['outline'] = budget_outline
+            else:
+                content['outline'] = self._extract_outline(doc)
 
             # 4. 生成摘要
             summary = self._generate_summary(sections, content['tables'])
+            if budget.limited:
+                summary['token_budget'] = budget.to_dict()
 
             # 5. 提取元数据
             metadata = self._extract_metadata(doc)
@@ -89,14 +106,80 @@ class WordParser(BaseParser):
             )
 
         except Exception as e:
-            self.logger.error(f"Word 文档解析失败: {e}", exc_info=True)
+            self.logger.error("Word 文档解析失败: %s", e, exc_info=True)
             raise ParseError(f"Word 文档解析失败: {str(e)}")
 
+    def iter_units(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Iterator[Dict]:
+        """
+        逐个产出 Word 文档的标题、段落和表格行
+
+        Args:
+            file_path: Word 文档路径
+            options: 解析选项
+                - extract_tables: 是否产出表格行 (默认 True)
+
+        Yields:
+            内容单元字典
+        """
+        try:
+            from docx import Document
+        except ImportError:
+            raise ParseError(
+                "缺少 python-docx 库，请运行: pip install python-docx"
+            )
+
+        options = options or {}
+        doc = Document(file_path)
+
+        current_section = "文档开头"
+        paragraph_index = 0
+
+        for para in doc.paragraphs:
+            text = para.text.strip()
+            if not text:
+                continue
+
+            if para.style.name.startswith('Heading'):
+                current_section = text
+                paragraph_index = 0
+                yield {
+                    "type": "heading",
+                    "location": {
+                        "section": text,
+                        "level": self._get_heading_level(para.style.name)
+                    },
+                    "text": text
+                }
+                continue
+
+            paragraph_index += 1
+            yield {
+                "type": "paragraph",
+                "location": {"section": current_section, "paragraph": paragraph_index},
+                "text": text
+            }
+
+        if not options.get('extract_tables', True):
+            return
+
+        for table_index, table in enumerate(doc.tables, 1):
+            for row_index, row in enumerate(table.rows, 1):
+                cells = [cell.text.strip() for cell in row.cells]
+                if any(cells):
+                    yield {
+                        "type": "table_row",
+                        "location": {"table": table_index, "row": row_index},
+                        "text": '\t'.join(cells),
+                        "cells": cells
+                    }
+
     def _extract_sections(
         self,
         doc,
         max_paragraphs: Optional[int] = None,
-        keywords: Optional[List[str]] = None
+        keywords: Optional[List[str]] = None,
+        budget: Optional[TokenBudget] = None,
+        outline: Optional[List[Dict]] = None
     ) -> Dict[str, List[str]]:
         """
         提取章节和段落，按标题分组
@@ -105,6 +188,8 @@ class WordParser(BaseParser):
             doc: Document 对象
             max_paragraphs: 最大段落数
             keywords: 关键词列表
+            budget: token 预算 (章节标题和段落计入,用完后停止)
+            outline: 传入列表时,每个已读取的标题追加一项 {"level", "text"}
 
         Returns:
             章节字典 {章节名: [段落列表]}
@@ -113,6 +198,7 @@ class WordParser(BaseParser):
         current_section = "文档开头"  # 默认章节名
         sections[current_section] = []
 
+        budget = budget or TokenBudget()
         paragraph_count = 0
 
         for para in doc.paragraphs:
@@ -124,42 +210,57 @@ class WordParser(BaseParser):
 
             # 检查是否为标题
             if para.style.name.startswith('Heading'):
+                text = budget.take(text)
+                if text is None:
+                    self.logger.info("已达到 token 预算: %s", budget.max_tokens)
+                    break
                 # 创建新章节
                 current_section = text
                 sections[current_section] = []
-                self.logger.debug(f"发现章节: {current_section}")
+                if outline is not None:
+                    outline.append({
+                        "level": self._get_heading_level(para.style.name),
+                        "text": text
+                    })
+                self.logger.debug("发现章节: %s", current_section)
             else:
                 # 添加到当前章节
                 # 如果指定了关键词，只保留包含关键词的段落
-                if keywords:
-                    if any(kw in text for kw in keywords):
-                        sections[current_section].append(text)
-                        paragraph_count += 1
-                else:
-                    sections[current_section].append(text)
-                    paragraph_count += 1
+                if keywords and not any(kw in text for kw in keywords):
+                    continue
+                text = budget.take(text)
+                if text is None:
+                    self.logger.info("已达到 token 预算: %s", budget.max_tokens)
+                    break
+                sections[current_section].append(text)
+                paragraph_count += 1
 
             # 检查是否达到最大段落数
             if max_paragraphs and paragraph_count >= max_paragraphs:
-                self.logger.info(f"已达到最大段落数限制: {max_paragraphs}")
+                self.logger.info("已达到最大段落数限制: %s", max_paragraphs)
                 break
 
-        self.logger.info(f"提取章节: {len(sections)} 个, 段落: {paragraph_count} 个")
+        self.logger.info("提取章节: %s 个, 段落: %s 个", len(sections), paragraph_count)
         return sections
 
-    def _extract_tables(self, doc) -> List[Dict]:
+    def _extract_tables(self, doc, budget: Optional[TokenBudget] = None) -> List[Dict]:
         """
         提取表格数据
 
         Args:
             doc: Document 对象
+            budget: token 预算 (每行整体计入,超出时舍弃该行并停止)
 
         Returns:
             表格列表
         """
+        budget = budget or TokenBudget()
         tables = []
 
         for i, table in enumerate(doc.tables):
+            if budget.should_stop():
+                break
+
             table_data = {
                 "index": i,
                 "rows": len(table.rows),
@@ -175,15 +276,20 @@ class WordParser(BaseParser):
                     cell_text = cell.text.strip()
                     row_data.append(cell_text)
 
+                if not budget.fits('\t'.join(row_data)):
+                    break
                 table_data["data"].append(row_data)
 
+            if budget.exhausted and not table_data["data"]:
+                break
+
             # 智能识别表头（第一行通常是表头）
             if table_data["data"]:
                 table_data["headers"] = table_data["data"][0]
 
             tables.append(table_data)
 
-        self.logger.info(f"提取表格: {len(tables)} 个")
+        self.logger.info("提取表格: %s 个", len(tables))
         return tables
 
     def _extract_outline(self, doc) -> List[Dict]:
@@ -206,7 +312,7 @@ class WordParser(BaseParser):
                     "text": para.text.strip()
                 })
 
-        self.logger.info(f"提取大纲: {len(outline)} 个标题")
+        self.logger.info("提取大纲: %s 个标题", len(outline))
         return outline
 
     @staticmethod
@@ -260,7 +366,7 @@ class WordParser(BaseParser):
                 metadata['modified'] = str(core_props.modified)
 
         except Exception as e:
-            self.logger.warning(f"提取元数据失败: {e}")
+            self.logger.warning("提取元数据失败: %s", e)
 
         return metadata
 
@@ -4,19 +4,23 @@
 提供完整的 Word、Excel、PowerPoint、PDF 文档解析和智能分析功能
 """
 
+import time
+_STARTUP_BEGIN = time.perf_counter()
+
 import sys
 import os
+import re
 import json
+import threading
 from typing import Any
 
 # 添加当前目录到 Python 路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # 导入工具模块
-from utils import get_logger, setup_logger, handle_error, handle_file_error, ErrorHandler
-from validators import validate_document, batch_validate_documents
-from parsers import parse_document, batch_parse_documents
-from extractors import extract_summary, extract_construction_summary
+# 验证器、解析器、提取器和索引模块在首次调用对应工具时才导入 (见 call_tool),
+# 进程启动后即可响应 list_tools
+from utils import get_logger, setup_logger, enable_file_logging, shutdown_logging, handle_error, handle_file_error, ErrorHandler, ParseCache, config, metrics, profiler, dumps, dumps_lines, format_parse_output
 
 # 设置日志
 logger = setup_logger("mcp_server", level="INFO")
@@ -24,10 +28,10 @@ logger = setup_logger("mcp_server", level="INFO")
 # 尝试导入 MCP SDK
 try:
     from mcp.server import Server
-    from mcp.types import Tool, TextContent
+    from mcp.types import Tool, TextContent, InitializedNotification
     from mcp.server.stdio import stdio_server
 except ImportError as e:
-    logger.error(f"MCP SDK 未安装: {e}")
+    logger.error("MCP SDK 未安装: %s", e)
     logger.error("请运行: pip install mcp")
     sys.exit(1)
 
@@ -36,6 +40,42 @@ server = Server("construction-doc-processor")
 
 logger.info("建筑施工文档处理 MCP 服务器初始化...")
 
+# 文档解析工具 -> 文档类型 (摘要模式默认限制见 ParserFactory.SUMMARY_MODE_LIMITS)
+_PARSE_TOOL_TYPES = {
+    "parse_word_document": "word",
+    "parse_excel_document": "excel",
+    "parse_powerpoint_document": "powerpoint",
+    "parse_pdf_document": "pdf",
+}
+
+# 启动预热器 (握手完成后在后台线程中创建和执行)
+_prewarmer = None
+
+
+def _prewarm_configured() -> bool:
+    """是否配置了启动预热"""
+    return bool(config.PREWARM_BACKENDS or config.PREWARM_DIRECTORIES or config.PREWARM_RECENT_PROJECTS)
+
+
+def _run_prewarm():
+    """后台线程: 执行启动预热"""
+    global _prewarmer
+    try:
+        from indexers.prewarm import Prewarmer
+        _prewarmer = Prewarmer()
+        _prewarmer.run()
+    except Exception as e:
+        logger.error("启动预热失败: %s", e, exc_info=True)
+
+
+async def _on_initialized(notification: InitializedNotification):
+    """MCP 握手完成: 按配置在后台线程中预热 (不阻塞握手)"""
+    if _prewarm_configured():
+        threading.Thread(target=_run_prewarm, name="prewarm", daemon=True).start()
+
+
+server.notification_handlers[InitializedNotification] = _on_initialized
+
 
 @server.list_tools()
 async def list_tools() -> list[Tool]:
@@ -87,6 +127,16 @@ async def list_tools() -> list[Tool]:
                         "type": "array",
                         "items": {"type": "string"},
                         "description": "关注的关键词列表（可选）"
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "description": "内容的 token 预算（可选，按中文字符约 2 token、英文单词约 1 token 估算）：按文档顺序读取段落和表格行，预算用完即停止读取；设置后摘要模式不再使用默认的数量限制"
+                    },
+                    "output_format": {
+                        "type": "string",
+                        "enum": ["text", "json", "ndjson", "table"],
+                        "description": "输出格式: text=可读摘要(默认), json=完整解析结果的紧凑 JSON, ndjson=每行一个 JSON 记录(首行文档信息,之后每个章节/表格行一行), table=表格数据的紧凑文本(制表符分隔)",
+                        "default": "text"
                     }
                 },
                 "required": ["file_path"]
@@ -118,6 +168,16 @@ async def list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "每个工作表最大行数（可选，仅在 parse_mode=summary 时生效，默认 100）",
                         "default": 100
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "description": "内容的 token 预算（可选，按中文字符约 2 token、英文单词约 1 token 估算）：按文档顺序读取数据行，预算用完即停止读取；设置后摘要模式不再使用默认的数量限制"
+                    },
+                    "output_format": {
+                        "type": "string",
+                        "enum": ["text", "json", "ndjson", "table"],
+                        "description": "输出格式: text=可读摘要(默认), json=完整解析结果的紧凑 JSON, ndjson=每行一个 JSON 记录(首行文档信息,之后每个数据行一行), table=工作表数据的紧凑文本(每个工作表一段,单元格以制表符分隔,首行为表头)",
+                        "default": "text"
                     }
                 },
                 "required": ["file_path"]
@@ -150,6 +210,16 @@ async def list_tools() -> list[Tool]:
                         "type": "boolean",
                         "description": "是否提取备注（默认 true）",
                         "default": True
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "description": "内容的 token 预算（可选，按中文字符约 2 token、英文单词约 1 token 估算）：按文档顺序读取幻灯片，预算用完即停止读取；设置后摘要模式不再使用默认的数量限制"
+                    },
+                    "output_format": {
+                        "type": "string",
+                        "enum": ["text", "json", "ndjson"],
+                        "description": "输出格式: text=可读摘要(默认), json=完整解析结果的紧凑 JSON, ndjson=每行一个 JSON 记录(首行文档信息,之后每个幻灯片一行)",
+                        "default": "text"
                     }
                 },
                 "required": ["file_path"]
@@ -182,6 +252,16 @@ async def list_tools() -> list[Tool]:
                         "type": "boolean",
                         "description": "是否提取表格（需要 pdfplumber，默认 false）",
                         "default": False
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "description": "内容的 token 预算（可选，按中文字符约 2 token、英文单词约 1 token 估算）：按文档顺序读取页面，预算用完即停止读取；设置后摘要模式不再使用默认的数量限制"
+                    },
+                    "output_format": {
+                        "type": "string",
+                        "enum": ["text", "json", "ndjson"],
+                        "description": "输出格式: text=可读摘要(默认), json=完整解析结果的紧凑 JSON, ndjson=每行一个 JSON 记录(首行文档信息,之后每个页一行)",
+                        "default": "text"
                     }
                 },
                 "required": ["file_path"]
@@ -208,6 +288,10 @@ async def list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "摘要最大字符数（默认 2000）",
                         "default": 2000
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "description": "读取文档内容的 token 预算（可选），预算用完即停止读取，摘要只基于已读取的内容"
                     }
                 },
                 "required": ["file_path"]
@@ -231,6 +315,21 @@ async def list_tools() -> list[Tool]:
                         "enum": ["full", "summary", "metadata"],
                         "description": "提取模式：full=完整内容，summary=摘要，metadata=仅元数据",
                         "default": "summary"
+                    },
+                    "skip_duplicates": {
+                        "type": "boolean",
+                        "description": "是否跳过近似重复的文档(如多次另存的版本),每组重复文档只解析一个（默认 false）",
+                        "default": False
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "description": "每个文档内容的 token 预算（可选），预算用完即停止读取该文档"
+                    },
+                    "output_format": {
+                        "type": "string",
+                        "enum": ["text", "json", "ndjson"],
+                        "description": "输出格式: text=可读摘要(默认), json=全部解析结果的紧凑 JSON, ndjson=每个文档的解析结果一行",
+                        "default": "text"
                     }
                 },
                 "required": ["file_paths"]
@@ -292,6 +391,12 @@ async def list_tools() -> list[Tool]:
                                 "description": "生成日期(格式:YYYY-MM-DD)"
                             }
                         }
+                    },
+                    "style_mode": {
+                        "type": "string",
+                        "enum": ["direct", "named"],
+                        "description": "样式模式:direct=每个段落直接写入格式(默认),named=样式注册为Word命名样式,内容只引用样式名(文件更小,便于在Word中统一修改)",
+                        "default": "direct"
                     }
                 },
                 "required": ["markdown_file", "output_file"]
@@ -318,23 +423,391 @@ async def list_tools() -> list[Tool]:
                         "type": "boolean",
                         "description": "是否清理标题序号(如'一、'、'1.'等),默认true",
                         "default": True
+                    },
+                    "output_format": {
+                        "type": "string",
+                        "enum": ["json", "ndjson"],
+                        "description": "输出格式: json=紧凑 JSON(默认), ndjson=首行为统计信息,之后每个标题一行",
+                        "default": "json"
                     }
                 },
                 "required": ["file_path"]
             }
+        ),
+
+        # 11. 项目文档索引(增量)
+        Tool(
+            name="index_directory",
+            description="扫描项目目录并生成持久化文档清单(路径、大小、修改时间、类型、指纹、页数/工作表数/幻灯片数),再次扫描时仅处理有变化的文件",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "directory": {
+                        "type": "string",
+                        "description": "项目文档根目录的绝对路径"
+                    },
+                    "recursive": {
+                        "type": "boolean",
+                        "description": "是否递归扫描子目录（默认 true）",
+                        "default": True
+                    },
+                    "force": {
+                        "type": "boolean",
+                        "description": "是否忽略已有清单强制全量重建（默认 false）",
+                        "default": False
+                    },
+                    "list_files": {
+                        "type": "boolean",
+                        "description": "是否在结果中按目录列出文档清单（默认 false）",
+                        "default": False
+                    },
+                    "build_search_index": {
+                        "type": "boolean",
+                        "description": "是否同时增量更新全文检索索引(供 search_documents 使用,默认 false)",
+                        "default": False
+                    }
+                },
+                "required": ["directory"]
+            }
+        ),
+
+        # 12. 全文检索
+        Tool(
+            name="search_documents",
+            description="在项目文档全文索引中检索关键词,按 BM25 相关度排序,返回命中片段及所在页/章节段落/单元格/幻灯片位置。首次调用会自动建立索引,之后仅增量更新有变化的文档",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "directory": {
+                        "type": "string",
+                        "description": "项目文档根目录的绝对路径"
+                    },
+                    "query": {
+                        "type": "string",
+                        "description": "检索内容,多个关键词用空格分隔,如 '混凝土 强度'"
+                    },
+                    "file_types": {
+                        "type": "array",
+                        "items": {
+                            "type": "string",
+                            "enum": ["word", "excel", "powerpoint", "pdf"]
+                        },
+                        "description": "限定文档类型（可选）"
+                    },
+                    "match_all": {
+                        "type": "boolean",
+                        "description": "是否要求所有关键词都命中（默认 true,false 表示任一命中）",
+                        "default": True
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "最大返回条数（默认 20）",
+                        "default": 20
+                    },
+                    "refresh": {
+                        "type": "boolean",
+                        "description": "检索前是否增量更新索引（默认 true）",
+                        "default": True
+                    }
+                },
+                "required": ["directory", "query"]
+            }
+        ),
+
+        # 13. 重复文档检测
+        Tool(
+            name="find_duplicates",
+            description="检测项目目录中的重复和近似重复文档(如\"最终版\"\"最终版2\"等多次另存的版本),按内容相似度聚类并给出每组的代表文档。签名持久化保存,再次检测时仅计算有变化的文档",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "directory": {
+                        "type": "string",
+                        "description": "项目文档根目录的绝对路径"
+                    },
+                    "threshold": {
+                        "type": "number",
+                        "description": "判定为重复的内容相似度阈值 0-1（默认 0.8）",
+                        "default": 0.8
+                    }
+                },
+                "required": ["directory"]
+            }
+        ),
+
+        # 14. 目录监控
+        Tool(
+            name="watch_directory",
+            description="在后台监控项目目录的文档变化(inotify,不可用时轮询),自动重新解析变化的文档并增量更新全文索引,使后续解析和检索无需等待",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "directory": {
+                        "type": "string",
+                        "description": "项目文档根目录的绝对路径（action 为 status 时可省略）"
+                    },
+                    "action": {
+                        "type": "string",
+                        "enum": ["start", "stop", "status"],
+                        "description": "操作: start 开始监控, stop 停止监控, status 查看监控状态（默认 start）",
+                        "default": "start"
+                    }
+                },
+                "required": []
+            }
+        ),
+
+        # 15. 智能解析(针对性提取)
+        Tool(
+            name="parse_document_smart",
+            description="智能解析文档: targeted 模式流式读取文档,只返回包含关键词的段落/页/单元格/幻灯片及前后上下文,并在达到 token 预算时停止,适合从大文档中定位相关内容;full 模式返回完整解析结果",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "文档的绝对路径"
+                    },
+                    "mode": {
+                        "type": "string",
+                        "enum": ["targeted", "full"],
+                        "description": "解析模式：targeted=针对性提取（默认），full=完整解析",
+                        "default": "targeted"
+                    },
+                    "keywords": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "关键词列表（targeted 模式必需）"
+                    },
+                    "context": {
+                        "type": "integer",
+                        "description": "命中内容前后各保留的段落/行/页数（默认 1）",
+                        "default": 1
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "description": "返回内容的 token 预算（默认 4000，full 模式同样生效）",
+                        "default": 4000
+                    },
+                    "match_all": {
+                        "type": "boolean",
+                        "description": "是否要求同一段落命中所有关键词（默认 false）",
+                        "default": False
+                    }
+                },
+                "required": ["file_path"]
+            }
+        ),
+
+        # 16. 多文档上下文构建
+        Tool(
+            name="build_context",
+            description="从多个文档中构建与问题相关的精简上下文: 并行读取文档,按 BM25 相关度为段落排序,去除跨文档的重复段落,在 token 预算内装入最相关的段落并标注来源(文件及页码/段落/单元格位置)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "file_paths": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "文档路径列表"
+                    },
+                    "query": {
+                        "type": "string",
+                        "description": "用户问题或关键词"
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "description": "上下文 token 预算（默认 10000）",
+                        "default": 10000
+                    }
+                },
+                "required": ["file_paths", "query"]
+            }
+        ),
+
+        # 17. 关键事实查询
+        Tool(
+            name="extract_key_facts",
+            description="查询项目关键事实(日期、金额、百分比、单位、施工节点、项目信息、风险事件、决策记录): 事实在文档首次出现或变化时提取一次并保存在本地事实库,查询时只处理变化的文档,每条事实附带来源文件及页码/段落/单元格位置",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "directory": {
+                        "type": "string",
+                        "description": "项目文档根目录的绝对路径"
+                    },
+                    "fact_types": {
+                        "type": "array",
+                        "items": {
+                            "type": "string",
+                            "enum": config.FACT_TYPES
+                        },
+                        "description": "限定事实类型（默认全部）"
+                    },
+                    "keyword": {
+                        "type": "string",
+                        "description": "事实值或上下文中包含的关键词"
+                    },
+                    "path": {
+                        "type": "string",
+                        "description": "限定来源文档（路径中包含的文本）"
+                    },
+                    "date_from": {
+                        "type": "string",
+                        "description": "起始日期 YYYY-MM-DD（仅对日期、施工节点生效）"
+                    },
+                    "date_to": {
+                        "type": "string",
+                        "description": "截止日期 YYYY-MM-DD（仅对日期、施工节点生效）"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "最大返回条数（默认 50）",
+                        "default": 50
+                    },
+                    "refresh": {
+                        "type": "boolean",
+                        "description": "查询前是否增量更新事实库（默认 true）",
+                        "default": True
+                    }
+                },
+                "required": ["directory"]
+            }
+        ),
+
+        # 18. 报告模板匹配
+        Tool(
+            name="match_report_template",
+            description="按 report_templates.json 中的分级关键词(高/中/低 10/5/2 分)为文档匹配报告模板: 全部模板关键词编译为一个多模式自动机,一次扫描文件名和文档内容,返回按关键词匹配度排序的模板及各级关键词命中明细",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "file_paths": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "文档路径列表（可为单个文档或整批文档）"
+                    },
+                    "text": {
+                        "type": "string",
+                        "description": "已解析的文档文本（可与 file_paths 同时提供）"
+                    },
+                    "top_n": {
+                        "type": "integer",
+                        "description": "每个文档列出的候选模板数（默认 3）",
+                        "default": 3
+                    }
+                }
+            }
+        ),
+
+        # 19. 服务器运行指标
+        Tool(
+            name="get_server_stats",
+            description="获取服务器运行指标: 各工具调用次数、错误数、延迟分布(p50/p95)和读取字节数,各类文档的解析吞吐量(段落/行/页/幻灯片每秒),解析缓存命中率,以及按类别统计的错误",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "output_format": {
+                        "type": "string",
+                        "enum": ["text", "json"],
+                        "description": "输出格式: text=可读摘要, json=完整指标(含延迟直方图)（默认 text）",
+                        "default": "text"
+                    },
+                    "reset": {
+                        "type": "boolean",
+                        "description": "读取后是否清零指标（默认 false）",
+                        "default": False
+                    }
+                }
+            }
+        ),
+
+        # 20. 批量生成Word报告
+        Tool(
+            name="batch_generate_word_reports",
+            description="批量将多个Markdown报告转换为Word文档(如同一类报告的多个子项目),在多个工作进程中并行生成,每个进程复用已编译的模板,返回每个报告的生成结果和耗时",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "jobs": {
+                        "type": "array",
+                        "description": "生成任务列表",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "markdown_file": {
+                                    "type": "string",
+                                    "description": "Markdown源文件的绝对路径"
+                                },
+                                "output_file": {
+                                    "type": "string",
+                                    "description": "Word输出文件的绝对路径"
+                                },
+                                "project_info": {
+                                    "type": "object",
+                                    "description": "项目信息(用于页眉页脚):project_name、report_type、generate_date"
+                                },
+                                "template_type": {
+                                    "type": "string",
+                                    "description": "该报告的模板类型(可选,覆盖统一设置)"
+                                }
+                            },
+                            "required": ["markdown_file", "output_file"]
+                        }
+                    },
+                    "template_type": {
+                        "type": "string",
+                        "enum": ["project_summary", "inspection_report",
+                                "progress_analysis", "organize_plan"],
+                        "description": "统一的报告模板类型（默认 project_summary）",
+                        "default": "project_summary"
+                    },
+                    "style_mode": {
+                        "type": "string",
+                        "enum": ["direct", "named"],
+                        "description": "样式模式:direct=直接格式(默认),named=命名样式",
+                        "default": "direct"
+                    },
+                    "workers": {
+                        "type": "integer",
+                        "description": "工作进程数（默认 REPORT_WORKERS 配置,最多不超过任务数）",
+                        "minimum": 1
+                    },
+                    "output_format": {
+                        "type": "string",
+                        "enum": ["text", "json"],
+                        "description": "输出格式: text=可读摘要, json=完整结果（默认 text）",
+                        "default": "text"
+                    }
+                },
+                "required": ["jobs"]
+            }
         )
     ]
 
 
 @server.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
-    """执行工具调用"""
+    """执行工具调用 (统计调用次数和耗时,按 PROFILE_TOOLS 配置剖析)"""
+    with metrics.track(name), profiler.profile(name, arguments):
+        return await _call_tool(name, arguments)
+
+
+async def _call_tool(name: str, arguments: Any) -> list[TextContent]:
+    """分发工具调用"""
     try:
-        logger.info(f"调用工具: {name}")
-        logger.debug(f"参数: {arguments}")
+        logger.info("调用工具: %s", name)
+        logger.debug("参数: %s", arguments)
+
+        # 记录最近使用的项目目录 (供下次启动预热)
+        if config.PREWARM_RECENT_PROJECTS and os.path.isdir(arguments.get("directory") or ""):
+            from indexers.prewarm import record_recent_project
+            record_recent_project(arguments["directory"])
 
         # 1. 文档验证
         if name == "validate_document":
+            from validators import validate_document
+
             result = validate_document(arguments["file_path"])
             return [TextContent(
                 type="text",
@@ -342,8 +815,9 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             )]
 
         # 2-5. 文档解析工具
-        elif name in ["parse_word_document", "parse_excel_document",
-                      "parse_powerpoint_document", "parse_pdf_document"]:
+        elif name in _PARSE_TOOL_TYPES:
+            from parsers import ParserFactory, parse_document
+
             # 处理 parse_mode 参数
             parse_mode = arguments.get("parse_mode", "summary")
 
@@ -359,19 +833,15 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 if "max_pages" in arguments:
                     arguments.pop("max_pages")
 
-                logger.info(f"使用完整模式解析文档: {arguments['file_path']}")
+                logger.info("使用完整模式解析文档: %s", arguments['file_path'])
+            elif "max_tokens" not in arguments:
+                # 摘要模式:使用默认限制(如果用户未指定; 指定了 token 预算时由预算控制内容量)
+                for key, value in ParserFactory.SUMMARY_MODE_LIMITS[_PARSE_TOOL_TYPES[name]].items():
+                    arguments.setdefault(key, value)
+
+                logger.info("使用摘要模式解析文档: %s", arguments['file_path'])
             else:
-                # 摘要模式:使用默认限制(如果用户未指定)
-                if name == "parse_word_document" and "max_paragraphs" not in arguments:
-                    arguments["max_paragraphs"] = 100
-                elif name == "parse_excel_document" and "max_rows" not in arguments:
-                    arguments["max_rows"] = 100
-                elif name == "parse_powerpoint_document" and "max_slides" not in arguments:
-                    arguments["max_slides"] = 50
-                elif name == "parse_pdf_document" and "max_pages" not in arguments:
-                    arguments["max_pages"] = 50
-
-                logger.info(f"使用摘要模式解析文档: {arguments['file_path']}")
+                logger.info("按 token 预算解析文档: %s (%s tokens)", arguments['file_path'], arguments['max_tokens'])
 
             result = parse_document(arguments["file_path"], arguments)
 
@@ -379,15 +849,21 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             if result.get("status") == "success":
                 result["parse_mode"] = parse_mode
 
-            return [TextContent(
-                type="text",
-                text=_format_parse_result(result)
-            )]
+            output_format = arguments.get("output_format", "text")
+            if output_format == "text":
+                text = _format_parse_result(result)
+            else:
+                text = format_parse_output(result, output_format)
+            return [TextContent(type="text", text=text)]
 
         # 6. 智能摘要提取
         elif name == "extract_document_summary":
-            # 先解析文档
-            parsed = parse_document(arguments["file_path"])
+            from parsers import parse_document
+            from extractors import extract_summary
+
+            # 先解析文档 (指定了 token 预算时只读取预算内的内容)
+            options = {"max_tokens": arguments["max_tokens"]} if arguments.get("max_tokens") is not None else None
+            parsed = parse_document(arguments["file_path"], options)
 
             # 提取摘要
             summary = extract_summary(
@@ -403,14 +879,32 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 
         # 7. 批量处理
         elif name == "batch_parse_documents":
-            results = batch_parse_documents(arguments["file_paths"], arguments)
-            return [TextContent(
-                type="text",
-                text=_format_batch_result(results)
-            )]
+            from parsers import batch_parse_documents
+
+            file_paths = arguments["file_paths"]
+            duplicate_clusters = []
+            if arguments.get("skip_duplicates"):
+                from indexers import skip_duplicate_files
+                file_paths, duplicate_clusters = skip_duplicate_files(file_paths)
+
+            results = batch_parse_documents(file_paths, arguments)
+
+            output_format = arguments.get("output_format", "text")
+            if output_format == "json":
+                text = dumps({"results": results, "duplicate_clusters": duplicate_clusters})
+            elif output_format == "ndjson":
+                records = list(results)
+                if duplicate_clusters:
+                    records.append({"type": "duplicate_clusters", "clusters": duplicate_clusters})
+                text = dumps_lines(records)
+            else:
+                text = _format_batch_result(results, duplicate_clusters)
+            return [TextContent(type="text", text=text)]
 
         # 8. 元数据获取
         elif name == "get_document_metadata":
+            from validators import validate_document
+
             result = validate_document(arguments["file_path"])
             if result["valid"]:
                 return [TextContent(
@@ -437,7 +931,10 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             result = generator.generate(
                 markdown_file=arguments["markdown_file"],
                 output_file=arguments["output_file"],
-                options={"project_info": arguments.get("project_info")}
+                options={
+                    "project_info": arguments.get("project_info"),
+                    "style_mode": arguments.get("style_mode", "direct"),
+                }
             )
 
             return [TextContent(
@@ -453,17 +950,206 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 clean_numbering=arguments.get("clean_numbering", True)
             )
 
+            if arguments.get("output_format", "json") == "ndjson" and result.get("status") == "success":
+                summary = {key: value for key, value in result.items() if key != "structure"}
+                text = dumps_lines([summary, *result["structure"]])
+            else:
+                text = dumps(result)
+            return [TextContent(type="text", text=text)]
+
+        # 11. 项目文档索引
+        elif name == "index_directory":
+            from indexers import index_directory, build_search_index
+
+            result = index_directory(
+                arguments["directory"],
+                recursive=arguments.get("recursive", True),
+                force=arguments.get("force", False)
+            )
+
+            output = _format_index_result(result, list_files=arguments.get("list_files", False))
+
+            if arguments.get("build_search_index", False):
+                search_index_result = build_search_index(arguments["directory"])
+                output += _format_search_index_result(search_index_result)
+
+            return [TextContent(
+                type="text",
+                text=output
+            )]
+
+        # 12. 全文检索
+        elif name == "search_documents":
+            from indexers import search_documents
+
+            result = search_documents(
+                arguments["directory"],
+                arguments["query"],
+                limit=arguments.get("limit", 20),
+                file_types=arguments.get("file_types"),
+                match_all=arguments.get("match_all", True),
+                refresh=arguments.get("refresh", True)
+            )
+
+            return [TextContent(
+                type="text",
+                text=_format_search_result(result)
+            )]
+
+        # 13. 重复文档检测
+        elif name == "find_duplicates":
+            from indexers import find_duplicates
+
+            result = find_duplicates(
+                arguments["directory"],
+                threshold=arguments.get("threshold")
+            )
+
+            return [TextContent(
+                type="text",
+                text=_format_duplicates_result(result)
+            )]
+
+        # 14. 目录监控
+        elif name == "watch_directory":
+            from indexers import start_watching, stop_watching, get_watch_status
+
+            action = arguments.get("action", "start")
+
+            if action == "status":
+                statuses = get_watch_status()
+            elif "directory" not in arguments:
+                raise ValueError("start/stop 操作需要提供 directory 参数")
+            elif action == "stop":
+                statuses = [stop_watching(arguments["directory"])]
+            else:
+                statuses = [start_watching(arguments["directory"])]
+
+            return [TextContent(
+                type="text",
+                text=_format_watch_status(statuses)
+            )]
+
+        # 15. 智能解析
+        elif name == "parse_document_smart":
+            from parsers import parse_document
+            from extractors import extract_targeted
+
+            if arguments.get("mode", "targeted") == "full":
+                result = parse_document(
+                    arguments["file_path"],
+                    {"max_tokens": arguments.get("max_tokens") or config.SMART_PARSE_MAX_TOKENS}
+                )
+                return [TextContent(
+                    type="text",
+                    text=_format_parse_result(result)
+                )]
+
+            result = extract_targeted(
+                arguments["file_path"],
+                arguments.get("keywords") or [],
+                context=arguments.get("context", 1),
+                max_tokens=arguments.get("max_tokens"),
+                match_all=arguments.get("match_all", False)
+            )
+
+            return [TextContent(
+                type="text",
+                text=_format_targeted_result(result)
+            )]
+
+        # 16. 多文档上下文构建
+        elif name == "build_context":
+            from extractors import build_context
+
+            result = build_context(
+                arguments["file_paths"],
+                arguments["query"],
+                max_tokens=arguments.get("max_tokens")
+            )
+
             return [TextContent(
                 type="text",
-                text=json.dumps(result, ensure_ascii=False, indent=2)
+                text=_format_context_result(result)
             )]
 
+        # 17. 关键事实查询
+        elif name == "extract_key_facts":
+            from indexers import query_facts
+
+            result = query_facts(
+                arguments["directory"],
+                fact_types=arguments.get("fact_types"),
+                keyword=arguments.get("keyword"),
+                path=arguments.get("path"),
+                date_from=arguments.get("date_from"),
+                date_to=arguments.get("date_to"),
+                limit=arguments.get("limit", 50),
+                refresh=arguments.get("refresh", True)
+            )
+
+            return [TextContent(
+                type="text",
+                text=_format_facts_result(result)
+            )]
+
+        # 18. 报告模板匹配
+        elif name == "match_report_template":
+            from extractors import match_report_template
+
+            result = match_report_template(
+                file_paths=arguments.get("file_paths"),
+                text=arguments.get("text"),
+                top_n=arguments.get("top_n", 3)
+            )
+
+            return [TextContent(
+                type="text",
+                text=_format_template_match_result(result)
+            )]
+
+        # 19. 服务器运行指标
+        elif name == "get_server_stats":
+            stats = metrics.snapshot()
+            if _prewarmer is not None:
+                stats["prewarm"] = _prewarmer.status()
+            if profiler.enabled:
+                stats["profiling"] = profiler.status()
+            if arguments.get("reset", False):
+                metrics.reset()
+
+            if arguments.get("output_format", "text") == "json":
+                text = json.dumps(stats, ensure_ascii=False, indent=2)
+            else:
+                text = _format_server_stats(stats)
+            return [TextContent(type="text", text=text)]
+
+        # 20. 批量生成Word报告
+        elif name == "batch_generate_word_reports":
+            from generators import batch_generate_word_reports
+
+            result = batch_generate_word_reports(
+                arguments["jobs"],
+                defaults={
+                    "template_type": arguments.get("template_type", "project_summary"),
+                    "style_mode": arguments.get("style_mode", "direct"),
+                },
+                workers=arguments.get("workers"),
+            )
+
+            if arguments.get("output_format", "text") == "json":
+                text = json.dumps(result, ensure_ascii=False, indent=2)
+            else:
+                text = _format_batch_generation_result(result)
+            return [TextContent(type="text", text=text)]
+
         else:
             raise ValueError(f"未知工具: {name}")
 
     except Exception as e:
-        logger.error(f"工具执行错误: {e}", exc_info=True)
+        logger.error("工具执行错误: %s", e, exc_info=True)
         error_result = handle_error(e, {"tool": name, "arguments": arguments})
+        metrics.record_error(error_result["user_message"])
         return [TextContent(
             type="text",
             text=ErrorHandler.format_error_for_user(error_result)
@@ -568,6 +1254,13 @@ def _format_parse_result(result: dict) -> str:
   - 总字符数: {summary.get('total_text_length', 0)}
 """
 
+    token_budget = summary.get('token_budget')
+    if token_budget:
+        output += f"\n🎯 Token 预算: 已使用 {token_budget['tokens_used']} / {token_budget['max_tokens']}"
+        if token_budget['truncated']:
+            output += " (预算已用完,后续内容未读取)"
+        output += "\n"
+
     # 根据模式添加不同的提示
     if parse_mode == "full":
         output += f"\n⚠️ 提示: 完整模式返回了所有内容,可能消耗大量 token"
@@ -621,7 +1314,7 @@ def _format_summary_result(summary: dict) -> str:
     return output
 
 
-def _format_batch_result(results: list) -> str:
+def _format_batch_result(results: list, duplicate_clusters: list = None) -> str:
     """格式化批量处理结果"""
     total = len(results)
     success = sum(1 for r in results if r.get('status') == 'success')
@@ -653,6 +1346,16 @@ def _format_batch_result(results: list) -> str:
                 error_msg = result.get('error_message', 'Unknown error')
                 output += f"  • {file_info.get('name', 'Unknown')}: {error_msg}\n"
 
+    # 显示跳过的重复文档
+    if duplicate_clusters:
+        output += "\n⏭️ 跳过的重复文档:\n"
+        for cluster in duplicate_clusters:
+            for duplicate in cluster["duplicates"]:
+                output += (
+                    f"  • {os.path.basename(duplicate['path'])} "
+                    f"(与 {os.path.basename(cluster['representative'])} {_describe_similarity(duplicate)})\n"
+                )
+
     return output
 
 
@@ -669,6 +1372,16 @@ def _format_metadata(file_info: dict) -> str:
 """
 
 
+def _format_file_size(file_size: int) -> str:
+    """格式化文件大小"""
+    if file_size < 1024:
+        return f"{file_size} B"
+    elif file_size < 1024 * 1024:
+        return f"{file_size / 1024:.1f} KB"
+    else:
+        return f"{file_size / (1024 * 1024):.1f} MB"
+
+
 def _format_generation_result(result: dict) -> str:
     """格式化Word生成结果"""
     if result.get("status") == "error":
@@ -682,14 +1395,9 @@ def _format_generation_result(result: dict) -> str:
     file_size = result.get('file_size', 0)
     warnings = result.get('warnings', [])
     template_type = result.get('template_type', 'Unknown')
+    style_mode = result.get('style_mode', 'direct')
 
-    # 格式化文件大小
-    if file_size < 1024:
-        size_str = f"{file_size} B"
-    elif file_size < 1024 * 1024:
-        size_str = f"{file_size / 1024:.1f} KB"
-    else:
-        size_str = f"{file_size / (1024 * 1024):.1f} MB"
+    size_str = _format_file_size(file_size)
 
     # 模板类型中文名称映射
     template_names = {
@@ -705,6 +1413,7 @@ def _format_generation_result(result: dict) -> str:
 📄 输出文件: {output_file}
 📊 文件大小: {size_str}
 📝 模板类型: {template_name}
+🎨 样式模式: {"命名样式" if style_mode == "named" else "直接格式"}
 🔢 处理段落: {sections_processed} 个
 """
 
@@ -723,6 +1432,453 @@ def _format_generation_result(result: dict) -> str:
     return output
 
 
+def _format_batch_generation_result(result: dict) -> str:
+    """格式化批量Word生成结果"""
+    output = f"""✅ 批量生成完成
+
+📊 生成统计:
+  - 报告总数: {result['total']}
+  - 成功: {result['succeeded']}
+  - 失败: {result['failed']}
+  - 工作进程: {result['workers']} 个
+  - 总耗时: {result['elapsed_seconds']:.2f} 秒 (各报告累计 {result['jobs_seconds']:.2f} 秒)
+"""
+
+    if result['succeeded'] > 0:
+        output += "\n✅ 生成成功的报告:\n"
+        for job in result['results']:
+            if job.get('status') == 'success':
+                warnings = job.get('warnings') or []
+                warning_note = f", {len(warnings)} 条警告" if warnings else ""
+                output += (
+                    f"  {job['index'] + 1}. {job.get('output_file')} "
+                    f"({_format_file_size(job.get('file_size', 0))}, "
+                    f"{job.get('sections_processed', 0)} 个段落, {job['elapsed_seconds']:.2f} 秒{warning_note})\n"
+                )
+
+    if result['failed'] > 0:
+        output += "\n❌ 生成失败的报告:\n"
+        for job in result['results']:
+            if job.get('status') != 'success':
+                source = os.path.basename(job.get('markdown_file') or '') or 'Unknown'
+                output += f"  {job['index'] + 1}. {source}: {job.get('error', 'Unknown error')}\n"
+
+    return output
+
+
+def _format_index_result(result: dict, list_files: bool = False) -> str:
+    """格式化目录索引结果"""
+    changes = result.get("changes", {})
+    type_names = {
+        "word": "Word",
+        "excel": "Excel",
+        "powerpoint": "PowerPoint",
+        "pdf": "PDF",
+        "text": "文本"
+    }
+
+    output = f"""✅ 文档索引完成
+
+📁 目录: {result.get('root', 'Unknown')}
+🗂️ 清单文件: {result.get('manifest_path', 'Unknown')}
+⏱️ 耗时: {result.get('elapsed_seconds', 0)} 秒
+
+📊 文档统计:
+  - 文档总数: {result.get('total_files', 0)}
+  - 总大小: {result.get('total_size', 0) / (1024 * 1024):.1f} MB
+"""
+    for file_type, count in sorted(result.get("by_type", {}).items(), key=lambda x: -x[1]):
+        output += f"  - {type_names.get(file_type, file_type)}: {count}\n"
+
+    output += f"""
+🔄 变化情况:
+  - 新增: {len(changes.get('added', []))}
+  - 修改: {len(changes.get('modified', []))}
+  - 删除: {len(changes.get('removed', []))}
+  - 未变化: {result.get('unchanged', 0)}
+"""
+
+    for label, key in (("新增", "added"), ("修改", "modified"), ("删除", "removed")):
+        paths = changes.get(key, [])
+        if paths:
+            output += f"\n{label}的文档:\n"
+            for path in paths[:20]:
+                output += f"  • {path}\n"
+            if len(paths) > 20:
+                output += f"  ... 还有 {len(paths) - 20} 个\n"
+
+    if list_files:
+        # 按目录分组列出清单
+        by_dir = {}
+        for entry in result.get("files", {}).values():
+            by_dir.setdefault(os.path.dirname(entry["path"]) or ".", []).append(entry)
+
+        output += "\n📋 文档清单:\n"
+        for directory in sorted(by_dir):
+            output += f"\n{directory}/\n"
+            for entry in sorted(by_dir[directory], key=lambda e: e["path"]):
+                counts = []
+                if "pages" in entry:
+                    counts.append(f"{entry['pages']}页")
+                if "sheets" in entry:
+                    counts.append(f"{entry['sheets']}个工作表")
+                if "slides" in entry:
+                    counts.append(f"{entry['slides']}张幻灯片")
+                count_text = f", {', '.join(counts)}" if counts else ""
+                output += (
+                    f"  - {os.path.basename(entry['path'])} "
+                    f"({entry['size'] / 1024:.1f} KB, {entry['mtime']}{count_text})\n"
+                )
+
+    return output
+
+
+def _format_search_index_result(result: dict) -> str:
+    """格式化全文索引更新结果"""
+    output = f"""
+🔎 全文索引:
+  - 索引文件: {result.get('index_path', 'Unknown')}
+  - 本次索引: {result.get('indexed', 0)} 个文档
+  - 本次移除: {result.get('removed', 0)} 个文档
+  - 已索引文档: {result.get('total_documents', 0)} 个 (内容单元 {result.get('total_units', 0)} 个)
+  - 耗时: {result.get('elapsed_seconds', 0)} 秒
+"""
+
+    failed = result.get("failed", [])
+    if failed:
+        output += f"\n⚠️ 索引失败 ({len(failed)} 个):\n"
+        for item in failed[:10]:
+            output += f"  • {item['path']}: {item['error']}\n"
+        if len(failed) > 10:
+            output += f"  ... 还有 {len(failed) - 10} 个\n"
+
+    return output
+
+
+def _format_search_result(result: dict) -> str:
+    """格式化全文检索结果"""
+    results = result.get("results", [])
+
+    output = f"""✅ 检索完成
+
+🔍 检索内容: {result.get('query', '')}
+📁 目录: {result.get('root', 'Unknown')}
+📊 命中: {result.get('total_results', 0)} 条 (检索耗时 {result.get('elapsed_seconds', 0)} 秒)
+"""
+
+    refresh = result.get("refresh")
+    if refresh and (refresh.get("indexed") or refresh.get("removed")):
+        output += (
+            f"🔄 索引已更新: 新索引 {refresh['indexed']} 个, 移除 {refresh['removed']} 个文档 "
+            f"(耗时 {refresh['elapsed_seconds']} 秒)\n"
+        )
+
+    if not results:
+        output += "\n💡 提示: 未找到匹配内容,可尝试减少关键词或设置 match_all=false\n"
+        return output
+
+    output += "\n📝 检索结果:\n"
+    for i, item in enumerate(results, 1):
+        output += f"\n{i}. {item['path']} · {item['location_text']} (相关度 {item['score']})\n"
+        output += f"   {item['snippet']}\n"
+        for cell in item.get("cells", [])[:5]:
+            position = cell.get("cell") or f"第 {cell['col']} 列"
+            output += f"   ▸ {position}: {cell['value']}\n"
+
+    return output
+
+
+def _describe_similarity(duplicate: dict) -> str:
+    """描述重复文档与代表文档的相似程度"""
+    if duplicate.get("exact"):
+        return "内容完全相同"
+    if duplicate.get("similarity") is not None:
+        return f"相似度 {duplicate['similarity']:.0%}"
+    return "疑似重复"
+
+
+def _format_duplicates_result(result: dict) -> str:
+    """格式化重复文档检测结果"""
+    clusters = result.get("clusters", [])
+
+    output = f"""✅ 重复文档检测完成
+
+📁 目录: {result.get('root', 'Unknown')}
+📊 统计:
+  - 文档总数: {result.get('total_documents', 0)} (有文本内容 {result.get('signed_documents', 0)} 个)
+  - 重复组: {len(clusters)} 组, 可跳过 {result.get('duplicate_count', 0)} 个文档
+  - 相似度阈值: {result.get('threshold')}
+  - 耗时: {result.get('elapsed_seconds', 0)} 秒 (新计算签名 {result.get('signatures_computed', 0)} 个)
+"""
+
+    if not clusters:
+        output += "\n💡 未发现重复文档\n"
+        return output
+
+    output += "\n📑 重复文档组:\n"
+    for i, cluster in enumerate(clusters, 1):
+        output += f"\n{i}. 保留: {cluster['representative']}\n"
+        for duplicate in cluster["duplicates"]:
+            output += f"   ↳ {duplicate['path']} ({_describe_similarity(duplicate)})\n"
+
+    return output
+
+
+def _format_targeted_result(result: dict) -> str:
+    """格式化针对性提取结果"""
+    file_info = result.get("file_info", {})
+    passages = result.get("passages", [])
+    counts = ", ".join(f"{k} {v} 处" for k, v in result.get("keyword_counts", {}).items())
+
+    output = f"""✅ 针对性提取完成
+
+📄 文件: {file_info.get('name', 'Unknown')}
+🔍 关键词: {counts}
+📊 扫描 {result.get('units_scanned', 0)} 个内容单元, 提取 {len(passages)} 个片段, 约 {result.get('tokens_used', 0)}/{result.get('max_tokens', 0)} tokens
+"""
+
+    if result.get("truncated"):
+        output += "⚠️ 已达到 token 预算,后续内容未读取\n"
+
+    if not passages:
+        output += "\n💡 提示: 文档中未找到关键词,可尝试同义词或减少关键词\n"
+        return output
+
+    for i, passage in enumerate(passages, 1):
+        output += f"\n### 片段 {i} · {passage['location_text']} (命中: {', '.join(passage['matched_keywords'])})\n"
+        for unit in passage["units"]:
+            marker = "▶" if unit["is_match"] else " "
+            output += f"{marker} [{unit['location_text']}] {unit['text']}\n"
+            for cell in unit.get("cells", []):
+                position = cell.get("cell") or f"第 {cell['col']} 列"
+                output += f"    ▸ {position}: {cell['value']}\n"
+
+    return output
+
+
+def _format_context_result(result: dict) -> str:
+    """格式化多文档上下文 (Markdown,每个段落附来源引用)"""
+    documents = result.get("documents", [])
+
+    output = f"""## 📚 相关文档上下文
+
+**问题**: {result.get('query', '')}
+**统计**: 候选段落 {result.get('candidate_passages', 0)} 个, 相关 {result.get('matched_passages', 0)} 个, 选用 {result.get('selected_passages', 0)} 个 (去重 {result.get('duplicates_removed', 0)} 个, 超出预算 {result.get('dropped_for_budget', 0)} 个), 约 {result.get('tokens_used', 0)}/{result.get('max_tokens', 0)} tokens
+"""
+
+    if not documents:
+        output += "\n💡 未找到相关内容,可尝试扩大文档范围或调整问题表述\n"
+
+    for i, doc in enumerate(documents, 1):
+        output += f"\n### 文档{i}: {doc['name']}\n"
+        output += f"**路径**: {doc['path']} | **相关度**: {doc['relevance']:.0%}\n\n"
+        for passage in doc["passages"]:
+            text = passage["text"].replace("\n", "\n> ")
+            output += f"> {text}\n>\n> 📄 来源: {doc['name']} {passage['location_text']}\n\n"
+
+    for item in result.get("failed", []):
+        output += f"⚠️ 读取失败: {item['path']} - {item['error']}\n"
+
+    return output
+
+
+def _format_facts_result(result: dict) -> str:
+    """格式化关键事实查询结果 (按事实类型分组)"""
+    type_names = {
+        "date": "📅 日期",
+        "amount": "💰 金额(元)",
+        "percentage": "📈 百分比",
+        "organization": "🏢 单位",
+        "milestone": "🚩 施工节点",
+        "project_info": "📋 项目信息",
+        "risk_event": "⚠️ 风险事件",
+        "decision_record": "📝 决策记录",
+    }
+    facts = result.get("facts", [])
+    by_type = result.get("by_type", {})
+    counts = ", ".join(f"{type_names.get(t, t)} {n} 条" for t, n in by_type.items()) or "无"
+
+    output = f"""✅ 关键事实查询完成
+
+📁 项目目录: {result.get('root', '')}
+📊 匹配 {result.get('total_matched', 0)} 条事实, 显示 {len(facts)} 条 ({counts})
+"""
+
+    refresh = result.get("refresh")
+    if refresh:
+        output += (
+            f"🔄 事实库: {refresh['total_documents']} 个文档, {refresh['total_facts']} 条事实 "
+            f"(本次提取 {refresh['extracted']} 个, 移除 {refresh['removed']} 个, 耗时 {refresh['elapsed_seconds']} 秒)\n"
+        )
+        for item in refresh.get("failed", []):
+            output += f"⚠️ 提取失败: {item['path']} - {item['error']}\n"
+
+    if not facts:
+        output += "\n💡 未找到匹配的事实,可尝试放宽类型、关键词或日期范围\n"
+        return output
+
+    for fact_type in config.FACT_TYPES:
+        group = [fact for fact in facts if fact["type"] == fact_type]
+        if not group:
+            continue
+        output += f"\n### {type_names[fact_type]}\n"
+        for fact in group:
+            source = fact["source"]
+            output += f"- **{fact['value']}** — {fact['context']}\n"
+            output += f"  📄 来源: {source['name']} {source['location_text']}\n"
+
+    return output
+
+
+def _format_template_match_result(result: dict) -> str:
+    """格式化报告模板匹配结果"""
+    tier_names = {"high": "高", "medium": "中", "low": "低"}
+    templates = result.get("templates", [])
+
+    output = f"""✅ 报告模板匹配完成
+
+🎯 推荐模板: {result.get('recommended')}"""
+    if not result.get("confident"):
+        output += f" (最高关键词匹配度低于 {result.get('min_confidence')},使用默认模板)"
+    output += f"""
+📊 关键词匹配度为综合得分中的关键词部分 (权重 {result.get('keyword_weight', 0):.0%}),需结合文档类型和目录结构得分
+"""
+
+    output += "\n📋 模板排名:\n"
+    for i, item in enumerate(templates, 1):
+        output += (
+            f"\n{i}. {item['name']} ({item['template']}) - 匹配度 {item['keyword_score']:.0%}, "
+            f"得分 {item['points']}, 关键词覆盖 {item['coverage']:.0%}, 加权 {item['weighted_score']}\n"
+        )
+        for tier, hits in item["tiers"].items():
+            if hits:
+                keywords = ", ".join(f"{keyword}×{count}" for keyword, count in hits.items())
+                output += f"   - {tier_names.get(tier, tier)}权重: {keywords}\n"
+
+    documents = result.get("documents", [])
+    if len(documents) > 1:
+        output += "\n📄 各文档匹配:\n"
+        for doc in documents:
+            candidates = ", ".join(
+                f"{item['name']} {item['keyword_score']:.0%}" for item in doc["templates"] if item["points"]
+            ) or "无关键词命中"
+            output += f"  - {doc['name']}: {candidates}\n"
+
+    for item in result.get("failed", []):
+        output += f"⚠️ 读取失败: {item['path']} - {item['error']}\n"
+
+    return output
+
+
+def _format_server_stats(stats: dict) -> str:
+    """格式化服务器运行指标"""
+    output = f"""📈 服务器运行指标
+
+⏱️ 统计开始: {stats['started_at']} (已运行 {stats['uptime_seconds']:.0f} 秒)
+📞 工具调用: {stats['total_calls']} 次
+"""
+
+    tools = stats.get("tools", {})
+    if tools:
+        output += "\n🛠️ 工具延迟:\n"
+        for name, tool in sorted(tools.items(), key=lambda item: -item[1]["total_seconds"]):
+            output += (
+                f"  - {name}: {tool['calls']} 次, 错误 {tool['errors']} 次, "
+                f"p50 {tool['p50_ms']} ms, p95 {tool['p95_ms']} ms, 最大 {tool['max_ms']} ms, "
+                f"合计 {tool['total_seconds']} 秒"
+            )
+            if tool["bytes_read"]:
+                output += f", 读取 {tool['bytes_read'] / 1024 / 1024:.2f} MB"
+            output += "\n"
+
+    parsing = stats.get("parsing", {})
+    if parsing:
+        output += "\n📄 解析吞吐量 (未命中缓存的解析):\n"
+        for file_type, item in parsing.items():
+            output += (
+                f"  - {file_type}: {item['documents']} 个文档, {item['units']} {item['unit']}, "
+                f"{item['units_per_second']} {item['unit']}/秒, {item['mb_per_second']} MB/秒\n"
+            )
+
+    cache = stats["cache"]
+    if cache["enabled"]:
+        hit_ratio = f"{cache['hit_ratio']:.0%}" if cache["hit_ratio"] is not None else "-"
+        output += (
+            f"\n💾 解析缓存: {cache['entries']}/{cache['max_entries']} 条, "
+            f"命中率 {hit_ratio} (命中 {cache['hits']} 次, 未命中 {cache['misses']} 次)\n"
+        )
+    else:
+        output += "\n💾 解析缓存: 未启用\n"
+
+    errors = stats.get("errors_by_category", {})
+    if errors:
+        output += "\n❗ 错误类别:\n"
+        for category, count in errors.items():
+            output += f"  - {category}: {count} 次\n"
+
+    profiling = stats.get("profiling")
+    if profiling:
+        output += (
+            f"\n🔬 性能剖析 ({profiling['mode']}): 已剖析 {profiling['profiled']} 次, "
+            f"保存 {profiling['saved']} 条, 限流跳过 {profiling['rate_limited']} 次 - {profiling['output_dir']}\n"
+        )
+
+    prewarm = stats.get("prewarm")
+    if prewarm:
+        output += f"\n🔥 启动预热: {prewarm['state']}"
+        if prewarm.get("elapsed_seconds") is not None:
+            output += f" (耗时 {prewarm['elapsed_seconds']} 秒)"
+        output += "\n"
+
+    return output
+
+
+def _format_watch_status(statuses: list) -> str:
+    """格式化目录监控状态"""
+    if not statuses:
+        return "ℹ️ 当前没有监控中的目录\n"
+
+    backend_names = {"inotify": "inotify 事件", "polling": "定时轮询"}
+    output = "👀 目录监控状态\n"
+
+    for status in statuses:
+        state = "运行中" if status.get("running") else "已停止"
+        output += f"\n📁 {status['root']} ({state})\n"
+        if status.get("backend"):
+            output += f"  - 监控方式: {backend_names.get(status['backend'], status['backend'])}\n"
+        if status.get("started_at"):
+            output += f"  - 开始时间: {status['started_at']}\n"
+            output += f"  - 已处理变化: {status['processed']} 个 (失败 {status['errors']} 个, 待处理 {status['pending']} 个)\n"
+        if status.get("last_refresh_at"):
+            output += f"  - 最近更新: {status['last_refresh_at']}\n"
+        cache = status.get("cache")
+        if cache:
+            output += (
+                f"  - 解析缓存: {cache['entries']}/{cache['max_entries']} 条 "
+                f"(命中 {cache['hits']} 次, 未命中 {cache['misses']} 次)\n"
+            )
+
+    return output
+
+
+# 标题样式名中的级别 ("Heading 1"、"Heading2")
+_HEADING_STYLE_RE = re.compile(r'Heading\s*(\d+)')
+
+# 标题序号: 以下各类序号依次各去除一次 (如 "一、1. 概况" 去除 "一、" 和 "1. "),
+# 合并为一个模式,每个标题只匹配一次
+_HEADING_NUMBERING_RE = re.compile(
+    r'^(?:[一二三四五六七八九十]+[、\.]?\s*)?'   # 中文数字 + 顿号/点
+    r'(?:\d+[\.\)、]\s*)?'                      # 阿拉伯数字 + 点/括号/顿号
+    r'(?:\d+\.\d+[\.\s])?'                      # 多级编号 (1.1, 1.2.3)
+    r'(?:\(\d+\)\s*)?'                          # 括号数字
+    r'(?:第[一二三四五六七八九十\d]+[章节条款]\s*)?'  # 第X章/节
+    r'(?:[A-Z][\.\)]\s*)?'                      # 大写字母编号
+)
+
+# 文档结构缓存 (按文件和提取参数缓存,文件 size/mtime 变化后失效)
+_structure_cache = ParseCache()
+
+
 def _extract_document_structure(file_path: str, max_depth: int = 3, clean_numbering: bool = True) -> dict:
     """
     提取Word文档的章节结构
@@ -735,26 +1891,44 @@ def _extract_document_structure(file_path: str, max_depth: int = 3, clean_number
     Returns:
         包含文档结构信息的字典
     """
-    import re
+    cache_options = {"max_depth": max_depth, "clean_numbering": clean_numbering}
+    if config.ENABLE_CACHE:
+        cached = _structure_cache.get(file_path, cache_options)
+        if cached is not None:
+            logger.debug("文档结构缓存命中: %s", file_path)
+            cached["file_path"] = file_path
+            return cached
+
     from docx import Document
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.oxml.ns import qn
 
     try:
-        logger.info(f"提取文档结构: {file_path}")
+        logger.info("提取文档结构: %s", file_path)
 
         # 打开Word文档
         doc = Document(file_path)
 
+        # 段落样式 ID -> 样式名 (一次性建立,避免逐段落查找样式);
+        # 未设置样式或样式不存在的段落使用默认段落样式
+        style_names = {
+            style.style_id: style.name
+            for style in doc.styles if style.type == WD_STYLE_TYPE.PARAGRAPH
+        }
+        default_style = doc.styles.default(WD_STYLE_TYPE.PARAGRAPH)
+        default_style_name = default_style.name if default_style is not None else ""
+
         structure = []
 
-        # 遍历段落,提取标题
-        for paragraph in doc.paragraphs:
+        # 遍历正文段落,提取标题
+        for p in doc.element.body.iterchildren(qn('w:p')):
             # 检查是否是标题样式
-            style_name = paragraph.style.name
+            style_name = style_names.get(p.style, default_style_name)
 
             # 匹配 Heading 样式
             if style_name.startswith('Heading'):
                 # 提取标题级别
-                level_match = re.match(r'Heading\s*(\d+)', style_name)
+                level_match = _HEADING_STYLE_RE.match(style_name)
                 if not level_match:
                     continue
 
@@ -765,29 +1939,15 @@ def _extract_document_structure(file_path: str, max_depth: int = 3, clean_number
                     continue
 
                 # 获取标题文本
-                title = paragraph.text.strip()
+                title = p.text.strip()
 
                 if not title:  # 跳过空标题
                     continue
 
-                # 清理标题序号
+                # 清理标题序号 (匹配: "一、", "1.", "1.1", "(1)", "第一章"等)
                 title_clean = title
                 if clean_numbering:
-                    # 清理常见序号格式
-                    # 匹配: "一、", "1.", "1.1", "(1)", "第一章"等
-                    patterns = [
-                        r'^[一二三四五六七八九十]+[、\.]?\s*',  # 中文数字 + 顿号/点
-                        r'^\d+[\.\)、]\s*',                      # 阿拉伯数字 + 点/括号/顿号
-                        r'^\d+\.\d+[\.\s]',                      # 多级编号 (1.1, 1.2.3)
-                        r'^\(\d+\)\s*',                          # 括号数字
-                        r'^第[一二三四五六七八九十\d]+[章节条款]\s*', # 第X章/节
-                        r'^[A-Z][\.\)]\s*',                      # 大写字母编号
-                    ]
-
-                    for pattern in patterns:
-                        title_clean = re.sub(pattern, '', title_clean)
-
-                    title_clean = title_clean.strip()
+                    title_clean = title[_HEADING_NUMBERING_RE.match(title).end():].strip()
 
                 # 如果清理后为空,使用原标题
                 if not title_clean:
@@ -821,11 +1981,13 @@ def _extract_document_structure(file_path: str, max_depth: int = 3, clean_number
             "structure": structure
         }
 
-        logger.info(f"提取成功: 共 {len(structure)} 个标题")
+        logger.info("提取成功: 共 %s 个标题", len(structure))
+        if config.ENABLE_CACHE:
+            _structure_cache.put(file_path, cache_options, result)
         return result
 
     except Exception as e:
-        logger.error(f"提取文档结构失败: {e}", exc_info=True)
+        logger.error("提取文档结构失败: %s", e, exc_info=True)
         return {
             "status": "error",
             "file_path": file_path,
@@ -844,20 +2006,130 @@ async def main():
     logger.info("新增功能: 文档结构提取工具 - 支持自定义报告模板创建")
     logger.info("=" * 60)
 
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    logger.info("服务器启动耗时: %.3fs", time.perf_counter() - _STARTUP_BEGIN)
+
+    enable_file_logging()
+
+    # 定期写出运行指标 (METRICS_DUMP_FILE)
+    metrics.start_dump()
+
+    # 启动配置的目录监控 (WATCH_DIRECTORIES)
+    if config.WATCH_DIRECTORIES:
+        from indexers import start_watching
+        for directory in config.WATCH_DIRECTORIES:
+            try:
+                start_watching(directory)
+            except Exception as e:
+                logger.error("启动目录监控失败: %s - %s", directory, e)
+
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        # 仅在监控模块已加载时停止监控,避免退出时导入索引模块
+        watcher_module = sys.modules.get("indexers.watcher")
+        if watcher_module is not None:
+            watcher_module.stop_all_watchers()
+        metrics.stop_dump()
+        shutdown_logging()
+
+
+def _profile_imports(limit: int = 15) -> dict:
+    """
+    在新进程中以 python -X importtime 导入服务器模块,统计冷启动导入耗时
+
+    Args:
+        limit: 列出的模块数
+
+    Returns:
+        导入耗时统计字典 (时间单位: 毫秒)
+    """
+    import subprocess
+
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, "LOG_LEVEL": "WARNING"},
+        capture_output=True,
+        text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    # 行格式: "import time: self [us] | cumulative | imported package",包名缩进表示嵌套层级,
+    # 子模块先于父模块输出;统计由 server 直接导入的模块
+    children = []
+    top_level = []
+    imported = set()
+    server_ms = 0.0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        indent = len(name) - len(name.lstrip())
+        imported.add(name.strip())
+        if indent == 3:
+            children.append((name.strip(), int(parts[1]) / 1000))
+        elif indent == 1:
+            if name.strip() == "server":
+                server_ms = int(parts[1]) / 1000
+                top_level = children
+            children = []
+
+    local_packages = ("utils", "validators", "parsers", "extractors", "indexers", "generators")
+    heavy_libraries = ("docx", "openpyxl", "pptx", "PyPDF2", "lxml", "magic")
+
+    return {
+        "returncode": completed.returncode,
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(server_ms, 1),
+        "top_modules": sorted(top_level, key=lambda item: item[1], reverse=True)[:limit],
+        "local_modules": [(name, ms) for name, ms in top_level if name.split(".")[0] in local_packages],
+        "heavy_loaded": [name for name in heavy_libraries if name in imported],
+    }
+
+
+def _format_import_report(report: dict) -> str:
+    """格式化冷启动导入耗时报告"""
+    output = f"""⏱️ 冷启动导入耗时报告
+
+  - 进程总耗时: {report['wall_ms']} ms (含解释器启动)
+  - 导入 server 模块耗时: {report['import_ms']} ms
+"""
+    if report["returncode"] != 0:
+        output += f"  - ⚠️ 导入失败 (退出码 {report['returncode']})\n"
+
+    output += "\n📦 server 直接导入的模块 (按累计耗时):\n"
+    for name, ms in report["top_modules"]:
+        output += f"  {ms:>9.1f} ms  {name}\n"
+
+    output += "\n🧩 服务器自身模块:\n"
+    for name, ms in report["local_modules"]:
+        output += f"  {ms:>9.1f} ms  {name}\n"
+
+    heavy = ", ".join(report["heavy_loaded"]) or "无"
+    output += f"\n📚 启动时已加载的文档处理库: {heavy}\n"
+    return output
 
 
 if __name__ == "__main__":
+    # 冷启动导入耗时报告: python server.py --import-report
+    if "--import-report" in sys.argv:
+        print(_format_import_report(_profile_imports()))
+        sys.exit(0)
+
     import asyncio
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("服务器已停止")
     except Exception as e:
-        logger.error(f"服务器错误: {e}", exc_info=True)
+        logger.error("服务器错误: %s", e, exc_info=True)
         sys.exit(1)
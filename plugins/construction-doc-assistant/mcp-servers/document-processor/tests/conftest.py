@@ -0,0 +1,49 @@
+"""
+测试公共夹具
+
+测试使用 benchmarks.corpus 生成的小规模合成语料 (每种类型一个文档),整个测试会话只生成一次
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus
+from utils import parse_cache
+
+# 测试语料规模: 足够覆盖多页、多表格、多工作表,生成和解析都在一秒以内
+TEST_SCALE = {"docs": 1, "pages": 3, "rows": 40, "sheets": 2, "tables": 2, "slides": 6}
+
+
+@pytest.fixture(scope="session")
+def corpus(tmp_path_factory):
+    """合成语料 {类型: 文件路径} (word/excel/powerpoint/pdf/markdown)"""
+    manifest = generate_corpus(str(tmp_path_factory.mktemp("corpus")), TEST_SCALE)
+    return {file_type: paths[0] for file_type, paths in manifest["files"].items()}
+
+
+@pytest.fixture
+def write_docx():
+    """Word 文档生成函数 write_docx(path, paragraphs, heading=None),返回文件路径"""
+    from docx import Document
+
+    def write(path, paragraphs, heading=None):
+        doc = Document()
+        if heading:
+            doc.add_heading(heading, level=1)
+        for text in paragraphs:
+            doc.add_paragraph(text)
+        doc.save(str(path))
+        return str(path)
+
+    return write
+
+
+@pytest.fixture(autouse=True)
+def clear_parse_cache():
+    """每个测试前后清空进程内解析缓存,避免测试之间相互影响"""
+    parse_cache.clear()
+    yield
+    parse_cache.clear()
@@ -0,0 +1,72 @@
+"""
+多文档上下文构建测试: 预算装入、去重与输出顺序
+"""
+from extractors.context_builder import ContextBuilder
+from utils import estimate_tokens
+
+TOPICS = ["钢筋绑扎", "模板支设", "混凝土浇筑", "脚手架搭设", "防水施工", "保温施工", "砌体施工", "抹灰施工"]
+
+
+def _passage(text, order=0, path="a.docx", score=1.0):
+    return {"path": path, "order": order, "location_text": "第 %d 段" % (order + 1), "text": text, "score": score}
+
+
+def _distinct_passages(count):
+    """互不重复、每段约 40 tokens 的段落 (按得分降序)"""
+    return [
+        _passage("%s的质量验收记录第%d项符合规范要求" % (TOPICS[i % len(TOPICS)], i), order=i, score=count - i)
+        for i in range(count)
+    ]
+
+
+def test_pack_stops_once_budget_cannot_fit_another_passage(monkeypatch):
+    builder = ContextBuilder()
+    scored = _distinct_passages(10)
+    first_two = sum(estimate_tokens(p["text"]) + ContextBuilder.CITATION_TOKENS for p in scored[:2])
+
+    tokenized = []
+    tokenize = builder.tokenizer.tokenize
+    monkeypatch.setattr(builder.tokenizer, "tokenize", lambda text: tokenized.append(text) or tokenize(text))
+
+    selected, duplicates_removed, dropped = builder._pack(scored, first_two + ContextBuilder.MIN_PASSAGE_TOKENS - 1)
+
+    assert [p["order"] for p in selected] == [0, 1]
+    assert (duplicates_removed, dropped) == (0, 8)
+    # 预算用完后的段落不再分词比较
+    assert len(tokenized) == 2
+
+
+def test_pack_truncates_long_passage_to_remaining_budget():
+    builder = ContextBuilder()
+    long_text = "混凝土浇筑应连续进行" * 40
+    selected, _, dropped = builder._pack([_passage(long_text)], 100)
+
+    assert dropped == 0
+    assert selected[0]["tokens"] == 100 - ContextBuilder.CITATION_TOKENS
+    assert selected[0]["text"].endswith("...")
+    assert long_text.startswith(selected[0]["text"][:-3])
+
+
+def test_pack_removes_exact_and_near_duplicates():
+    builder = ContextBuilder()
+    text = "地下室底板混凝土浇筑完成后应及时覆盖养护不少于十四天"
+    scored = [
+        _passage(text, order=0, path="a.docx"),
+        _passage(" ".join(text), order=0, path="b.docx"),
+        _passage(text + "。", order=1, path="b.docx"),
+        _passage("屋面防水卷材铺贴前基层应干燥平整", order=2, path="b.docx"),
+    ]
+    selected, duplicates_removed, dropped = builder._pack(scored, 1000)
+
+    assert [(p["path"], p["order"]) for p in selected] == [("a.docx", 0), ("b.docx", 2)]
+    assert (duplicates_removed, dropped) == (2, 0)
+
+
+def test_build_orders_documents_by_input_and_passages_by_position(corpus):
+    paths = [corpus["pdf"], corpus["word"], corpus["pdf"]]
+    result = ContextBuilder().build(paths, "混凝土 浇筑", max_tokens=1500)
+
+    assert result["tokens_used"] <= 1500
+    assert [doc["path"] for doc in result["documents"]] == [corpus["pdf"], corpus["word"]]
+    assert result["documents"][0]["relevance"] <= 1
+    assert result["dropped_for_budget"] > 0
@@ -0,0 +1,170 @@
+"""
+重复文档检测测试: 聚类、签名持久化与批量解析跳过重复文档
+"""
+import asyncio
+import json
+import os
+import random
+import shutil
+import time
+
+import pytest
+
+from indexers import DuplicateDetector, duplicate_detector, skip_duplicate_files
+from utils import config
+
+PARAGRAPHS = [
+    "本工程为某住宅小区三号楼,地上十八层,地下两层,结构形式为剪力墙结构。",
+    "基础采用钢筋混凝土筏板基础,筏板厚度一千二百毫米,混凝土强度等级为C35。",
+    "主体结构混凝土强度等级: 墙柱C40,梁板C30,钢筋采用HRB400级。",
+    "模板工程采用木胶合板,支撑体系采用盘扣式脚手架,立杆间距九百毫米。",
+    "混凝土浇筑前应对模板、钢筋及预埋件进行隐蔽验收,验收合格后方可浇筑。",
+    "冬期施工时应采取保温养护措施,混凝土入模温度不得低于五摄氏度。",
+    "屋面防水等级为一级,采用两道SBS改性沥青防水卷材,厚度各四毫米。",
+    "外墙保温采用岩棉板,燃烧性能等级为A级,厚度八十毫米。",
+]
+
+
+@pytest.fixture
+def project(tmp_path, write_docx):
+    """项目目录: 原稿、另存副本、少量修改的版本和一份无关文档"""
+    root = tmp_path / "project"
+    root.mkdir()
+    original = write_docx(root / "方案.docx", PARAGRAPHS, heading="施工组织设计")
+    shutil.copy(original, root / "方案-副本.docx")
+    revised = PARAGRAPHS[:-1] + ["外墙保温采用岩棉板,燃烧性能等级为A级,厚度一百毫米。"]
+    write_docx(root / "方案-修订.docx", revised, heading="施工组织设计")
+    write_docx(root / "会议纪要.docx", [
+        "会议时间: 二零二四年五月十日上午九点,地点: 项目部二楼会议室。",
+        "参会单位: 建设单位、监理单位、施工单位及设计单位代表。",
+        "会议议题: 讨论地下室防水节点做法及后浇带封闭时间安排。",
+    ], heading="施工组织设计")
+    # 原稿修改时间最新,文本长度相同时作为代表文档
+    stat = os.stat(original)
+    os.utime(original, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 10))
+    return root
+
+
+def test_signature_similarity_tracks_text_overlap():
+    detector = DuplicateDetector()
+    base = "\n".join(PARAGRAPHS)
+    signature = detector.compute_signature(base)
+
+    assert len(signature) == detector.num_perm
+    assert detector.compute_signature(base) == signature
+    assert detector.estimate_similarity(signature, detector.compute_signature(base + "\n补充说明。")) >= 0.8
+    assert detector.estimate_similarity(signature, detector.compute_signature("完全不同的会议纪要内容" * 5)) < 0.3
+    assert detector.compute_signature("太短") is None
+
+
+def _random_text(length, seed=7):
+    """由常用汉字随机组成的长文本 (shingle 几乎不重复,接近真实大文档的签名计算量)"""
+    rng = random.Random(seed)
+    return ''.join(chr(rng.randint(0x4e00, 0x9fa5)) for _ in range(length))
+
+
+def test_vectorized_signature_matches_pure_python_and_is_faster(monkeypatch):
+    pytest.importorskip("numpy")
+    detector = DuplicateDetector()
+    text = _random_text(50000)
+
+    start = time.perf_counter()
+    vectorized = detector.compute_signature(text)
+    vectorized_seconds = time.perf_counter() - start
+
+    monkeypatch.setattr(duplicate_detector, "np", None)
+    start = time.perf_counter()
+    pure_python = detector.compute_signature(text)
+    pure_python_seconds = time.perf_counter() - start
+
+    assert vectorized == pure_python
+    assert all(isinstance(value, int) for value in vectorized)
+    # 逐排列的纯 Python 计算在该规模下约慢 5 倍以上
+    assert vectorized_seconds * 3 < pure_python_seconds
+
+
+def test_find_clusters_groups_exact_and_near_duplicates(project):
+    result = DuplicateDetector().find_directory_duplicates(str(project))
+
+    assert result["total_documents"] == 4
+    assert len(result["clusters"]) == 1
+    cluster = result["clusters"][0]
+    assert cluster["representative"] == "方案.docx"
+
+    by_path = {d["path"]: d for d in cluster["duplicates"]}
+    assert sorted(by_path) == ["方案-修订.docx", "方案-副本.docx"]
+    assert by_path["方案-副本.docx"] == {"path": "方案-副本.docx", "similarity": 1.0, "exact": True}
+    assert not by_path["方案-修订.docx"]["exact"]
+    assert 0.8 <= by_path["方案-修订.docx"]["similarity"] < 1.0
+
+
+def test_find_clusters_uses_fingerprint_when_text_is_missing():
+    entries = {
+        "scan.pdf": {"fingerprint": "f1", "text_length": 0, "mtime_ns": 1, "signature": None},
+        "scan-copy.pdf": {"fingerprint": "f1", "text_length": 0, "mtime_ns": 2, "signature": None},
+        "other.pdf": {"fingerprint": "f2", "text_length": 0, "mtime_ns": 3, "signature": None},
+    }
+    clusters = DuplicateDetector().find_clusters(entries)
+
+    assert clusters == [{
+        "representative": "scan-copy.pdf",
+        "duplicates": [{"path": "scan.pdf", "similarity": 1.0, "exact": True}],
+    }]
+
+
+def test_directory_signatures_are_reused_until_file_changes(project):
+    detector = DuplicateDetector()
+    assert detector.find_directory_duplicates(str(project))["signatures_computed"] == 4
+    assert detector.find_directory_duplicates(str(project))["signatures_computed"] == 0
+
+    target = project / "会议纪要.docx"
+    stat = os.stat(target)
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert detector.find_directory_duplicates(str(project))["signatures_computed"] == 1
+
+
+def test_file_list_reuses_persisted_signatures(project, monkeypatch):
+    """回归: 批量解析跳过重复文档时复用持久化签名,不再每次重新解析计算"""
+    file_paths = sorted(str(path) for path in project.iterdir() if path.is_file())
+
+    kept, clusters = skip_duplicate_files(file_paths)
+    assert len(kept) == 2
+    assert len(clusters) == 1
+    store_path = project / config.INDEX_DIR_NAME / config.SIGNATURE_INDEX_FILE
+    with open(store_path, encoding="utf-8") as f:
+        assert sorted(json.load(f)["documents"]) == sorted(os.path.basename(p) for p in file_paths)
+
+    def fail(self, file_path):
+        raise AssertionError("签名应从持久化文件读取: %s" % file_path)
+
+    monkeypatch.setattr(DuplicateDetector, "signature_for_file", fail)
+    assert skip_duplicate_files(file_paths) == (kept, clusters)
+    assert DuplicateDetector().find_directory_duplicates(str(project))["signatures_computed"] == 0
+
+
+def test_file_list_uses_nearest_indexed_parent(project):
+    subdir = project / "存档"
+    subdir.mkdir()
+    shutil.copy(project / "方案.docx", subdir / "方案.docx")
+    DuplicateDetector().find_directory_duplicates(str(project))
+
+    result = DuplicateDetector().find_file_duplicates([str(project / "方案.docx"), str(subdir / "方案.docx")])
+    assert result["signatures_computed"] == 0
+    assert result["duplicate_count"] == 1
+    assert not (subdir / config.INDEX_DIR_NAME).exists()
+
+
+def test_batch_parse_skips_duplicates(project):
+    import server
+
+    file_paths = sorted(str(path) for path in project.iterdir() if path.is_file())
+    text = asyncio.run(server.call_tool("batch_parse_documents", {
+        "file_paths": file_paths,
+        "skip_duplicates": True,
+        "output_format": "json",
+    }))[0].text
+    result = json.loads(text)
+
+    assert len(result["results"]) == 2
+    assert len(result["duplicate_clusters"]) == 1
+    assert len(result["duplicate_clusters"][0]["duplicates"]) == 2
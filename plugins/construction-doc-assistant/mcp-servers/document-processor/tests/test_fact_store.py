@@ -0,0 +1,110 @@
+"""
+关键事实测试: 规则提取、事实库增量更新与日期范围查询
+"""
+import os
+
+import pytest
+
+from extractors.fact_extractor import FactExtractor
+from indexers import FactStore
+
+SCHEDULE = [
+    "工程名称: 某住宅小区三号楼",
+    "本工程于2024年3月1日开工,合同金额1,250.5万元,预付款比例30%。",
+    "主体结构于2024年5月底封顶,计划2024年5月31日完成验收。",
+    "因雨季影响,屋面防水施工延期,计划2024年6月15日竣工。",
+]
+MEETING = [
+    "会议决定地下室外墙防水采用两道SBS改性沥青防水卷材。",
+    "施工单位: 某建设集团有限公司",
+]
+
+
+@pytest.fixture
+def project(tmp_path, write_docx):
+    root = tmp_path / "project"
+    root.mkdir()
+    write_docx(root / "进度报告.docx", SCHEDULE)
+    write_docx(root / "会议纪要.docx", MEETING)
+    return root
+
+
+@pytest.fixture
+def store(project):
+    fact_store = FactStore(str(project))
+    yield fact_store
+    fact_store.close()
+
+
+def _values(result, fact_type):
+    return [fact["value"] for fact in result["facts"] if fact["type"] == fact_type]
+
+
+def test_extract_text_normalizes_dates_and_amounts():
+    facts = FactExtractor().extract_text(SCHEDULE[1] + SCHEDULE[2])
+    by_type = {}
+    for fact in facts:
+        by_type.setdefault(fact["type"], []).append(fact["value"])
+
+    assert by_type["date"] == ["2024-03-01", "2024-05", "2024-05-31"]
+    assert by_type["amount"] == ["12505000.00"]
+    assert by_type["percentage"] == ["30"]
+    assert by_type["milestone"] == ["开工 2024-03-01", "封顶 2024-05"]
+
+
+def test_invalid_dates_are_ignored():
+    assert FactExtractor().extract_text("编号 2024年13月40日") == []
+
+
+def test_refresh_only_extracts_new_or_changed_documents(store, project, monkeypatch, write_docx):
+    first = store.refresh()
+    assert (first["extracted"], first["removed"], first["failed"]) == (2, 0, [])
+    total_facts = first["total_facts"]
+    assert total_facts > 0
+
+    def fail(file_path):
+        raise AssertionError("未变化的文档不应重新提取: %s" % file_path)
+
+    monkeypatch.setattr(store.extractor, "extract_file", fail)
+    second = store.refresh()
+    assert (second["extracted"], second["removed"], second["total_facts"]) == (0, 0, total_facts)
+
+    monkeypatch.undo()
+    path = str(project / "会议纪要.docx")
+    write_docx(path, MEETING + ["监理单位要求整改脚手架连墙件。"])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    third = store.refresh()
+    assert (third["extracted"], third["removed"]) == (1, 0)
+    assert "整改" in _values(store.query(path="会议纪要"), "risk_event")
+
+
+def test_refresh_removes_facts_of_deleted_documents(store, project):
+    store.refresh()
+    assert store.query(path="会议纪要")["total_matched"] > 0
+
+    os.remove(project / "会议纪要.docx")
+    result = store.refresh()
+
+    assert (result["extracted"], result["removed"], result["total_documents"]) == (0, 1, 1)
+    assert store.query(path="会议纪要")["total_matched"] == 0
+    assert store.query(path="进度报告")["total_matched"] == result["total_facts"]
+
+
+def test_query_date_bounds_include_whole_end_day_and_month(store):
+    store.refresh()
+
+    def dates(**bounds):
+        return sorted(set(_values(store.query(fact_types=["date"], **bounds), "date")))
+
+    assert dates() == ["2024-03-01", "2024-05", "2024-05-31", "2024-06-15"]
+    # 截止到某月: 包含当月任意一天及只精确到月的日期
+    assert dates(date_to="2024-05") == ["2024-03-01", "2024-05", "2024-05-31"]
+    # 截止到某天: 包含当天
+    assert dates(date_to="2024-05-31") == ["2024-03-01", "2024-05", "2024-05-31"]
+    assert dates(date_from="2024-05", date_to="2024-05-31") == ["2024-05", "2024-05-31"]
+    assert dates(date_from="2024-06-01") == ["2024-06-15"]
+
+    # 日期范围只匹配带日期的事实
+    bounded = store.query(date_from="2000-01-01")
+    assert set(bounded["by_type"]) == {"date", "milestone"}
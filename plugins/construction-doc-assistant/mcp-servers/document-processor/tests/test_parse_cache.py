@@ -0,0 +1,144 @@
+"""
+解析结果缓存测试: 缓存键、失效和启动预热
+"""
+import asyncio
+import os
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+from utils import ParseCache, parse_cache
+
+
+def _result(value):
+    return {"status": "success", "content": {"value": value}}
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("v1", encoding="utf-8")
+    return str(path)
+
+
+def test_cache_key_includes_parse_options(source_file):
+    cache = ParseCache(max_entries=8, ttl=60)
+    cache.put(source_file, {"max_rows": 100}, _result(1))
+
+    assert cache.get(source_file, {"max_rows": 100})["content"]["value"] == 1
+    assert cache.get(source_file, {"max_rows": 50}) is None
+    assert cache.get(source_file, {}) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_key_ignores_options_that_do_not_change_the_result(source_file):
+    cache = ParseCache(max_entries=8, ttl=60)
+    cache.put(source_file, {"max_paragraphs": 100}, _result(1))
+
+    for options in (
+        {"file_path": source_file, "max_paragraphs": 100},
+        {"max_paragraphs": 100, "output_format": "json"},
+        {"max_paragraphs": 100, "parse_mode": "summary"},
+    ):
+        assert cache.get(source_file, options) is not None, options
+
+
+def test_cache_is_invalidated_when_file_changes(source_file):
+    cache = ParseCache(max_entries=8, ttl=60)
+    cache.put(source_file, None, _result(1))
+    assert cache.get(source_file) is not None
+
+    with open(source_file, "w", encoding="utf-8") as f:
+        f.write("version 2")
+    stat = os.stat(source_file)
+    os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert cache.get(source_file) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_expires_after_ttl(source_file, monkeypatch):
+    import sys
+    import time
+
+    # utils 包以同名属性导出了缓存实例,从 sys.modules 取模块本身
+    parse_cache_module = sys.modules["utils.parse_cache"]
+
+    cache = ParseCache(max_entries=8, ttl=60)
+    cache.put(source_file, None, _result(1))
+    assert cache.get(source_file) is not None
+
+    now = time.time()
+    monkeypatch.setattr(parse_cache_module, "time", SimpleNamespace(time=lambda: now + 61))
+    assert cache.get(source_file) is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(max_entries=2, ttl=60)
+    paths = []
+    for name in "abc":
+        path = tmp_path / name
+        path.write_text(name)
+        paths.append(str(path))
+
+    cache.put(paths[0], None, _result("a"))
+    cache.put(paths[1], None, _result("b"))
+    assert cache.get(paths[0]) is not None  # a 变为最近使用
+    cache.put(paths[2], None, _result("c"))
+
+    assert cache.get(paths[1]) is None
+    assert cache.get(paths[0]) is not None
+    assert cache.get(paths[2]) is not None
+
+
+def test_cache_only_stores_successful_results(source_file):
+    cache = ParseCache(max_entries=8, ttl=60)
+    cache.put(source_file, None, {"status": "error"})
+    assert cache.get(source_file) is None
+
+
+def test_cache_returns_copies(source_file):
+    cache = ParseCache(max_entries=8, ttl=60)
+    cache.put(source_file, None, _result(1))
+    cache.get(source_file)["parse_mode"] = "full"
+    assert "parse_mode" not in cache.get(source_file)
+
+
+def test_invalidate_and_cached_options(source_file):
+    cache = ParseCache(max_entries=8, ttl=60)
+    cache.put(source_file, {"max_rows": 100}, _result(1))
+    cache.put(source_file, {"max_rows": 10, "output_format": "json"}, _result(2))
+
+    assert sorted(o["max_rows"] for o in cache.cached_options(source_file)) == [10, 100]
+    assert cache.invalidate(source_file) == 2
+    assert cache.cached_options(source_file) == []
+
+
+def test_prewarm_fills_cache_used_by_parse_tools(corpus, tmp_path):
+    """预热按解析工具摘要模式的默认选项填充缓存,之后的工具调用直接命中"""
+    import server
+    from indexers.prewarm import Prewarmer
+
+    project = tmp_path / "project"
+    project.mkdir()
+    for file_type in ("word", "excel", "powerpoint", "pdf"):
+        shutil.copy(corpus[file_type], project)
+
+    stats = Prewarmer(backends=[], directories=[str(project)]).run()
+    assert stats["directories"][0]["parsed"] == 4
+    misses = parse_cache.stats()["misses"]
+
+    for tool, file_type in (
+        ("parse_word_document", "word"),
+        ("parse_excel_document", "excel"),
+        ("parse_powerpoint_document", "powerpoint"),
+        ("parse_pdf_document", "pdf"),
+    ):
+        file_path = str(project / os.path.basename(corpus[file_type]))
+        asyncio.run(server.call_tool(tool, {"file_path": file_path}))
+        asyncio.run(server.call_tool(tool, {"file_path": file_path, "parse_mode": "summary", "output_format": "json"}))
+
+    assert parse_cache.stats()["hits"] == 8
+    assert parse_cache.stats()["misses"] == misses
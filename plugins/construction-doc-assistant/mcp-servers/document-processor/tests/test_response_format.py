@@ -0,0 +1,122 @@
+"""
+解析工具输出格式测试: json / ndjson / table
+"""
+import asyncio
+import json
+
+import pytest
+
+import server
+from utils.response_format import dumps, format_parse_output, iter_parse_records
+
+
+def _call(name, arguments):
+    """调用工具并返回文本结果"""
+    return asyncio.run(server.call_tool(name, arguments))[0].text
+
+
+def _records(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+@pytest.fixture
+def sparse_workbook(tmp_path):
+    """数据位于 C1、C2、C4、C6 的工作表 (第 3、5 行为空行)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "材料"
+    sheet["C1"] = "材料名称"
+    sheet["C2"] = "钢筋"
+    sheet["C4"] = "混凝土"
+    sheet["C6"] = "模板"
+    path = str(tmp_path / "sparse.xlsx")
+    workbook.save(path)
+    return path
+
+
+def test_ndjson_excel_rows_use_sheet_row_numbers(sparse_workbook):
+    """回归: 空行不应使 NDJSON 中之后各行的行号错位"""
+    records = _records(_call("parse_excel_document", {"file_path": sparse_workbook, "output_format": "ndjson"}))
+
+    assert records[0]["type"] == "document"
+    assert records[1] == {"type": "sheet", "name": "材料", "headers": ["", "", "材料名称"], "rows": 4}
+    rows = {record["cells"][2]: record["row"] for record in records[2:]}
+    assert rows == {"钢筋": 2, "混凝土": 4, "模板": 6}
+
+
+def test_ndjson_row_numbers_agree_with_targeted_extraction(sparse_workbook):
+    records = _records(_call("parse_excel_document", {"file_path": sparse_workbook, "output_format": "ndjson"}))
+    ndjson_rows = {record["cells"][2]: record["row"] for record in records if record["type"] == "row"}
+
+    from extractors.targeted_extractor import TargetedExtractor
+    result = TargetedExtractor().extract(sparse_workbook, ["混凝土", "模板"], context=0)
+    cells = {cell["value"]: cell["cell"] for passage in result["passages"] for cell in passage["units"][0]["cells"]}
+    assert cells == {"混凝土": "C%d" % ndjson_rows["混凝土"], "模板": "C%d" % ndjson_rows["模板"]}
+
+
+def test_ndjson_word_records(corpus):
+    full = json.loads(_call("parse_word_document", {"file_path": corpus["word"], "output_format": "json"}))
+    records = _records(_call("parse_word_document", {"file_path": corpus["word"], "output_format": "ndjson"}))
+
+    assert records[0]["type"] == "document"
+    assert "content" not in records[0]
+    assert records[0]["summary"] == full["summary"]
+
+    sections = [r for r in records if r["type"] == "section"]
+    assert [s["title"] for s in sections] == list(full["content"]["sections"])
+    assert [s["paragraphs"] for s in sections] == list(full["content"]["sections"].values())
+
+    table_rows = [r for r in records if r["type"] == "table_row"]
+    first_table = full["content"]["tables"][0]
+    assert table_rows[0] == {"type": "table_row", "table": first_table["index"], "row": 1, "cells": first_table["data"][0]}
+    assert len(table_rows) == sum(len(t["data"]) for t in full["content"]["tables"])
+
+
+def test_ndjson_pdf_pages_omit_preview(corpus):
+    records = _records(_call("parse_pdf_document", {"file_path": corpus["pdf"], "output_format": "ndjson"}))
+    pages = [r for r in records if r["type"] == "page"]
+
+    assert [p["page"] for p in pages] == list(range(1, len(pages) + 1))
+    assert all(set(p) == {"type", "page", "text"} for p in pages)
+
+
+def test_table_format_condenses_rows(sparse_workbook, corpus):
+    text = _call("parse_excel_document", {"file_path": sparse_workbook, "output_format": "table"})
+    assert text == "# sparse.xlsx\n## 工作表 材料 (4 行)\n\t\t材料名称\n\t\t钢筋\n\t\t混凝土\n\t\t模板"
+
+    word_table = _call("parse_word_document", {"file_path": corpus["word"], "output_format": "table"})
+    assert word_table.splitlines()[1].startswith("## 表格 1 (")
+    assert _call("parse_pdf_document", {"file_path": corpus["pdf"], "output_format": "table"}).endswith(
+        "(文档中没有表格数据)"
+    )
+
+
+def test_table_format_escapes_cell_separators():
+    result = {
+        "status": "success",
+        "file_info": {"name": "a.xlsx"},
+        "content": {"sheets": [{"name": "S", "data": [["a\tb", "c\nd", "", ""], ["", "", "", ""]]}]},
+    }
+    assert format_parse_output(result, "table") == "# a.xlsx\n## 工作表 S (1 行)\na b\tc d"
+
+
+def test_error_results_and_unknown_format():
+    error = {"status": "error", "error": "文件不存在"}
+    assert list(iter_parse_records(error)) == [{"type": "error", **error}]
+    assert format_parse_output(error, "table") == dumps(error)
+    with pytest.raises(ValueError):
+        format_parse_output(error, "xml")
+
+
+def test_dumps_is_compact_and_keeps_chinese():
+    assert dumps({"名称": "钢筋", "数量": [1, 2]}) == '{"名称":"钢筋","数量":[1,2]}'
+
+
+def test_batch_ndjson_has_one_record_per_document(corpus):
+    paths = [corpus["word"], corpus["excel"]]
+    records = _records(_call("batch_parse_documents", {"file_paths": paths, "output_format": "ndjson"}))
+
+    assert len(records) == 2
+    assert all(record["status"] == "success" for record in records)
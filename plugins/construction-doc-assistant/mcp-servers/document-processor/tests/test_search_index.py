@@ -0,0 +1,132 @@
+"""
+全文索引测试: BM25 排序、片段与单元格定位、增量更新
+"""
+import os
+
+import pytest
+
+from indexers import SearchIndex
+
+
+def _touch_later(path):
+    """推后修改时间,保证 (size, mtime) 变化可被检测"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+@pytest.fixture
+def project(tmp_path, write_docx):
+    from openpyxl import Workbook
+
+    root = tmp_path / "project"
+    root.mkdir()
+    write_docx(root / "施工日志.docx", [
+        "今日完成三层梁板钢筋绑扎,下午浇筑混凝土,混凝土坍落度抽检合格。",
+        "天气晴,气温十八至二十六摄氏度,现场作业人员六十人,塔吊两台运行正常,"
+        "脚手架验收完成,安全员巡查未发现隐患,材料进场钢管两百根,已按规定堆放,混凝土养护按方案执行。",
+        "监理例会讨论了外墙保温施工样板的验收时间。",
+    ], heading="施工日志")
+    write_docx(root / "会议纪要.docx", [
+        "会议确定地下室防水卷材进场复验项目。",
+    ], heading="施工日志")
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "材料台账"
+    sheet.append(["序号", "材料名称", "规格", "数量"])
+    sheet.append([1, "商品混凝土", "C30", 120])
+    sheet.append([2, "钢筋", "HRB400", 35])
+    workbook.save(str(root / "材料台账.xlsx"))
+    return root
+
+
+@pytest.fixture
+def index(project):
+    search_index = SearchIndex(str(project))
+    yield search_index
+    search_index.close()
+
+
+def test_bm25_ranks_dense_short_units_first(index):
+    index.refresh()
+    results = index.search("混凝土")["results"]
+
+    # BM25 按单元长度归一化: 很短的表格行 > 出现两次的短段落 > 只出现一次的长段落
+    assert [result["location"] for result in results] == [
+        {"sheet": "材料台账", "row": 2},
+        {"section": "施工日志", "paragraph": 1},
+        {"section": "施工日志", "paragraph": 2},
+    ]
+    scores = [result["score"] for result in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_match_all_and_file_type_filter(index):
+    index.refresh()
+
+    assert [r["path"] for r in index.search("钢筋 浇筑")["results"]] == ["施工日志.docx"]
+    assert [r["path"] for r in index.search("钢筋 浇筑", match_all=False)["results"]] == ["施工日志.docx", "材料台账.xlsx"]
+    excel_only = index.search("钢筋", file_types=["excel"])["results"]
+    assert [result["file_type"] for result in excel_only] == ["excel"]
+
+
+def test_single_character_and_dictionary_term_queries(index):
+    index.refresh()
+
+    assert {r["path"] for r in index.search("卷")["results"]} == {"会议纪要.docx"}
+    assert index.search("防水卷材")["results"][0]["path"] == "会议纪要.docx"
+    assert index.search("防水样板")["total_results"] == 0
+
+
+def test_results_locate_snippet_and_cells(index):
+    index.refresh()
+
+    row = index.search("商品混凝土")["results"][0]
+    assert row["path"] == "材料台账.xlsx"
+    assert row["cells"] == [{"col": 2, "value": "商品混凝土", "cell": "B2"}]
+    assert "【商品混凝土】" in row["snippet"]
+
+    paragraph = index.search("外墙保温")["results"][0]
+    assert paragraph["snippet"] == "监理例会讨论了【外墙保温】施工样板的验收时间。"
+
+
+def test_empty_query_is_rejected(index):
+    index.refresh()
+    with pytest.raises(ValueError):
+        index.search("  ,。 ")
+
+
+def test_refresh_only_reindexes_changed_documents(index, project, write_docx):
+    first = index.refresh()
+    assert first["indexed"] == 3
+    assert first["total_documents"] == 3
+
+    assert index.refresh()["indexed"] == 0
+
+    log_path = project / "施工日志.docx"
+    write_docx(log_path, ["今日进行屋面防水施工。"], heading="施工日志")
+    _touch_later(log_path)
+    changed = index.refresh()
+    assert (changed["indexed"], changed["removed"]) == (1, 0)
+    assert {r["path"] for r in index.search("混凝土")["results"]} == {"材料台账.xlsx"}
+    assert {r["path"] for r in index.search("屋面防水")["results"]} == {"施工日志.docx"}
+
+    os.remove(project / "会议纪要.docx")
+    removed = index.refresh()
+    assert (removed["indexed"], removed["removed"]) == (0, 1)
+    assert index.search("卷材")["total_results"] == 0
+
+    rebuilt = index.refresh(force=True)
+    assert rebuilt["indexed"] == rebuilt["total_documents"] == 2
+
+
+def test_index_persists_across_instances(index, project):
+    index.refresh()
+    index.close()
+
+    reopened = SearchIndex(str(project))
+    try:
+        assert reopened.refresh()["indexed"] == 0
+        assert reopened.search("塔吊")["total_results"] == 1
+    finally:
+        reopened.close()
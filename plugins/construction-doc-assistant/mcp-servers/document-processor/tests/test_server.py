@@ -0,0 +1,42 @@
+"""
+MCP 工具分发测试 (进程内直接调用 call_tool)
+"""
+import asyncio
+import json
+
+import server
+
+
+def _call(name, arguments):
+    """调用工具并返回文本结果"""
+    return asyncio.run(server.call_tool(name, arguments))[0].text
+
+
+def test_parse_tool_json_output_honors_max_tokens(corpus):
+    result = json.loads(_call("parse_pdf_document", {
+        "file_path": corpus["pdf"], "max_tokens": 200, "output_format": "json"
+    }))
+    assert result["summary"]["token_budget"]["tokens_used"] <= 200
+    assert result["summary"]["token_budget"]["truncated"]
+
+
+def test_smart_parse_full_mode_honors_max_tokens(corpus):
+    text = _call("parse_document_smart", {"file_path": corpus["pdf"], "mode": "full", "max_tokens": 200})
+    assert "Token 预算: 已使用" in text
+    assert "/ 200" in text
+
+
+def test_document_summary_honors_max_tokens(corpus, monkeypatch):
+    import parsers
+
+    calls = []
+    parse_document = parsers.parse_document
+
+    def record(file_path, options=None):
+        calls.append(options)
+        return parse_document(file_path, options)
+
+    monkeypatch.setattr(parsers, "parse_document", record)
+    _call("extract_document_summary", {"file_path": corpus["word"], "max_tokens": 100})
+    _call("extract_document_summary", {"file_path": corpus["word"]})
+    assert calls == [{"max_tokens": 100}, None]
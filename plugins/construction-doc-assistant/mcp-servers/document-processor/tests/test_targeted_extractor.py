@@ -0,0 +1,124 @@
+"""
+针对性提取测试: 命中合并、全部命中、预算截断与单元格标注
+"""
+import pytest
+
+from extractors.targeted_extractor import TargetedExtractor
+from utils import estimate_tokens
+
+PARAGRAPHS = [
+    "工程概况说明",
+    "钢筋进场验收",
+    "模板安装检查",
+    "钢筋绑扎检查",
+    "混凝土浇筑记录",
+    "屋面防水施工",
+    "外墙保温施工",
+    "钢筋与混凝土试块送检",
+    "竣工资料整理",
+]
+
+
+@pytest.fixture
+def document(tmp_path, write_docx):
+    return write_docx(tmp_path / "施工记录.docx", PARAGRAPHS)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    sheet = wb.active
+    sheet.title = "材料"
+    for row in [
+        ["材料名称", "规格", "数量"],
+        ["水泥", "P.O 42.5", "120"],
+        ["螺纹钢筋", "HRB400 钢筋", "35"],
+        ["模板", "木胶合板", "800"],
+        ["砂石", "中砂", "200"],
+    ]:
+        sheet.append(row)
+    path = str(tmp_path / "材料表.xlsx")
+    wb.save(path)
+    return path
+
+
+def _texts(passage):
+    return [unit["text"] for unit in passage["units"]]
+
+
+def test_hits_with_overlapping_context_merge_into_one_passage(document):
+    result = TargetedExtractor().extract(document, ["钢筋"], context=2)
+
+    first, second = result["passages"]
+    # 第 2、4 段的上下文重叠: 合并为一个片段,中间的第 3 段只输出一次
+    assert _texts(first) == PARAGRAPHS[:6]
+    assert [unit["is_match"] for unit in first["units"]] == [False, True, False, True, False, False]
+    # 第二个片段的前文只包含尚未输出的单元
+    assert _texts(second) == PARAGRAPHS[6:]
+    assert result["keyword_counts"] == {"钢筋": 3}
+    assert result["units_scanned"] == len(PARAGRAPHS)
+    assert not result["truncated"]
+
+
+def test_match_all_requires_every_keyword_in_the_unit(document):
+    extractor = TargetedExtractor()
+    any_match = extractor.extract(document, ["钢筋", "混凝土"], context=0)
+    all_match = extractor.extract(document, ["钢筋", "混凝土"], context=0, match_all=True)
+
+    assert any_match["keyword_counts"] == {"钢筋": 3, "混凝土": 2}
+    assert [_texts(p) for p in all_match["passages"]] == [[PARAGRAPHS[7]]]
+    assert all_match["passages"][0]["matched_keywords"] == ["钢筋", "混凝土"]
+    assert all_match["keyword_counts"] == {"钢筋": 1, "混凝土": 1}
+
+
+def test_matched_unit_is_truncated_at_token_budget(tmp_path, write_docx):
+    long_match = "钢筋绑扎应符合设计要求" * 30
+    path = write_docx(tmp_path / "long.docx", ["工程概况说明", long_match, "钢筋复试合格"])
+    context_tokens = estimate_tokens("工程概况说明")
+    max_tokens = context_tokens + 20
+
+    result = TargetedExtractor().extract(path, ["钢筋"], context=1, max_tokens=max_tokens)
+
+    assert result["truncated"]
+    assert result["tokens_used"] == max_tokens
+    # 达到预算即停止读取,之后的命中不再扫描
+    assert result["units_scanned"] == 2
+    assert result["keyword_counts"] == {"钢筋": 1}
+    units = result["passages"][0]["units"]
+    assert units[0]["text"] == "工程概况说明"
+    assert units[1]["text"].endswith("...")
+    assert long_match.startswith(units[1]["text"][:-3])
+    assert estimate_tokens(units[1]["text"][:-3]) <= 20
+
+
+def test_context_unit_over_budget_is_dropped_not_truncated(tmp_path, write_docx):
+    path = write_docx(tmp_path / "long.docx", ["钢筋进场验收", "模板安装检查" * 40])
+    budget = estimate_tokens("钢筋进场验收") + 5
+
+    result = TargetedExtractor().extract(path, ["钢筋"], context=1, max_tokens=budget)
+
+    assert result["truncated"]
+    assert [_texts(p) for p in result["passages"]] == [["钢筋进场验收"]]
+    assert result["tokens_used"] == estimate_tokens("钢筋进场验收")
+
+
+def test_excel_matches_annotate_cell_references(workbook):
+    result = TargetedExtractor().extract(workbook, ["钢筋"], context=1)
+
+    passage, = result["passages"]
+    # 片段位置为首个命中单元,前后文单元不标注单元格
+    assert passage["location_text"] == "工作表「材料」第 3 行"
+    before, match, after = passage["units"]
+    assert "cells" not in before and "cells" not in after
+    assert before["text"].startswith("水泥") and after["text"].startswith("模板")
+    assert match["cells"] == [
+        {"col": 1, "value": "螺纹钢筋", "cell": "A3"},
+        {"col": 2, "value": "HRB400 钢筋", "cell": "B3"},
+    ]
+
+
+def test_empty_keywords_are_rejected(document):
+    with pytest.raises(ValueError):
+        TargetedExtractor().extract(document, [" ", ""])
@@ -0,0 +1,116 @@
+"""
+报告模板匹配测试: 关键词自动机、分级计分与低置信度回退
+"""
+import json
+import random
+
+import pytest
+
+from extractors.template_matcher import KeywordAutomaton, TemplateMatcher
+
+TEMPLATES = {
+    "matching_rules": {"keyword_weight": 0.4, "min_confidence": 0.6},
+    "templates": {
+        "technical": {
+            "name": "技术方案",
+            "priority": 1,
+            "keyword_tiers": {"high": ["技术方案"], "medium": ["技术", "工艺"], "low": ["施工"]},
+        },
+        "safety": {
+            "name": "安全报告",
+            "priority": 2,
+            "keyword_tiers": {"high": ["安全"], "low": ["隐患", "安全"]},
+            "keywords": ["应急预案"],
+        },
+    },
+}
+
+
+def _overlapping_count(text, pattern):
+    return sum(text.startswith(pattern, i) for i in range(len(text)))
+
+
+@pytest.fixture
+def templates_file(tmp_path):
+    def write(data=TEMPLATES):
+        path = tmp_path / "report_templates.json"
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        return str(path)
+    return write
+
+
+def test_automaton_counts_overlapping_matches():
+    automaton = KeywordAutomaton(["技术方案", "技术", "方案", "案", "BIM", "技术"])
+
+    assert automaton.patterns == ["技术方案", "技术", "方案", "案", "bim"]
+    counts = automaton.count("技术方案与技术交底, bim 及 BIM 模型")
+    assert counts == [1, 2, 1, 1, 2]
+    # 计数可跨多段文本累加
+    assert automaton.count("专项方案", counts) == [1, 2, 2, 2, 2]
+
+
+def test_automaton_matches_naive_overlapping_count():
+    rng = random.Random(7)
+    patterns = ["ab", "aba", "b", "bab", "aab", "abab"]
+    automaton = KeywordAutomaton(patterns)
+    for _ in range(50):
+        text = "".join(rng.choice("ab") for _ in range(rng.randint(0, 40)))
+        assert automaton.count(text) == [_overlapping_count(text, p) for p in patterns]
+
+
+def test_rank_applies_tier_points(templates_file):
+    matcher = TemplateMatcher(templates_file())
+    result = matcher.match(text="技术方案: 施工工艺及施工技术要求")
+
+    technical = next(t for t in result["templates"] if t["template"] == "technical")
+    # 技术方案 (高) 1 次 + 技术 (中) 2 次 + 工艺 (中) 1 次 + 施工 (低) 2 次
+    assert technical["points"] == 10 + 5 * 2 + 5 + 2 * 2
+    assert technical["tiers"] == {
+        "high": {"技术方案": 1}, "medium": {"技术": 2, "工艺": 1}, "low": {"施工": 2},
+    }
+    assert technical["coverage"] == 1.0
+    assert technical["keyword_score"] == 1.0
+    assert technical["weighted_score"] == 0.4
+    assert result["recommended"] == "technical" and result["confident"]
+
+
+def test_keyword_points_and_tiers_are_configurable(templates_file):
+    data = dict(TEMPLATES, matching_rules={"keyword_points": {"high": 20}})
+    matcher = TemplateMatcher(templates_file(data))
+
+    # 重复出现的关键词只保留最高分级,未分级的 keywords 按高权重计
+    assert matcher.templates["safety"]["keywords"] == [("安全", "high"), ("隐患", "low"), ("应急预案", "high")]
+    safety = next(t for t in matcher.match(text="安全隐患与应急预案")["templates"] if t["template"] == "safety")
+    assert safety["points"] == 20 + 2 + 20
+
+
+def test_low_confidence_falls_back_to_default_template(templates_file):
+    matcher = TemplateMatcher(templates_file())
+
+    # 只命中低权重关键词: 覆盖率 2/22,低于 min_confidence
+    result = matcher.match(text="施工日志")
+    assert result["templates"][0]["template"] == "technical"
+    assert result["templates"][0]["keyword_score"] < result["min_confidence"]
+    assert result["recommended"] == TemplateMatcher.DEFAULT_TEMPLATE
+    assert not result["confident"]
+
+    nothing = matcher.match(text="无关内容")
+    assert nothing["recommended"] == TemplateMatcher.DEFAULT_TEMPLATE
+    assert all(t["keyword_score"] == 0 for t in nothing["templates"])
+
+
+def test_file_names_and_contents_are_matched_per_document(templates_file, tmp_path, write_docx):
+    path = write_docx(tmp_path / "安全专项.docx", ["发现隐患应及时整改。"], heading="应急预案")
+
+    result = TemplateMatcher(templates_file()).match(file_paths=[path], top_n=1)
+
+    document, = result["documents"]
+    assert document["templates"] == [
+        {"template": "safety", "name": "安全报告", "points": 10 + 2 + 10, "keyword_score": 1.0}
+    ]
+    assert result["recommended"] == "safety"
+
+
+def test_match_requires_input(templates_file):
+    with pytest.raises(ValueError):
+        TemplateMatcher(templates_file()).match()
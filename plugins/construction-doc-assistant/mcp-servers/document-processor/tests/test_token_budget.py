@@ -0,0 +1,201 @@
+"""
+Token 估算、TokenBudget 和解析器 max_tokens 预算测试
+"""
+import pytest
+
+from parsers.excel_parser import ExcelParser
+from parsers.pdf_parser import PDFParser
+from parsers.ppt_parser import PowerPointParser
+from parsers.word_parser import WordParser
+from utils import TokenBudget, estimate_tokens, truncate_to_tokens
+
+
+def _budgeted_texts(file_type, result):
+    """解析结果中计入预算的文本 (Word 大纲由已读取的标题组成,不单独计入)"""
+    content = result["content"]
+    texts = []
+    if file_type == "word":
+        for title, paragraphs in content["sections"].items():
+            if title != "文档开头":
+                texts.append(title)
+            texts.extend(paragraphs)
+        texts.extend('\t'.join(row) for table in content["tables"] for row in table["data"])
+    elif file_type == "excel":
+        texts.extend('\t'.join(row) for sheet in content["sheets"] for row in sheet["data"])
+    elif file_type == "powerpoint":
+        for slide in content["slides"]:
+            texts.extend([slide["title"], *slide["content"], slide["notes"]])
+    elif file_type == "pdf":
+        texts.extend(page["text"] for page in content["pages"])
+    return texts
+
+
+def _unit_tokens(file_type, result):
+    """未限制预算时各内容单元的 token 数 (按读取顺序)"""
+    return [estimate_tokens(text) for text in _budgeted_texts(file_type, result)]
+
+
+# ========== estimate_tokens / truncate_to_tokens ==========
+
+@pytest.mark.parametrize("text, expected", [
+    ("", 0),
+    ("   \n\t", 0),
+    ("hello world", 2),
+    ("a, b.", 4),
+    ("中文", 4),
+    ("C30混凝土", 7),
+    ("坍落度180mm±20mm", 6 + 1 + 1 + 1),
+    ("豈㐀", 4),
+])
+def test_estimate_tokens(text, expected):
+    assert estimate_tokens(text) == expected
+
+
+def test_truncate_to_tokens_keeps_longest_prefix():
+    text = "钢筋保护层厚度符合设计要求"
+    truncated = truncate_to_tokens(text, 7)
+    assert estimate_tokens(truncated) <= 7
+    assert text.startswith(truncated)
+    assert estimate_tokens(text[:len(truncated) + 1]) > 7
+    assert truncate_to_tokens(text, 1000) == text
+
+
+# ========== TokenBudget ==========
+
+def test_unlimited_budget_accepts_everything():
+    budget = TokenBudget()
+    assert not budget.limited
+    assert budget.take("任意文本" * 100) == "任意文本" * 100
+    assert budget.fits("x" * 1000)
+    assert not budget.should_stop()
+    assert budget.used == 0
+
+
+def test_take_truncates_crossing_text_within_budget():
+    budget = TokenBudget(10)
+    assert budget.take("abc def") == "abc def"
+    text = budget.take("混凝土强度等级为C30")
+    assert text.endswith("...")
+    assert budget.truncated
+    assert budget.used == estimate_tokens("abc def") + estimate_tokens(text)
+    assert budget.used <= 10
+    assert budget.take("more") is None
+
+
+def test_take_returns_none_when_ellipsis_does_not_fit():
+    budget = TokenBudget(2)
+    assert budget.take("混凝土") is None
+    assert budget.truncated
+    assert budget.used == 0
+
+
+def test_fits_drops_whole_unit_and_exhausts_budget():
+    budget = TokenBudget(5)
+    assert budget.fits("a b c")
+    assert not budget.fits("d e f")
+    assert budget.exhausted and budget.truncated
+    assert budget.used == 3
+    assert not budget.fits("g")
+
+
+def test_empty_text_is_accepted_after_budget_is_used_up():
+    budget = TokenBudget(2)
+    assert budget.take("中") == "中"
+    assert budget.take("") == ""
+    assert not budget.truncated
+
+
+def test_exact_budget_is_not_truncated_until_more_content():
+    budget = TokenBudget(2)
+    assert budget.take("中") == "中"
+    assert budget.exhausted
+    assert not budget.truncated
+    assert budget.should_stop()
+    assert budget.to_dict() == {"max_tokens": 2, "tokens_used": 2, "truncated": True}
+
+
+# ========== 解析器 max_tokens ==========
+
+PARSERS = {
+    "word": WordParser,
+    "excel": ExcelParser,
+    "powerpoint": PowerPointParser,
+    "pdf": PDFParser,
+}
+
+
+def _boundary_budgets(unit_tokens):
+    """0-10 以及每个内容单元边界前后的预算 (覆盖预算恰好在单元边界用完、放不下截断标记等情况)"""
+    budgets = set(range(11))
+    total = 0
+    for tokens in unit_tokens:
+        total += tokens
+        budgets.update(range(max(0, total - 4), total + 5))
+    return sorted(budgets)
+
+
+@pytest.mark.parametrize("file_type", sorted(PARSERS))
+def test_parser_honors_budget_at_unit_boundaries(corpus, file_type):
+    parser = PARSERS[file_type]()
+    # max_rows 等数量限制显式放开,使未限制预算的结果包含全部内容
+    full = parser.parse(corpus[file_type], {"max_rows": 10 ** 9, "max_slides": 10 ** 9, "max_pages": 10 ** 9})
+    unit_tokens = _unit_tokens(file_type, full)
+    total = sum(unit_tokens)
+    assert total > 0
+
+    for max_tokens in _boundary_budgets(unit_tokens):
+        result = parser.parse(corpus[file_type], {"max_tokens": max_tokens})
+        assert result["status"] == "success", max_tokens
+
+        budget = result["summary"]["token_budget"]
+        used = sum(estimate_tokens(text) for text in _budgeted_texts(file_type, result))
+        assert budget["max_tokens"] == max_tokens
+        assert budget["tokens_used"] == used <= max_tokens, max_tokens
+        assert budget["truncated"] == (max_tokens < total), max_tokens
+
+
+@pytest.mark.parametrize("file_type", sorted(PARSERS))
+def test_parser_without_budget_has_no_budget_summary(corpus, file_type):
+    result = PARSERS[file_type]().parse(corpus[file_type], {})
+    assert "token_budget" not in result["summary"]
+
+
+def test_pdf_budget_exhausted_at_page_boundary(corpus):
+    """回归: 剩余预算放不下下一页的截断文本时应停止读取,而不是解析失败"""
+    full = PDFParser().parse(corpus["pdf"], {})
+    first_page = estimate_tokens(full["content"]["pages"][0]["text"])
+
+    for max_tokens in (1, 2, 3, first_page + 1, first_page + 2):
+        result = PDFParser().parse(corpus["pdf"], {"max_tokens": max_tokens})
+        assert result["status"] == "success"
+        assert result["summary"]["token_budget"]["truncated"]
+        assert len(result["content"]["pages"]) == (0 if max_tokens < first_page else 1)
+        assert result["summary"]["pages_extracted"] == len(result["content"]["pages"])
+
+
+def test_word_outline_lists_headings_read_within_budget(corpus):
+    result = WordParser().parse(corpus["word"], {"max_tokens": 60})
+    titles = [title for title in result["content"]["sections"] if title != "文档开头"]
+    assert [item["text"] for item in result["content"]["outline"]] == titles
+    assert result["summary"]["token_budget"]["tokens_used"] <= 60
+
+
+def test_excel_budget_replaces_default_row_limit(tmp_path):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["序号", "材料名称", "数量"])
+    for i in range(1, 150):
+        sheet.append([i, "HRB400钢筋", i * 10])
+    path = str(tmp_path / "ledger.xlsx")
+    workbook.save(path)
+
+    # 不设 max_rows 时只按预算截止,不再默认每个工作表 100 行
+    result = ExcelParser().parse(path, {"max_tokens": 10 ** 6})
+    assert result["summary"]["total_rows"] == 150
+    assert not result["summary"]["token_budget"]["truncated"]
+
+    assert ExcelParser().parse(path, {})["summary"]["total_rows"] == 100
+    capped = ExcelParser().parse(path, {"max_tokens": 10 ** 6, "max_rows": 5})
+    assert capped["summary"]["total_rows"] == 5
@@ -0,0 +1,71 @@
+"""
+目录监控测试: 文档变化后按解析工具使用的选项预热解析缓存
+"""
+import asyncio
+import os
+import shutil
+import time
+
+import pytest
+
+import server
+from indexers.watcher import DocumentWatcher
+from parsers import ParserFactory
+from utils import parse_cache
+
+
+def _wait_until(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    """轮询模式、短静默时间的监控器"""
+    root = tmp_path / "project"
+    root.mkdir()
+    doc_watcher = DocumentWatcher(str(root), debounce=0.1, poll_interval=0.1, workers=2, use_inotify=False)
+    doc_watcher.start()
+    yield doc_watcher
+    doc_watcher.stop()
+
+
+def test_new_document_is_prewarmed_for_summary_tool_calls(watcher, corpus):
+    """回归: 新文档按摘要模式默认选项预热,而不是无限制的完整解析"""
+    for file_type in ("word", "excel"):
+        shutil.copy(corpus[file_type], watcher.root_dir)
+    assert _wait_until(lambda: watcher.processed >= 2)
+    assert watcher.errors == 0
+
+    word_path = os.path.join(watcher.root_dir, os.path.basename(corpus["word"]))
+    excel_path = os.path.join(watcher.root_dir, os.path.basename(corpus["excel"]))
+    assert parse_cache.cached_options(word_path) == [ParserFactory.SUMMARY_MODE_LIMITS["word"]]
+
+    misses = parse_cache.stats()["misses"]
+    asyncio.run(server.call_tool("parse_word_document", {"file_path": word_path}))
+    asyncio.run(server.call_tool("parse_excel_document", {"file_path": excel_path, "parse_mode": "summary"}))
+    assert parse_cache.stats()["hits"] == 2
+    assert parse_cache.stats()["misses"] == misses
+
+
+def test_changed_document_is_reparsed_with_cached_options(watcher, corpus):
+    path = os.path.join(watcher.root_dir, os.path.basename(corpus["pdf"]))
+    shutil.copy(corpus["pdf"], path)
+    assert _wait_until(lambda: watcher.processed >= 1)
+
+    asyncio.run(server.call_tool("parse_pdf_document", {"file_path": path, "max_tokens": 50}))
+    cached = sorted(parse_cache.cached_options(path), key=len)
+    assert len(cached) == 2
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert _wait_until(lambda: watcher.processed >= 2)
+
+    assert sorted(parse_cache.cached_options(path), key=len) == cached
+    hits = parse_cache.stats()["hits"]
+    asyncio.run(server.call_tool("parse_pdf_document", {"file_path": path, "max_tokens": 50}))
+    assert parse_cache.stats()["hits"] == hits + 1
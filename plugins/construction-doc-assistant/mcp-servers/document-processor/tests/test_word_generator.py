@@ -0,0 +1,126 @@
+"""
+Word 报告生成测试: direct / named 样式模式输出与骨架缓存
+"""
+import os
+
+import pytest
+from docx import Document
+from docx.shared import Pt
+
+from generators import WordGenerator
+from generators.docx_skeleton import clear_skeleton_cache
+from utils import config
+
+MARKDOWN = """# 项目总结报告
+
+## 一、工程概况
+
+本工程为住宅楼,地上十八层。
+
+- 主体结构已封顶
+- 二次结构施工中
+
+> 注意冬期施工
+
+| 项目 | 数量 |
+| --- | --- |
+| 钢筋 | 35 |
+| 混凝土 | 120 |
+"""
+
+PROJECT_INFO = {"project_name": "某住宅楼", "report_type": "项目总结"}
+
+
+@pytest.fixture(autouse=True)
+def skeleton_dir(tmp_path, monkeypatch):
+    """骨架磁盘缓存写入临时目录,并清空进程内骨架缓存"""
+    path = tmp_path / "skeletons"
+    monkeypatch.setattr(config, "WORD_SKELETON_DIR", str(path))
+    clear_skeleton_cache()
+    yield path
+    clear_skeleton_cache()
+
+
+@pytest.fixture
+def markdown_file(tmp_path):
+    path = tmp_path / "report.md"
+    path.write_text(MARKDOWN, encoding="utf-8")
+    return str(path)
+
+
+def _generate(markdown_file, tmp_path, style_mode, **options):
+    output = str(tmp_path / f"report-{style_mode}.docx")
+    result = WordGenerator().generate(markdown_file, output, {"style_mode": style_mode, **options})
+    assert result["status"] == "success", result
+    assert result["style_mode"] == style_mode
+    assert result["warnings"] == []
+    return Document(output)
+
+
+def _content(doc):
+    paragraphs = [p.text for p in doc.paragraphs]
+    tables = [[[cell.text for cell in row.cells] for row in table.rows] for table in doc.tables]
+    return paragraphs, tables
+
+
+def test_direct_and_named_modes_produce_same_content(markdown_file, tmp_path):
+    direct = _generate(markdown_file, tmp_path, "direct", project_info=PROJECT_INFO)
+    named = _generate(markdown_file, tmp_path, "named", project_info=PROJECT_INFO)
+
+    assert _content(direct) == _content(named)
+    paragraphs, tables = _content(direct)
+    assert paragraphs[:3] == ["项目总结报告", "一、工程概况", "本工程为住宅楼,地上十八层。"]
+    assert tables == [[["项目", "数量"], ["钢筋", "35"], ["混凝土", "120"]]]
+    for doc in (direct, named):
+        assert doc.sections[0].header.paragraphs[0].text == "某住宅楼 - 项目总结"
+
+
+def test_direct_mode_writes_formatting_on_runs(markdown_file, tmp_path):
+    doc = _generate(markdown_file, tmp_path, "direct")
+    heading, body = doc.paragraphs[0], doc.paragraphs[2]
+
+    assert heading.style.name == "Heading 1"
+    assert heading.runs[0].font.size == Pt(22)
+    assert heading.runs[0].font.bold
+    assert heading.runs[0].font.name == "黑体"
+    assert body.style.name == "Normal"
+    assert body.runs[0].font.name == "宋体"
+    assert "Report Body" not in [style.name for style in doc.styles]
+
+
+def test_named_mode_references_registered_styles(markdown_file, tmp_path):
+    doc = _generate(markdown_file, tmp_path, "named")
+
+    assert [p.style.name for p in doc.paragraphs] == [
+        "Heading 1", "Heading 2", "Report Body", "Report List", "Report List", "Report Quote",
+    ]
+    for paragraph in doc.paragraphs:
+        assert paragraph.runs[0].font.size is None
+        assert paragraph.runs[0].font.name is None
+    assert doc.tables[0].rows[0].cells[0].paragraphs[0].style.name == "Report Table Header"
+    assert doc.tables[0].rows[1].cells[0].paragraphs[0].style.name == "Report Table Cell"
+
+    heading_style = doc.styles["Heading 1"]
+    assert heading_style.font.size == Pt(22)
+    assert heading_style.font.bold
+    assert doc.styles["Report Body"].font.name == "宋体"
+
+
+def test_unknown_style_mode_is_rejected(markdown_file, tmp_path):
+    result = WordGenerator().generate(markdown_file, str(tmp_path / "out.docx"), {"style_mode": "inline"})
+    assert result["status"] == "error"
+    assert "inline" in result["error"]
+
+
+def test_skeleton_is_built_once_and_reused_from_disk(markdown_file, tmp_path, skeleton_dir, monkeypatch):
+    _generate(markdown_file, tmp_path, "named")
+    _generate(markdown_file, tmp_path, "direct")
+    assert len(os.listdir(skeleton_dir)) == 2
+
+    def fail(self, style_mode, with_header_footer):
+        raise AssertionError("骨架应从缓存读取")
+
+    monkeypatch.setattr(WordGenerator, "_build_skeleton", fail)
+    clear_skeleton_cache()
+    _generate(markdown_file, tmp_path, "named")
+    _generate(markdown_file, tmp_path, "direct")
@@ -1,13 +1,16 @@
 """
 工具模块
 
-提供配置管理、日志记录、错误处理等工具函数
+提供配置管理、日志记录、错误处理、运行指标、性能剖析、响应格式等工具函数
 """
 
 from .config import Config, config
 from .logger import (
     get_logger,
     setup_logger,
+    enable_file_logging,
+    set_module_level,
+    shutdown_logging,
     debug,
     info,
     warning,
@@ -26,6 +29,11 @@ from .error_handler import (
     success_response,
     warning_response
 )
+from .parse_cache import ParseCache, parse_cache
+from .metrics import MetricsRegistry, metrics
+from .profiler import ToolProfiler, profiler
+from .token_counter import TokenBudget, estimate_tokens, truncate_to_tokens
+from .response_format import OUTPUT_FORMATS, dumps, dumps_lines, format_parse_output
 
 __all__ = [
     # 配置
@@ -35,6 +43,9 @@ __all__ = [
     # 日志
     'get_logger',
     'setup_logger',
+    'enable_file_logging',
+    'set_module_level',
+    'shutdown_logging',
     'debug',
     'info',
     'warning',
@@ -52,4 +63,27 @@ __all__ = [
     'handle_file_error',
     'success_response',
     'warning_response',
+
+    # 解析缓存
+    'ParseCache',
+    'parse_cache',
+
+    # 运行指标
+    'MetricsRegistry',
+    'metrics',
+
+    # 性能剖析
+    'ToolProfiler',
+    'profiler',
+
+    # Token 估算
+    'TokenBudget',
+    'estimate_tokens',
+    'truncate_to_tokens',
+
+    # 响应格式
+    'OUTPUT_FORMATS',
+    'dumps',
+    'dumps_lines',
+    'format_parse_output',
 ]
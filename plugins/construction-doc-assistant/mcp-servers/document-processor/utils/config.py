@@ -19,16 +19,101 @@ class Config:
     DEFAULT_EXTRACT_IMAGES = False
     MAX_SUMMARY_LENGTH = int(os.getenv("MAX_SUMMARY_LENGTH", 2000))  # 摘要最大字符数
     MAX_TEXT_PREVIEW_LENGTH = 500  # 文本预览长度
+    SMART_PARSE_MAX_TOKENS = int(os.getenv("SMART_PARSE_MAX_TOKENS", 4000))  # 针对性提取默认 token 预算
+    CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", 10000))  # 多文档上下文默认 token 预算
+    CONTEXT_WORKERS = int(os.getenv("CONTEXT_WORKERS", 4))  # 上下文构建并行读取文档的线程数
+
+    # 报告模板配置
+    REPORT_TEMPLATES_FILE = os.getenv(
+        "REPORT_TEMPLATES_FILE",
+        os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+            "templates", "report_templates.json"
+        )
+    )  # 报告模板配置文件(默认为插件 templates 目录)
+
+    # Word 报告生成配置
+    WORD_STREAM_FLUSH_EVERY = int(os.getenv("WORD_STREAM_FLUSH_EVERY", 200))  # 生成时每累积多少个正文元素写出到临时文件(控制大报告的内存占用)
+    WORD_SKELETON_DIR = os.getenv(
+        "WORD_SKELETON_DIR",
+        os.path.join(os.path.expanduser("~"), ".construction-doc-processor", "skeletons")
+    )  # 报告骨架 .docx 磁盘缓存目录(设为空则只在内存中缓存)
+    REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", min(4, os.cpu_count() or 1)))  # 批量生成报告的工作进程数
 
     # 性能优化
     ENABLE_CACHE = os.getenv("ENABLE_CACHE", "true").lower() == "true"
     CACHE_TTL = 3600  # 缓存过期时间(秒) - 1小时
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 128))  # 解析结果缓存最大条目数
+
+    # 启动预热配置 (MCP 握手完成后在后台线程执行)
+    PREWARM_BACKENDS = [t.strip() for t in os.getenv("PREWARM_BACKENDS", "").split(",") if t.strip()]  # 预热的解析后端(word,excel,powerpoint,pdf 或 all)
+    PREWARM_DIRECTORIES = [d for d in os.getenv("PREWARM_DIRECTORIES", "").split(os.pathsep) if d]  # 预加载解析缓存的项目目录
+    PREWARM_RECENT_PROJECTS = int(os.getenv("PREWARM_RECENT_PROJECTS", 0))  # 预加载最近使用的项目目录数(0 表示不记录也不预加载)
+    PREWARM_MAX_FILES = int(os.getenv("PREWARM_MAX_FILES", 20))  # 每个目录预加载的最近修改文档数
+    RECENT_PROJECTS_FILE = os.getenv(
+        "RECENT_PROJECTS_FILE",
+        os.path.join(os.path.expanduser("~"), ".construction-doc-processor", "recent_projects.json")
+    )  # 最近使用的项目目录记录文件
+    RECENT_PROJECTS_MAX = 20  # 最多记录的项目目录数
+
+    # 重复文档检测配置
+    DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", 0.8))  # 判定为重复的相似度阈值
+    DUPLICATE_NUM_PERM = 64  # MinHash 排列数
+    DUPLICATE_LSH_BANDS = 16  # LSH 分段数 (每段 4 行,相似度约 0.5 以上即成为候选)
+
+    # 目录监控配置
+    WATCH_DIRECTORIES = [d for d in os.getenv("WATCH_DIRECTORIES", "").split(os.pathsep) if d]  # 启动时自动监控的目录
+    WATCH_DEBOUNCE_SECONDS = float(os.getenv("WATCH_DEBOUNCE_SECONDS", 2.0))  # 文件变化静默多久后处理
+    WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", 5.0))  # 轮询模式扫描间隔(秒)
+    WATCH_WORKERS = int(os.getenv("WATCH_WORKERS", 2))  # 重新解析的工作线程数
+
+    # 索引配置
+    INDEX_DIR_NAME = os.getenv("INDEX_DIR_NAME", ".construction_index")  # 索引目录(位于项目根目录下)
+    INDEX_MANIFEST_FILE = "manifest.json"  # 文档清单文件名
+    SEARCH_INDEX_FILE = "search.db"  # 全文索引数据库文件名
+    INDEX_IGNORE_PREFIXES = ('.', '~$')  # 忽略的文件/目录前缀(隐藏文件、Office 临时文件)
+    SIGNATURE_INDEX_FILE = "signatures.json"  # 重复检测签名文件名
+    FACT_STORE_FILE = "facts.db"  # 关键事实库文件名
+    FACT_TYPES = [
+        'date', 'amount', 'percentage', 'organization',
+        'milestone', 'project_info', 'risk_event', 'decision_record'
+    ]  # 关键事实类型
+    INDEX_USE_DICTIONARY = os.getenv("INDEX_USE_DICTIONARY", "true").lower() == "true"  # 是否启用行业词典分词
+    INDEX_USER_DICT_FILE = os.getenv("INDEX_USER_DICT_FILE", "")  # 用户词典文件(每行一个词)
 
     # 日志配置
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE = os.getenv("LOG_FILE", "mcp_server.log")
     LOG_MAX_SIZE = 10 * 1024 * 1024  # 10MB
     LOG_BACKUP_COUNT = 3
+    LOG_LEVELS = {
+        name.strip(): level.strip().upper()
+        for name, _, level in (
+            item.partition("=") for item in os.getenv("LOG_LEVELS", "").split(",") if "=" in item
+        )
+    }  # 按模块设置日志级别(如 "parsers=WARNING,indexers.watcher=DEBUG",前缀匹配)
+    LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", 20))  # 同一日志模板在时间窗口内最多输出的条数(0 表示不限,WARNING 及以上不限)
+    LOG_RATE_WINDOW = float(os.getenv("LOG_RATE_WINDOW", 10.0))  # 日志限流时间窗口(秒)
+
+    # 运行指标配置
+    METRICS_DUMP_FILE = os.getenv("METRICS_DUMP_FILE", "")  # 定期写出运行指标的 JSON 文件(为空则不写出)
+    METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", 60))  # 运行指标写出间隔(秒)
+    METRICS_LATENCY_BUCKETS = (
+        1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000
+    )  # 延迟直方图桶上界(毫秒)
+
+    # 性能剖析配置 (默认关闭)
+    PROFILE_TOOLS = [t.strip() for t in os.getenv("PROFILE_TOOLS", "").split(",") if t.strip()]  # 剖析的工具(逗号分隔或 all,为空则关闭)
+    PROFILE_MODE = os.getenv("PROFILE_MODE", "sampling")  # sampling=栈采样(折叠栈), cprofile=cProfile(.prof), both=两者
+    PROFILE_DIR = os.getenv(
+        "PROFILE_DIR",
+        os.path.join(os.path.expanduser("~"), ".construction-doc-processor", "profiles")
+    )  # 剖析记录输出目录
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 1.0))  # 被剖析的调用比例(0-1)
+    PROFILE_MAX_PER_MINUTE = int(os.getenv("PROFILE_MAX_PER_MINUTE", 6))  # 每分钟最多剖析的调用数
+    PROFILE_MIN_SECONDS = float(os.getenv("PROFILE_MIN_SECONDS", 1.0))  # 只保存耗时不少于该值(秒)的调用
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.005))  # 栈采样间隔(秒)
+    PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", 200))  # 最多保留的剖析记录数
 
     # 错误处理
     RETRY_COUNT = 3
@@ -68,6 +153,19 @@ class Config:
         '环境': ['环保', '扬尘', '噪音', '污水', '固废', '文明施工']
     }
 
+    # 建筑行业术语(全文索引词典,与 CONSTRUCTION_KEYWORDS 合并使用)
+    CONSTRUCTION_TERMS = [
+        '施工日志', '施工方案', '专项方案', '技术交底', '安全交底', '隐蔽工程', '隐蔽验收',
+        '分部工程', '分项工程', '检验批', '单位工程', '竣工验收', '竣工图', '监理日志',
+        '监理通知', '工程联系单', '设计变更', '工程洽商', '签证', '进度计划', '形象进度',
+        '混凝土', '钢筋', '模板', '脚手架', '塔吊', '施工电梯', '基坑', '土方', '桩基',
+        '地基', '基础', '主体结构', '砌体', '防水', '屋面', '装饰装修', '幕墙', '给排水',
+        '暖通', '电气', '消防', '强度等级', '坍落度', '试块', '见证取样', '旁站',
+        '质量通病', '安全隐患', '危大工程', '高处作业', '临时用电', '动火作业', '有限空间',
+        '劳务分包', '总包', '建设单位', '监理单位', '施工单位', '设计单位', '项目经理',
+        '安全员', '质检员', '施工员', '资料员', '材料员'
+    ]
+
     @classmethod
     def get_file_type_by_extension(cls, file_path: str) -> Optional[str]:
         """
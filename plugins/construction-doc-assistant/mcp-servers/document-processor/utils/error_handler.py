@@ -91,6 +91,13 @@ class ErrorHandler:
                 '尝试简化文档内容'
             ]
         },
+        'ValueError': {
+            'message': '参数错误',
+            'suggestions': [
+                '请检查必需参数是否已提供',
+                '确认参数取值有效(如关键词不能为空)'
+            ]
+        },
         'OSError': {
             'message': '系统错误',
             'suggestions': [
@@ -122,7 +129,8 @@ class ErrorHandler:
 
         # 记录完整错误到日志
         logger.error(
-            f"错误类型: {error_type}, 消息: {error_message}",
+            "错误类型: %s, 消息: %s",
+            error_type, error_message,
             exc_info=True
         )
 
@@ -187,7 +195,7 @@ class ErrorHandler:
                 result['file_info']['size'] = os.path.getsize(file_path)
                 result['file_info']['extension'] = os.path.splitext(file_path)[1]
             except Exception as e:
-                logger.warning(f"无法获取文件信息: {e}")
+                logger.warning("无法获取文件信息: %s", e)
 
         return result
 
@@ -3,13 +3,226 @@
 
 提供统一的日志记录功能
 重要：MCP 服务器只能将日志输出到 stderr，不能输出到 stdout
+
+日志记录不在调用线程中做 I/O:
+- 所有日志记录器共享一个 QueueHandler,记录放入队列后立即返回
+- 后台 QueueListener 线程负责格式化并写入 stderr 和 (可选的) 轮转日志文件
+- 消息按 %-style 延迟格式化,被级别过滤的日志不产生格式化开销
+- 同一日志模板在 LOG_RATE_WINDOW 秒内超过 LOG_RATE_LIMIT 条时省略 (WARNING 及以上不限流)
+- LOG_LEVELS 按模块前缀设置日志级别
+
+文件日志不在导入时创建: 服务器启动后调用 enable_file_logging()
 """
 import sys
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
 from .config import config
 
+# 日志格式
+_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# 由 setup_logger 配置的日志记录器、共享的队列处理器、后台监听线程和文件处理器
+_configured_loggers: List[logging.Logger] = []
+_queue_handler: Optional[logging.Handler] = None
+_listener = None
+_file_handler: Optional[logging.Handler] = None
+_handlers_lock = threading.Lock()
+
+
+class _DeferredQueueHandler(logging.Handler):
+    """
+    队列处理器: 调用线程只把日志记录放入队列
+
+    与 logging.handlers.QueueHandler 不同,入队前不格式化消息 (队列只在进程内使用,
+    无需序列化),格式化在监听线程中完成。日志参数在记录后不应再被修改
+    """
+
+    def __init__(self, record_queue):
+        super().__init__()
+        self.queue = record_queue
+        # 监听线程停止后直接由这些处理器同步输出 (退出阶段的日志不丢失)
+        self.direct_handlers: tuple = ()
+
+    def emit(self, record: logging.LogRecord):
+        if self.direct_handlers:
+            for handler in self.direct_handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except Exception:
+            self.handleError(record)
+
+
+class _RateLimitFilter(logging.Filter):
+    """按 (日志记录器, 级别, 消息模板) 限制重复日志的输出频率"""
+
+    # 限流状态条目数超过该值时清理过期条目
+    MAX_KEYS = 1024
+
+    def __init__(self, limit: int, window: float):
+        """
+        Args:
+            limit: 时间窗口内同一模板最多输出的条数 (0 表示不限)
+            window: 时间窗口(秒)
+        """
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._states: Dict[tuple, list] = {}  # 键 -> [窗口开始时间, 已输出条数, 已省略条数]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            state = self._states.get(key)
+            if state is None or now - state[0] >= self.window:
+                if state is None and len(self._states) >= self.MAX_KEYS:
+                    self._prune(now)
+                suppressed = state[2] if state else 0
+                self._states[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} (上一时间窗口内省略 {suppressed} 条同类日志)"
+                return True
+
+            if state[1] < self.limit:
+                state[1] += 1
+                return True
+
+            state[2] += 1
+            return False
+
+    def _prune(self, now: float):
+        """清理已过期的限流状态 (调用方持有锁)"""
+        expired = [key for key, state in self._states.items() if now - state[0] >= self.window]
+        for key in expired:
+            del self._states[key]
+
+
+def _create_file_handler(log_file: str) -> Optional[logging.Handler]:
+    """创建轮转文件处理器 (失败时返回 None)"""
+    from logging.handlers import RotatingFileHandler
+
+    try:
+        handler = RotatingFileHandler(
+            log_file,
+            maxBytes=config.LOG_MAX_SIZE,
+            backupCount=config.LOG_BACKUP_COUNT,
+            encoding='utf-8'
+        )
+    except Exception as e:
+        # 如果文件日志失败，只记录到 stderr
+        logging.getLogger("mcp_document_processor").error("无法创建文件日志处理器: %s", e)
+        return None
+
+    handler.setLevel(logging.DEBUG)  # 文件记录更详细的日志
+    handler.setFormatter(_FORMATTER)
+    return handler
+
+
+def _get_queue_handler() -> logging.Handler:
+    """获取共享的队列处理器 (首次调用时启动后台监听线程)"""
+    global _queue_handler, _listener
+
+    with _handlers_lock:
+        if _queue_handler is None:
+            from logging.handlers import QueueListener
+
+            record_queue = queue.SimpleQueue()
+
+            # stderr 处理器 - 必需，MCP 服务器标准输出
+            stderr_handler = logging.StreamHandler(sys.stderr)
+            stderr_handler.setLevel(logging.INFO)
+            stderr_handler.setFormatter(_FORMATTER)
+
+            _listener = QueueListener(record_queue, stderr_handler, respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown_logging)
+
+            _queue_handler = _DeferredQueueHandler(record_queue)
+            _queue_handler.addFilter(_RateLimitFilter(config.LOG_RATE_LIMIT, config.LOG_RATE_WINDOW))
+
+        return _queue_handler
+
+
+def shutdown_logging():
+    """停止后台监听线程 (输出队列中剩余的日志),服务器退出时调用"""
+    global _listener
+
+    with _handlers_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        _queue_handler.direct_handlers = listener.handlers
+
+
+def enable_file_logging(log_file: Optional[str] = None) -> bool:
+    """
+    启用文件日志: 后台监听线程同时写入共享的轮转文件
+
+    Args:
+        log_file: 日志文件路径 (默认: config.LOG_FILE,为空时不启用)
+
+    Returns:
+        是否已启用
+    """
+    global _file_handler
+
+    _get_queue_handler()
+    with _handlers_lock:
+        if _file_handler is None:
+            log_file = log_file or config.LOG_FILE
+            if not log_file:
+                return False
+            _file_handler = _create_file_handler(log_file)
+            if _file_handler is None:
+                return False
+
+        if _listener is not None and _file_handler not in _listener.handlers:
+            _listener.handlers = _listener.handlers + (_file_handler,)
+
+    return True
+
+
+def _resolve_level(name: str, level: Optional[str] = None) -> int:
+    """日志级别: LOG_LEVELS 中最长的匹配前缀 > 调用方指定的级别 > LOG_LEVEL"""
+    matches = [
+        prefix for prefix in config.LOG_LEVELS
+        if name == prefix or name.startswith(prefix + '.')
+    ]
+    if matches:
+        level = config.LOG_LEVELS[max(matches, key=len)]
+    level = level or config.LOG_LEVEL
+    return getattr(logging, level.upper(), logging.INFO)
+
+
+def set_module_level(prefix: str, level: str):
+    """
+    运行时设置模块日志级别 (对已创建和之后创建的日志记录器生效)
+
+    Args:
+        prefix: 日志记录器名称或模块前缀 (如 "parsers")
+        level: 日志级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+    """
+    config.LOG_LEVELS[prefix] = level.upper()
+    with _handlers_lock:
+        loggers = list(_configured_loggers)
+    for logger in loggers:
+        logger.setLevel(_resolve_level(logger.name))
+
 
 def setup_logger(
     name: str = "mcp_document_processor",
@@ -21,8 +234,8 @@ def setup_logger(
 
     Args:
         name: 日志记录器名称
-        level: 日志级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-        log_file: 日志文件路径 (可选)
+        level: 日志级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL),LOG_LEVELS 中的模块设置优先
+        log_file: 额外写入的日志文件路径 (可选,默认在 enable_file_logging() 后写入 config.LOG_FILE)
 
     Returns:
         配置好的 Logger 实例
@@ -33,42 +246,22 @@ def setup_logger(
     if logger.handlers:
         return logger
 
-    # 设置日志级别
-    log_level = level or config.LOG_LEVEL
-    logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
-
-    # 日志格式
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    logger.setLevel(_resolve_level(name, level))
+    logger.addHandler(_get_queue_handler())
 
-    # 1. stderr 处理器 - 必需，MCP 服务器标准输出
-    stderr_handler = logging.StreamHandler(sys.stderr)
-    stderr_handler.setLevel(logging.INFO)
-    stderr_handler.setFormatter(formatter)
-    logger.addHandler(stderr_handler)
-
-    # 2. 文件处理器 - 可选，用于持久化日志
-    if log_file or config.LOG_FILE:
-        try:
-            file_handler = RotatingFileHandler(
-                log_file or config.LOG_FILE,
-                maxBytes=config.LOG_MAX_SIZE,
-                backupCount=config.LOG_BACKUP_COUNT,
-                encoding='utf-8'
-            )
-            file_handler.setLevel(logging.DEBUG)  # 文件记录更详细的日志
-            file_handler.setFormatter(formatter)
+    # 显式指定 log_file 时为该日志记录器单独写入文件
+    if log_file:
+        file_handler = _create_file_handler(log_file)
+        if file_handler is not None:
             logger.addHandler(file_handler)
-        except Exception as e:
-            # 如果文件日志失败，只记录到 stderr
-            logger.error(f"无法创建文件日志处理器: {e}")
+
+    with _handlers_lock:
+        _configured_loggers.append(logger)
 
     # 防止日志传播到父 logger
     logger.propagate = False
 
-    logger.info(f"日志系统初始化完成 - 级别: {log_level}")
+    logger.debug("日志系统初始化完成 - 级别: %s", logging.getLevelName(logger.level))
     return logger
 
 
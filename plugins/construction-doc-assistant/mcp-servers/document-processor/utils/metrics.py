@@ -0,0 +1,286 @@
+"""
+运行指标模块
+
+进程内指标注册表 (线程安全),统计:
+- 每个工具的调用次数、错误次数、延迟直方图和读取的字节数
+- 每种文档类型的解析吞吐量 (段落/行/页/幻灯片每秒、MB/秒)
+- 解析缓存命中率
+- 按 ErrorHandler 错误类别 (user_message) 统计的错误数
+
+由 get_server_stats 工具读取,也可按 METRICS_DUMP_FILE 定期写出为 JSON
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+import bisect
+import json
+import os
+import threading
+import time
+
+from .config import config
+from .logger import get_logger
+from .parse_cache import parse_cache
+
+logger = get_logger(__name__)
+
+# 当前正在执行的工具 (字节数和错误归属到该工具)
+_current_tool: ContextVar[Optional[str]] = ContextVar("current_tool", default=None)
+
+
+class MetricsRegistry:
+    """运行指标注册表"""
+
+    # 文档类型 -> (处理单元名称, 解析结果 summary 中的计数字段)
+    UNIT_FIELDS = {
+        'word': ('段落', ('total_paragraphs', 'total_table_rows')),
+        'excel': ('行', ('total_rows',)),
+        'powerpoint': ('幻灯片', ('total_slides',)),
+        'pdf': ('页', ('pages_extracted',)),
+    }
+
+    def __init__(self, latency_buckets: Optional[List[float]] = None):
+        """
+        初始化指标注册表
+
+        Args:
+            latency_buckets: 延迟直方图桶上界(毫秒) (默认: config.METRICS_LATENCY_BUCKETS)
+        """
+        self.latency_buckets = list(latency_buckets or config.METRICS_LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+        self._dump_stop: Optional[threading.Event] = None
+        self._dump_thread: Optional[threading.Thread] = None
+        self._dump_file: Optional[str] = None
+        self.reset()
+
+    def reset(self):
+        """清空全部指标"""
+        with self._lock:
+            self.started_at = datetime.now().isoformat(timespec='seconds')
+            self._started = time.monotonic()
+            self._tools: Dict[str, Dict] = {}
+            self._parsing: Dict[str, Dict] = {}
+            self._errors: Dict[str, int] = {}
+            self._cache_base = parse_cache.stats()
+
+    # ========== 记录 ==========
+
+    @contextmanager
+    def track(self, tool_name: str):
+        """
+        统计一次工具调用的耗时 (期间读取的字节数和错误归属到该工具)
+
+        Args:
+            tool_name: 工具名
+        """
+        token = _current_tool.set(tool_name)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            _current_tool.reset(token)
+            self.record_call(tool_name, time.perf_counter() - start_time)
+
+    def record_call(self, tool_name: str, seconds: float):
+        """记录一次工具调用"""
+        milliseconds = seconds * 1000
+        with self._lock:
+            tool = self._tool(tool_name)
+            tool["calls"] += 1
+            tool["total_ms"] += milliseconds
+            tool["min_ms"] = min(tool["min_ms"], milliseconds) if tool["min_ms"] is not None else milliseconds
+            tool["max_ms"] = max(tool["max_ms"], milliseconds)
+            tool["histogram"][bisect.bisect_left(self.latency_buckets, milliseconds)] += 1
+
+    def record_error(self, category: str, tool_name: Optional[str] = None):
+        """
+        记录一次错误
+
+        Args:
+            category: 错误类别 (ErrorHandler 的 user_message,如 "文件不存在")
+            tool_name: 工具名 (默认: 当前正在执行的工具)
+        """
+        tool_name = tool_name or _current_tool.get()
+        with self._lock:
+            self._errors[category] = self._errors.get(category, 0) + 1
+            if tool_name:
+                self._tool(tool_name)["errors"] += 1
+
+    def record_read(self, num_bytes: int):
+        """记录当前工具读取的文档字节数"""
+        tool_name = _current_tool.get()
+        if tool_name:
+            with self._lock:
+                self._tool(tool_name)["bytes_read"] += num_bytes
+
+    def record_parse(self, file_type: str, num_bytes: int, summary: Dict, seconds: float):
+        """
+        记录一次文档解析 (未命中缓存的实际解析)
+
+        Args:
+            file_type: 文档类型
+            num_bytes: 文件大小
+            summary: 解析结果的 summary (用于统计处理单元数)
+            seconds: 解析耗时(秒)
+        """
+        unit_name, fields = self.UNIT_FIELDS.get(file_type, ('单元', ()))
+        units = sum(summary.get(field) or 0 for field in fields)
+
+        self.record_read(num_bytes)
+        with self._lock:
+            stats = self._parsing.setdefault(file_type, {
+                "unit": unit_name, "documents": 0, "bytes": 0, "units": 0, "seconds": 0.0,
+            })
+            stats["documents"] += 1
+            stats["bytes"] += num_bytes
+            stats["units"] += units
+            stats["seconds"] += seconds
+
+    def _tool(self, tool_name: str) -> Dict:
+        """获取工具的指标条目 (调用方持有锁)"""
+        tool = self._tools.get(tool_name)
+        if tool is None:
+            tool = self._tools[tool_name] = {
+                "calls": 0, "errors": 0, "total_ms": 0.0, "min_ms": None, "max_ms": 0.0,
+                "bytes_read": 0, "histogram": [0] * (len(self.latency_buckets) + 1),
+            }
+        return tool
+
+    # ========== 读取 ==========
+
+    def snapshot(self) -> Dict:
+        """
+        获取当前指标快照
+
+        Returns:
+            指标字典 (可直接序列化为 JSON)
+        """
+        with self._lock:
+            tools = {name: self._tool_stats(tool) for name, tool in sorted(self._tools.items())}
+            parsing = {
+                file_type: {
+                    **stats,
+                    "seconds": round(stats["seconds"], 3),
+                    "units_per_second": round(stats["units"] / stats["seconds"], 1) if stats["seconds"] else None,
+                    "mb_per_second": round(stats["bytes"] / 1024 / 1024 / stats["seconds"], 2) if stats["seconds"] else None,
+                }
+                for file_type, stats in sorted(self._parsing.items())
+            }
+            errors = dict(sorted(self._errors.items(), key=lambda item: -item[1]))
+            cache_base = self._cache_base
+            started_at = self.started_at
+            uptime = time.monotonic() - self._started
+
+        cache = parse_cache.stats()
+        hits = max(0, cache["hits"] - cache_base["hits"])
+        misses = max(0, cache["misses"] - cache_base["misses"])
+
+        return {
+            "started_at": started_at,
+            "uptime_seconds": round(uptime, 1),
+            "total_calls": sum(tool["calls"] for tool in tools.values()),
+            "tools": tools,
+            "parsing": parsing,
+            "cache": {
+                "enabled": config.ENABLE_CACHE,
+                "entries": cache["entries"],
+                "max_entries": cache["max_entries"],
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+            },
+            "errors_by_category": errors,
+        }
+
+    def _tool_stats(self, tool: Dict) -> Dict:
+        """整理单个工具的指标 (调用方持有锁)"""
+        calls = tool["calls"]
+        bounds = [str(bound) for bound in self.latency_buckets] + ["+Inf"]
+        return {
+            "calls": calls,
+            "errors": tool["errors"],
+            "avg_ms": round(tool["total_ms"] / calls, 2) if calls else None,
+            "min_ms": round(tool["min_ms"], 2) if tool["min_ms"] is not None else None,
+            "p50_ms": self._estimate_percentile(tool, 50),
+            "p95_ms": self._estimate_percentile(tool, 95),
+            "max_ms": round(tool["max_ms"], 2),
+            "total_seconds": round(tool["total_ms"] / 1000, 3),
+            "bytes_read": tool["bytes_read"],
+            "histogram": {bound: count for bound, count in zip(bounds, tool["histogram"]) if count},
+        }
+
+    def _estimate_percentile(self, tool: Dict, percent: float) -> Optional[float]:
+        """由直方图估算延迟百分位数 (桶内线性插值,并限制在最小/最大值之间)"""
+        calls = tool["calls"]
+        if not calls:
+            return None
+
+        rank = percent / 100 * calls
+        cumulative = 0
+        for i, count in enumerate(tool["histogram"]):
+            if count and cumulative + count >= rank:
+                lower = self.latency_buckets[i - 1] if i > 0 else 0.0
+                upper = self.latency_buckets[i] if i < len(self.latency_buckets) else tool["max_ms"]
+                estimate = lower + (upper - lower) * (rank - cumulative) / count
+                return round(min(max(estimate, tool["min_ms"]), tool["max_ms"]), 2)
+            cumulative += count
+        return round(tool["max_ms"], 2)
+
+    # ========== 定期写出 ==========
+
+    def dump(self, file_path: str):
+        """将指标快照写入 JSON 文件 (原子替换)"""
+        snapshot = {**self.snapshot(), "dumped_at": datetime.now().isoformat(timespec='seconds')}
+        directory = os.path.dirname(os.path.abspath(file_path))
+        os.makedirs(directory, exist_ok=True)
+
+        temp_path = file_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, file_path)
+
+    def start_dump(self, file_path: Optional[str] = None, interval: Optional[float] = None):
+        """
+        启动后台线程定期写出指标
+
+        Args:
+            file_path: JSON 文件路径 (默认: config.METRICS_DUMP_FILE)
+            interval: 写出间隔(秒) (默认: config.METRICS_DUMP_INTERVAL)
+        """
+        file_path = file_path or config.METRICS_DUMP_FILE
+        interval = interval or config.METRICS_DUMP_INTERVAL
+        if not file_path or self._dump_thread is not None:
+            return
+
+        stop_event = threading.Event()
+
+        def dump_loop():
+            while not stop_event.wait(interval):
+                try:
+                    self.dump(file_path)
+                except OSError as e:
+                    logger.warning("运行指标写出失败: %s", e)
+
+        self._dump_stop = stop_event
+        self._dump_thread = threading.Thread(target=dump_loop, name="metrics-dump", daemon=True)
+        self._dump_thread.start()
+        self._dump_file = file_path
+        logger.info("运行指标每 %g 秒写出到: %s", interval, file_path)
+
+    def stop_dump(self):
+        """停止定期写出,并写出最终快照"""
+        if self._dump_thread is None:
+            return
+
+        self._dump_stop.set()
+        self._dump_thread.join(timeout=5)
+        self._dump_thread = None
+        try:
+            self.dump(self._dump_file)
+        except OSError as e:
+            logger.warning("运行指标写出失败: %s", e)
+
+
+# 全局指标注册表
+metrics = MetricsRegistry()
@@ -0,0 +1,163 @@
+"""
+解析结果缓存模块
+
+进程内 LRU 缓存,按 (文件路径, 解析选项) 缓存解析结果
+命中时校验文件 size/mtime,文件变化或超过 CACHE_TTL 的条目视为失效
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+from .config import config
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ParseCache:
+    """解析结果 LRU 缓存 (线程安全)"""
+
+    # 不影响解析结果的参数 (不参与缓存键): 文件路径、输出格式,以及只由服务器处理、解析器不读取的工具参数
+    IGNORED_OPTIONS = ('file_path', 'file_paths', 'output_format', 'parse_mode', 'extract_mode', 'skip_duplicates')
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[int] = None):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最大缓存条目数 (默认: config.CACHE_MAX_ENTRIES)
+            ttl: 过期时间(秒) (默认: config.CACHE_TTL)
+        """
+        self.max_entries = max_entries or config.CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else config.CACHE_TTL
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def _make_key(cls, file_path: str, options: Optional[Dict]) -> Tuple[str, str]:
+        """生成缓存键 (绝对路径, 规范化的选项 JSON)"""
+        options = {
+            k: v for k, v in (options or {}).items()
+            if k not in cls.IGNORED_OPTIONS
+        }
+        return (
+            os.path.abspath(file_path),
+            json.dumps(options, sort_keys=True, ensure_ascii=False, default=str)
+        )
+
+    def get(self, file_path: str, options: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        读取缓存的解析结果
+
+        Args:
+            file_path: 文件路径
+            options: 解析选项
+
+        Returns:
+            解析结果 (顶层浅拷贝) 或 None
+        """
+        key = self._make_key(file_path, options)
+
+        try:
+            stat = os.stat(key[0])
+        except OSError:
+            self.invalidate(file_path)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            size, mtime_ns, cached_at, result = entry
+            if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns) or time.time() - cached_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return dict(result)
+
+    def put(self, file_path: str, options: Optional[Dict], result: Dict):
+        """
+        写入解析结果 (仅缓存成功结果)
+
+        Args:
+            file_path: 文件路径
+            options: 解析选项
+            result: 解析结果
+        """
+        if result.get('status') != 'success':
+            return
+
+        key = self._make_key(file_path, options)
+        try:
+            stat = os.stat(key[0])
+        except OSError:
+            return
+
+        with self._lock:
+            self._entries[key] = (stat.st_size, stat.st_mtime_ns, time.time(), dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, file_path: str) -> int:
+        """
+        移除文件的全部缓存条目
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            移除的条目数
+        """
+        path = os.path.abspath(file_path)
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == path]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def cached_options(self, file_path: str) -> List[Dict]:
+        """
+        获取文件已缓存的全部解析选项 (用于文件变化后按相同选项重新预热)
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            选项字典列表
+        """
+        path = os.path.abspath(file_path)
+        with self._lock:
+            return [json.loads(key[1]) for key in self._entries if key[0] == path]
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """获取缓存统计"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# 全局缓存实例
+parse_cache = ParseCache()
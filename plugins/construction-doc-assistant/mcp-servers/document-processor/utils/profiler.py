@@ -0,0 +1,250 @@
+"""
+工具调用性能剖析模块
+
+按 PROFILE_TOOLS 配置对单次工具调用进行剖析 (默认关闭):
+- sampling: 后台线程定时采样调用线程的调用栈,开销低,输出折叠栈文件 (.collapsed),
+  可直接用于 flamegraph.pl / speedscope 生成火焰图
+- cprofile: 使用 cProfile 记录全部函数调用,输出 .prof 文件 (pstats / snakeviz 可读)
+- both: 同时使用两种方式
+
+每条记录另附 .txt 摘要 (工具、参数、耗时、耗时最多的函数)
+采样比例、每分钟剖析次数上限、最短耗时和保留文件数均可配置,可在生产环境中常开
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+import collections
+import glob
+import io
+import os
+import random
+import sys
+import threading
+import time
+
+from .config import config
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class StackSampler:
+    """调用栈采样器 (统计指定线程的调用栈出现次数)"""
+
+    def __init__(self, thread_id: int, interval: float):
+        """
+        初始化采样器
+
+        Args:
+            thread_id: 被采样的线程 ID
+            interval: 采样间隔(秒)
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: collections.Counter = collections.Counter()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """开始采样"""
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止采样"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        """采样循环"""
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """折叠栈格式 (每行: 调用栈 次数)"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 20) -> List[tuple]:
+        """按自身采样数排序的函数 [(函数, 采样数)]"""
+        self_counts = collections.Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack.rsplit(';', 1)[-1]] += count
+        return self_counts.most_common(limit)
+
+
+class ToolProfiler:
+    """工具调用剖析器"""
+
+    MODES = ('sampling', 'cprofile', 'both')
+
+    def __init__(self):
+        self.tools = config.PROFILE_TOOLS
+        self.mode = config.PROFILE_MODE if config.PROFILE_MODE in self.MODES else 'sampling'
+        self.output_dir = config.PROFILE_DIR
+        self.sample_rate = config.PROFILE_SAMPLE_RATE
+        self.max_per_minute = config.PROFILE_MAX_PER_MINUTE
+        self.min_seconds = config.PROFILE_MIN_SECONDS
+        self.logger = get_logger(__name__)
+
+        # cProfile 不能同时运行多个,同一时间只剖析一个调用
+        self._busy = threading.Lock()
+        self._recent = collections.deque()  # 最近一分钟开始剖析的时间
+        self._rate_lock = threading.Lock()
+        self.profiled = 0
+        self.saved = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用剖析"""
+        return bool(self.tools)
+
+    def should_profile(self, tool_name: str) -> bool:
+        """按工具、采样比例和每分钟上限判断本次调用是否剖析"""
+        if not self.enabled or ('all' not in self.tools and tool_name not in self.tools):
+            return False
+        if random.random() >= self.sample_rate:
+            return False
+
+        now = time.monotonic()
+        with self._rate_lock:
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_per_minute:
+                self.skipped += 1
+                return False
+            self._recent.append(now)
+        return True
+
+    @contextmanager
+    def profile(self, tool_name: str, arguments: Optional[Dict] = None):
+        """
+        剖析一次工具调用 (未启用或不满足条件时直接执行)
+
+        Args:
+            tool_name: 工具名
+            arguments: 工具参数 (写入摘要)
+        """
+        if not self.should_profile(tool_name) or not self._busy.acquire(blocking=False):
+            yield
+            return
+
+        sampler = None
+        profile = None
+        try:
+            if self.mode in ('sampling', 'both'):
+                sampler = StackSampler(threading.get_ident(), config.PROFILE_SAMPLE_INTERVAL)
+                sampler.start()
+            if self.mode in ('cprofile', 'both'):
+                import cProfile
+                profile = cProfile.Profile()
+                profile.enable()
+
+            start_time = time.perf_counter()
+            try:
+                yield
+            finally:
+                elapsed = time.perf_counter() - start_time
+                if profile is not None:
+                    profile.disable()
+                if sampler is not None:
+                    sampler.stop()
+
+            self.profiled += 1
+            if elapsed >= self.min_seconds:
+                self._save(tool_name, arguments or {}, elapsed, sampler, profile)
+        finally:
+            self._busy.release()
+
+    def _save(self, tool_name: str, arguments: Dict, elapsed: float, sampler, profile):
+        """写出剖析结果 (写出失败只记录警告,不影响工具调用)"""
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            timestamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+            base = os.path.join(self.output_dir, f"{timestamp}_{tool_name}_{elapsed * 1000:.0f}ms")
+
+            summary = [
+                f"工具: {tool_name}",
+                f"参数: {self._describe_arguments(arguments)}",
+                f"耗时: {elapsed:.3f}s",
+                f"模式: {self.mode}",
+                "",
+            ]
+
+            if sampler is not None:
+                with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+                    f.write(sampler.collapsed())
+                total = sum(sampler.stacks.values())
+                summary.append(f"栈采样: {total} 次 (间隔 {sampler.interval * 1000:g} ms),按自身采样数排序:")
+                for function, count in sampler.top_functions():
+                    summary.append(f"  {count / total:6.1%}  {function}")
+                summary.append("")
+
+            if profile is not None:
+                import pstats
+                profile.dump_stats(base + '.prof')
+                stream = io.StringIO()
+                pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(20)
+                summary.append("cProfile (按累计耗时排序):")
+                summary.append(stream.getvalue().strip())
+
+            with open(base + '.txt', 'w', encoding='utf-8') as f:
+                f.write('\n'.join(summary) + '\n')
+
+            self.saved += 1
+            self._prune()
+            self.logger.info("已保存剖析记录: %s.* (%s, %.3fs)", base, tool_name, elapsed)
+        except OSError as e:
+            self.logger.warning("剖析记录写出失败: %s", e)
+
+    @staticmethod
+    def _describe_arguments(arguments: Dict) -> str:
+        """参数摘要 (长文本截断)"""
+        parts = []
+        for key, value in arguments.items():
+            text = str(value)
+            parts.append(f"{key}={text[:200] + '...' if len(text) > 200 else text}")
+        return ', '.join(parts)
+
+    def _prune(self):
+        """只保留最新的 PROFILE_MAX_FILES 条剖析记录"""
+        if config.PROFILE_MAX_FILES <= 0:
+            return
+
+        # 文件名以时间戳开头,按名称排序即按时间排序
+        summaries = sorted(glob.glob(os.path.join(glob.escape(self.output_dir), '*.txt')))
+        for summary in summaries[:-config.PROFILE_MAX_FILES]:
+            base = summary[:-len('.txt')]
+            for extension in ('.txt', '.collapsed', '.prof'):
+                try:
+                    os.remove(base + extension)
+                except FileNotFoundError:
+                    pass
+
+    def status(self) -> Dict:
+        """获取剖析状态"""
+        return {
+            "tools": self.tools,
+            "mode": self.mode,
+            "output_dir": self.output_dir,
+            "sample_rate": self.sample_rate,
+            "max_per_minute": self.max_per_minute,
+            "min_seconds": self.min_seconds,
+            "profiled": self.profiled,
+            "saved": self.saved,
+            "rate_limited": self.skipped,
+        }
+
+
+# 全局剖析器
+profiler = ToolProfiler()
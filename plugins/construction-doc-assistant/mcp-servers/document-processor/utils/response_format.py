@@ -0,0 +1,179 @@
+"""
+响应格式模块
+
+解析类工具除可读文本外的紧凑输出格式:
+- json: 紧凑 JSON (无缩进和多余空白,安装了 orjson 时使用 orjson 序列化)
+- ndjson: 每行一个 JSON 记录,首行为文档信息,之后每个 Word 章节/表格行、Excel 行、幻灯片、PDF 页一行
+- table: 表格数据 (Excel 工作表、Word 表格) 的紧凑文本,每行单元格以制表符分隔
+"""
+import json
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # 可选依赖,缺失时使用标准库 json
+    orjson = None
+
+# 解析类工具支持的输出格式 (text 为可读摘要,由服务器格式化)
+OUTPUT_FORMATS = ("text", "json", "ndjson", "table")
+
+
+def dumps(obj) -> str:
+    """
+    序列化为紧凑 JSON
+
+    Args:
+        obj: 可 JSON 序列化的对象 (无法序列化的值转为字符串)
+
+    Returns:
+        JSON 字符串 (非 ASCII 字符不转义)
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass  # 超出 orjson 支持范围的值 (如超过 64 位的整数) 改用标准库
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def dumps_lines(records: Iterable) -> str:
+    """
+    序列化为 NDJSON (每条记录一行)
+
+    Args:
+        records: 记录迭代器
+
+    Returns:
+        NDJSON 字符串
+    """
+    return '\n'.join(dumps(record) for record in records)
+
+
+def iter_parse_records(result: Dict) -> Iterator[Dict]:
+    """
+    将解析结果拆分为 NDJSON 记录
+
+    首条记录为文档信息 (file_info、summary、metadata),之后按内容单元各一条:
+    Word 章节 (section) 和表格行 (table_row),Excel 工作表 (sheet) 和行 (row),
+    幻灯片 (slide),PDF 页 (page) 和表格 (table)
+
+    Args:
+        result: 解析结果
+
+    Yields:
+        记录字典
+    """
+    if result.get("status") != "success":
+        yield {"type": "error", **result}
+        return
+
+    yield {
+        "type": "document",
+        **{key: value for key, value in result.items() if key != "content"},
+    }
+
+    content = result.get("content") or {}
+
+    for title, paragraphs in (content.get("sections") or {}).items():
+        yield {"type": "section", "title": title, "paragraphs": paragraphs}
+
+    for sheet in content.get("sheets") or []:
+        data = sheet.get("data") or []
+        yield {"type": "sheet", "name": sheet.get("name"), "headers": sheet.get("headers") or [], "rows": len(data)}
+        # 行号为工作表中的实际行号 (跳过的空行不影响编号);首行即表头,已在 sheet 记录中
+        row_numbers = sheet.get("row_numbers") or range(1, len(data) + 1)
+        for row_number, row in zip(row_numbers[1:], data[1:]):
+            yield {"type": "row", "sheet": sheet.get("name"), "row": row_number, "cells": row}
+
+    for slide in content.get("slides") or []:
+        yield {"type": "slide", **slide}
+
+    for page in content.get("pages") or []:
+        # text_preview 是 text 的前缀,不重复输出
+        yield {
+            "type": "page",
+            "page": page.get("page_number"),
+            "text": page.get("text", ""),
+        }
+
+    for table_position, table in enumerate(content.get("tables") or []):
+        if not isinstance(table, dict) or "data" not in table:
+            yield {"type": "table", "table": table_position, "data": table}
+            continue
+        table_index = table.get("index", table_position)
+        for row_number, row in enumerate(table["data"], 1):
+            yield {"type": "table_row", "table": table_index, "row": row_number, "cells": row}
+
+
+def _iter_tables(result: Dict) -> Iterator[Tuple[str, List[List]]]:
+    """解析结果中的表格数据: (标题, 行列表)"""
+    content = result.get("content") or {}
+    for sheet in content.get("sheets") or []:
+        yield f"工作表 {sheet.get('name')}", sheet.get("data") or []
+    for position, table in enumerate(content.get("tables") or []):
+        if isinstance(table, dict) and "data" in table:
+            yield f"表格 {table.get('index', position) + 1}", table["data"]
+        elif isinstance(table, list):
+            yield f"表格 {position + 1}", table
+
+
+def _condense_row(row: List) -> str:
+    """单元格以制表符连接 (去掉末尾空单元格,单元格内的换行和制表符替换为空格)"""
+    cells = ['' if cell is None else str(cell) for cell in row]
+    while cells and not cells[-1]:
+        cells.pop()
+    return '\t'.join(
+        cell.replace('\t', ' ').replace('\r', ' ').replace('\n', ' ') if cell else cell
+        for cell in cells
+    )
+
+
+def format_tables_text(result: Dict) -> str:
+    """
+    将解析结果中的表格数据编码为紧凑文本
+
+    每个表格以 "## 标题 (行数)" 开头,之后每行单元格以制表符分隔 (首行为表头);空行省略
+
+    Args:
+        result: 解析结果
+
+    Returns:
+        表格文本
+    """
+    file_name = (result.get("file_info") or {}).get("name", "")
+    lines = [f"# {file_name}"]
+    table_count = 0
+    for title, rows in _iter_tables(result):
+        table_count += 1
+        condensed = [line for line in map(_condense_row, rows) if line]
+        lines.append(f"## {title} ({len(condensed)} 行)")
+        lines.extend(condensed)
+
+    if not table_count:
+        lines.append("(文档中没有表格数据)")
+    return '\n'.join(lines)
+
+
+def format_parse_output(result: Dict, output_format: str) -> str:
+    """
+    按输出格式序列化解析结果 (text 格式由服务器格式化,不在此处理)
+
+    Args:
+        result: 解析结果
+        output_format: json、ndjson 或 table
+
+    Returns:
+        序列化后的字符串
+
+    Raises:
+        ValueError: 不支持的输出格式
+    """
+    if output_format == "json":
+        return dumps(result)
+    if output_format == "ndjson":
+        return dumps_lines(iter_parse_records(result))
+    if output_format == "table":
+        if result.get("status") != "success":
+            return dumps(result)
+        return format_tables_text(result)
+    raise ValueError(f"不支持的输出格式: {output_format}。可用格式: {', '.join(OUTPUT_FORMATS)}")
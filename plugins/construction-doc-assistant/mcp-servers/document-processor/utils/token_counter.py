@@ -0,0 +1,175 @@
+"""
+Token 估算模块
+
+按与 context-builder 技能一致的简化规则估算文本占用的 token 数:
+- 1 个中文字符 ≈ 2 tokens
+- 1 个英文单词/数字串 ≈ 1 token
+- 其他非空白符号 ≈ 1 token
+
+TokenBudget 用于解析时按 token 预算逐个接收内容单元,预算用完即停止读取
+"""
+import re
+from typing import Dict, Optional
+
+_CJK_RUN_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+_WORD_PATTERN = re.compile(r'[A-Za-z0-9_]+')
+
+TOKENS_PER_CJK_CHAR = 2
+
+_ELLIPSIS = "..."
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本的 token 数
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的 token 数
+    """
+    if not text:
+        return 0
+
+    # 去掉单词和空白后,剩下的每个字符 (中文或符号) 各计一次,中文字符再补足差额
+    # (subn 只计数不构造匹配列表,比逐类 findall 快)
+    rest, words = _WORD_PATTERN.subn('', text)
+    rest = ''.join(rest.split())
+    tokens = words + len(rest)
+    if not rest.isascii():
+        cjk_chars = len(rest) - len(_CJK_RUN_PATTERN.sub('', rest))
+        tokens += cjk_chars * (TOKENS_PER_CJK_CHAR - 1)
+    return tokens
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    截断文本使其不超过 token 预算
+
+    Args:
+        text: 文本
+        max_tokens: token 上限
+
+    Returns:
+        截断后的文本 (未超出时原样返回)
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # 二分查找可保留的最长前缀
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+_ELLIPSIS_TOKENS = estimate_tokens(_ELLIPSIS)
+
+
+class TokenBudget:
+    """
+    解析结果的 token 预算
+
+    解析器按文档顺序把内容单元 (段落、表格行、幻灯片文本、页面文本) 交给预算,
+    预算用完后停止读取后续内容。max_tokens 为 None 时不限制,也不估算 token
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None):
+        """
+        初始化预算
+
+        Args:
+            max_tokens: token 上限 (None 表示不限制)
+        """
+        self.max_tokens = max_tokens
+        self.used = 0
+        self.truncated = False
+
+    @property
+    def limited(self) -> bool:
+        """是否设置了预算"""
+        return self.max_tokens is not None
+
+    @property
+    def exhausted(self) -> bool:
+        """预算是否已用完 (用完后不再接收任何内容)"""
+        return self.limited and (self.truncated or self.used >= self.max_tokens)
+
+    def should_stop(self) -> bool:
+        """
+        读取下一个内容单元前调用: 预算已用完时标记为截断 (后面还有未读取的内容)
+
+        Returns:
+            是否应停止读取
+        """
+        if self.exhausted:
+            self.truncated = True
+            return True
+        return False
+
+    def take(self, text: str) -> Optional[str]:
+        """
+        接收一段文本,超出剩余预算时截断
+
+        Args:
+            text: 文本
+
+        Returns:
+            原文本、截断后的文本 (以 "..." 结尾),预算已用完时返回 None (空文本总是原样返回)
+        """
+        if not self.limited:
+            return text
+        tokens = estimate_tokens(text)
+        if not tokens:
+            # 空文本 (如没有备注的幻灯片) 不占预算,也不算作被截断的内容
+            return text
+        if self.exhausted:
+            self.truncated = True
+            return None
+
+        remaining = self.max_tokens - self.used
+        if tokens <= remaining:
+            self.used += tokens
+            return text
+
+        # 截断标记 "..." 也计入预算,剩余预算放不下标记时整段舍弃
+        self.truncated = True
+        keep = remaining - _ELLIPSIS_TOKENS
+        if keep <= 0:
+            return None
+        text = truncate_to_tokens(text, keep) + _ELLIPSIS
+        self.used += estimate_tokens(text)
+        return text
+
+    def fits(self, text: str) -> bool:
+        """
+        接收一个不可拆分的单元 (如表格行),超出剩余预算时整体舍弃
+
+        Args:
+            text: 单元文本
+
+        Returns:
+            是否接收 (不接收时预算标记为已用完)
+        """
+        if not self.limited:
+            return True
+        if not self.exhausted:
+            tokens = estimate_tokens(text)
+            if self.used + tokens <= self.max_tokens:
+                self.used += tokens
+                return True
+        self.truncated = True
+        return False
+
+    def to_dict(self) -> Dict:
+        """预算使用情况 (写入解析结果的 summary)"""
+        return {
+            "max_tokens": self.max_tokens,
+            "tokens_used": self.used,
+            "truncated": self.truncated,
+        }
@@ -6,13 +6,10 @@
 import os
 from typing import Dict, List, Optional
 from pathlib import Path
+import importlib.util
 
-# 尝试导入 python-magic，如果不可用则降级
-try:
-    import magic
-    MAGIC_AVAILABLE = True
-except ImportError:
-    MAGIC_AVAILABLE = False
+# python-magic 是否可用 (加载 libmagic 较慢,首次检测 MIME 类型时才导入)
+MAGIC_AVAILABLE = importlib.util.find_spec("magic") is not None
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -95,14 +92,12 @@ class DocumentValidator:
                 result["errors"].append("文件可能已损坏或格式不正确")
 
             logger.info(
-                f"文档验证完成: {file_path} - "
-                f"有效: {result['valid']}, "
-                f"警告: {len(result['warnings'])}, "
-                f"错误: {len(result['errors'])}"
+                "文档验证完成: %s - 有效: %s, 警告: %s, 错误: %s",
+                file_path, result['valid'], len(result['warnings']), len(result['errors'])
             )
 
         except Exception as e:
-            logger.error(f"验证过程出错: {e}", exc_info=True)
+            logger.error("验证过程出错: %s", e, exc_info=True)
             result["valid"] = False
             result["errors"].append(f"验证失败: {str(e)}")
 
@@ -112,12 +107,12 @@ class DocumentValidator:
         """检查文件是否存在"""
         if not os.path.exists(file_path):
             result["errors"].append(f"文件不存在: {file_path}")
-            logger.error(f"文件不存在: {file_path}")
+            logger.error("文件不存在: %s", file_path)
             return False
 
         if not os.path.isfile(file_path):
             result["errors"].append(f"路径不是文件: {file_path}")
-            logger.error(f"路径不是文件: {file_path}")
+            logger.error("路径不是文件: %s", file_path)
             return False
 
         return True
@@ -142,7 +137,7 @@ class DocumentValidator:
         """检查文件扩展名是否支持"""
         ext = Path(file_path).suffix.lower()
         if ext not in self.supported_extensions:
-            logger.warning(f"不支持的文件扩展名: {ext}")
+            logger.warning("不支持的文件扩展名: %s", ext)
             return False
         return True
 
@@ -150,8 +145,8 @@ class DocumentValidator:
         """检查文件大小"""
         if size > self.max_file_size:
             logger.warning(
-                f"文件大小 {self._format_size(size)} 超过限制 "
-                f"{self._format_size(self.max_file_size)}"
+                "文件大小 %s 超过限制 %s",
+                self._format_size(size), self._format_size(self.max_file_size)
             )
             return False
 
@@ -166,7 +161,7 @@ class DocumentValidator:
         """检查文件权限"""
         if not os.access(file_path, os.R_OK):
             result["errors"].append("文件不可读，请检查权限")
-            logger.error(f"文件不可读: {file_path}")
+            logger.error("文件不可读: %s", file_path)
             return False
         return True
 
@@ -176,10 +171,11 @@ class DocumentValidator:
             return None
 
         try:
+            import magic
             mime = magic.Magic(mime=True)
             return mime.from_file(file_path)
         except Exception as e:
-            logger.warning(f"无法获取MIME类型: {e}")
+            logger.warning("无法获取MIME类型: %s", e)
             return None
 
     def _check_mime_type(self, mime_type: Optional[str], result: Dict) -> bool:
@@ -189,7 +185,7 @@ class DocumentValidator:
 
         file_type = config.get_file_type_by_mime(mime_type)
         if file_type is None:
-            logger.warning(f"不支持的MIME类型: {mime_type}")
+            logger.warning("不支持的MIME类型: %s", mime_type)
             return False
 
         return True
@@ -223,7 +219,7 @@ class DocumentValidator:
                 return True
 
         except Exception as e:
-            logger.error(f"文件完整性检查失败: {e}")
+            logger.error("文件完整性检查失败: %s", e)
             return False
 
     @staticmethod
@@ -267,7 +263,7 @@ class DocumentValidator:
             return True
 
         except Exception as e:
-            logger.error(f"快速验证失败: {e}")
+            logger.error("快速验证失败: %s", e)
             return False
 
     def batch_validate(self, file_paths: List[str]) -> Dict:
@@ -308,9 +304,8 @@ class DocumentValidator:
                 })
 
         logger.info(
-            f"批量验证完成: 总计 {results['total']}, "
-            f"有效 {len(results['valid'])}, "
-            f"无效 {len(results['invalid'])}"
+            "批量验证完成: 总计 %s, 有效 %s, 无效 %s",
+            results['total'], len(results['valid']), len(results['invalid'])
         )
 
         return results